@@ -12,6 +12,8 @@ from django.utils import timezone
 
 from import_export.admin import ImportExportModelAdmin
 
+from .services.incentive_engine import recompute_points
+
 from .models import (
     Client, Employee, Sale, IncentiveRule, MonthlyIncentive, Target,
     MessageTemplate,
@@ -25,6 +27,7 @@ from .models import (
     Campaign,
     CampaignProduct,
     CampaignSlab,
+    PointsRecomputeJob,
 )
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
@@ -131,7 +134,7 @@ class SaleAdmin(admin.ModelAdmin):
     )
     search_fields = ("client__name", "employee__user__username", "product", "policy_type")
     list_filter = ("product", "policy_type", "date")
-    actions = ("export_aggregated_incentives",)  # register the action
+    actions = ("export_aggregated_incentives", "recalc_points_for_employees")
 
     def policy_type_label(self, obj):
         return obj.get_policy_type_display() if obj.policy_type else "-"
@@ -221,6 +224,21 @@ class SaleAdmin(admin.ModelAdmin):
 
     export_aggregated_incentives.short_description = "Export aggregated incentives (CSV)"
 
+    # -----------------------------
+    # Admin action: batch-recompute points
+    # -----------------------------
+    @admin.action(description="Recalculate points for the selected sales' employees")
+    def recalc_points_for_employees(self, request, queryset):
+        """Slab deltas depend on the whole month/campaign window, so every sale
+        of each selected employee is recomputed, not just the ticked rows."""
+        employee_ids = list(queryset.order_by().values_list("employee_id", flat=True).distinct())
+        stats = recompute_points(employee_ids)
+        self.message_user(
+            request,
+            f"Recalculated {stats['sales']} sales across {stats['employees']} employees "
+            f"({stats['updated']} changed).",
+        )
+
 
 
 @admin.register(IncentiveRule)
@@ -229,6 +247,12 @@ class IncentiveRuleAdmin(admin.ModelAdmin):
     list_editable = ('unit_amount', 'points_per_unit', 'active')
     search_fields = ('product',)
 
+@admin.register(PointsRecomputeJob)
+class PointsRecomputeJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "reason", "sales_scanned", "sales_updated", "points_delta", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = [f.name for f in PointsRecomputeJob._meta.fields]
+
 @admin.register(MessageTemplate)
 class MessageTemplateAdmin(admin.ModelAdmin):
     list_display = ("name", "created_by", "created_at")
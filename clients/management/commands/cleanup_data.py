@@ -66,6 +66,12 @@ class Command(BaseCommand):
             expired.delete()
         self.stdout.write(f"  Expired sessions:          {count} {'would be ' if dry_run else ''}deleted")
 
+        # 4. View profiler samples past their retention window
+        from clients.services import profiler
+
+        count = profiler.expired().count() if dry_run else profiler.prune()
+        self.stdout.write(f"  View profiler rows (old):  {count} {'would be ' if dry_run else ''}deleted")
+
         if dry_run:
             self.stdout.write(self.style.WARNING("Dry run — nothing was deleted."))
         else:
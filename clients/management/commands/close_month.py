@@ -1,12 +1,15 @@
 # clients/management/commands/close_month.py
+from datetime import date
+
 from django.core.management.base import BaseCommand
 from django.utils.timezone import now
 from django.db.models import Sum
 from clients.models import Employee, Sale, Target, MonthlyTargetHistory
+from clients.services import closed_periods
 
 
 class Command(BaseCommand):
-    help = "Close the previous month and store employee performance into MonthlyTargetHistory"
+    help = "Close the previous month: store employee performance into MonthlyTargetHistory and freeze its reports"
 
     def handle(self, *args, **kwargs):
         today = now().date()
@@ -55,4 +58,7 @@ class Command(BaseCommand):
                     f"vs Target ₹{target.target_value}"
                 )
 
+        # Freeze the month's reports now that its target history is final.
+        closed_periods.freeze(date(year, month, 1))
+
         self.stdout.write(self.style.SUCCESS(f"Monthly targets closed for {month}/{year}"))
@@ -0,0 +1,49 @@
+"""Print the views with the most queries / time from the view profiler.
+
+Reads the rolling per-hour ViewProfile rows written by the profiler
+middleware (VIEW_PROFILER=1); see clients/services/profiler.py.
+--prune drops rows older than --keep-days first.
+
+Usage:
+    python manage.py profile_report
+    python manage.py profile_report --hours 168 --order avg_queries --limit 10
+    python manage.py profile_report --prune --keep-days 14
+"""
+from django.core.management.base import BaseCommand
+
+from clients.services import profiler
+
+ORDERS = ("total_ms", "avg_ms", "avg_queries", "max_queries", "n_plus_one")
+
+
+class Command(BaseCommand):
+    help = "List the worst views by time, query count or repeated (N+1) queries from the view profiler."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Window to report on (default: 24).")
+        parser.add_argument("--order", choices=ORDERS, default="total_ms", help="Rank views by this column.")
+        parser.add_argument("--limit", type=int, default=20, help="Number of views to print (default: 20).")
+        parser.add_argument("--prune", action="store_true", help="Delete old profiler rows before reporting.")
+        parser.add_argument("--keep-days", type=int, default=profiler.RETENTION_DAYS,
+                            help=f"With --prune, keep this many days (default: {profiler.RETENTION_DAYS}).")
+
+    def handle(self, *args, **opts):
+        if opts["prune"]:
+            self.stdout.write(f"Pruned {profiler.prune(opts['keep_days'])} profiler row(s).")
+
+        rows = profiler.report(hours=opts["hours"], order=opts["order"], limit=opts["limit"])
+        if not rows:
+            self.stdout.write(self.style.WARNING("No profiler samples in this window (is VIEW_PROFILER=1 set?)."))
+            return
+
+        self.stdout.write(
+            f"{'view':<45} {'reqs':>6} {'avg q':>7} {'max q':>6} {'sql ms':>8} {'py ms':>8} {'p95 ms':>7} {'N+1':>5}"
+        )
+        for r in rows:
+            p95 = r["p95_ms"] if r["p95_ms"] is not None else ">5000"
+            self.stdout.write(
+                f"{r['view'][:45]:<45} {r['requests']:>6} {r['avg_queries']:>7.1f} {r['max_queries']:>6} "
+                f"{r['avg_sql_ms']:>8.1f} {r['avg_python_ms']:>8.1f} {p95:>7} {r['n_plus_one_pct']:>4}%"
+            )
+            for sql, times in r["top_duplicates"]:
+                self.stdout.write(f"    x{times} {sql[:110]}")
@@ -0,0 +1,28 @@
+"""Recompute client portfolio columns (SIP / life / health / motor / PMS) from sales.
+
+Sale saves and deletes only apply deltas to these columns; run this to repair
+drift after bulk SQL edits or restores. See clients/services/client_portfolio.py.
+
+Usage:
+    python manage.py rebuild_client_portfolios
+    python manage.py rebuild_client_portfolios --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from clients.services.client_portfolio import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute Client portfolio amounts / status flags for every client with sales."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report how many clients have drifted without writing.")
+
+    def handle(self, *args, **opts):
+        stats = rebuild(dry_run=opts["dry_run"])
+        msg = f"{stats['changed']} of {stats['clients']} clients with sales"
+        if opts["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"[dry-run] {msg} would change."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt portfolios: {msg} updated."))
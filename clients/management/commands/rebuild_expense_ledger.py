@@ -0,0 +1,21 @@
+"""Regenerate the monthly expense ledger (ExpenseMonth) from Expense.
+
+The ledger is kept current by the Expense save / delete path; run this after
+bulk SQL edits, restores or ``QuerySet.update()`` calls on expenses, or if
+the business analytics expense totals ever look off. See
+clients/services/expense_ledger.py.
+
+Usage:
+    python manage.py rebuild_expense_ledger
+"""
+from django.core.management.base import BaseCommand
+
+from clients.services import expense_ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-month expense ledger used by business analytics."
+
+    def handle(self, *args, **opts):
+        stats = expense_ledger.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {stats['rows']} expense ledger row(s)."))
@@ -0,0 +1,45 @@
+"""Regenerate EmployeeProductPeriodTotal from Sale.
+
+The running month / campaign-window totals are kept current by Sale.save and
+the Sale post_delete signal; run this after bulk SQL edits, restores, or if
+slab deltas ever look off. See clients/services/period_totals.py.
+
+Usage:
+    python manage.py rebuild_period_totals
+    python manage.py rebuild_period_totals --employee alice --employee 7
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from clients.models import Employee
+from clients.services.period_totals import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the running (employee, product, month/campaign) sale totals used for slab incentives."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employee", action="append", default=[],
+                            help="Employee id or username (repeatable). Default: everyone.")
+
+    def handle(self, *args, **opts):
+        employee_ids = None
+        if opts["employee"]:
+            employee_ids = self._resolve_employees(opts["employee"])
+
+        stats = rebuild(employee_ids)
+        scope = f"{len(employee_ids)} employee(s)" if employee_ids is not None else "all employees"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {stats['rows']} period total rows for {scope}."))
+
+    def _resolve_employees(self, tokens):
+        ids = set()
+        for token in tokens:
+            token = token.strip()
+            lookup = Q(user__username=token)
+            if token.isdigit():
+                lookup |= Q(pk=int(token))
+            matched = list(Employee.objects.filter(lookup).values_list("pk", flat=True))
+            if not matched:
+                raise CommandError(f"No employee matches '{token}'.")
+            ids.update(matched)
+        return sorted(ids)
@@ -0,0 +1,57 @@
+"""Regenerate (or check) SaleDailyRollup from Sale.
+
+The per-day rollup is kept current by the Sale save / delete path, approvals
+and points recomputes; run this after bulk SQL edits, restores, imports done
+under ``sale_effects.suppressed()``, or if report totals ever look off.
+--verify only lists the days that differ. See clients/services/sale_rollup.py.
+
+Usage:
+    python manage.py rebuild_sale_rollups
+    python manage.py rebuild_sale_rollups --from 2026-04-01 --to 2026-04-30
+    python manage.py rebuild_sale_rollups --verify
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clients.services import sale_rollup
+
+
+def _day(value, flag):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"{flag} must be a YYYY-MM-DD date, got '{value}'.")
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day (employee, product, policy type, status) sales rollup used by dashboards and reports."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", help="First sale date to rebuild (YYYY-MM-DD). Default: all history.")
+        parser.add_argument("--to", dest="end", help="Last sale date to rebuild (YYYY-MM-DD). Default: all history.")
+        parser.add_argument("--verify", action="store_true",
+                            help="Compare the rollup with Sale and list differences instead of rebuilding.")
+
+    def handle(self, *args, **opts):
+        start, end = _day(opts["start"], "--from"), _day(opts["end"], "--to")
+        if start and end and start > end:
+            raise CommandError("--from must not be after --to.")
+
+        if opts["verify"]:
+            mismatches = sale_rollup.verify(start, end)
+            for m in mismatches:
+                self.stdout.write(
+                    f"  {m['date']} employee {m['employee_id']} {m['product']} [{m['status']}]: "
+                    f"{m['sale_count_diff']:+} sale(s), {m['amount_diff']:+} amount, {m['points_diff']:+} pts off"
+                )
+            if mismatches:
+                self.stdout.write(self.style.WARNING(f"{len(mismatches)} rollup row(s) differ from Sale."))
+            else:
+                self.stdout.write(self.style.SUCCESS("Rollup matches Sale."))
+            return
+
+        stats = sale_rollup.rebuild(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {stats['rows']} sale rollup row(s)."))
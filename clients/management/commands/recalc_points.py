@@ -0,0 +1,74 @@
+"""Recompute incentive points for all sales in one batch pass.
+
+Loads rules/slabs/campaigns once, walks each employee's sales in date order
+and writes changed rows back with bulk_update. See
+clients/services/incentive_engine.py.
+
+Usage:
+    python manage.py recalc_points
+    python manage.py recalc_points --employee alice --employee 7
+    python manage.py recalc_points --workers 4 --chunk-size 1000
+    python manage.py recalc_points --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from clients.models import Employee
+from clients.services.incentive_engine import recompute_points
+
+
+class Command(BaseCommand):
+    help = "Recompute Sale.points / incentive_amount for all (or selected) employees in one batch pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employee", action="append", default=[],
+                            help="Employee id or username (repeatable). Default: everyone with sales.")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Process-pool size; employees are split across workers (default 1).")
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Rows per bulk_update batch (default 500).")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Compute and report changes without writing.")
+
+    def handle(self, *args, **opts):
+        employee_ids = None
+        if opts["employee"]:
+            employee_ids = self._resolve_employees(opts["employee"])
+
+        dry = opts["dry_run"]
+
+        def _progress(done, total, stats):
+            self.stdout.write(
+                f"  [{done}/{total}] employees · {stats['sales']} sales scanned · "
+                f"{stats['updated']} {'would change' if dry else 'updated'}"
+            )
+
+        stats = recompute_points(
+            employee_ids,
+            workers=max(1, opts["workers"]),
+            chunk_size=max(1, opts["chunk_size"]),
+            dry_run=dry,
+            progress=_progress,
+        )
+
+        msg = (
+            f"Recomputed {stats['sales']} sales across {stats['employees']} employees; "
+            f"{stats['updated']} {'would change' if dry else 'updated'}."
+        )
+        if dry:
+            self.stdout.write(self.style.WARNING(f"[dry-run] {msg}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(msg))
+
+    def _resolve_employees(self, tokens):
+        ids = set()
+        for token in tokens:
+            token = token.strip()
+            lookup = Q(user__username=token)
+            if token.isdigit():
+                lookup |= Q(pk=int(token))
+            matched = list(Employee.objects.filter(lookup).values_list("pk", flat=True))
+            if not matched:
+                raise CommandError(f"No employee matches '{token}'.")
+            ids.update(matched)
+        return sorted(ids)
@@ -0,0 +1,111 @@
+"""Time the CRM's hot views and services on synthetic data and save JSON results.
+
+Creates a throwaway test database (``test_<NAME>``, as the test runner
+does), fills it with a reproducible synthetic firm (see
+clients/services/bench_data.py), measures every benchmark case (see
+clients/services/benchmarks.py) and writes the results to --output. Your
+real data is never touched. --compare prints the change against an
+earlier results file, e.g. one taken on the previous commit.
+
+Usage:
+    python manage.py run_benchmarks
+    python manage.py run_benchmarks --scale 0.1 --repeat 3
+    python manage.py run_benchmarks --only admin_dashboard --only all_sales
+    python manage.py run_benchmarks --output bench/after.json --compare bench/before.json
+    python manage.py run_benchmarks --keepdb    # reuse the generated database
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from clients.services import bench_data, benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark the hot views and services on a throwaway database of synthetic data; writes JSON results."
+
+    def add_arguments(self, parser):
+        defaults = bench_data.Volumes()
+        parser.add_argument("--scale", type=float, default=1.0, help="Multiply every volume (default: 1.0).")
+        parser.add_argument("--employees", type=int, default=defaults.employees)
+        parser.add_argument("--clients", type=int, default=defaults.clients)
+        parser.add_argument("--sales", type=int, default=defaults.sales)
+        parser.add_argument("--years", type=int, default=defaults.years, help="Years of sales history.")
+        parser.add_argument("--renewals", type=int, default=defaults.renewals)
+        parser.add_argument("--sheets", type=int, default=defaults.sheets)
+        parser.add_argument("--records-per-sheet", type=int, default=defaults.records_per_sheet)
+        parser.add_argument("--followups", type=int, default=defaults.followups)
+        parser.add_argument("--events", type=int, default=defaults.events)
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the generator (default: 42).")
+        parser.add_argument("--repeat", type=int, default=5, help="Warm runs per case (default: 5).")
+        parser.add_argument("--only", action="append", choices=benchmarks.case_names(), default=[],
+                            help="Run only this case (repeatable).")
+        parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results.")
+        parser.add_argument("--compare", help="Earlier results file to compare against.")
+        parser.add_argument("--keepdb", action="store_true",
+                            help="Keep the benchmark database afterwards and reuse it (and its data) next time.")
+
+    def handle(self, *args, **opts):
+        if opts["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        baseline = None
+        if opts["compare"]:
+            try:
+                with open(opts["compare"], encoding="utf-8") as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read --compare file: {exc}")
+
+        volumes = bench_data.Volumes(
+            employees=opts["employees"], clients=opts["clients"], sales=opts["sales"], years=opts["years"],
+            renewals=opts["renewals"], sheets=opts["sheets"], records_per_sheet=opts["records_per_sheet"],
+            followups=opts["followups"], events=opts["events"], scale=opts["scale"],
+        )
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=opts["keepdb"])
+        try:
+            data = self._data(volumes, opts["seed"])
+            results = benchmarks.run(data, repeat=opts["repeat"], only=opts["only"], progress=self._progress)
+            benchmarks.write(opts["output"], results, volumes, opts["seed"], opts["repeat"])
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=opts["keepdb"])
+            teardown_test_environment()
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} result(s) to {opts['output']}."))
+        if baseline is not None:
+            self._compare(baseline, results)
+
+    def _data(self, volumes, seed):
+        from django.contrib.auth.models import User
+
+        from clients.models import LeadSheet
+
+        admin = User.objects.filter(username=f"{bench_data.USERNAME_PREFIX}admin").first()
+        if admin:  # --keepdb: reuse what an earlier run generated
+            self.stdout.write("Reusing the existing benchmark data.")
+            employee = User.objects.filter(username__startswith=f"{bench_data.USERNAME_PREFIX}emp", employee__role="employee").order_by("username").first()
+            return {"admin": admin, "employee": employee, "sheet": LeadSheet.objects.order_by("pk").first()}
+
+        started = time.perf_counter()
+        data = bench_data.generate(volumes, seed=seed)
+        counts = ", ".join(f"{n} {what}" for what, n in data["counts"].items())
+        self.stdout.write(f"Generated {counts} in {time.perf_counter() - started:.1f}s.")
+        return data
+
+    def _progress(self, name, r):
+        self.stdout.write(
+            f"  {name:<30} median {r['ms_median']:>9.1f} ms  cold {r['cold_ms']:>9.1f} ms  "
+            f"{r['queries']:>4} queries ({r['cold_queries']} cold)  {r['repeated_queries']} repeated"
+        )
+
+    def _compare(self, baseline, results):
+        commit = baseline.get("meta", {}).get("commit") or "baseline"
+        self.stdout.write(f"\nAgainst {commit}:")
+        for name, before_ms, now_ms, change, before_q, now_q in benchmarks.compare(baseline, results):
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else (lambda s: s)
+            self.stdout.write(style(
+                f"  {name:<30} {before_ms:>9.1f} -> {now_ms:>9.1f} ms ({change:+.1f}%)  queries {before_q} -> {now_q}"
+            ))
@@ -0,0 +1,48 @@
+"""Run queued retroactive points-recompute jobs.
+
+Incentive rule / slab / campaign edits queue a PointsRecomputeJob on commit
+(see clients/services/recompute_planner.py). With the default
+POINTS_RECOMPUTE_MODE "cron" this command (scheduled every minute in
+CRONJOBS) is what runs them. In the "sync" and opt-in "thread" modes they
+usually run straight away and it picks up anything left over, e.g. after a
+restart, including jobs left RUNNING by a dead worker once their lease
+(POINTS_RECOMPUTE_LEASE_MINUTES) has expired.
+
+Usage:
+    python manage.py run_recompute_jobs
+    python manage.py run_recompute_jobs --list
+"""
+from django.core.management.base import BaseCommand
+
+from clients.models import PointsRecomputeJob
+from clients.services.recompute_planner import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued points-recompute jobs and report what each one changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--list", action="store_true",
+                            help="Show the 20 most recent jobs instead of running anything.")
+
+    def handle(self, *args, **opts):
+        if opts["list"]:
+            for job in PointsRecomputeJob.objects.all()[:20]:
+                self.stdout.write(f"  {self._describe(job)}")
+            return
+
+        jobs = run_pending()
+        if not jobs:
+            self.stdout.write("No queued recompute jobs.")
+            return
+        for job in jobs:
+            style = self.style.SUCCESS if job.status == PointsRecomputeJob.STATUS_DONE else self.style.WARNING
+            self.stdout.write(style(self._describe(job)))
+
+    def _describe(self, job):
+        if job.status == PointsRecomputeJob.STATUS_FAILED:
+            return f"#{job.pk} failed ({job.reason}): {job.error}"
+        return (
+            f"#{job.pk} {job.status} ({job.reason}): {job.sales_updated}/{job.sales_scanned} sales changed "
+            f"across {job.employees} employees, {job.partitions} partitions, {job.points_delta:+} points."
+        )
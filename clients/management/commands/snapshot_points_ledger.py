@@ -0,0 +1,46 @@
+"""Fold new points-ledger entries into the monthly per-employee snapshots.
+
+Balances and monthly histories read PointsLedgerSnapshot plus the ledger rows
+after it, so running this regularly keeps that tail short. Entries younger
+than points_ledger.SNAPSHOT_LAG are left for the next run. --verify compares
+the ledger with Sale.points per employee-month; --repair also posts the
+correcting adjustments. See clients/services/points_ledger.py.
+
+Usage:
+    python manage.py snapshot_points_ledger
+    python manage.py snapshot_points_ledger --verify
+    python manage.py snapshot_points_ledger --verify --repair
+"""
+from django.core.management.base import BaseCommand
+
+from clients.services import points_ledger
+
+
+class Command(BaseCommand):
+    help = "Snapshot the append-only points ledger per employee-month (optionally verify it against Sale)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify", action="store_true",
+                            help="Compare ledger totals with Sale per employee-month and list differences.")
+        parser.add_argument("--repair", action="store_true",
+                            help="With --verify, post adjustment entries for every difference.")
+
+    def handle(self, *args, **opts):
+        if opts["verify"]:
+            mismatches = points_ledger.verify(repair=opts["repair"])
+            for m in mismatches:
+                self.stdout.write(
+                    f"  employee {m['employee_id']} {m['period']:%Y-%m}: "
+                    f"{m['points']:+} pts, {m['amount']:+} amount off"
+                )
+            if not mismatches:
+                self.stdout.write(self.style.SUCCESS("Ledger matches Sale."))
+            elif opts["repair"]:
+                self.stdout.write(self.style.WARNING(f"Posted {len(mismatches)} repair adjustment(s)."))
+            else:
+                self.stdout.write(self.style.WARNING(f"{len(mismatches)} employee-month(s) differ."))
+
+        stats = points_ledger.take_snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot updated {stats['rows']} employee-month row(s) up to entries from {stats['cutoff']:%Y-%m-%d %H:%M}."
+        ))
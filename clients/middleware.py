@@ -0,0 +1,26 @@
+"""Request middleware for the clients app."""
+from .services import profiler
+
+
+class ViewProfilerMiddleware:
+    """Probe each request's queries and timing under its resolved URL name.
+
+    See clients/services/profiler.py. Does nothing unless
+    ``VIEW_PROFILER_ENABLED`` is set.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiler.enabled() or not profiler.sampled():
+            return self.get_response(request)
+
+        with profiler.Probe("") as probe:
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        probe.name = (match.view_name if match else None) or "(unresolved)"
+        profiler.record(probe, profiler.response_size(response))
+        if profiler.flush_due():
+            profiler.flush()
+        return response
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:31
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def _product_key(product_ref_id, label):
+    return f"r{product_ref_id}" if product_ref_id else f"n:{label or ''}"[:60]
+
+
+def backfill_period_totals(apps, schema_editor):
+    """Seed running totals from existing sales (same keys as services/period_totals.py)."""
+    Sale = apps.get_model("clients", "Sale")
+    CampaignProduct = apps.get_model("clients", "CampaignProduct")
+    Total = apps.get_model("clients", "EmployeeProductPeriodTotal")
+
+    totals = {}
+
+    def add(key, amount, points):
+        entry = totals.setdefault(key, [Decimal("0"), Decimal("0")])
+        entry[0] += amount or Decimal("0")
+        entry[1] += points or Decimal("0")
+
+    month_rows = (
+        Sale.objects.annotate(y=ExtractYear("date"), m=ExtractMonth("date"))
+        .values("employee_id", "product_ref_id", "product", "y", "m")
+        .annotate(amount=Sum("amount"), points=Sum("points"))
+        .order_by()
+    )
+    for r in month_rows:
+        pkey = _product_key(r["product_ref_id"], r["product"])
+        add((r["employee_id"], pkey, f"{r['y']:04d}-{r['m']:02d}", None), r["amount"], r["points"])
+
+    for cp in CampaignProduct.objects.filter(campaign__is_active=True).select_related("campaign", "product_ref"):
+        window = Sale.objects.filter(date__range=(cp.campaign.start_date, cp.campaign.end_date))
+        for ref_id, qs in (
+            (cp.product_ref_id, window.filter(product_ref_id=cp.product_ref_id)),
+            (None, window.filter(product_ref__isnull=True, product=cp.product_ref.name)),
+        ):
+            pkey = _product_key(ref_id, cp.product_ref.name)
+            for r in qs.values("employee_id").annotate(amount=Sum("amount"), points=Sum("points")).order_by():
+                add((r["employee_id"], pkey, f"c{cp.campaign_id}", cp.campaign_id), r["amount"], r["points"])
+
+    Total.objects.bulk_create(
+        [
+            Total(
+                employee_id=emp_id, product_key=pkey,
+                product_ref_id=int(pkey[1:]) if pkey.startswith("r") else None,
+                period_key=period, campaign_id=campaign_id,
+                total_amount=amount, total_points=points,
+            )
+            for (emp_id, pkey, period, campaign_id), (amount, points) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0072_campaign_sale_campaign_campaignproduct_campaignslab'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeProductPeriodTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_key', models.CharField(max_length=60)),
+                ('period_key', models.CharField(max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('total_points', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('campaign', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clients.campaign')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_totals', to='clients.employee')),
+                ('product_ref', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clients.product')),
+            ],
+            options={
+                'unique_together': {('employee', 'product_key', 'period_key')},
+            },
+        ),
+        migrations.RunPython(backfill_period_totals, migrations.RunPython.noop),
+    ]
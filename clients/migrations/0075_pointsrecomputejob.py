@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:47
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0074_notification_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsRecomputeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=10)),
+                ('reason', models.CharField(blank=True, default='', max_length=255)),
+                ('scopes', models.JSONField(default=list)),
+                ('employees', models.PositiveIntegerField(default=0)),
+                ('partitions', models.PositiveIntegerField(default=0)),
+                ('sales_scanned', models.PositiveIntegerField(default=0)),
+                ('sales_updated', models.PositiveIntegerField(default=0)),
+                ('points_delta', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=18)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    """One opening entry per earning sale (not rejected), as of its current points."""
+    Sale = apps.get_model("clients", "Sale")
+    Entry = apps.get_model("clients", "PointsLedgerEntry")
+
+    batch = []
+    rows = (
+        Sale.objects.exclude(status="rejected")
+        .values_list("id", "employee_id", "campaign_id", "date", "points", "amount")
+        .order_by("date", "id")
+    )
+    for sale_id, employee_id, campaign_id, day, points, amount in rows.iterator(chunk_size=2000):
+        batch.append(Entry(
+            employee_id=employee_id, sale_id=sale_id, campaign_id=campaign_id,
+            kind="campaign" if campaign_id else "award", period=day.replace(day=1),
+            points=points or Decimal("0"), amount=amount or Decimal("0"), note="opening balance",
+        ))
+        if len(batch) >= 2000:
+            Entry.objects.bulk_create(batch)
+            batch = []
+    Entry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0075_pointsrecomputejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sale_id', models.PositiveBigIntegerField(blank=True, db_index=True, null=True)),
+                ('campaign_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('award', 'Award'), ('slab_delta', 'Slab delta'), ('campaign', 'Campaign override'), ('adjustment', 'Adjustment'), ('reversal', 'Reversal')], max_length=12)),
+                ('period', models.DateField(help_text='First day of the month the points count toward.')),
+                ('points', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=14)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('note', models.CharField(blank=True, default='', max_length=120)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_ledger', to='clients.employee')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['employee', 'period'], name='ledger_emp_period_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PointsLedgerSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('points', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=18)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('last_entry_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_snapshots', to='clients.employee')),
+            ],
+            options={
+                'ordering': ['-period'],
+                'unique_together': {('employee', 'period')},
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
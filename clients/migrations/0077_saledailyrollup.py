@@ -0,0 +1,67 @@
+# Generated by Django 5.2.9 on 2026-10-16 23:59
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rollup(apps, schema_editor):
+    """One rollup row per (date, employee, product, policy type, status) from the existing sales."""
+    Sale = apps.get_model("clients", "Sale")
+    Rollup = apps.get_model("clients", "SaleDailyRollup")
+
+    rows = (
+        Sale.objects.values("date", "employee_id", "product_ref_id", "product", "policy_type", "status")
+        .annotate(amount_sum=Sum("amount"), points_sum=Sum("points"), cover_sum=Sum("cover_amount"), count=Count("id"))
+        .order_by()
+    )
+    merged = {}
+    for r in rows.iterator(chunk_size=2000):
+        ref_id = r["product_ref_id"]
+        product_key = f"r{ref_id}" if ref_id else f"n:{r['product'] or ''}"[:60]
+        key = (r["date"], r["employee_id"], product_key, r["product"] or "", r["policy_type"] or "", r["status"])
+        row = merged.get(key)
+        if row is None:
+            row = merged[key] = Rollup(
+                date=key[0], employee_id=key[1], product_key=key[2], product=key[3], policy_type=key[4],
+                status=key[5], product_ref_id=ref_id,
+            )
+        row.amount += r["amount_sum"] or Decimal("0")
+        row.points += r["points_sum"] or Decimal("0")
+        row.cover_amount += r["cover_sum"] or Decimal("0")
+        row.sale_count += r["count"]
+    Rollup.objects.bulk_create(merged.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0076_points_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaleDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('product_key', models.CharField(max_length=60)),
+                ('product', models.CharField(max_length=50)),
+                ('policy_type', models.CharField(blank=True, default='', max_length=10)),
+                ('status', models.CharField(max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('points', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=18)),
+                ('cover_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('sale_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sale_rollups', to='clients.employee')),
+                ('product_ref', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='clients.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['employee', 'date'], name='rollup_emp_date_idx')],
+                'unique_together': {('date', 'employee', 'product_key', 'product', 'policy_type', 'status')},
+            },
+        ),
+        migrations.RunPython(fill_rollup, migrations.RunPython.noop),
+    ]
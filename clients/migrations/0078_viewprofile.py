@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0077_saledailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=200)),
+                ('hour', models.DateTimeField()),
+                ('requests', models.IntegerField(default=0)),
+                ('queries', models.IntegerField(default=0)),
+                ('max_queries', models.IntegerField(default=0)),
+                ('sql_ms', models.FloatField(default=0)),
+                ('python_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('response_bytes', models.BigIntegerField(default=0)),
+                ('n_plus_one_requests', models.IntegerField(default=0)),
+                ('latency_histogram', models.JSONField(blank=True, default=list)),
+                ('query_histogram', models.JSONField(blank=True, default=list)),
+                ('top_duplicates', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='viewprofile_hour_idx')],
+                'unique_together': {('view_name', 'hour')},
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:49
+
+import django.db.models.deletion
+from datetime import date
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_ledger(apps, schema_editor):
+    """Expand every expense into its months; ongoing recurring ones up to this month."""
+    Expense = apps.get_model("clients", "Expense")
+    ExpenseMonth = apps.get_model("clients", "ExpenseMonth")
+
+    today = timezone.localdate()
+    current = date(today.year, today.month, 1)
+    rows = []
+    for e in Expense.objects.order_by().iterator():
+        month = date(e.spent_on.year, e.spent_on.month, 1)
+        if e.expense_type == "one_time":
+            last = month
+        else:
+            last = date(e.end_on.year, e.end_on.month, 1) if e.end_on else current
+        while month <= last:
+            rows.append(ExpenseMonth(expense_id=e.pk, category_id=e.category_id, month=month, amount=e.amount))
+            month = date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+    ExpenseMonth.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0078_viewprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clients.expensecategory')),
+                ('expense', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_months', to='clients.expense')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'category'], name='expense_month_cat_idx')],
+                'unique_together': {('expense', 'month')},
+            },
+        ),
+        migrations.RunPython(fill_ledger, migrations.RunPython.noop),
+    ]
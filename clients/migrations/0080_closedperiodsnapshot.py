@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:54
+
+import clients.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0079_expensemonth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClosedPeriodSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report', models.CharField(choices=[('business_analytics', 'Business analytics'), ('monthly_business_report', 'Monthly business report'), ('month_performance', 'Past month performance')], max_length=40)),
+                ('month', models.DateField(help_text='First day of the month.')),
+                ('payload', models.JSONField(decoder=clients.models.SnapshotJSONDecoder, encoder=clients.models.SnapshotJSONEncoder)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('report', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:11
+
+from django.db import migrations, models
+
+
+def drop_snapshots(apps, schema_editor):
+    """Id watermarks don't translate to created_at ones; the next snapshot_points_ledger refolds everything."""
+    apps.get_model("clients", "PointsLedgerSnapshot").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0080_closedperiodsnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_snapshots, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='pointsledgersnapshot',
+            name='last_entry_id',
+        ),
+        migrations.AddField(
+            model_name='pointsledgersnapshot',
+            name='folded_through',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='pointsledgerentry',
+            index=models.Index(fields=['created_at'], name='ledger_created_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0081_ledger_snapshot_watermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClosedPeriodGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.', unique=True)),
+                ('generation', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
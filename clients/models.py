@@ -1,3 +1,4 @@
+import json
 import logging
 import re
 import uuid
@@ -9,7 +10,7 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.db import models, transaction
-from django.db.models import Max, Sum
+from django.db.models import Max
 from django.utils import timezone
 from django.utils.html import strip_tags
 
@@ -19,6 +20,52 @@ logger = logging.getLogger(__name__)
 _TEMPLATE_VAR_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
 
 
+class DirtyFieldsMixin:
+    """Remember the column values an instance was loaded (or last saved) with.
+
+    `from_db` snapshots every loaded concrete field by attname, so signal
+    handlers and `save()` can tell what changed without re-reading the row.
+    Instances built in Python (not yet saved) have no snapshot; callers should
+    treat them as "everything changed". Subclasses call `_snapshot_loaded_values()`
+    after a successful save.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_loaded_values()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_loaded_values()
+
+    def _snapshot_loaded_values(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            f.attname: getattr(self, f.attname)
+            for f in self._meta.concrete_fields
+            if f.attname not in deferred
+        }
+
+    def loaded_values(self):
+        """{attname: value} as loaded / last saved, or None for an unsaved instance."""
+        return getattr(self, "_loaded_values", None)
+
+    def changed_fields(self):
+        """Attnames whose current value differs from the snapshot (all fields if there is none)."""
+        loaded = self.loaded_values()
+        if loaded is None:
+            return {f.attname for f in self._meta.concrete_fields}
+        deferred = self.get_deferred_fields()
+        return {
+            f.attname
+            for f in self._meta.concrete_fields
+            if f.attname not in deferred
+            and (f.attname not in loaded or getattr(self, f.attname) != loaded[f.attname])
+        }
+
+
 class Employee(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     role = models.CharField(max_length=50, choices=(("admin", "Admin"), ("manager", "Manager"), ("employee", "Employee")))
@@ -92,15 +139,20 @@ class Product(models.Model):
         For health products, `policy_type` selects the Fresh/Port slab set.
         Falls back to the product's default `margin_percent` if no slab matches.
         """
+        from .services import margin_slabs
+
         amount = Decimal(str(amount or 0))
         pt = (policy_type or "").strip() if self.is_health else ""
-        for slab in self.margin_slabs.filter(policy_type=pt):
-            if amount < slab.min_amount:
-                continue
-            if slab.max_amount is not None and amount > slab.max_amount:
-                continue
-            return slab.margin_percent
-        return self.margin_percent
+        pct = margin_slabs.get_index().percent_for(self.pk, pt, amount)
+        return self.margin_percent if pct is None else pct
+
+    def margin_for_many(self, amounts, policy_type=""):
+        """`margin_for` of each amount in `amounts`, as a list, in one index lookup."""
+        from .services import margin_slabs
+
+        pt = (policy_type or "").strip() if self.is_health else ""
+        pcts = margin_slabs.get_index().percents_for(self.pk, pt, [Decimal(str(a or 0)) for a in amounts])
+        return [self.margin_percent if pct is None else pct for pct in pcts]
 
 
 class ProductMarginSlab(models.Model):
@@ -231,6 +283,106 @@ class Expense(models.Model):
         return True
 
 
+class ExpenseMonth(models.Model):
+    """
+    One month's cost of one `Expense`: a one-time expense has one row, a
+    recurring one a row per month it applies to. Ongoing recurring expenses
+    are extended lazily as later months are asked for, so period expense
+    totals are a grouped SUM; see services/expense_ledger.py.
+    """
+    expense = models.ForeignKey("Expense", on_delete=models.CASCADE, related_name="ledger_months")
+    category = models.ForeignKey("ExpenseCategory", on_delete=models.CASCADE, related_name="+")
+    month = models.DateField(help_text="First day of the month.")
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        unique_together = [("expense", "month")]
+        indexes = [models.Index(fields=["month", "category"], name="expense_month_cat_idx")]
+
+    def __str__(self):
+        return f"{self.month:%b %Y} {self.category_id}: ₹{self.amount}"
+
+
+class SnapshotJSONEncoder(json.JSONEncoder):
+    """JSON that keeps Decimals and dates as such (see SnapshotJSONDecoder)."""
+
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return {"__decimal__": str(o)}
+        if isinstance(o, date):
+            return {"__date__": o.isoformat()}
+        return super().default(o)
+
+
+class SnapshotJSONDecoder(json.JSONDecoder):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, object_hook=self._revive, **kwargs)
+
+    @staticmethod
+    def _revive(obj):
+        if len(obj) == 1:
+            if "__decimal__" in obj:
+                return Decimal(obj["__decimal__"])
+            if "__date__" in obj:
+                return date.fromisoformat(obj["__date__"])
+        return obj
+
+
+class ClosedPeriodSnapshot(models.Model):
+    """
+    A report's computed payload for one closed (past) month, frozen so the
+    page is served from this row instead of recomputed from raw data. Rows
+    are dropped when a back-dated sale, renewal or expense lands in their
+    month; see services/closed_periods.py.
+    """
+    REPORT_BUSINESS_ANALYTICS = "business_analytics"
+    REPORT_MONTHLY_BUSINESS = "monthly_business_report"
+    REPORT_MONTH_PERFORMANCE = "month_performance"
+    REPORT_CHOICES = [
+        (REPORT_BUSINESS_ANALYTICS, "Business analytics"),
+        (REPORT_MONTHLY_BUSINESS, "Monthly business report"),
+        (REPORT_MONTH_PERFORMANCE, "Past month performance"),
+    ]
+
+    report = models.CharField(max_length=40, choices=REPORT_CHOICES)
+    month = models.DateField(help_text="First day of the month.")
+    payload = models.JSONField(encoder=SnapshotJSONEncoder, decoder=SnapshotJSONDecoder)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [("report", "month")]
+
+    def __str__(self):
+        return f"{self.get_report_display()} {self.month:%b %Y}"
+
+
+class ProcessCacheVersion(models.Model):
+    """
+    Version stamp of a process-wide cached copy (the incentive rule book, the
+    margin slab index, a singleton config row). Bumped when the data behind
+    it changes, so every worker rebuilds its copy; see
+    services/process_cache.py.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key} #{self.version}"
+
+
+class ClosedPeriodGeneration(models.Model):
+    """
+    Invalidation counter of one closed month. Every drop of the month's
+    snapshots bumps it, and a payload is only stored if the counter has not
+    moved since its build started; see services/closed_periods.py.
+    """
+    month = models.DateField(unique=True, help_text="First day of the month.")
+    generation = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.month:%b %Y} #{self.generation}"
+
+
 class MFProjectionSettings(models.Model):
     """Singleton forward-projection assumptions for the MF Revenue Engine.
 
@@ -262,8 +414,8 @@ class MFProjectionSettings(models.Model):
 
     @classmethod
     def current(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
-        return obj
+        from .services import singletons  # avoid circular import
+        return singletons.get(cls)
 
 
 class MFSnapshot(models.Model):
@@ -738,7 +890,11 @@ def campaign_product_overlaps(product_ref, start_date, end_date, exclude_campaig
     return qs.exists()
 
 
-class Sale(models.Model):
+class StaleSale(Exception):
+    """A sale's row no longer holds the values the instance was loaded with; see `Sale.save()`."""
+
+
+class Sale(DirtyFieldsMixin, models.Model):
     STATUS_PENDING = "pending"
     STATUS_APPROVED = "approved"
     STATUS_REJECTED = "rejected"
@@ -809,74 +965,59 @@ class Sale(models.Model):
             return self.product_ref.name
         return self.product
 
+    def _sale_day(self):
+        # `date` defaults to timezone.now, so an unsaved sale may still hold a datetime.
+        return self._meta.get_field("date").to_python(self.date or timezone.localdate())
+
     def _active_campaign_product(self):
-        """Return the single CampaignProduct covering this sale's product on its
-        date, or None. Overlap prevention guarantees at most one match."""
-        from .models import CampaignProduct  # avoid circular import
+        """Return the compiled campaign benefit covering this sale's product on
+        its date, or None. Overlap prevention guarantees at most one match."""
+        from .services.incentive_rules import get_rulebook  # avoid circular import
 
-        sale_date = self.date or timezone.localdate()
-        qs = CampaignProduct.objects.select_related("campaign").filter(
-            campaign__is_active=True,
-            campaign__start_date__lte=sale_date,
-            campaign__end_date__gte=sale_date,
+        return get_rulebook().campaign_for(
+            self.product_ref_id, self._effective_product_label(), self._sale_day()
         )
-        if self.product_ref_id:
-            qs = qs.filter(product_ref_id=self.product_ref_id)
-        else:
-            qs = qs.filter(product_ref__name=self._effective_product_label())
-        return qs.first()
+
+    def _slab_delta(self, rule, period_key):
+        """Payout reached by the window's running total + this sale, minus what
+        the employee's other sales in the window already earned."""
+        from .services.period_totals import PeriodClaim  # avoid circular import
+
+        claim = getattr(self, "_period_claim", None) or PeriodClaim(self, lock=False)
+        other_amount, other_points = claim.others(period_key)
+        cumulative_amount = other_amount + (self.amount or Decimal("0"))
+        delta = rule.payout_for(cumulative_amount) - other_points
+        if delta < 0:
+            delta = Decimal("0.00")
+        return delta
 
     def _compute_campaign_points(self, cp):
-        """Compute points from a CampaignProduct benefit (replaces regular)."""
-        from .models import CampaignSlab  # avoid circular import
-
-        if cp.benefit_type == cp.BENEFIT_UNIT:
-            unit = cp.unit_amount or Decimal("0")
-            if unit > 0:
-                self.points = (self.amount / unit) * (cp.points_per_unit or Decimal("0"))
-                self.incentive_amount = self.points
-            else:
-                self.points = Decimal("0.000")
-                self.incentive_amount = Decimal("0.00")
+        """Compute points from a compiled campaign benefit (replaces regular)."""
+        from .models import CampaignProduct  # avoid circular import
+        from .services.period_totals import campaign_key
+
+        if cp.benefit_type == CampaignProduct.BENEFIT_UNIT:
+            self.points = cp.unit_points(self.amount)
+            self.incentive_amount = self.points
             return
 
         # One-time target payout: slab-delta over the campaign window.
-        slab_qs = CampaignSlab.objects.filter(campaign_product=cp).order_by("-threshold")
-        if not slab_qs.exists():
+        if not cp.has_slabs:
             self.points = Decimal("0.000")
             self.incentive_amount = Decimal("0.00")
             return
 
-        campaign = cp.campaign
-        premium = self.amount or Decimal("0")
-        qs = Sale.objects.filter(
-            employee=self.employee,
-            date__range=[campaign.start_date, campaign.end_date],
-        )
-        if self.product_ref_id:
-            qs = qs.filter(product_ref_id=self.product_ref_id)
-        else:
-            qs = qs.filter(product=self._effective_product_label())
-        if self.pk:
-            qs = qs.exclude(pk=self.pk)
-        cumulative_amount = (qs.aggregate(total=Sum("amount"))["total"] or Decimal("0")) + premium
-
-        payout = Decimal("0.00")
-        for slab in slab_qs:
-            if cumulative_amount >= slab.threshold:
-                payout = slab.payout
-                break
-
-        already_awarded = qs.aggregate(total=Sum("points"))["total"] or Decimal("0.00")
-        delta = payout - already_awarded
-        if delta < 0:
-            delta = Decimal("0.00")
-        self.points = delta
-        self.incentive_amount = delta
+        self.points = self.incentive_amount = self._slab_delta(cp, campaign_key(cp.campaign_id))
 
     def compute_points(self):
-        """Compute points based on IncentiveRule + IncentiveSlab in DB"""
-        from .models import IncentiveRule, IncentiveSlab  # avoid circular import
+        """Compute points from the compiled IncentiveRule / IncentiveSlab book.
+
+        Rules, slabs and campaigns come from the process-wide rule book
+        (services/incentive_rules.py); slab payouts read the running
+        month / campaign-window total from EmployeeProductPeriodTotal.
+        """
+        from .services.incentive_rules import get_rulebook  # avoid circular import
+        from .services.period_totals import month_key
 
         product_label = self._effective_product_label()
 
@@ -889,80 +1030,140 @@ class Sale(models.Model):
         # Time-bound campaign takes precedence and fully replaces regular points.
         cp = self._active_campaign_product()
         if cp is not None:
-            self.campaign = cp.campaign
+            self.campaign_id = cp.campaign_id
             self._compute_campaign_points(cp)
             return
         self.campaign = None
 
-        try:
-            rule_qs = IncentiveRule.objects.filter(active=True)
-            if self.product_ref_id:
-                rule_qs = rule_qs.filter(product_ref=self.product_ref)
-            else:
-                rule_qs = rule_qs.filter(product=product_label)
-            rule = rule_qs.get()
-
-            # Check if this rule has slabs → slab-based calculation
-            slab_qs = IncentiveSlab.objects.filter(rule=rule).order_by("-threshold")
-
-            if slab_qs.exists():
-                # Slab-based incentive (e.g. Life Insurance)
-                premium = self.amount or Decimal("0")
-
-                if not rule.active:
-                    self.points = Decimal("0.000")
-                    self.incentive_amount = Decimal("0.00")
-                    return
-
-                sale_month = self.date.month if self.date else timezone.now().month
-                sale_year = self.date.year if self.date else timezone.now().year
-                qs = Sale.objects.filter(employee=self.employee, date__year=sale_year, date__month=sale_month)
-                if self.product_ref_id:
-                    qs = qs.filter(product_ref=self.product_ref)
-                else:
-                    qs = qs.filter(product=product_label)
-                if self.pk:
-                    qs = qs.exclude(pk=self.pk)
-                cumulative_amount = (qs.aggregate(total=Sum("amount"))["total"] or Decimal("0")) + premium
-
-                # Match highest slab threshold <= cumulative amount
-                payout = Decimal("0.00")
-                for slab in slab_qs:
-                    if cumulative_amount >= slab.threshold:
-                        payout = slab.payout
-                        break
-
-                already_awarded = qs.aggregate(total=Sum("points"))["total"] or Decimal("0.00")
-                delta = payout - already_awarded
-                if delta < 0:
-                    delta = Decimal("0.00")
-
-                self.points = delta
-                self.incentive_amount = delta
-                return
-
-            # Unit-based incentive (e.g. SIP, PMS, etc.)
-            if rule.unit_amount > 0:
-                self.points = (self.amount / rule.unit_amount) * rule.points_per_unit
-                self.incentive_amount = self.points  # You can later define ₹ conversion
-            else:
-                self.points = Decimal("0.000")
-                self.incentive_amount = Decimal("0.00")
-        except IncentiveRule.DoesNotExist:
+        rule = get_rulebook().rule_for(self.product_ref_id, product_label)
+        if rule is None:
             self.points = Decimal("0.000")
             self.incentive_amount = Decimal("0.00")
+            return
+
+        if rule.has_slabs:
+            # Slab-based incentive (e.g. Life Insurance): delta over the product-month.
+            self.points = self.incentive_amount = self._slab_delta(rule, month_key(self._sale_day()))
+            return
+
+        # Unit-based incentive (e.g. SIP, PMS, etc.)
+        self.points = rule.unit_points(self.amount)
+        self.incentive_amount = self.points  # You can later define ₹ conversion
+
+    # Inputs of compute_points(); a save touching none of them keeps the stored score.
+    SCORING_FIELDS = frozenset({
+        "employee", "employee_id", "product", "product_ref", "product_ref_id", "amount", "policy_type", "date",
+    })
+
+    # Written by compute_points(); saved alongside any scoring input.
+    SCORE_FIELDS = frozenset({"points", "incentive_amount", "campaign"})
+
+    @staticmethod
+    def delta_fields():
+        """Attnames the derived tables (period totals, rollup, portfolio, points ledger, audit) take deltas of."""
+        from .services import client_portfolio, points_ledger, sale_rollup  # avoid circular import
+
+        return tuple(dict.fromkeys((
+            "status", *client_portfolio.SALE_FIELDS, *points_ledger.SALE_FIELDS, *sale_rollup.SALE_FIELDS,
+        )))
+
+    def _update_guard(self, loaded, update_fields):
+        """{attname: loaded value} of the delta columns, to make the UPDATE conditional on them.
+
+        None when there is no snapshot or the save writes no delta column
+        (e.g. a notes edit), since then nothing derived depends on the old row.
+        """
+        if loaded is None:
+            return None
+        fields = self.delta_fields()
+        if update_fields is not None and {self._meta.get_field(f).attname for f in update_fields}.isdisjoint(fields):
+            return None
+        return {field: loaded[field] for field in fields if field in loaded}
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        guard = getattr(self, "_guard", None)
+        if not guard:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        # UPDATE ... WHERE pk = %s AND <delta columns> = <snapshot>: the
+        # deltas derived from the snapshot are right iff this matches.
+        if super()._do_update(base_qs.filter(**guard), using, pk_val, values, update_fields, forced_update):
+            return True
+        if base_qs.filter(pk=pk_val).exists():
+            raise StaleSale(pk_val)
+        return False
+
+    def _rebase_on_stored_row(self):
+        """Move a stale snapshot onto the stored delta columns, keeping this instance's own edits."""
+        loaded = self._loaded_values
+        fields = [f for f in self.delta_fields() if f in loaded]
+        stored = Sale.objects.filter(pk=self.pk).values(*fields).first()
+        if stored is None:
+            return
+        for field in fields:
+            if getattr(self, field) == loaded[field]:
+                setattr(self, field, stored[field])
+            loaded[field] = stored[field]
 
     def save(self, *args, **kwargs):
-        if self.product_ref_id:
-            self.product = self.product_ref.name
-            self.product_name_snapshot = self.product_ref.name
-        elif self.product:
-            self.product_name_snapshot = self.product
-
-        if not self._is_health_product():
-            self.policy_type = ""
-        self.compute_points()  # always compute before saving
-        super().save(*args, **kwargs)
+        # The loaded snapshot is the "old" side of every delta. The UPDATE only
+        # lands while the row still holds it; an instance loaded before
+        # another write re-reads the row and saves again.
+        while True:
+            try:
+                return self._save_once(*args, **kwargs)
+            except StaleSale:
+                # save_base() flagged the enclosing atomic block for rollback,
+                # but the UPDATE matched nothing and nothing was written, so the
+                # transaction is still good.
+                if transaction.get_connection().in_atomic_block:
+                    transaction.set_rollback(False)
+                self._rebase_on_stored_row()
+
+    def _save_once(self, *args, **kwargs):
+        from .services.period_totals import PeriodClaim  # avoid circular import
+
+        loaded = None if self._state.adding else self.loaded_values()
+        narrow = loaded is not None and not args and kwargs.get("update_fields") is None
+        if narrow and not self.SCORING_FIELDS.intersection(self.changed_fields()):
+            # Status / notes edits: keep the stored score, write only what moved.
+            kwargs["update_fields"] = self.changed_fields() | {"updated_at"}
+        update_fields = kwargs.get("update_fields")
+        self._guard = self._update_guard(loaded, update_fields)
+        try:
+            if update_fields is not None and not self.SCORING_FIELDS.intersection(update_fields):
+                # e.g. save(update_fields=["status", ...]): no re-scoring, no running-total churn.
+                super().save(*args, **kwargs)
+                self._snapshot_loaded_values()
+                return
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | self.SCORE_FIELDS
+
+            if self.product_ref_id:
+                self.product = self.product_ref.name
+                self.product_name_snapshot = self.product_ref.name
+            elif self.product:
+                self.product_name_snapshot = self.product
+
+            if not self._is_health_product():
+                self.policy_type = ""
+
+            # No savepoint: like save_base(), a failed save dooms the enclosing
+            # transaction, and the sale's side effects join its commit buffer.
+            with transaction.atomic(savepoint=False):
+                # Lock the running-total rows this sale leaves / joins, score it
+                # against them, then fold the new amount and points back in.
+                self._period_claim = PeriodClaim(self, lock=True, previous=loaded)
+                try:
+                    self.compute_points()  # always compute before saving
+                    if narrow:
+                        kwargs["update_fields"] = self.changed_fields() | {"updated_at"}
+                    super().save(*args, **kwargs)
+                    self._period_claim.commit()
+                finally:
+                    del self._period_claim
+        finally:
+            del self._guard
+        self._snapshot_loaded_values()
 
     def __str__(self):
         return f"{self.client} - {self.product} - ₹{self.amount}"
@@ -988,6 +1189,190 @@ class MonthlyIncentive(models.Model):
         return f"{self.employee} - {self.year}-{str(self.month).zfill(2)} : {self.total_points} pts"
 
 
+class EmployeeProductPeriodTotal(models.Model):
+    """
+    Running (amount, points) totals of an employee's sales for one product in one
+    slab window — a calendar month (period_key "2026-01") or a campaign window
+    (period_key "c<id>"). Maintained by Sale.save / post_delete so slab deltas
+    are a single-row lookup; see services/period_totals.py.
+    """
+    employee = models.ForeignKey("Employee", on_delete=models.CASCADE, related_name="period_totals")
+    # "r<product_ref_id>", or "n:<product label>" for legacy sales without a product_ref.
+    product_key = models.CharField(max_length=60)
+    product_ref = models.ForeignKey("Product", on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    period_key = models.CharField(max_length=20)
+    campaign = models.ForeignKey("Campaign", on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    total_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal("0.00"))
+    total_points = models.DecimalField(max_digits=18, decimal_places=3, default=Decimal("0.000"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [("employee", "product_key", "period_key")]
+
+    def __str__(self):
+        return f"{self.employee} - {self.product_key} - {self.period_key}: ₹{self.total_amount} / {self.total_points} pts"
+
+
+class PointsRecomputeJob(models.Model):
+    """
+    A queued retroactive recompute after an incentive rule / slab / campaign
+    edit. `scopes` lists the product slices the edit can affect; the runner
+    (services/recompute_planner.py) re-scores only those partitions and records
+    what changed.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    reason = models.CharField(max_length=255, blank=True, default="")
+    # [{"ref": product id or null, "name": label, "start": "YYYY-MM-DD" or null, "end": ...}, ...]
+    scopes = models.JSONField(default=list)
+    employees = models.PositiveIntegerField(default=0)
+    partitions = models.PositiveIntegerField(default=0)
+    sales_scanned = models.PositiveIntegerField(default=0)
+    sales_updated = models.PositiveIntegerField(default=0)
+    points_delta = models.DecimalField(max_digits=18, decimal_places=3, default=Decimal("0.000"))
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Recompute #{self.pk} [{self.status}] {self.reason}"
+
+
+class PointsLedgerEntry(models.Model):
+    """
+    Append-only record of every change to an employee's earned points.
+
+    A sale earns its points (and counts its amount) for the month of its date
+    unless it is rejected. Every save, status change, recompute or delete posts
+    the signed difference here — rows are never updated or deleted — so any
+    month's figure can be replayed entry by entry. See services/points_ledger.py.
+    """
+    KIND_AWARD = "award"
+    KIND_SLAB_DELTA = "slab_delta"
+    KIND_CAMPAIGN = "campaign"
+    KIND_ADJUSTMENT = "adjustment"
+    KIND_REVERSAL = "reversal"
+    KIND_CHOICES = [
+        (KIND_AWARD, "Award"),
+        (KIND_SLAB_DELTA, "Slab delta"),
+        (KIND_CAMPAIGN, "Campaign override"),
+        (KIND_ADJUSTMENT, "Adjustment"),
+        (KIND_REVERSAL, "Reversal"),
+    ]
+
+    employee = models.ForeignKey("Employee", on_delete=models.CASCADE, related_name="points_ledger")
+    # No FK so a deleted sale keeps its history (same as AuditLog.target_id).
+    sale_id = models.PositiveBigIntegerField(null=True, blank=True, db_index=True)
+    campaign_id = models.PositiveBigIntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    period = models.DateField(help_text="First day of the month the points count toward.")
+    points = models.DecimalField(max_digits=14, decimal_places=3, default=Decimal("0.000"))
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    note = models.CharField(max_length=120, blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["employee", "period"], name="ledger_emp_period_idx"),
+            models.Index(fields=["created_at"], name="ledger_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} {self.period:%Y-%m} {self.kind} {self.points:+} pts"
+
+
+class PointsLedgerSnapshot(models.Model):
+    """
+    Per-employee monthly totals folded from the ledger rows created up to
+    `folded_through`. Current figures are the snapshot plus the rows after it.
+    """
+    employee = models.ForeignKey("Employee", on_delete=models.CASCADE, related_name="points_snapshots")
+    period = models.DateField()
+    points = models.DecimalField(max_digits=18, decimal_places=3, default=Decimal("0.000"))
+    amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal("0.00"))
+    folded_through = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [("employee", "period")]
+        ordering = ["-period"]
+
+    def __str__(self):
+        return f"{self.employee} {self.period:%Y-%m}: {self.points} pts (through {self.folded_through})"
+
+
+class SaleDailyRollup(models.Model):
+    """
+    Per-day sales fact table: sum(amount), sum(points), sum(cover_amount) and
+    count of an employee's sales for one product, policy type and status.
+    Kept current from the Sale save / delete path so month and year reports
+    read a few rollup rows instead of every sale; see services/sale_rollup.py.
+    """
+    date = models.DateField()
+    employee = models.ForeignKey("Employee", on_delete=models.CASCADE, related_name="sale_rollups")
+    # "r<product_ref_id>", or "n:<product label>" for legacy sales without a product_ref.
+    product_key = models.CharField(max_length=60)
+    product_ref = models.ForeignKey("Product", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    product = models.CharField(max_length=50)
+    policy_type = models.CharField(max_length=10, blank=True, default="")
+    status = models.CharField(max_length=20)
+    amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal("0.00"))
+    points = models.DecimalField(max_digits=18, decimal_places=3, default=Decimal("0.000"))
+    cover_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal("0.00"))
+    sale_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [("date", "employee", "product_key", "product", "policy_type", "status")]
+        indexes = [models.Index(fields=["employee", "date"], name="rollup_emp_date_idx")]
+
+    def __str__(self):
+        return f"{self.date} {self.employee} {self.product} [{self.status}]: {self.sale_count} sale(s), ₹{self.amount}"
+
+
+class ViewProfile(models.Model):
+    """
+    One hour of profiler samples for a view: request count, query and time
+    totals, latency / query-count histograms and the most repeated query
+    fingerprints. Written by services/profiler.py.
+    """
+    view_name = models.CharField(max_length=200)
+    hour = models.DateTimeField()
+    requests = models.IntegerField(default=0)
+    queries = models.IntegerField(default=0)
+    max_queries = models.IntegerField(default=0)
+    sql_ms = models.FloatField(default=0)
+    python_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    response_bytes = models.BigIntegerField(default=0)
+    n_plus_one_requests = models.IntegerField(default=0)
+    latency_histogram = models.JSONField(default=list, blank=True)
+    query_histogram = models.JSONField(default=list, blank=True)
+    top_duplicates = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        unique_together = [("view_name", "hour")]
+        indexes = [models.Index(fields=["hour"], name="viewprofile_hour_idx")]
+
+    def __str__(self):
+        return f"{self.view_name} @ {self.hour:%Y-%m-%d %H:00}: {self.requests} request(s)"
+
+
 
 class Target(models.Model):
     TARGET_TYPE_CHOICES = [
@@ -1064,8 +1449,8 @@ class ManagerAccessConfig(models.Model):
 
     @classmethod
     def current(cls):
-        cfg, _ = cls.objects.get_or_create(id=1)
-        return cfg
+        from .services import singletons  # avoid circular import
+        return singletons.get(cls)
 
 
 class Redemption(models.Model):
@@ -1633,6 +2018,9 @@ class Notification(models.Model):
         "Sale", null=True, blank=True, on_delete=models.CASCADE
     )
     is_read = models.BooleanField(default=False, db_index=True)
+    # Digest notifications fold several events (e.g. new sales) into one row.
+    group_key = models.CharField(max_length=40, blank=True, default="")
+    event_count = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -1686,6 +2074,6 @@ class FirmSettings(models.Model):
     
     @classmethod
     def get_settings(cls):
-        """Get or create the singleton settings instance."""
-        settings, created = cls.objects.get_or_create(pk=1)
-        return settings
+        """Get or create the singleton settings instance (cached, see services/singletons.py)."""
+        from .services import singletons  # avoid circular import
+        return singletons.get(cls)
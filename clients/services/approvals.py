@@ -0,0 +1,152 @@
+"""Sale approval workbench helpers.
+
+Approving or rejecting used to be one POST → one full `Sale.save()` per sale,
+which re-scores points and fires every Sale signal. Status never feeds points,
+running totals or the client portfolio (they count every status), so bulk
+decisions here skip all of that:
+
+* one `UPDATE ... WHERE id IN (...)` inside a transaction, limited to sales
+  still pending (rows are locked first so concurrent reviewers don't
+  double-log a transition);
+* the matching AuditLog transitions and points-ledger reversals / awards
+  (rejecting removes a sale's earned points) and the sales' moves between
+  status rows of the daily rollup go through `sale_effects.deferred()`:
+  each kind is written with one bulk statement before the transaction
+  commits.
+
+`pending_queue()` serves the approval page with keyset pagination on
+(-date, -id) plus per-employee pending counts.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import points_ledger, sale_effects, sale_rollup
+
+PAGE_SIZE = 50
+
+
+def status_audit_fields(*, sale_id, client_name, old_status, new_status, amount, product,
+                        employee_id, rejection_reason="", actor=None):
+    """AuditLog kwargs for a sale status transition, or None if it isn't one we log."""
+    from clients.models import AuditLog
+
+    action = {
+        "approved": AuditLog.ACTION_SALE_APPROVED,
+        "rejected": AuditLog.ACTION_SALE_REJECTED,
+        "pending": AuditLog.ACTION_SALE_PENDING,
+    }.get(new_status)
+    if not action or old_status == new_status:
+        return None
+    details = {
+        "from": old_status,
+        "to": new_status,
+        "amount": str(amount),
+        "product": product or "",
+        "employee_id": employee_id,
+    }
+    if new_status == "rejected" and rejection_reason:
+        details["rejection_reason"] = rejection_reason
+    return {
+        "action": action,
+        "actor": actor,
+        "target_model": "Sale",
+        "target_id": sale_id,
+        "summary": f"Sale #{sale_id} for {client_name or '?'}: {old_status} → {new_status}",
+        "details": details,
+    }
+
+
+# ---------------- queue ----------------
+
+def encode_cursor(sale):
+    return f"{sale.date.isoformat()}_{sale.pk}"
+
+
+def _decode_cursor(cursor):
+    try:
+        day, pk = cursor.split("_", 1)
+        return date.fromisoformat(day), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def pending_queue(qs, cursor=None, page_size=PAGE_SIZE):
+    """One keyset page of `qs` (already filtered to pending) ordered newest first.
+
+    Returns (sales, next_cursor, counts) where counts is a list of
+    {"employee_id", "username", "full_name", "pending"} over the whole filter.
+    """
+    counts = list(
+        qs.order_by()
+        .values("employee_id", "employee__user__username", "employee__user__first_name", "employee__user__last_name")
+        .annotate(pending=Count("id"))
+        .order_by("-pending", "employee__user__username")
+    )
+    counts = [
+        {
+            "employee_id": row["employee_id"],
+            "username": row["employee__user__username"],
+            "full_name": f"{row['employee__user__first_name']} {row['employee__user__last_name']}".strip(),
+            "pending": row["pending"],
+        }
+        for row in counts
+    ]
+
+    position = _decode_cursor(cursor) if cursor else None
+    page_qs = qs.order_by("-date", "-id")
+    if position:
+        day, pk = position
+        page_qs = page_qs.filter(Q(date__lt=day) | Q(date=day, id__lt=pk))
+    sales = list(page_qs[: page_size + 1])
+    next_cursor = encode_cursor(sales[page_size - 1]) if len(sales) > page_size else None
+    return sales[:page_size], next_cursor, counts
+
+
+# ---------------- decisions ----------------
+
+def decide(sale_ids, new_status, *, actor, reason="", scope=None):
+    """Move the given pending sales to `new_status` in one UPDATE. Returns the number changed.
+
+    `scope` optionally narrows which sales the actor may touch (e.g. a
+    manager limited to their own sales).
+    """
+    from clients.models import Sale
+
+    ids = {int(i) for i in sale_ids if str(i).isdigit()}
+    if not ids:
+        return 0
+    base = scope if scope is not None else Sale.objects.all()
+    with sale_effects.deferred():
+        rows = list(
+            base.filter(id__in=ids, status=Sale.STATUS_PENDING)
+            .select_for_update(of=("self",))
+            .values("id", "client__name", *dict.fromkeys((*points_ledger.SALE_FIELDS, *sale_rollup.SALE_FIELDS)))
+        )
+        if not rows:
+            return 0
+        now = timezone.now()
+        rejection_reason = reason if new_status == Sale.STATUS_REJECTED else ""
+        Sale.objects.filter(id__in=[r["id"] for r in rows]).update(
+            status=new_status,
+            approved_by=actor,
+            approved_at=now,
+            rejection_reason=rejection_reason,
+            updated_at=now,
+        )
+        for row in rows:
+            fields = status_audit_fields(
+                sale_id=row["id"], client_name=row["client__name"], old_status=row["status"],
+                new_status=new_status, amount=row["amount"], product=row["product"],
+                employee_id=row["employee_id"], rejection_reason=rejection_reason, actor=actor,
+            )
+            if fields:
+                sale_effects.audit(created_at=now, **fields)
+            sale_effects.ledger_entries(points_ledger.entries_for_change(
+                row["id"], row, {**row, "status": new_status}, note=f"sale {new_status}",
+            ))
+        sale_effects.rollup_deltas(sale_rollup.status_moves(rows, new_status))
+    return len(rows)
@@ -0,0 +1,204 @@
+"""Synthetic CRM data for the benchmark suite (services/benchmarks.py).
+
+`generate(volumes, seed)` fills an (empty, throwaway) database with a
+reproducible firm: employees, clients, sales spread over several years,
+renewals, lead sheets with JSON records and follow-ups, calendar events and
+monthly MF snapshots. The same seed and volumes give the same rows, so
+benchmark runs on different commits measure the same workload.
+
+Rows are written with ``bulk_create`` under ``sale_effects.suppressed()``
+and the derived tables (points, daily sales rollup, slab-window totals,
+client portfolio columns) are then rebuilt in one pass each, as an import
+would — generating a year of sales one ``save()`` at a time would take
+longer than the benchmarks themselves.
+"""
+from __future__ import annotations
+
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+SALE_PRODUCTS = ("SIP", "LUMSUM", "LIFE_INS", "HEALTH_INS", "MOTOR_INS", "PMS")
+RENEWAL_PRODUCTS = {"LIFE_INS": "life_insurance", "HEALTH_INS": "health_insurance"}
+LEAD_STATUSES = ["New", "Contacted", "Interested", "Not interested", "Converted"]
+USERNAME_PREFIX = "bench_"
+
+
+class Volumes:
+    """How much data to generate; `scale` multiplies every count."""
+
+    def __init__(self, employees=20, clients=2000, sales=20000, years=3, renewals=1500,
+                 sheets=5, records_per_sheet=1000, followups=2000, events=2000, scale=1.0):
+        self.employees = max(int(employees * scale), 2)
+        self.clients = max(int(clients * scale), 1)
+        self.sales = int(sales * scale)
+        self.years = max(int(years), 1)
+        self.renewals = int(renewals * scale)
+        self.sheets = max(int(sheets * scale), 1)
+        self.records_per_sheet = int(records_per_sheet * scale)
+        self.followups = int(followups * scale)
+        self.events = int(events * scale)
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _money(rng, low, high, step=500):
+    return Decimal(rng.randrange(low // step, high // step + 1) * step)
+
+
+def _day(rng, start, end):
+    return start + timedelta(days=rng.randrange((end - start).days + 1))
+
+
+def _aware(day, hour):
+    return timezone.make_aware(datetime.combine(day, time(hour, 0)))
+
+
+def generate(volumes, seed=42, today=None):
+    """Create the synthetic firm; returns {"admin": User, "employee": User, "sheet": LeadSheet, ...counts}."""
+    from django.contrib.auth.models import User
+
+    from clients.models import (
+        CalendarEvent, Client, Employee, LeadSheet, LeadSheetColumn, LeadSheetFollowUp, LeadSheetRecord,
+        MFSnapshot, Product, Renewal, Sale,
+    )
+    from clients.services import client_portfolio, incentive_rules, period_totals, sale_effects, sale_rollup
+    from clients.services.incentive_engine import recompute_points
+
+    rng = random.Random(seed)
+    today = today or timezone.localdate()
+    start = date(today.year - volumes.years + 1, 1, 1)
+    products = {p.code: p for p in Product.objects.filter(code__in=SALE_PRODUCTS)}
+    sale_products = [products[code] for code in SALE_PRODUCTS if code in products]
+
+    # Team: one admin plus employees (every tenth a manager).
+    admin_user = User.objects.create_superuser(username=f"{USERNAME_PREFIX}admin", password="bench")
+    Employee.objects.create(user=admin_user, role="admin")
+    users = User.objects.bulk_create([
+        User(username=f"{USERNAME_PREFIX}emp{i:04d}", first_name=f"Emp{i}") for i in range(volumes.employees)
+    ])
+    employees = Employee.objects.bulk_create([
+        Employee(user=u, role="manager" if i % 10 == 9 else "employee", salary=Decimal(25000 + 500 * i))
+        for i, u in enumerate(users)
+    ])
+    staff = [e for e in employees if e.role == "employee"] or employees
+
+    first_id = (Client.objects.order_by("-id").values_list("id", flat=True).first() or 0) + 1
+    clients = Client.objects.bulk_create([
+        Client(
+            id=first_id + i, name=f"Client {i:06d}", phone=f"9{rng.randrange(10**9):09d}",
+            mapped_to=rng.choice(staff), status="Mapped",
+            sip_status=rng.random() < 0.4, health_status=rng.random() < 0.2,
+        )
+        for i in range(volumes.clients)
+    ], batch_size=1000)
+
+    statuses = [Sale.STATUS_APPROVED] * 8 + [Sale.STATUS_PENDING, Sale.STATUS_REJECTED]
+    with sale_effects.suppressed():
+        sales = []
+        for _ in range(volumes.sales):
+            product = rng.choice(sale_products)
+            is_insurance = product.code in ("LIFE_INS", "HEALTH_INS")
+            sales.append(Sale(
+                client=rng.choice(clients), employee=rng.choice(staff), product=product.name,
+                product_ref=product, product_name_snapshot=product.name,
+                amount=_money(rng, 1000, 200000), date=_day(rng, start, today), status=rng.choice(statuses),
+                cover_amount=_money(rng, 500000, 5000000, 100000) if is_insurance else None,
+                policy_type=rng.choice([Sale.POLICY_TYPE_FRESH, Sale.POLICY_TYPE_PORT]) if product.code == "HEALTH_INS" else "",
+            ))
+        Sale.objects.bulk_create(sales, batch_size=2000)
+
+    renewal_products = [(products[code], kind) for code, kind in RENEWAL_PRODUCTS.items() if code in products]
+    Renewal.objects.bulk_create([
+        Renewal(
+            client=rng.choice(clients), product_ref=product, product_type=kind,
+            renewal_date=_day(rng, start, today + timedelta(days=365)),
+            frequency=rng.choice([c for c, _ in Renewal.FREQUENCY_CHOICES]),
+            employee=rng.choice(staff), premium_amount=_money(rng, 5000, 100000),
+            premium_collected_on=_day(rng, start, today),
+        )
+        for product, kind in (rng.choice(renewal_products) for _ in range(volumes.renewals))
+    ], batch_size=2000)
+
+    sheets = []
+    for s in range(volumes.sheets):
+        sheet = LeadSheet.objects.create(name=f"Bench sheet {s}", owner=rng.choice(employees), is_private=False)
+        sheet.shared_with.add(*rng.sample(staff, min(len(staff), 5)))
+        LeadSheetColumn.objects.bulk_create([
+            LeadSheetColumn(sheet=sheet, name="Name", field_key="name", display_order=0),
+            LeadSheetColumn(sheet=sheet, name="Phone", field_key="phone", type=LeadSheetColumn.TYPE_PHONE, display_order=1),
+            LeadSheetColumn(sheet=sheet, name="City", field_key="city", display_order=2),
+            LeadSheetColumn(sheet=sheet, name="Budget", field_key="budget", type=LeadSheetColumn.TYPE_NUMBER, display_order=3),
+            LeadSheetColumn(sheet=sheet, name="Status", field_key="status", type=LeadSheetColumn.TYPE_STATUS,
+                            options=LEAD_STATUSES, display_order=4),
+        ])
+        LeadSheetRecord.objects.bulk_create([
+            LeadSheetRecord(
+                sheet=sheet, assigned_to=rng.choice(staff),
+                values={
+                    "name": f"Lead {s}-{r}", "phone": f"8{rng.randrange(10**9):09d}",
+                    "city": rng.choice(["Pune", "Mumbai", "Nashik", "Nagpur"]),
+                    "budget": rng.randrange(1, 50) * 10000, "status": rng.choice(LEAD_STATUSES),
+                },
+                tags=rng.sample(["hot", "callback", "vip", "nri"], rng.randrange(3)),
+                created_at=_aware(_day(rng, today - timedelta(days=365), today), rng.randrange(9, 19)),
+            )
+            for r in range(volumes.records_per_sheet)
+        ], batch_size=2000)
+        sheets.append(sheet)
+
+    record_ids = list(LeadSheetRecord.objects.filter(sheet__in=sheets).values_list("id", flat=True))
+    if record_ids:
+        LeadSheetFollowUp.objects.bulk_create([
+            LeadSheetFollowUp(
+                record_id=rng.choice(record_ids), note="Call back",
+                scheduled_at=_aware(_day(rng, today - timedelta(days=60), today + timedelta(days=60)), rng.randrange(9, 19)),
+                completed=rng.random() < 0.5,
+            )
+            for _ in range(volumes.followups)
+        ], batch_size=2000)
+
+    CalendarEvent.objects.bulk_create([
+        CalendarEvent(
+            employee=rng.choice(staff), client=rng.choice(clients), title=f"Follow-up {i}",
+            type=rng.choice([t for t, _ in CalendarEvent.EVENT_TYPES]),
+            scheduled_time=_aware(_day(rng, today - timedelta(days=90), today + timedelta(days=90)), rng.randrange(9, 19)),
+            status=rng.choice(["pending", "completed"]),
+        )
+        for i in range(volumes.events)
+    ], batch_size=2000)
+
+    snapshots, aum, month = [], Decimal("50000000"), start
+    while month <= today:
+        end = (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        closing = aum * Decimal(1 + rng.uniform(-0.02, 0.04)).quantize(Decimal("0.0001"))
+        snapshots.append(MFSnapshot(
+            start_date=month, end_date=end, opening_aum=aum.quantize(Decimal("1")), closing_aum=closing.quantize(Decimal("1")),
+            gross_sip_registered=_money(rng, 50000, 500000), active_sip_book=_money(rng, 2000000, 5000000),
+            stopped_sip_amount=_money(rng, 10000, 100000), new_lumpsum=_money(rng, 100000, 2000000),
+            redemptions=_money(rng, 100000, 1500000), trail_income=_money(rng, 20000, 80000),
+            insurance_new_business=_money(rng, 20000, 200000), insurance_renewals=_money(rng, 20000, 150000),
+        ))
+        aum, month = closing, end + timedelta(days=1)
+    MFSnapshot.objects.bulk_create(snapshots)
+
+    # Derived tables, as an import would rebuild them.
+    incentive_rules.invalidate()
+    recompute_points()
+    sale_rollup.rebuild()
+    period_totals.rebuild()
+    client_portfolio.rebuild()
+
+    return {
+        "admin": admin_user,
+        "employee": staff[0].user,
+        "sheet": sheets[0],
+        "counts": {
+            "employees": len(employees), "clients": len(clients), "sales": len(sales),
+            "renewals": volumes.renewals, "lead_records": len(record_ids),
+            "followups": volumes.followups, "events": volumes.events, "mf_snapshots": len(snapshots),
+        },
+    }
@@ -0,0 +1,219 @@
+"""Benchmark suite for the CRM's hot views and services.
+
+Each case is registered with `@_case(name)` and returns the callable to time
+(views are fetched through the Django test client, logged in as the
+generated admin or employee). `run()` measures every case:
+
+* once cold — the default cache and the process caches (rule book,
+  margin slabs, singletons) cleared first, as after a deploy or a data change;
+* `repeat` times warm, reporting min / median / max wall time;
+
+and records the query count, repeated statements (profiler fingerprints)
+and response size of each run, via `profiler.Probe`. `write()` stores the
+results as JSON with the commit and volumes they were taken at, and
+`compare()` lines two result files up so a change can be measured rather
+than guessed. The ``run_benchmarks`` command drives all of this against a
+throwaway database filled by services/bench_data.py.
+"""
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import subprocess
+from datetime import timedelta
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from . import incentive_rules, margin_slabs, profiler, singletons
+
+_CASES = {}
+
+
+def _case(name):
+    def register(setup):
+        _CASES[name] = setup
+        return setup
+    return register
+
+
+def case_names():
+    return list(_CASES)
+
+
+class _Context:
+    """What the cases need: logged-in clients and a few generated rows."""
+
+    def __init__(self, data):
+        from django.test import Client as HttpClient
+
+        self.data = data
+        self.admin = HttpClient()
+        self.admin.force_login(data["admin"])
+        self.employee = HttpClient()
+        self.employee.force_login(data["employee"])
+
+    def get(self, http, url, params=None):
+        def fetch():
+            response = http.get(url, params or {})
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+            return response
+        return fetch
+
+
+@_case("admin_dashboard")
+def _admin_dashboard(ctx):
+    return ctx.get(ctx.admin, reverse("clients:admin_dashboard"))
+
+
+@_case("employee_dashboard")
+def _employee_dashboard(ctx):
+    return ctx.get(ctx.employee, reverse("clients:employee_dashboard"))
+
+
+@_case("all_sales")
+def _all_sales(ctx):
+    return ctx.get(ctx.admin, reverse("clients:all_sales"))
+
+
+@_case("all_clients_product_filter")
+def _all_clients_product_filter(ctx):
+    from clients.models import Product
+
+    sip = Product.objects.get(code="SIP")
+    return ctx.get(ctx.admin, reverse("clients:all_clients"), {f"product_{sip.pk}_status": "yes", f"product_{sip.pk}_min": "1000"})
+
+
+@_case("business_analytics_annual")
+def _business_analytics_annual(ctx):
+    return ctx.get(ctx.admin, reverse("clients:business_analytics"), {"view": "annual"})
+
+
+@_case("lead_sheet_detail")
+def _lead_sheet_detail(ctx):
+    return ctx.get(ctx.admin, reverse("clients:lead_sheet_detail", args=[ctx.data["sheet"].pk]))
+
+
+@_case("lead_sheet_stats")
+def _lead_sheet_stats(ctx):
+    return ctx.get(ctx.admin, reverse("clients:lead_sheet_stats", args=[ctx.data["sheet"].pk]))
+
+
+@_case("calendar_events_json")
+def _calendar_events_json(ctx):
+    # The month grid FullCalendar asks for: six weeks from the 1st.
+    first = timezone.localdate().replace(day=1)
+    return ctx.get(ctx.employee, reverse("clients:calendar_events_json"), {
+        "start": f"{first.isoformat()}T00:00:00", "end": f"{(first + timedelta(days=42)).isoformat()}T00:00:00",
+    })
+
+
+@_case("recalc_points")
+def _recalc_points(ctx):
+    from .incentive_engine import recompute_points
+
+    return lambda: recompute_points(dry_run=True)
+
+
+@_case("mf_engine.build_dashboard")
+def _mf_build_dashboard(ctx):
+    from clients.models import MFProjectionSettings, MFSnapshot
+    from .mf_engine import build_dashboard
+
+    def build():
+        history = list(MFSnapshot.objects.order_by("start_date"))
+        anchor = next((s for s in reversed(history) if s.closing_aum is not None), None)
+        return build_dashboard(history[-1], MFProjectionSettings.current(), horizon_months=120, projection_anchor=anchor)
+    return build
+
+
+def _reset_caches():
+    cache.clear()
+    incentive_rules.invalidate()
+    margin_slabs.invalidate()
+    singletons.clear()
+
+
+def _measure(func):
+    with profiler.Probe("bench") as probe:
+        result = func()
+    return {
+        "ms": round(probe.total_ms, 2),
+        "sql_ms": round(probe.sql_ms, 2),
+        "queries": probe.queries,
+        "repeated": sum(n - 1 for n in probe.duplicates().values()),
+        "bytes": profiler.response_size(result),
+    }
+
+
+def run(data, repeat=5, only=None, progress=None):
+    """Measure every case (or those in `only`); returns {case: stats}."""
+    ctx = _Context(data)
+    results = {}
+    for name, setup in _CASES.items():
+        if only and name not in only:
+            continue
+        func = setup(ctx)
+        _reset_caches()
+        cold = _measure(func)
+        warm = [_measure(func) for _ in range(repeat)]
+        times = [w["ms"] for w in warm]
+        results[name] = {
+            "cold_ms": cold["ms"],
+            "cold_queries": cold["queries"],
+            "ms_min": min(times),
+            "ms_median": round(statistics.median(times), 2),
+            "ms_max": max(times),
+            "sql_ms_median": round(statistics.median(w["sql_ms"] for w in warm), 2),
+            "queries": warm[-1]["queries"],
+            "repeated_queries": max(w["repeated"] for w in [cold, *warm]),
+            "bytes": warm[-1]["bytes"],
+        }
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def write(path, results, volumes, seed, repeat):
+    payload = {
+        "meta": {
+            "commit": _git_commit(),
+            "taken_at": timezone.now().isoformat(timespec="seconds"),
+            "seed": seed,
+            "repeat": repeat,
+            "volumes": volumes.as_dict(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+    return payload
+
+
+def compare(baseline, results):
+    """Rows of (case, baseline median ms, median ms, % change, baseline queries, queries)."""
+    rows = []
+    for name, now in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        change = (now["ms_median"] - before["ms_median"]) / before["ms_median"] * 100 if before["ms_median"] else 0.0
+        rows.append((name, before["ms_median"], now["ms_median"], round(change, 1), before["queries"], now["queries"]))
+    return rows
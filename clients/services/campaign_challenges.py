@@ -0,0 +1,182 @@
+"""Campaign challenge progress for the employee dashboard and the leaderboard.
+
+The "Gamified Campaign Challenges" block used to run three aggregates
+(approved amount, approved points, pending points) against `Sale` for every
+product of every live campaign — 3 × N queries that grew with each campaign.
+
+`window_totals()` reads all of them at once: one grouped query over
+`SaleDailyRollup`, restricted to the live products and the hull of the
+campaign windows, with one conditional ``Sum(..., filter=Q(...))`` bucket
+per campaign product (its product and its own date window). Grouping by
+employee lets the same query feed the firm-wide `leaderboard()`.
+
+`evaluate()` turns one campaign product's totals into the dict the
+dashboard template renders; slab progress is computed from the prefetched
+slabs, so the whole block is two queries for the campaigns (plus their
+prefetches) and one for the totals, however many campaigns are live.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+
+ZERO = Decimal("0")
+_EMPTY = (ZERO, ZERO, ZERO)
+
+
+def live_campaigns(today):
+    """Campaigns running on `today`, soonest-ending first, with products and slabs prefetched."""
+    from clients.models import Campaign
+
+    return list(
+        Campaign.objects.filter(is_active=True, start_date__lte=today, end_date__gte=today)
+        .prefetch_related("products__slabs", "products__product_ref")
+        .order_by("end_date")
+    )
+
+
+def _campaign_products(campaigns):
+    return [(camp, cp) for camp in campaigns for cp in camp.products.all()]
+
+
+def window_totals(campaigns, employee_ids=None):
+    """{employee_id: {campaign_product_id: (approved amount, approved points, pending points)}}.
+
+    One query for all of `campaigns`; pass `employee_ids` to limit it to
+    those employees (the dashboard passes just the viewer).
+    """
+    from clients.models import Sale, SaleDailyRollup
+
+    pairs = _campaign_products(campaigns)
+    if not pairs:
+        return {}
+    buckets = {}
+    for camp, cp in pairs:
+        window = Q(product_ref_id=cp.product_ref_id, date__gte=camp.start_date, date__lte=camp.end_date)
+        approved = window & Q(status=Sale.STATUS_APPROVED)
+        buckets[f"a{cp.pk}"] = Sum("amount", filter=approved)
+        buckets[f"p{cp.pk}"] = Sum("points", filter=approved)
+        buckets[f"q{cp.pk}"] = Sum("points", filter=window & Q(status=Sale.STATUS_PENDING))
+
+    qs = SaleDailyRollup.objects.filter(
+        product_ref_id__in={cp.product_ref_id for _camp, cp in pairs},
+        date__gte=min(camp.start_date for camp, _cp in pairs),
+        date__lte=max(camp.end_date for camp, _cp in pairs),
+    )
+    if employee_ids is not None:
+        qs = qs.filter(employee_id__in=employee_ids)
+
+    totals = {}
+    for row in qs.values("employee_id").annotate(**buckets).order_by():
+        totals[row["employee_id"]] = {
+            cp.pk: (row[f"a{cp.pk}"] or ZERO, row[f"p{cp.pk}"] or ZERO, row[f"q{cp.pk}"] or ZERO)
+            for _camp, cp in pairs
+        }
+    return totals
+
+
+def evaluate(camp, cp, totals, today):
+    """The challenge card for one campaign product given its `totals` triple."""
+    from clients.models import CampaignProduct
+
+    cumulative, earned, pending_pts = totals
+    challenge = {
+        "campaign": camp.name,
+        "end_date": camp.end_date,
+        "days_left": (camp.end_date - today).days,
+        "product": cp.product_ref.name,
+        "benefit_type": cp.benefit_type,
+        "earned_points": earned,
+        "pending_points": pending_pts,
+        "cumulative": cumulative,
+    }
+
+    if cp.benefit_type == CampaignProduct.BENEFIT_UNIT:
+        challenge["unit_amount"] = cp.unit_amount or ZERO
+        challenge["points_per_unit"] = cp.points_per_unit or ZERO
+        return challenge
+
+    slabs = sorted(cp.slabs.all(), key=lambda s: s.threshold)
+    current_payout = ZERO
+    next_threshold = None
+    next_payout = None
+    for s in slabs:
+        if cumulative >= s.threshold:
+            current_payout = s.payout
+        else:
+            next_threshold = s.threshold
+            next_payout = s.payout
+            break
+    if next_threshold is not None and next_threshold > 0:
+        progress = min(cumulative / next_threshold * Decimal("100"), Decimal("100"))
+        amount_to_next = next_threshold - cumulative
+        top_reached = False
+    else:
+        progress = Decimal("100")
+        amount_to_next = ZERO
+        top_reached = True
+    challenge.update({
+        "current_payout": current_payout,
+        "next_threshold": next_threshold,
+        "next_payout": next_payout,
+        "progress": progress,
+        "amount_to_next": amount_to_next,
+        "top_reached": top_reached,
+        "max_payout": slabs[-1].payout if slabs else ZERO,
+    })
+    return challenge
+
+
+def challenges_for(employee, today, campaigns=None):
+    """`employee`'s challenge cards for every campaign product live on `today`."""
+    if campaigns is None:
+        campaigns = live_campaigns(today)
+    mine = window_totals(campaigns, employee_ids=[employee.pk]).get(employee.pk, {})
+    return [evaluate(camp, cp, mine.get(cp.pk, _EMPTY), today) for camp, cp in _campaign_products(campaigns)]
+
+
+def _rank_key(challenge):
+    # Target campaigns race on sales towards the slabs; unit campaigns on points.
+    if challenge["benefit_type"] == "target":
+        return (challenge["cumulative"], challenge["earned_points"])
+    return (challenge["earned_points"], challenge["cumulative"])
+
+
+def leaderboard(today, campaigns=None):
+    """Firm-wide standings for each live campaign product.
+
+    [{"campaign", "product", "benefit_type", "end_date", "days_left",
+      "rows": [{"rank", "employee_id", "employee", **challenge}, ...]}]
+    Rows cover every active employee with sales in the window, best first.
+    """
+    from clients.models import Employee
+
+    if campaigns is None:
+        campaigns = live_campaigns(today)
+    totals = window_totals(campaigns)
+    names = {
+        e.pk: e.user.get_full_name() or e.user.username
+        for e in Employee.objects.filter(pk__in=list(totals), active=True).select_related("user")
+    }
+    boards = []
+    for camp, cp in _campaign_products(campaigns):
+        rows = []
+        for emp_id, name in names.items():
+            triple = totals[emp_id].get(cp.pk, _EMPTY)
+            if not any(triple):
+                continue
+            rows.append({"employee_id": emp_id, "employee": name, **evaluate(camp, cp, triple, today)})
+        rows.sort(key=lambda r: r["employee"].lower())
+        rows.sort(key=_rank_key, reverse=True)  # stable: ties stay alphabetical
+        for rank, row in enumerate(rows, 1):
+            row["rank"] = rank
+        boards.append({
+            "campaign": camp.name,
+            "product": cp.product_ref.name,
+            "benefit_type": cp.benefit_type,
+            "end_date": camp.end_date,
+            "days_left": (camp.end_date - today).days,
+            "rows": rows,
+        })
+    return boards
@@ -0,0 +1,127 @@
+"""Client portfolio columns derived from sales.
+
+`Client.sip_amount`, `life_cover`, `health_cover`, `motor_insured_value` and
+`pms_amount` (plus their `*_status` flags) are the sum of the client's sales
+in that product bucket. Rather than re-aggregating every sale of the client on
+each save, the Sale signals hand the old and new row to `sale_deltas()`
+(coalesced per transaction by services/sale_effects.py), and
+`apply_deltas()` adds the difference to just the affected columns with one
+`F()`-expression `update()` per client — no `Client.save()`, so `edited_at`
+is left alone.
+
+`rebuild()` (``manage.py rebuild_client_portfolios``) recomputes every client
+that has sales from one grouped query, for drift repair.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Case, F, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+
+from .incentive_rules import get_rulebook
+
+ZERO = Decimal("0")
+
+# (product code, fallback name, client value column, client status column, sale field)
+BUCKETS = (
+    ("SIP", "SIP", "sip_amount", "sip_status", "amount"),
+    ("LIFE_INS", "Life Insurance", "life_cover", "life_status", "cover_amount"),
+    ("HEALTH_INS", "Health Insurance", "health_cover", "health_status", "cover_amount"),
+    ("MOTOR_INS", "Motor Insurance", "motor_insured_value", "motor_status", "amount"),
+    ("PMS", "PMS", "pms_amount", "pms_status", "amount"),
+)
+SALE_FIELDS = ("client_id", "product_ref_id", "product", "amount", "cover_amount")
+
+
+def sale_row(sale):
+    """The fields of a Sale instance that feed its client's portfolio."""
+    return {field: getattr(sale, field) for field in SALE_FIELDS}
+
+
+def contribution(row, products=None):
+    """{client column: value} that one sale row adds to its client.
+
+    A sale counts toward a bucket when its product_ref has the bucket's code or
+    its product label equals that product's name.
+    """
+    products = products if products is not None else get_rulebook().products
+    names = {p["code"]: p["name"] for p in products.values()}
+    ref = products.get(row["product_ref_id"]) if row["product_ref_id"] else None
+    out = {}
+    for code, fallback, column, _status, field in BUCKETS:
+        if (ref and ref["code"] == code) or row["product"] == names.get(code, fallback):
+            value = row[field] or ZERO
+            if value:
+                out[column] = out.get(column, ZERO) + value
+    return out
+
+
+def sale_deltas(old, new, deltas=None, products=None):
+    """Accumulate the move of one sale from `old` to `new` (either may be None)
+    into `deltas` ({client_id: {column: delta}}) and return it."""
+    products = products if products is not None else get_rulebook().products
+    if deltas is None:
+        deltas = defaultdict(lambda: defaultdict(lambda: ZERO))
+    if old and old["client_id"]:
+        for column, value in contribution(old, products).items():
+            deltas[old["client_id"]][column] -= value
+    if new and new["client_id"]:
+        for column, value in contribution(new, products).items():
+            deltas[new["client_id"]][column] += value
+    return deltas
+
+
+def apply_deltas(deltas):
+    """One F()-expression update() per client, touching only columns that moved."""
+    from clients.models import Client
+
+    status_for = {column: status for _c, _f, column, status, _s in BUCKETS}
+    for client_id, by_column in deltas.items():
+        changes = {}
+        for column, delta in by_column.items():
+            if not delta:
+                continue
+            updated = Coalesce(F(column), Value(ZERO)) + Value(delta)
+            changes[column] = updated
+            changes[status_for[column]] = Case(
+                When(GreaterThan(updated, ZERO), then=Value(True)), default=Value(False),
+            )
+        if changes:
+            Client.objects.filter(pk=client_id).update(**changes)
+
+
+def rebuild(*, dry_run=False):
+    """Recompute the portfolio columns of every client with sales. Returns {"clients": n, "changed": m}."""
+    from clients.models import Client, Sale
+
+    products = get_rulebook().products
+    totals = defaultdict(lambda: defaultdict(lambda: ZERO))
+    rows = (
+        Sale.objects.values("client_id", "product_ref_id", "product")
+        .annotate(amount=Sum("amount"), cover_amount=Sum("cover_amount"))
+        .order_by()
+    )
+    for row in rows:
+        for column, value in contribution(row, products).items():
+            totals[row["client_id"]][column] += value
+        totals[row["client_id"]]  # clients whose sales fill no bucket still get zeroed
+
+    fields = [c for _c, _f, column, status, _s in BUCKETS for c in (column, status)]
+    changed = []
+    for client in Client.objects.filter(pk__in=list(totals)).only("id", *fields):
+        dirty = False
+        for _c, _f, column, status, _s in BUCKETS:
+            value = totals[client.pk][column]
+            if getattr(client, column) != value or getattr(client, status) != (value > 0):
+                setattr(client, column, value)
+                setattr(client, status, value > 0)
+                dirty = True
+        if dirty:
+            changed.append(client)
+
+    if changed and not dry_run:
+        Client.objects.bulk_update(changed, fields, batch_size=500)
+    return {"clients": len(totals), "changed": len(changed)}
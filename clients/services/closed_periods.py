@@ -0,0 +1,352 @@
+"""Frozen report snapshots for closed months (`ClosedPeriodSnapshot`).
+
+A past month does not change once it is over, yet `business_analytics`,
+`monthly_business_report` and `admin_past_month_performance` recomputed it
+from sales, renewals and expenses on every visit. Each report's computed
+payload for a closed month — any month before the current one — is kept in
+one `ClosedPeriodSnapshot` row:
+
+* the first visit to a closed month builds the payload and stores it, and
+  ``manage.py close_month`` (re)freezes the month it closes with `freeze()`
+  once MonthlyTargetHistory is written;
+* `invalidate(*days)` drops every snapshot of the closed months those days
+  fall in. Back-dated sales reach it from services/sale_rollup.py (every
+  Sale write path), expenses and renewals from their receivers in
+  `clients.signals`;
+* the current month is always computed live.
+
+A build can read the month before a concurrent back-dated write commits
+and store its payload after that write's `invalidate()` ran, which would
+freeze the old numbers. `invalidate()` therefore also bumps the month's
+`ClosedPeriodGeneration` inside the writing transaction, and `_served`
+stores a payload only if, holding that row's lock, the generation is still
+the one it read before building.
+
+Payloads hold plain lists and dicts (Decimals and dates survive the JSON
+round trip through `SnapshotJSONEncoder`), so a page renders the same from
+a fresh build as from the stored row.
+
+Frozen on purpose: a closed month keeps the product margins, the monthly
+salary bill, the employee names on its leaderboard and breakdowns, and the
+list of active products it was frozen with. Call `freeze(month)` to rebuild
+a month after correcting those.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from . import data_versions, expense_ledger, leaderboard, margin_cube
+from .sales_pivot import month_bounds
+
+ZERO = Decimal("0")
+
+
+def _month(day):
+    return date(day.year, day.month, 1)
+
+
+def is_closed(month_start):
+    return month_start < _month(timezone.localdate())
+
+
+def _generations(months):
+    """{month: generation}, creating the missing counters."""
+    from clients.models import ClosedPeriodGeneration
+
+    ClosedPeriodGeneration.objects.bulk_create(
+        [ClosedPeriodGeneration(month=m) for m in months], ignore_conflicts=True,
+    )
+    return dict(ClosedPeriodGeneration.objects.filter(month__in=months).values_list("month", "generation"))
+
+
+def _store(report, built, seen):
+    """Save the payloads of `built` whose month was not invalidated since `seen` was read."""
+    from clients.models import ClosedPeriodGeneration, ClosedPeriodSnapshot
+
+    with transaction.atomic():
+        # A writer bumps the generation before dropping snapshots, so it
+        # either waits for this insert (and drops it) or has already moved it.
+        now = dict(
+            ClosedPeriodGeneration.objects.select_for_update()
+            .filter(month__in=list(seen)).values_list("month", "generation")
+        )
+        ClosedPeriodSnapshot.objects.bulk_create(
+            [ClosedPeriodSnapshot(report=report, month=m, payload=built[m]) for m in seen if now.get(m) == seen[m]],
+            ignore_conflicts=True,
+        )
+
+
+def _served(report, months, build):
+    """{month: payload}: closed months from their snapshots, the rest (and missing ones) from `build(months)`."""
+    from clients.models import ClosedPeriodSnapshot
+
+    closed = [m for m in months if is_closed(m)]
+    found = {}
+    if closed:
+        found = dict(ClosedPeriodSnapshot.objects.filter(report=report, month__in=closed).values_list("month", "payload"))
+    missing = [m for m in months if m not in found]
+    if missing:
+        seen = _generations([m for m in missing if is_closed(m)])
+        built = build(missing)
+        if seen:
+            _store(report, built, seen)
+        found.update(built)
+    return {m: found[m] for m in months}
+
+
+def invalidate(*days):
+    """Drop the snapshots of the closed months `days` fall in (None entries are ignored)."""
+    from clients.models import ClosedPeriodGeneration, ClosedPeriodSnapshot
+
+    months = [m for m in {_month(d) for d in days if d is not None} if is_closed(m)]
+    if months:
+        with transaction.atomic(savepoint=False):
+            # Create missing counters too: a build that starts meanwhile must
+            # find one this transaction has already moved (or wait for it).
+            ClosedPeriodGeneration.objects.bulk_create(
+                [ClosedPeriodGeneration(month=m) for m in months], ignore_conflicts=True,
+            )
+            ClosedPeriodGeneration.objects.filter(month__in=months).update(generation=F("generation") + 1)
+            ClosedPeriodSnapshot.objects.filter(month__in=months).delete()
+
+
+def freeze(month_start):
+    """Rebuild every report's snapshot of one closed month."""
+    from clients.models import ClosedPeriodSnapshot
+
+    if not is_closed(month_start):
+        raise ValueError(f"{month_start:%B %Y} is not closed yet.")
+    ClosedPeriodSnapshot.objects.filter(month=month_start).delete()
+    business_months([(month_start.year, month_start.month)])
+    monthly_business_totals(month_start)
+    month_performance(month_start)
+
+
+# ---------------- business analytics ----------------
+
+def monthly_salary_total():
+    """Current total monthly salary across active employees."""
+    from clients.models import Employee
+
+    return Employee.objects.filter(active=True).aggregate(t=Sum("salary"))["t"] or ZERO
+
+
+def _business(months):
+    months = sorted(months)
+    periods = [(m.year, m.month) for m in months]
+    cube = margin_cube.build(periods)
+    expenses = expense_ledger.by_month(periods)
+    salary = monthly_salary_total()
+    out = {}
+    for m, (y, mo) in zip(months, periods):
+        rows, totals = cube.sales(y, mo)
+        renewal_rows, renewal_totals = cube.renewals(y, mo)
+        expense_rows, expense_total = expenses[(y, mo)]
+        out[m] = {
+            "rows": rows, "totals": totals,
+            "renewal_rows": renewal_rows, "renewal_totals": renewal_totals,
+            "expense_rows": expense_rows, "expense_total": expense_total,
+            "monthly_salary": salary,
+        }
+    return out
+
+
+def business_months(months):
+    """months: list of (year, month). Returns {(year, month): payload} for business analytics.
+
+    A payload holds the month's sale margin rows and totals, renewal margin
+    rows and totals, expense rows and total, and the monthly salary bill.
+    """
+    from clients.models import ClosedPeriodSnapshot
+
+    starts = [date(y, m, 1) for y, m in months]
+    served = _served(ClosedPeriodSnapshot.REPORT_BUSINESS_ANALYTICS, starts, _business)
+    return {(m.year, m.month): served[m] for m in starts}
+
+
+# ---------------- monthly business report ----------------
+
+def _monthly_business(month_start):
+    from clients.models import Product, SaleDailyRollup
+
+    approved = SaleDailyRollup.objects.filter(status="approved", date__range=month_bounds(month_start))
+
+    # Show all active products, and include disabled products only if they have sales in the selected month.
+    products = list(
+        Product.objects.filter(is_active=True)
+        .order_by("display_order", "name")
+        .values_list("name", flat=True)
+    )
+
+    used_products = set(
+        approved.exclude(product="")
+        .values_list("product", flat=True)
+        .distinct()
+    )
+    used_ref_products = set(
+        approved.filter(product_ref__isnull=False)
+        .values_list("product_ref__name", flat=True)
+        .distinct()
+    )
+
+    for product_name in sorted(used_products | used_ref_products):
+        if product_name and product_name not in products:
+            products.append(product_name)
+
+    # Amounts grouped by (employee, product) and points by employee: two queries.
+    return {
+        "products": products,
+        "amounts": [
+            [r["employee_id"], r["product"], r["total"] or ZERO]
+            for r in approved.values("employee_id", "product").annotate(total=Sum("amount")).order_by()
+        ],
+        "points": [
+            [r["employee_id"], r["total"] or ZERO]
+            for r in approved.values("employee_id").annotate(total=Sum("points")).order_by()
+        ],
+    }
+
+
+def monthly_business_totals(month_start):
+    """(products, amount by (employee, product), points by employee) for one month's approved sales."""
+    from clients.models import ClosedPeriodSnapshot
+
+    if is_closed(month_start):
+        payload = _served(
+            ClosedPeriodSnapshot.REPORT_MONTHLY_BUSINESS, [month_start],
+            lambda months: {m: _monthly_business(m) for m in months},
+        )[month_start]
+    else:
+        payload = data_versions.fragment(
+            f"monthly-business-report:{month_start:%Y-%m}",
+            [data_versions.sales_month(month_start), data_versions.PRODUCTS],
+            lambda: _monthly_business(month_start),
+        )
+    amounts = {(employee_id, product): total for employee_id, product, total in payload["amounts"]}
+    return payload["products"], amounts, dict(payload["points"])
+
+
+# ---------------- past month performance ----------------
+
+def performer_rows(rows):
+    """Leaderboard rows (services/leaderboard.py) in the shape the performance templates use."""
+    return [
+        {
+            "rank": r["rank"],
+            "employee_id": r["employee_id"],
+            "full_name": r["name"],
+            "total_points": int(r["points"]),
+            "total_amount": float(r["amount"]),
+        }
+        for r in rows
+        if r is not None
+    ]
+
+
+def _month_performance(month_start):
+    from clients.models import MonthlyTargetHistory, SaleDailyRollup
+
+    month_rollup = SaleDailyRollup.objects.filter(date__range=month_bounds(month_start))
+    product_sales = (
+        month_rollup
+        .values("product")
+        .annotate(total_amount=Sum("amount"), total_points=Sum("points"))
+        .order_by("-total_amount")
+    )
+
+    target_history = MonthlyTargetHistory.objects.filter(year=month_start.year, month=month_start.month)
+    target_map = {}
+    if target_history.exists():
+        summed_targets = target_history.values("product").annotate(
+            target_value_sum=Sum("target_value"), achieved_value_sum=Sum("achieved_value")
+        )
+        for t in summed_targets:
+            target_map[t["product"]] = {
+                "target_value": float(t["target_value_sum"] or 0),
+                "achieved_value": float(t["achieved_value_sum"] or 0),
+            }
+
+    products = []
+    for row in product_sales:
+        prod = row["product"]
+        target_val = target_map.get(prod, {}).get("target_value")
+        achieved_val = target_map.get(prod, {}).get("achieved_value")
+        progress = 0
+        if target_val:
+            try:
+                progress = (float(achieved_val or 0) / float(target_val)) * 100
+            except Exception:
+                progress = 0
+        products.append({
+            "product": prod,
+            "total_amount": float(row["total_amount"] or 0),
+            "total_points": int(row["total_points"] or 0),
+            "target_value": target_val,
+            "achieved_value": achieved_val,
+            "progress": progress,
+        })
+
+    board = leaderboard.standings(leaderboard.month(month_start))
+    top_performers = performer_rows(board.top(len(board)))
+
+    # Per-product employee breakdown: for each product in this month, list which
+    # employees sold it with their amount/points contribution.
+    per_product_employee_qs = (
+        month_rollup
+        .values(
+            "product",
+            "employee__id",
+            "employee__user__username",
+            "employee__user__first_name",
+            "employee__user__last_name",
+        )
+        .annotate(total_amount=Sum("amount"), total_points=Sum("points"))
+        .order_by("product", "-total_points")
+    )
+
+    product_employee_map = {}
+    for r in per_product_employee_qs:
+        prod = r["product"]
+        first = (r.get("employee__user__first_name") or "").strip()
+        last = (r.get("employee__user__last_name") or "").strip()
+        full_name = (first + " " + last).strip() if (first or last) else (r.get("employee__user__username") or "Unknown")
+        product_employee_map.setdefault(prod, []).append({
+            "employee_id": r.get("employee__id"),
+            "username": r.get("employee__user__username") or "",
+            "full_name": full_name,
+            "total_points": int(r.get("total_points") or 0),
+            "total_amount": float(r.get("total_amount") or 0),
+        })
+
+    product_employee_stats = []
+    for p in products:
+        employees_for_prod = product_employee_map.get(p["product"], [])
+        prod_total_points = p["total_points"] or 0
+        for emp_row in employees_for_prod:
+            emp_row["points_share"] = (
+                round((emp_row["total_points"] / prod_total_points) * 100, 1)
+                if prod_total_points else 0
+            )
+        product_employee_stats.append({
+            "product": p["product"],
+            "total_amount": p["total_amount"],
+            "total_points": p["total_points"],
+            "employees": employees_for_prod,
+        })
+
+    return {"products": products, "top_performers": top_performers, "product_employee_stats": product_employee_stats}
+
+
+def month_performance(month_start):
+    """{"products", "top_performers", "product_employee_stats"} of one month, for the past-month page."""
+    from clients.models import ClosedPeriodSnapshot
+
+    return _served(
+        ClosedPeriodSnapshot.REPORT_MONTH_PERFORMANCE, [month_start],
+        lambda months: {m: _month_performance(m) for m in months},
+    )[month_start]
@@ -0,0 +1,70 @@
+"""Per-savepoint buffers flushed when the transaction commits.
+
+Signal handlers that hold work back until commit (`sale_effects`,
+`recompute_planner`) collect it in one buffer per savepoint level:
+`segment(store, factory)` returns the buffer for the connection's current
+``savepoint_ids`` stack, opening it and scheduling its `flush()` with
+`transaction.on_commit` the first time. Django files that callback under the
+same stack, so rolling back a savepoint drops the flush of every buffer
+opened inside it, and the buffered entries with it.
+
+Django holds the only strong reference to a scheduled flush; `store` keeps a
+weak one per stack. A buffer whose flush has run, or was dropped by a
+rollback, is therefore never handed out again, even when the next
+transaction reuses the same stack. `take(store)` hands the waiting buffers
+to a caller that flushes them itself (see `sale_effects.deferred()`).
+"""
+from __future__ import annotations
+
+import weakref
+
+from django.db import transaction
+
+
+class _ScheduledFlush:
+    __slots__ = ("buffer", "__weakref__")
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __call__(self):
+        buffer, self.buffer = self.buffer, None
+        if buffer is not None:  # None: taken over by `take()`
+            buffer.flush()
+
+
+def segment(store, factory, using=None):
+    """The buffer for the current savepoint level; call inside an atomic block.
+
+    `store` is the caller's thread-local, `factory()` builds an empty buffer
+    with a `flush()` method.
+    """
+    # Blocks opened with savepoint=False (None) cannot roll back on their own.
+    key = tuple(sid for sid in transaction.get_connection(using).savepoint_ids if sid is not None)
+    segments = getattr(store, "segments", None)
+    if segments is None:
+        segments = store.segments = {}
+    ref = segments.get(key)
+    scheduled = ref() if ref is not None else None
+    if scheduled is not None and scheduled.buffer is not None:
+        return scheduled.buffer
+    for stale in [k for k, r in segments.items() if r() is None]:
+        del segments[stale]
+    buffer = factory()
+    scheduled = _ScheduledFlush(buffer)
+    transaction.on_commit(scheduled, using=using)
+    segments[key] = weakref.ref(scheduled)
+    return buffer
+
+
+def take(store):
+    """Detach the buffers still waiting in `store`, oldest first; their
+    scheduled flushes become no-ops and the caller flushes them instead."""
+    buffers = []
+    for ref in (getattr(store, "segments", None) or {}).values():
+        scheduled = ref()
+        if scheduled is not None and scheduled.buffer is not None:
+            buffers.append(scheduled.buffer)
+            scheduled.buffer = None
+    store.segments = {}
+    return buffers
@@ -0,0 +1,124 @@
+"""Data-version registry and versioned fragment cache.
+
+Dashboards recomputed every section on every hit even when nothing they
+read had changed. This module keeps a monotonic counter per data domain in
+the default cache:
+
+* ``sales:<YYYY-MM>`` — bumped whenever a month's sale rollup rows move
+  (every Sale write path funnels through `sale_rollup.apply_deltas`);
+* ``targets``, ``products``, ``employees``, ``campaigns``, ``leads`` —
+  bumped from the model signals in `clients.signals`.
+
+`fragment(name, deps, build)` caches a section's computed data under a key
+that embeds the current value of each dependency, e.g.
+``frag:company-progress:2026-10-17@sales:2026-10=…,targets=…``. A write
+bumps the counter on commit, so the next read misses and rebuilds; nothing
+has to guess a TTL.
+
+Counters start from the current time in milliseconds (`seed()`), so one
+evicted and re-created never repeats a value an old fragment was stored
+under. With the per-process LocMemCache counters are not shared between
+workers, so fragments also expire after `LOCAL_MAX_AGE_SECONDS`.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+SALES = "sales"
+TARGETS = "targets"
+PRODUCTS = "products"
+EMPLOYEES = "employees"
+CAMPAIGNS = "campaigns"
+LEADS = "leads"
+
+PREFIX = "dv:"
+FRAGMENT_PREFIX = "frag:"
+# Old fragments are never read again once a dependency moves; this only
+# bounds how long they occupy a shared cache.
+FRAGMENT_SECONDS = 24 * 3600
+LOCAL_MAX_AGE_SECONDS = 60
+
+
+def sales_month(day):
+    """The ``sales:<YYYY-MM>`` dependency for the month of `day`."""
+    return f"{SALES}:{day.year:04d}-{day.month:02d}"
+
+
+def seed():
+    """Starting value for a new counter: the clock in milliseconds."""
+    return int(time.time() * 1000)
+
+
+def current(*deps):
+    """{dep: version} for the given dependencies, creating missing counters."""
+    keys = {PREFIX + dep: dep for dep in deps}
+    found = cache.get_many(list(keys))
+    for key, dep in keys.items():
+        if key not in found:
+            cache.add(key, seed(), None)
+            found[key] = cache.get(key, 0)
+    return {dep: found[key] for key, dep in keys.items()}
+
+
+def _incr(deps):
+    for dep in deps:
+        try:
+            cache.incr(PREFIX + dep)
+        except ValueError:
+            cache.set(PREFIX + dep, seed(), None)
+
+
+# ---------------- bumps (called from clients.signals and services) ----------------
+
+def bump(*deps):
+    """Mark `deps` changed; the counters move once the transaction commits."""
+    if deps:
+        transaction.on_commit(lambda: _incr(deps))
+
+
+# ---------------- fragments ----------------
+
+def is_shared():
+    """False when the default cache is per-process (LocMemCache), so workers keep their own counters."""
+    return not isinstance(caches["default"], LocMemCache)
+
+
+def local_epoch():
+    """"" with a shared cache; otherwise a value that changes every `LOCAL_MAX_AGE_SECONDS`.
+
+    Anything keyed on `current()` versions (e.g. an HTTP ETag) should also
+    carry this, or a write made in another worker is never noticed.
+    """
+    return "" if is_shared() else str(int(time.time() // LOCAL_MAX_AGE_SECONDS))
+
+
+def _timeout():
+    return FRAGMENT_SECONDS if is_shared() else LOCAL_MAX_AGE_SECONDS
+
+
+def fragment_key(name, deps):
+    versions = current(*deps)
+    stamp = ",".join(f"{dep}={versions[dep]}" for dep in sorted(versions))
+    if len(stamp) > 120:
+        # A year of month deps would push the key past memcached's 250 chars.
+        stamp = hashlib.sha1(stamp.encode()).hexdigest()
+    return f"{FRAGMENT_PREFIX}{name}@{stamp}"
+
+
+def fragment(name, deps, build):
+    """`build()`'s result, cached until one of `deps` is bumped.
+
+    `name` must carry everything else the result depends on (the day, the
+    viewer's scope, ...); the value has to be picklable.
+    """
+    key = fragment_key(name, deps)
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, _timeout())
+    return value
@@ -0,0 +1,159 @@
+"""Monthly expense ledger (`ExpenseMonth`).
+
+Business analytics used to load every `Expense` and call
+`Expense.applies_to_month()` on each of them for each month of the period,
+so the cost grew with months × expenses on every page load. The ledger
+expands each expense into one row per month it costs money:
+
+* a one-time expense has one row, in the month it was incurred;
+* a recurring expense has a row for every month from `spent_on` to
+  `end_on`; an ongoing one (no `end_on`) is written up to the current
+  month, and `extend_through()` adds the later months lazily the first time
+  a period reaching them is asked for. The month ongoing expenses are known
+  to be complete through is kept in the default cache (`THROUGH_KEY`).
+
+The Expense post_save receiver in `clients.signals` calls `sync()`; deleting
+an expense cascades to its rows. `rebuild()` (``manage.py
+rebuild_expense_ledger``) regenerates everything after bulk edits.
+`breakdown()` and `by_month()` are the read side: one grouped SUM per period.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+ZERO = Decimal("0")
+THROUGH_KEY = "expense_ledger:through"
+
+
+def _month(day):
+    return date(day.year, day.month, 1)
+
+
+def _next_month(month):
+    return date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+
+
+def _months(first, last):
+    out = []
+    while first <= last:
+        out.append(first)
+        first = _next_month(first)
+    return out
+
+
+def _through():
+    """Month every ongoing recurring expense is written through (at least the current one)."""
+    current = _month(timezone.localdate())
+    cached = cache.get(THROUGH_KEY)
+    return max(current, date.fromisoformat(cached)) if cached else current
+
+
+def months_of(expense, through=None):
+    """First days of the months `expense` costs money in (ongoing ones up to `through`)."""
+    first = _month(expense.spent_on)
+    if expense.expense_type == expense.TYPE_ONE_TIME:
+        return [first]
+    return _months(first, _month(expense.end_on) if expense.end_on else (through or _through()))
+
+
+def _rows(expense, through):
+    from clients.models import ExpenseMonth
+
+    return [ExpenseMonth(expense_id=expense.pk, category_id=expense.category_id, month=m, amount=expense.amount)
+            for m in months_of(expense, through)]
+
+
+def sync(expense):
+    """Rewrite one expense's ledger rows after it was created or edited.
+
+    Returns the months whose totals may have moved (the old rows' and the new ones').
+    """
+    from clients.models import ExpenseMonth
+
+    with transaction.atomic():
+        existing = ExpenseMonth.objects.filter(expense_id=expense.pk)
+        old_months = list(existing.values_list("month", flat=True))
+        existing.delete()
+        rows = _rows(expense, _through())
+        ExpenseMonth.objects.bulk_create(rows)
+    if expense.expense_type != expense.TYPE_ONE_TIME and expense.end_on is None:
+        # A reader extending ongoing expenses concurrently cannot have seen
+        # this one yet; make the next one check again.
+        transaction.on_commit(lambda: cache.delete(THROUGH_KEY))
+    return sorted(set(old_months) | {r.month for r in rows})
+
+
+def extend_through(month):
+    """Make sure every ongoing recurring expense has its rows up to `month`."""
+    from clients.models import Expense, ExpenseMonth
+
+    cached = cache.get(THROUGH_KEY)
+    if cached and date.fromisoformat(cached) >= month:
+        return
+    month = max(month, _month(timezone.localdate()))
+    ongoing = (
+        Expense.objects.filter(expense_type=Expense.TYPE_RECURRING, end_on__isnull=True, spent_on__lt=_next_month(month))
+        .annotate(written=Max("ledger_months__month"))
+        .order_by()
+    )
+    rows = []
+    for e in ongoing:
+        first = _next_month(e.written) if e.written else _month(e.spent_on)
+        rows += [ExpenseMonth(expense_id=e.pk, category_id=e.category_id, month=m, amount=e.amount)
+                 for m in _months(first, month)]
+    ExpenseMonth.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    transaction.on_commit(lambda: cache.set(THROUGH_KEY, month.isoformat(), None))
+
+
+def breakdown(months):
+    """months: list of (year, month). Returns ([{"category", "amount"}] by name, total)."""
+    from clients.models import ExpenseMonth
+
+    starts = [date(y, m, 1) for y, m in months]
+    if not starts:
+        return [], ZERO
+    extend_through(max(starts))
+    rows = sorted(
+        (
+            {"category": r["category__name"], "amount": r["amount"]}
+            for r in ExpenseMonth.objects.filter(month__in=starts).values("category__name").annotate(amount=Sum("amount")).order_by()
+        ),
+        key=lambda r: r["category"],
+    )
+    return rows, sum((r["amount"] for r in rows), ZERO)
+
+
+def by_month(months):
+    """months: list of (year, month). Returns {(year, month): (rows, total)} from one grouped SUM."""
+    from clients.models import ExpenseMonth
+
+    starts = [date(y, m, 1) for y, m in months]
+    if not starts:
+        return {}
+    extend_through(max(starts))
+    cells = {}
+    for r in ExpenseMonth.objects.filter(month__in=starts).values("month", "category__name").annotate(amount=Sum("amount")).order_by():
+        cells.setdefault(r["month"], []).append({"category": r["category__name"], "amount": r["amount"]})
+    out = {}
+    for start in starts:
+        rows = sorted(cells.get(start, []), key=lambda r: r["category"])
+        out[(start.year, start.month)] = (rows, sum((r["amount"] for r in rows), ZERO))
+    return out
+
+
+def rebuild():
+    """Regenerate the whole ledger from `Expense`. Returns {"rows": n}."""
+    from clients.models import Expense, ExpenseMonth
+
+    through = _through()
+    with transaction.atomic():
+        ExpenseMonth.objects.all().delete()
+        rows = [row for e in Expense.objects.order_by() for row in _rows(e, through)]
+        ExpenseMonth.objects.bulk_create(rows, batch_size=1000)
+    return {"rows": len(rows)}
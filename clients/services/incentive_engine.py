@@ -0,0 +1,222 @@
+"""Batch incentive recomputation.
+
+`Sale.compute_points()` scores one sale at a time and re-queries the rules,
+slabs, campaigns and the cumulative month/campaign totals on every call.
+Looping it over the whole history (the old `recalc_points` view) costs
+4–8 queries per sale plus every post_save signal.
+
+This module recomputes many sales at once:
+
+* rules, slabs, campaign products and product metadata are compiled once
+  into an `IncentiveRuleBook` (see incentive_rules.py);
+* each employee's sales are walked in date order, keeping running
+  (amount, points) totals per product-month and per campaign window, so the
+  slab deltas are computed in memory;
+* only rows whose points / campaign actually changed are written back, with
+  chunked `bulk_update` and no signals (points never feed client status,
+  the audit log or notifications); the employee's
+  `EmployeeProductPeriodTotal` rows are replaced from the walk's totals and
+  the points differences are posted to the points ledger and the daily
+  sales rollup, in the same `sale_effects.deferred()` transaction.
+
+Walking in date order gives the numbers the sales would have received had
+they been recorded one by one in that order. Employees are independent
+partitions, so large runs can be spread over a process pool.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import connections
+
+from . import period_totals, points_ledger, sale_effects, sale_rollup
+from .incentive_rules import IncentiveRuleBook
+
+ZERO = Decimal("0")
+POINTS_Q = Decimal("0.001")
+INCENTIVE_Q = Decimal("0.01")
+
+_SALE_FIELDS = (
+    "id", "employee_id", "product", "product_ref_id", "amount", "policy_type",
+    "date", "created_at", "points", "incentive_amount", "campaign_id", "status",
+)
+
+
+# ---------------- rule snapshot ----------------
+
+def load_rules():
+    """Compile a fresh `IncentiveRuleBook` — one consistent snapshot for the whole run."""
+    return IncentiveRuleBook.build()
+
+
+def _slab_delta(rule, running, amount):
+    """Payout reached by `running` + `amount`, minus what the partition already earned."""
+    return max(rule.payout_for(running[0] + amount) - running[1], ZERO)
+
+
+# ---------------- per-employee walk ----------------
+
+def score_employee_sales(sales, rules, totals=None):
+    """Score one employee's sales, which must already be in date order.
+
+    Returns a list of `(sale, points, campaign_id)`. Mirrors the branches of
+    `Sale.compute_points()`: Port health policies earn nothing, a live
+    campaign replaces the regular rule, slab rules pay the delta over the
+    product-month (or campaign window) total. The final running totals are
+    left in `totals`, keyed like `EmployeeProductPeriodTotal`:
+    (product_key, period_key, campaign_id) -> [amount, points].
+    """
+    products = rules.products
+    totals = {} if totals is None else totals
+    scored = []
+
+    for sale in sales:
+        product = products.get(sale.product_ref_id) if sale.product_ref_id else None
+        label = product["name"] if product else sale.product
+        product_key = period_totals.product_key(sale.product_ref_id, label)
+        if product:
+            is_health = product["code"] == "HEALTH_INS" or (product["name"] or "").strip().lower() == "health insurance"
+        else:
+            is_health = (sale.product or "").strip().lower() == "health insurance"
+        amount = sale.amount or ZERO
+
+        month_running = totals.setdefault((product_key, period_totals.month_key(sale.date), None), [ZERO, ZERO])
+        cp = rules.campaign_for(sale.product_ref_id, label, sale.date)
+        campaign_running = None
+        if cp is not None:
+            campaign_running = totals.setdefault(
+                (product_key, period_totals.campaign_key(cp.campaign_id), cp.campaign_id), [ZERO, ZERO],
+            )
+
+        campaign_id = None
+        if is_health and sale.policy_type == "port":
+            points = ZERO
+        elif cp is not None:
+            campaign_id = cp.campaign_id
+            if cp.benefit_type == "unit":
+                points = cp.unit_points(amount)
+            elif cp.has_slabs:
+                points = _slab_delta(cp, campaign_running, amount)
+            else:
+                points = ZERO
+        else:
+            rule = rules.rule_for(sale.product_ref_id, label)
+            if rule is None:
+                points = ZERO
+            elif rule.has_slabs:
+                points = _slab_delta(rule, month_running, amount)
+            else:
+                points = rule.unit_points(amount)
+
+        points = points.quantize(POINTS_Q)
+        month_running[0] += amount
+        month_running[1] += points
+        if campaign_running is not None:
+            campaign_running[0] += amount
+            campaign_running[1] += points
+        scored.append((sale, points, campaign_id))
+
+    return scored
+
+
+def _apply(scored):
+    """Set new values on the sale objects; return only the ones that changed."""
+    changed = []
+    for sale, points, campaign_id in scored:
+        incentive = points.quantize(INCENTIVE_Q)
+        old_points = (sale.points or ZERO).quantize(POINTS_Q)
+        old_incentive = (sale.incentive_amount or ZERO).quantize(INCENTIVE_Q)
+        if old_points == points and old_incentive == incentive and sale.campaign_id == campaign_id:
+            continue
+        sale.points = points
+        sale.incentive_amount = incentive
+        sale.campaign_id = campaign_id
+        changed.append(sale)
+    return changed
+
+
+def _recompute_employee_ids(employee_ids, rules, chunk_size, dry_run):
+    from clients.models import Sale
+
+    stats = {"employees": 0, "sales": 0, "updated": 0}
+    qs = (
+        Sale.objects.filter(employee_id__in=employee_ids)
+        .only(*_SALE_FIELDS)
+        .order_by("employee_id", "date", "created_at", "id")
+    )
+    for employee_id, sales in groupby(qs.iterator(chunk_size=2000), key=lambda s: s.employee_id):
+        totals = {}
+        sales = list(sales)
+        before = {s.pk: s.points for s in sales}
+        scored = score_employee_sales(sales, rules, totals)
+        changed = _apply(scored)
+        if not dry_run:
+            with sale_effects.deferred():
+                if changed:
+                    Sale.objects.bulk_update(
+                        changed, ["points", "incentive_amount", "campaign"], batch_size=chunk_size,
+                    )
+                    sale_effects.ledger_entries(points_ledger.rescored(changed, before))
+                    sale_effects.rollup_deltas(sale_rollup.rescored(changed, before))
+                # bulk_update skips Sale.save(), so refresh the running totals here.
+                period_totals.replace_employee_totals(employee_id, totals)
+        stats["employees"] += 1
+        stats["sales"] += len(scored)
+        stats["updated"] += len(changed)
+    return stats
+
+
+def _worker_init():
+    import django
+
+    django.setup()
+
+
+def _worker_run(employee_ids, chunk_size, dry_run):
+    try:
+        return _recompute_employee_ids(employee_ids, load_rules(), chunk_size, dry_run)
+    finally:
+        connections.close_all()
+
+
+# ---------------- entry point ----------------
+
+def recompute_points(employee_ids=None, *, workers=1, chunk_size=500, dry_run=False, progress=None):
+    """Recompute points for every sale of the given employees (default: all).
+
+    `workers` > 1 spreads employees over a process pool; each worker opens its
+    own DB connection. `progress(done, total, stats)` is called after each
+    employee partition (or worker batch) finishes. Returns the combined stats
+    dict: employees, sales, updated.
+    """
+    from clients.models import Sale
+
+    if employee_ids is None:
+        employee_ids = list(Sale.objects.order_by().values_list("employee_id", flat=True).distinct())
+    employee_ids = sorted(set(employee_ids))
+    total = len(employee_ids)
+    totals = {"employees": 0, "sales": 0, "updated": 0}
+
+    def _merge(stats):
+        for key in totals:
+            totals[key] += stats[key]
+        if progress:
+            progress(totals["employees"], total, dict(totals))
+
+    if workers <= 1 or total <= 1:
+        rules = load_rules()
+        for emp_id in employee_ids:
+            _merge(_recompute_employee_ids([emp_id], rules, chunk_size, dry_run))
+        return totals
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    # Forked children must not share the parent's DB socket.
+    connections.close_all()
+    buckets = [employee_ids[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+        futures = [pool.submit(_worker_run, bucket, chunk_size, dry_run) for bucket in buckets if bucket]
+        for future in as_completed(futures):
+            _merge(future.result())
+    return totals
@@ -0,0 +1,165 @@
+"""Process-wide compiled incentive rule book.
+
+`Sale.compute_points()` used to query `IncentiveRule`, `IncentiveSlab`,
+`CampaignProduct` and `CampaignSlab` on every save. The rule book compiles
+all of them once per process:
+
+* product_ref id / product label → `CompiledRule` (unit rate, or slab
+  thresholds sorted ascending with parallel payouts, resolved with bisect);
+* product_ref id / product label → interval index of active campaign
+  windows (`CompiledCampaign`, sorted by start date).
+
+It is kept in a `process_cache.ProcessCopy` and rebuilt lazily on first use
+after an invalidation: the post_save / post_delete receivers in
+`clients.signals` drop this process's copy at once and bump its version
+stamp when the transaction commits.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from decimal import Decimal
+
+from .process_cache import ProcessCopy
+
+VERSION_KEY = "incentive_rulebook:version"
+
+
+class CompiledRule:
+    """Unit rate plus an ascending slab ladder for one product."""
+
+    __slots__ = ("unit_amount", "points_per_unit", "thresholds", "payouts")
+
+    def __init__(self, unit_amount, points_per_unit, slabs=()):
+        pairs = sorted((s.threshold, s.payout) for s in slabs)
+        self.unit_amount = unit_amount
+        self.points_per_unit = points_per_unit
+        self.thresholds = [t for t, _ in pairs]
+        self.payouts = [p for _, p in pairs]
+
+    @property
+    def has_slabs(self):
+        return bool(self.thresholds)
+
+    def payout_for(self, cumulative):
+        """Payout of the highest slab whose threshold is <= `cumulative`."""
+        idx = bisect_right(self.thresholds, cumulative) - 1
+        return self.payouts[idx] if idx >= 0 else Decimal("0.00")
+
+    def unit_points(self, amount):
+        unit = self.unit_amount or Decimal("0")
+        if unit > 0:
+            return (amount / unit) * (self.points_per_unit or Decimal("0"))
+        return Decimal("0.000")
+
+
+class CompiledCampaign(CompiledRule):
+    """One campaign product's benefit, valid for [start_date, end_date]."""
+
+    __slots__ = ("campaign_id", "start_date", "end_date", "benefit_type")
+
+    def __init__(self, cp):
+        super().__init__(cp.unit_amount, cp.points_per_unit, cp.slabs.all())
+        self.campaign_id = cp.campaign_id
+        self.start_date = cp.campaign.start_date
+        self.end_date = cp.campaign.end_date
+        self.benefit_type = cp.benefit_type
+
+
+class _WindowIndex:
+    """Campaign windows for one product, sorted by start date."""
+
+    __slots__ = ("starts", "windows")
+
+    def __init__(self, windows):
+        self.windows = sorted(windows, key=lambda w: w.start_date)
+        self.starts = [w.start_date for w in self.windows]
+
+    def covering(self, day):
+        # Overlap prevention means the latest window starting on/before `day`
+        # is normally the only candidate; walk back in case legacy data overlaps.
+        idx = bisect_right(self.starts, day) - 1
+        while idx >= 0:
+            window = self.windows[idx]
+            if window.end_date >= day:
+                return window
+            idx -= 1
+        return None
+
+
+class IncentiveRuleBook:
+    """Immutable snapshot of every active incentive rule and campaign."""
+
+    def __init__(self, products, rules_by_ref, rules_by_name, campaigns_by_ref, campaigns_by_name):
+        self.products = products
+        self.rules_by_ref = rules_by_ref
+        self.rules_by_name = rules_by_name
+        self.campaigns_by_ref = campaigns_by_ref
+        self.campaigns_by_name = campaigns_by_name
+
+    @classmethod
+    def build(cls):
+        from clients.models import CampaignProduct, IncentiveRule, Product
+
+        products = {p["id"]: p for p in Product.objects.values("id", "name", "code")}
+
+        rules_by_ref, rules_by_name = {}, {}
+        for rule in IncentiveRule.objects.filter(active=True).prefetch_related("slabs"):
+            compiled = CompiledRule(rule.unit_amount, rule.points_per_unit, rule.slabs.all())
+            if rule.product_ref_id:
+                rules_by_ref.setdefault(rule.product_ref_id, compiled)
+            rules_by_name.setdefault(rule.product, compiled)
+
+        by_ref, by_name = {}, {}
+        cps = (
+            CampaignProduct.objects.filter(campaign__is_active=True)
+            .select_related("campaign", "product_ref")
+            .prefetch_related("slabs")
+        )
+        for cp in cps:
+            compiled = CompiledCampaign(cp)
+            by_ref.setdefault(cp.product_ref_id, []).append(compiled)
+            by_name.setdefault(cp.product_ref.name, []).append(compiled)
+
+        return cls(
+            products,
+            rules_by_ref,
+            rules_by_name,
+            {k: _WindowIndex(v) for k, v in by_ref.items()},
+            {k: _WindowIndex(v) for k, v in by_name.items()},
+        )
+
+    def rule_for(self, product_ref_id, label):
+        """Active regular rule for a sale — matched on product_ref when set, else on name."""
+        if product_ref_id:
+            return self.rules_by_ref.get(product_ref_id)
+        return self.rules_by_name.get(label)
+
+    def campaign_for(self, product_ref_id, label, day):
+        """Active campaign benefit covering the product on `day`, or None."""
+        if product_ref_id:
+            index = self.campaigns_by_ref.get(product_ref_id)
+        else:
+            index = self.campaigns_by_name.get(label)
+        return index.covering(day) if index else None
+
+
+# ---------------- process-wide cache ----------------
+
+_copy = ProcessCopy(VERSION_KEY, IncentiveRuleBook.build)
+
+
+def get_rulebook():
+    """Return this process's rule book, rebuilding it if stale."""
+    return _copy.get()
+
+
+def drop_local():
+    _copy.drop_local()
+
+
+def bump_version():
+    _copy.bump_version()
+
+
+def invalidate():
+    _copy.invalidate()
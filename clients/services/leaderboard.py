@@ -0,0 +1,155 @@
+"""Firm-wide ranked standings (leaderboard).
+
+Top performers used to be re-ranked with ``values(...).annotate(...)
+.order_by("-total_points")`` on every past-performance page and were not
+shown on the dashboards at all. `standings(period, metric)` returns a
+`Standings` for a day, month, financial year or campaign, ranked on approved
+points or amount:
+
+* it is built from one grouped query over the daily sales rollup
+  (services/sale_rollup.py), which approvals and every other Sale write path
+  already keep current incrementally;
+* the built object — a compact tuple per employee plus an
+  employee -> position index — lives in the versioned fragment cache
+  (services/data_versions.py) under the period's ``sales:<YYYY-MM>``
+  versions, so an approval only invalidates the periods it falls in;
+* `top()`, `rank_of()`, `entry()` and `percentile()` read that cached
+  object; rank and percentile lookups are constant time.
+
+Ties share a rank (1, 2, 2, 4).
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from . import data_versions
+from .sales_pivot import month_bounds
+
+ZERO = Decimal("0")
+METRICS = ("points", "amount")
+
+
+class Period:
+    """A ranking window: [start, end], optionally limited to some products."""
+
+    def __init__(self, key, label, start, end, product_ref_ids=None, extra_deps=()):
+        self.key = key
+        self.label = label
+        self.start = start
+        self.end = end
+        self.product_ref_ids = product_ref_ids
+        self.extra_deps = tuple(extra_deps)
+
+    def deps(self):
+        months, day = [], self.start.replace(day=1)
+        while day <= self.end:
+            months.append(data_versions.sales_month(day))
+            day = (day + timedelta(days=32)).replace(day=1)
+        return [*months, data_versions.EMPLOYEES, *self.extra_deps]
+
+
+def day(on):
+    return Period(f"day:{on.isoformat()}", on.strftime("%d %b %Y"), on, on)
+
+
+def month(on):
+    start, end = month_bounds(on)
+    return Period(f"month:{start:%Y-%m}", start.strftime("%B %Y"), start, end)
+
+
+def fy_start_year(on):
+    """Indian financial year (Apr → Mar) that `on` falls in, by its starting year."""
+    return on.year if on.month >= 4 else on.year - 1
+
+
+def fy(on):
+    year = fy_start_year(on)
+    return Period(f"fy:{year}", f"FY {year}-{str(year + 1)[-2:]}", date(year, 4, 1), date(year + 1, 3, 31))
+
+
+def campaign(camp):
+    """The campaign's window and products; `camp` should have ``products`` prefetched."""
+    return Period(
+        f"campaign:{camp.pk}:{camp.start_date}:{camp.end_date}",
+        camp.name,
+        camp.start_date,
+        camp.end_date,
+        product_ref_ids=sorted(cp.product_ref_id for cp in camp.products.all()),
+        extra_deps=[data_versions.CAMPAIGNS],
+    )
+
+
+class Standings:
+    """Ranked (employee_id, name, points, amount) tuples for one period and metric."""
+
+    def __init__(self, period_key, metric, entries):
+        self.period_key = period_key
+        self.metric = metric
+        column = 2 if metric == "points" else 3
+        self.entries = sorted(entries, key=lambda e: (-e[column], e[1].lower()))
+        self.ranks = []
+        self._index = {}
+        previous = None
+        for position, entry in enumerate(self.entries):
+            if entry[column] != previous:
+                rank, previous = position + 1, entry[column]
+            self.ranks.append(rank)
+            self._index[entry[0]] = position
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _row(self, position):
+        employee_id, name, points, amount = self.entries[position]
+        return {"rank": self.ranks[position], "employee_id": employee_id, "name": name, "points": points, "amount": amount}
+
+    def top(self, n=10):
+        return [self._row(position) for position in range(min(n, len(self.entries)))]
+
+    def entry(self, employee_id):
+        position = self._index.get(employee_id)
+        return None if position is None else self._row(position)
+
+    def rank_of(self, employee_id):
+        position = self._index.get(employee_id)
+        return None if position is None else self.ranks[position]
+
+    def percentile(self, employee_id):
+        """Share of ranked employees at or below this one (the leader is 100)."""
+        rank = self.rank_of(employee_id)
+        if rank is None:
+            return None
+        return round(100 * (len(self.entries) - rank + 1) / len(self.entries))
+
+
+def _display_name(row):
+    first = (row["employee__user__first_name"] or "").strip()
+    last = (row["employee__user__last_name"] or "").strip()
+    return f"{first} {last}".strip() if (first or last) else (row["employee__user__username"] or "Unknown")
+
+
+def _build(period, metric):
+    from clients.models import Sale, SaleDailyRollup
+
+    qs = SaleDailyRollup.objects.filter(date__gte=period.start, date__lte=period.end, status=Sale.STATUS_APPROVED)
+    if period.product_ref_ids is not None:
+        qs = qs.filter(product_ref_id__in=period.product_ref_ids)
+    rows = (
+        qs.values("employee_id", "employee__user__username", "employee__user__first_name", "employee__user__last_name")
+        .annotate(points=Sum("points"), amount=Sum("amount"))
+        .order_by()
+    )
+    return Standings(
+        period.key, metric,
+        [(r["employee_id"], _display_name(r), r["points"] or ZERO, r["amount"] or ZERO) for r in rows],
+    )
+
+
+def standings(period, metric="points"):
+    """Cached `Standings` for `period` ranked on `metric` ("points" or "amount")."""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown leaderboard metric: {metric}")
+    return data_versions.fragment(f"leaderboard:{period.key}:{metric}", period.deps(), lambda: _build(period, metric))
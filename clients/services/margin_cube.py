@@ -0,0 +1,142 @@
+"""Margin cube for business analytics.
+
+The annual view of `business_analytics` built each of its 12 months
+separately: a ``Sum`` per product and per Fresh/Port bucket, a leftover
+query, a renewal query, and a `margin_slabs` query inside
+`Product.margin_for` for every row — hundreds of queries per page. `build()`
+reads a whole period in three:
+
+* approved revenue from the daily sales rollup grouped by (month,
+  product_ref, product name, policy type);
+* renewal premium grouped by (month, product_ref) by collection date;
+* the products.
+
+Slab margins then resolve against each month's cumulative product revenue
+through `Product.margin_for`, which reads the process-wide compiled slab
+index (services/margin_slabs.py) instead of the database. `MarginCube.sales()`
+and `.renewals()` return the same (rows, totals) a single month's breakdown
+always produced, so the monthly and annual tables render unchanged.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+from .sales_pivot import month_bounds
+
+ZERO = Decimal("0")
+PCT_ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+HEALTH_BUCKETS = (("fresh", "Fresh"), ("port", "Port"))
+
+
+def _margin(revenue, pct):
+    return (revenue * pct / Decimal("100")).quantize(CENT)
+
+
+def _totals(rows):
+    revenue = sum((r["revenue"] for r in rows), ZERO)
+    margin = sum((r["margin_amount"] for r in rows), ZERO)
+    blended = (margin / revenue * Decimal("100")).quantize(CENT) if revenue else PCT_ZERO
+    return {"revenue": revenue, "margin_amount": margin, "blended_percent": blended}
+
+
+class MarginCube:
+    """Per-month sales and renewal margin breakdowns for a run of months."""
+
+    def __init__(self, products, sales, renewals):
+        self.products = products  # ordered like the breakdown rows
+        self._sales = sales  # month -> {(product_ref_id, product, policy_type): revenue}
+        self._renewals = renewals  # month -> {product_ref_id: premium}
+
+    def sales(self, year, month):
+        """(rows, totals) of approved sale margin for one month, per product and Fresh/Port bucket."""
+        cells = self._sales.get(date(year, month, 1), {})
+        by_product, leftover = {}, ZERO
+        names = {p.name: p for p in self.products}
+        by_pk = {p.pk: p for p in self.products}
+        for (ref_id, name, policy_type), revenue in cells.items():
+            product = by_pk.get(ref_id) if ref_id is not None else names.get(name)
+            if product is None:
+                leftover += revenue
+                continue
+            bucket = policy_type if product.is_health and policy_type in ("fresh", "port") else ""
+            per_bucket = by_product.setdefault(product.pk, {})
+            per_bucket[bucket] = per_bucket.get(bucket, ZERO) + revenue
+
+        rows = []
+        for p in self.products:
+            per_bucket = by_product.get(p.pk, {})
+            if p.is_health:
+                buckets = [*HEALTH_BUCKETS, ("", "Unspecified")]
+            else:
+                buckets = [("", "")]
+            for code, label in buckets:
+                revenue = per_bucket.get(code, ZERO)
+                if revenue <= 0:
+                    continue
+                pct = p.margin_for(revenue, code)
+                rows.append({"product": p.name, "policy": label, "revenue": revenue,
+                             "margin_percent": pct, "margin_amount": _margin(revenue, pct)})
+        # Approved sales not mapped to any known product → 0% margin, kept so totals reconcile.
+        if leftover > 0:
+            rows.append({"product": "Other / Unmapped", "policy": "", "revenue": leftover,
+                         "margin_percent": PCT_ZERO, "margin_amount": PCT_ZERO})
+        return rows, _totals(rows)
+
+    def renewals(self, year, month):
+        """(rows, totals) of renewal margin for one month, by premium collected, largest first."""
+        by_pk = {p.pk: p for p in self.products}
+        rows, unmapped = [], ZERO
+        for ref_id, revenue in self._renewals.get(date(year, month, 1), {}).items():
+            if ref_id is None:
+                unmapped += revenue
+                continue
+            if revenue <= 0:
+                continue
+            p = by_pk.get(ref_id)
+            pct = p.renewal_margin_percent if p else PCT_ZERO
+            rows.append({"product": p.name if p else "—", "revenue": revenue,
+                         "margin_percent": pct, "margin_amount": _margin(revenue, pct)})
+        if unmapped > 0:
+            rows.append({"product": "Other / Unmapped (Renewal)", "revenue": unmapped,
+                         "margin_percent": PCT_ZERO, "margin_amount": PCT_ZERO})
+        rows.sort(key=lambda x: x["margin_amount"], reverse=True)
+        return rows, _totals(rows)
+
+
+def build(months):
+    """`MarginCube` covering `months`, a list of (year, month) in order."""
+    from clients.models import Product, Renewal, SaleDailyRollup
+
+    start, end = date(*months[0], 1), month_bounds(date(*months[-1], 1))[1]
+    products = list(Product.objects.order_by("display_order", "name"))
+
+    sales = {}
+    rows = (
+        SaleDailyRollup.objects.filter(status="approved", date__gte=start, date__lte=end)
+        .annotate(month=TruncMonth("date"))
+        .values("month", "product_ref_id", "product", "policy_type")
+        .annotate(revenue=Sum("amount"))
+        .order_by()
+    )
+    for r in rows:
+        cells = sales.setdefault(r["month"], {})
+        key = (r["product_ref_id"], r["product"], r["policy_type"])
+        cells[key] = cells.get(key, ZERO) + (r["revenue"] or ZERO)
+
+    renewals = {}
+    rows = (
+        Renewal.objects.filter(premium_collected_on__gte=start, premium_collected_on__lte=end)
+        .annotate(month=TruncMonth("premium_collected_on"))
+        .values("month", "product_ref_id")
+        .annotate(premium=Sum("premium_amount"))
+        .order_by()
+    )
+    for r in rows:
+        renewals.setdefault(r["month"], {})[r["product_ref_id"]] = r["premium"] or ZERO
+
+    return MarginCube(products, sales, renewals)
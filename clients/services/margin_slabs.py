@@ -0,0 +1,104 @@
+"""Process-wide compiled index of product margin slabs.
+
+`Product.margin_for()` queried ``margin_slabs`` and scanned them on every
+call, and margin reports call it per product, per Fresh/Port bucket, per
+month. The index loads every `ProductMarginSlab` in one query and compiles
+each (product id, policy type) slab set into a `SlabIndex`: sorted interval
+bounds with a parallel array of margin percents, resolved with bisect.
+
+Slabs may overlap or leave gaps, and the linear scan returned the first
+matching slab in ``min_amount`` order. Compiling flattens that into
+disjoint intervals up front — each bound is where the first-match answer
+changes — so a lookup is one ``bisect_right`` and gives the same answer the
+scan did. A gap (or an amount below every slab) resolves to None, and the
+caller falls back to the product's default margin.
+
+The index is kept in a `process_cache.ProcessCopy`: the post_save /
+post_delete receivers in `clients.signals` drop this process's copy at once
+and bump its version stamp when the transaction commits.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+
+from .process_cache import ProcessCopy
+
+VERSION_KEY = "margin_slabs:version"
+
+# Interval bounds are (amount, side) pairs: a slab starts at (min, _AT) —
+# "amount >= min" — and stops at (max, _AFTER) — "amount > max". An amount is
+# looked up as (amount, _PROBE), which sorts between the two.
+_AT, _PROBE, _AFTER = 0, 1, 2
+
+
+class SlabIndex:
+    """One product's slabs for one policy type, as disjoint intervals."""
+
+    __slots__ = ("bounds", "percents")
+
+    def __init__(self, slabs):
+        # `slabs`: (min_amount, max_amount or None, margin_percent), in match order.
+        bounds = sorted({(lo, _AT) for lo, _, _ in slabs} | {(hi, _AFTER) for _, hi, _ in slabs if hi is not None})
+        self.bounds, self.percents = [], []
+        for bound in bounds:
+            pct = next((p for lo, hi, p in slabs if (lo, _AT) <= bound and (hi is None or bound < (hi, _AFTER))), None)
+            if self.percents and self.percents[-1] == pct:
+                continue  # same answer as the interval before: merge
+            self.bounds.append(bound)
+            self.percents.append(pct)
+
+    def percent_for(self, amount):
+        """Margin % of the slab covering `amount` (a Decimal), or None."""
+        i = bisect_right(self.bounds, (amount, _PROBE)) - 1
+        return self.percents[i] if i >= 0 else None
+
+
+class MarginSlabIndex:
+    """(product id, policy type) → `SlabIndex`."""
+
+    def __init__(self, indexes):
+        self._indexes = indexes
+
+    @classmethod
+    def build(cls):
+        from clients.models import ProductMarginSlab
+
+        grouped = {}
+        rows = ProductMarginSlab.objects.order_by("product_id", "policy_type", "min_amount", "pk").values_list(
+            "product_id", "policy_type", "min_amount", "max_amount", "margin_percent",
+        )
+        for product_id, policy_type, lo, hi, pct in rows:
+            grouped.setdefault((product_id, policy_type), []).append((lo, hi, pct))
+        return cls({key: SlabIndex(slabs) for key, slabs in grouped.items()})
+
+    def percent_for(self, product_id, policy_type, amount):
+        index = self._indexes.get((product_id, policy_type))
+        return index.percent_for(amount) if index is not None else None
+
+    def percents_for(self, product_id, policy_type, amounts):
+        index = self._indexes.get((product_id, policy_type))
+        if index is None:
+            return [None] * len(amounts)
+        return [index.percent_for(a) for a in amounts]
+
+
+# ---------------- process-wide cache ----------------
+
+_copy = ProcessCopy(VERSION_KEY, MarginSlabIndex.build)
+
+
+def get_index():
+    """Return this process's slab index, rebuilding it if stale."""
+    return _copy.get()
+
+
+def drop_local():
+    _copy.drop_local()
+
+
+def bump_version():
+    _copy.bump_version()
+
+
+def invalidate():
+    _copy.invalidate()
@@ -0,0 +1,122 @@
+"""In-app notification dispatch.
+
+New-sale alerts used to look the admins up (two queries) and insert one
+`Notification` per admin per sale. The dispatcher here:
+
+* caches the admin recipient ids in the default cache; the User / Employee
+  signals drop the entry on commit when someone's admin status can change,
+  and `ADMIN_CACHE_SECONDS` bounds staleness for per-process caches;
+* writes every notification with one `bulk_create`;
+* folds sale alerts into one digest per admin — always when a single flush
+  brings more than ``SALE_NOTIFICATION_DIGEST_BATCH`` sales (bulk imports),
+  and, when ``SALE_NOTIFICATION_DIGEST_MINUTES`` is set, into the admin's
+  unread digest from the last N minutes instead of a fresh row.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+ADMIN_CACHE_KEY = "notifications:admin_ids"
+ADMIN_CACHE_SECONDS = 300
+SALE_DIGEST_KEY = "new_sales"
+
+
+# ---------------- recipients ----------------
+
+def admin_recipient_ids():
+    """Ids of superusers and users whose employee role is admin."""
+    from django.contrib.auth import get_user_model
+
+    ids = cache.get(ADMIN_CACHE_KEY)
+    if ids is None:
+        User = get_user_model()
+        ids = sorted(
+            User.objects.filter(Q(is_superuser=True) | Q(employee__role="admin"))
+            .values_list("id", flat=True)
+            .distinct()
+        )
+        cache.set(ADMIN_CACHE_KEY, ids, ADMIN_CACHE_SECONDS)
+    return ids
+
+
+def invalidate_admins():
+    cache.delete(ADMIN_CACHE_KEY)
+
+
+# ---------------- writes ----------------
+
+def _sale_line(sale):
+    employee_name = getattr(sale.employee, "user", None)
+    if employee_name and hasattr(employee_name, "username"):
+        employee_name = employee_name.username
+    else:
+        employee_name = str(sale.employee)
+    client_name = getattr(sale.client, "name", str(sale.client))
+    return f"{employee_name} logged a {sale.product} sale of ₹{sale.amount} for client {client_name}."
+
+
+def _digest_body(count, latest):
+    if count == 1:
+        return latest
+    return f"{count} new sales recorded. Latest: {latest}"
+
+
+def notify_new_sales(sales):
+    """Tell every admin about `sales` (saved Sale instances)."""
+    from django.urls import reverse
+
+    from clients.models import Notification
+
+    admin_ids = admin_recipient_ids()
+    if not sales or not admin_ids:
+        return
+    try:
+        dashboard_url = reverse("clients:admin_dashboard")
+    except Exception:
+        dashboard_url = ""
+
+    window = int(getattr(settings, "SALE_NOTIFICATION_DIGEST_MINUTES", 0) or 0)
+    batch = int(getattr(settings, "SALE_NOTIFICATION_DIGEST_BATCH", 20) or 0)
+    if not window and not (batch and len(sales) > batch):
+        notes = []
+        for sale in sales:
+            body = _sale_line(sale)
+            notes.extend(
+                Notification(
+                    recipient_id=rid, title="New sale recorded", body=body,
+                    link=dashboard_url, related_sale_id=sale.pk,
+                )
+                for rid in admin_ids
+            )
+        Notification.objects.bulk_create(notes)
+        return
+
+    latest = _sale_line(sales[-1])
+    open_digests = {}
+    if window:
+        since = timezone.now() - timedelta(minutes=window)
+        for note in Notification.objects.filter(
+            recipient_id__in=admin_ids, group_key=SALE_DIGEST_KEY, is_read=False, created_at__gte=since,
+        ).order_by("recipient_id", "-created_at"):
+            open_digests.setdefault(note.recipient_id, note)
+
+    merged, fresh = [], []
+    for rid in admin_ids:
+        note = open_digests.get(rid)
+        if note is not None:
+            note.event_count += len(sales)
+            note.body = _digest_body(note.event_count, latest)
+            merged.append(note)
+        else:
+            fresh.append(Notification(
+                recipient_id=rid, title="New sales recorded", body=_digest_body(len(sales), latest),
+                link=dashboard_url, group_key=SALE_DIGEST_KEY, event_count=len(sales),
+            ))
+    if merged:
+        Notification.objects.bulk_update(merged, ["event_count", "body"])
+    Notification.objects.bulk_create(fresh)
@@ -0,0 +1,302 @@
+"""Running per-employee totals for slab-delta incentives.
+
+Slab rules pay "payout(cumulative amount) − points already awarded" over a
+product-month, and target campaigns do the same over the campaign window.
+Instead of aggregating every other sale in the window on each save,
+`EmployeeProductPeriodTotal` keeps one row per (employee, product, window)
+with the running amount and points.
+
+* `Sale.save()` opens a `PeriodClaim`: it locks the rows the sale is leaving
+  and entering (`select_for_update`), takes the sale's stored contribution
+  out, lets `compute_points()` read the other sales' totals, then writes the
+  new contribution back in the same transaction.
+* The Sale post_delete receiver subtracts the deleted row with an `F()` update.
+* Campaign / campaign-product edits rebuild that campaign's rows on commit,
+  since they move sales in or out of the window.
+* `rebuild()` (``manage.py rebuild_period_totals``) regenerates everything
+  from `Sale` with grouped queries.
+
+Every status counts toward the totals, matching the slab maths, so a status
+change only touches the rows when the amount or points move with it.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .incentive_rules import IncentiveRuleBook, get_rulebook
+
+ZERO = Decimal("0")
+
+
+def product_key(product_ref_id, label):
+    if product_ref_id:
+        return f"r{product_ref_id}"
+    return f"n:{label or ''}"[:60]
+
+
+def month_key(day):
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def campaign_key(campaign_id):
+    return f"c{campaign_id}"
+
+
+def bucket_keys(product_ref_id, label, day, book=None):
+    """(product_key, period_key, campaign_id) for every slab window a sale counts toward."""
+    book = book or get_rulebook()
+    pkey = product_key(product_ref_id, label)
+    keys = [(pkey, month_key(day), None)]
+    cp = book.campaign_for(product_ref_id, label, day)
+    if cp is not None:
+        keys.append((pkey, campaign_key(cp.campaign_id), cp.campaign_id))
+    return keys
+
+
+_OLD_FIELDS = ("employee_id", "product_ref_id", "product", "date", "amount", "points")
+
+
+def _product_ref_id(pkey):
+    return int(pkey[1:]) if pkey.startswith("r") else None
+
+
+class PeriodClaim:
+    """The period-total rows one sale is moving between, minus its stored contribution.
+
+    With `lock=True` (inside `Sale.save()`) the rows are locked and created if
+    missing, and `commit()` must be called after the sale row is written.
+    `lock=False` is a read-only snapshot for a standalone `compute_points()`.
+    `previous` is the sale's loaded-state snapshot; without one the stored
+    row is read (and locked) to find its old contribution.
+    """
+
+    def __init__(self, sale, *, lock, previous=None):
+        from clients.models import Sale
+
+        book = get_rulebook()
+        self.sale = sale
+        self.lock = lock
+        old_keys = []
+        if sale.pk:
+            if previous is not None and all(f in previous for f in _OLD_FIELDS):
+                # Loaded-state snapshot Sale.save() guards its UPDATE with: no need to re-read the row.
+                old = previous
+            else:
+                qs = Sale.objects.filter(pk=sale.pk)
+                if lock:
+                    qs = qs.select_for_update()
+                old = qs.values(*_OLD_FIELDS).first()
+            if old:
+                old_day = Sale._meta.get_field("date").to_python(old["date"])
+                old_keys = [
+                    (old["employee_id"], pkey, period)
+                    for pkey, period, _ in bucket_keys(old["product_ref_id"], old["product"], old_day, book)
+                ]
+        self.employee_id = sale.employee_id
+        self.new_keys = bucket_keys(sale.product_ref_id, sale.product, sale._sale_day(), book)
+        new_ids = [(sale.employee_id, pkey, period) for pkey, period, _ in self.new_keys]
+
+        self.rows = self._fetch(set(old_keys) | set(new_ids))
+        if lock:
+            missing = [k for k in self.new_keys if (sale.employee_id, k[0], k[1]) not in self.rows]
+            if missing:
+                self._create(missing)
+                self.rows = self._fetch(set(old_keys) | set(new_ids))
+
+        for key in old_keys:
+            row = self.rows.get(key)
+            if row is not None:
+                row.total_amount -= old["amount"] or ZERO
+                row.total_points -= old["points"] or ZERO
+        self.touched = {key for key in old_keys if key in self.rows}
+
+    def _fetch(self, keys):
+        from clients.models import EmployeeProductPeriodTotal
+
+        if not keys:
+            return {}
+        qs = EmployeeProductPeriodTotal.objects.filter(
+            employee_id__in={k[0] for k in keys},
+            product_key__in={k[1] for k in keys},
+            period_key__in={k[2] for k in keys},
+        ).order_by("pk")
+        if self.lock:
+            qs = qs.select_for_update()
+        return {
+            (row.employee_id, row.product_key, row.period_key): row
+            for row in qs
+            if (row.employee_id, row.product_key, row.period_key) in keys
+        }
+
+    def _create(self, keys):
+        from clients.models import EmployeeProductPeriodTotal
+
+        EmployeeProductPeriodTotal.objects.bulk_create(
+            [
+                EmployeeProductPeriodTotal(
+                    employee_id=self.employee_id,
+                    product_key=pkey,
+                    product_ref_id=_product_ref_id(pkey),
+                    period_key=period,
+                    campaign_id=campaign_id,
+                )
+                for pkey, period, campaign_id in keys
+            ],
+            ignore_conflicts=True,
+        )
+
+    def others(self, period_key):
+        """(amount, points) of the employee's other sales in this sale's `period_key` window."""
+        pkey = self.new_keys[0][0]
+        row = self.rows.get((self.employee_id, pkey, period_key))
+        if row is None:
+            return ZERO, ZERO
+        return row.total_amount, row.total_points
+
+    def commit(self):
+        """Add the sale's new contribution and write every touched row."""
+        from clients.models import EmployeeProductPeriodTotal
+
+        now = timezone.now()
+        for pkey, period, _ in self.new_keys:
+            key = (self.employee_id, pkey, period)
+            row = self.rows[key]
+            row.total_amount += self.sale.amount or ZERO
+            row.total_points += self.sale.points or ZERO
+            self.touched.add(key)
+        changed = [self.rows[key] for key in self.touched]
+        for row in changed:
+            row.updated_at = now
+        EmployeeProductPeriodTotal.objects.bulk_update(changed, ["total_amount", "total_points", "updated_at"])
+
+
+def discard(sale):
+    """Take a deleted sale's contribution out of its rows."""
+    from clients.models import EmployeeProductPeriodTotal
+
+    keys = bucket_keys(sale.product_ref_id, sale.product, sale._sale_day())
+    EmployeeProductPeriodTotal.objects.filter(
+        employee_id=sale.employee_id,
+        product_key=keys[0][0],
+        period_key__in=[period for _, period, _ in keys],
+    ).update(
+        total_amount=F("total_amount") - (sale.amount or ZERO),
+        total_points=F("total_points") - (sale.points or ZERO),
+        updated_at=timezone.now(),
+    )
+
+
+# ---------------- rebuild ----------------
+
+def _campaign_totals(sales, book, campaign_id=None):
+    """{(employee_id, product_key, period_key, campaign_id): [amount, points]} for campaign windows."""
+    totals = defaultdict(lambda: [ZERO, ZERO])
+    windows = [
+        (ref_id, None, w) for ref_id, index in book.campaigns_by_ref.items() for w in index.windows
+    ] + [
+        (None, name, w) for name, index in book.campaigns_by_name.items() for w in index.windows
+    ]
+    for ref_id, name, window in windows:
+        if campaign_id is not None and window.campaign_id != campaign_id:
+            continue
+        qs = sales.filter(date__range=(window.start_date, window.end_date))
+        if ref_id:
+            qs = qs.filter(product_ref_id=ref_id)
+        else:
+            qs = qs.filter(product_ref__isnull=True, product=name)
+        rows = qs.values("employee_id").annotate(amount=Sum("amount"), points=Sum("points")).order_by()
+        pkey = product_key(ref_id, name)
+        for r in rows:
+            entry = totals[(r["employee_id"], pkey, campaign_key(window.campaign_id), window.campaign_id)]
+            entry[0] += r["amount"] or ZERO
+            entry[1] += r["points"] or ZERO
+    return totals
+
+
+def _write(totals):
+    from clients.models import EmployeeProductPeriodTotal
+
+    EmployeeProductPeriodTotal.objects.bulk_create(
+        [
+            EmployeeProductPeriodTotal(
+                employee_id=emp_id,
+                product_key=pkey,
+                product_ref_id=_product_ref_id(pkey),
+                period_key=period,
+                campaign_id=campaign_id,
+                total_amount=amount,
+                total_points=points,
+            )
+            for (emp_id, pkey, period, campaign_id), (amount, points) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+def rebuild(employee_ids=None):
+    """Regenerate the table (or the given employees' rows) from `Sale`. Returns {"rows": n}."""
+    from clients.models import EmployeeProductPeriodTotal, Sale
+
+    book = IncentiveRuleBook.build()
+    sales = Sale.objects.all()
+    existing = EmployeeProductPeriodTotal.objects.all()
+    if employee_ids is not None:
+        sales = sales.filter(employee_id__in=employee_ids)
+        existing = existing.filter(employee_id__in=employee_ids)
+
+    totals = defaultdict(lambda: [ZERO, ZERO])
+    month_rows = (
+        sales.annotate(y=ExtractYear("date"), m=ExtractMonth("date"))
+        .values("employee_id", "product_ref_id", "product", "y", "m")
+        .annotate(amount=Sum("amount"), points=Sum("points"))
+        .order_by()
+    )
+    for r in month_rows:
+        entry = totals[(r["employee_id"], product_key(r["product_ref_id"], r["product"]), f"{r['y']:04d}-{r['m']:02d}", None)]
+        entry[0] += r["amount"] or ZERO
+        entry[1] += r["points"] or ZERO
+    totals.update(_campaign_totals(sales, book))
+
+    with transaction.atomic():
+        existing.delete()
+        _write(totals)
+    return {"rows": len(totals)}
+
+
+def rebuild_campaign(campaign_id):
+    """Recompute one campaign's window rows after its dates or products change."""
+    from clients.models import EmployeeProductPeriodTotal, Sale
+
+    totals = _campaign_totals(Sale.objects.all(), get_rulebook(), campaign_id)
+    with transaction.atomic():
+        EmployeeProductPeriodTotal.objects.filter(period_key=campaign_key(campaign_id)).delete()
+        _write(totals)
+
+
+def replace_employee_totals(employee_id, totals):
+    """Swap one employee's rows for `totals` ({(product_key, period_key, campaign_id): [amount, points]})."""
+    from clients.models import EmployeeProductPeriodTotal
+
+    EmployeeProductPeriodTotal.objects.filter(employee_id=employee_id).delete()
+    _write({(employee_id, *key): value for key, value in totals.items()})
+
+
+def replace_slice(employee_id, product_keys, totals, months=None, campaign_ids=()):
+    """Swap one employee's rows for some products, limited to a month range.
+
+    `months` is an inclusive ("YYYY-MM", "YYYY-MM") range plus the given
+    campaign windows; None replaces every period of those products.
+    """
+    from clients.models import EmployeeProductPeriodTotal
+
+    rows = EmployeeProductPeriodTotal.objects.filter(employee_id=employee_id, product_key__in=product_keys)
+    if months is not None:
+        rows = rows.filter(Q(period_key__range=months) | Q(campaign_id__in=campaign_ids))
+    rows.delete()
+    _write({(employee_id, *key): value for key, value in totals.items()})
@@ -0,0 +1,257 @@
+"""Append-only points ledger and monthly snapshots.
+
+`Sale.points` is overwritten on every recompute, so it cannot say what an
+employee was owed at the time of a payout. Every change to a sale's earned
+points now also posts a signed `PointsLedgerEntry`:
+
+* a new sale posts an award (``award``, ``slab_delta`` or ``campaign``);
+* a re-score posts an ``adjustment`` for the difference;
+* rejecting or deleting a sale posts a ``reversal``; un-rejecting awards again;
+* moving a sale to another employee or month reverses the old bucket and
+  awards the new one.
+
+A sale earns its points for the month of its date unless it is rejected.
+Entries are written in bulk through `sale_effects`: on commit for single
+saves, and before commit inside `sale_effects.deferred()` for approvals and
+batch recomputes.
+
+`take_snapshot()` folds new entries into `PointsLedgerSnapshot` (one row
+per employee-month), so `monthly_history()` and `month_totals()` read the
+snapshot plus the few entries after it instead of summing `Sale`. Entries
+are folded by `created_at`, and only once they are `SNAPSHOT_LAG` old: an
+entry is stamped when its transaction writes it, not when it commits, so a
+younger one may still be invisible to the fold.
+`verify()` compares the ledger with `Sale` and, with ``repair=True``, posts
+correcting adjustments for any drift (e.g. after raw SQL updates).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+ZERO = Decimal("0")
+REJECTED = "rejected"
+SNAPSHOT_LAG = timedelta(minutes=10)
+
+# Sale fields the ledger needs to place a sale's points.
+SALE_FIELDS = ("employee_id", "date", "points", "amount", "status", "campaign_id", "product_ref_id", "product")
+
+
+def _period(day):
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.replace(day=1)
+
+
+def sale_row(sale):
+    row = {field: getattr(sale, field) for field in SALE_FIELDS}
+    row["date"] = sale._sale_day()
+    return row
+
+
+def _earned(row):
+    """(employee_id, period, points, amount) the row counts for, or None."""
+    if not row or row.get("status") == REJECTED or not row.get("employee_id"):
+        return None
+    return (row["employee_id"], _period(row["date"]), row.get("points") or ZERO, row.get("amount") or ZERO)
+
+
+def _award_kind(row, book=None):
+    from clients.models import PointsLedgerEntry
+
+    from .incentive_rules import get_rulebook
+
+    if row.get("campaign_id"):
+        return PointsLedgerEntry.KIND_CAMPAIGN
+    rule = (book or get_rulebook()).rule_for(row.get("product_ref_id"), row.get("product"))
+    if rule is not None and rule.has_slabs:
+        return PointsLedgerEntry.KIND_SLAB_DELTA
+    return PointsLedgerEntry.KIND_AWARD
+
+
+def entries_for_change(sale_id, old, new, *, note="", book=None):
+    """Ledger rows turning `old` into `new` (SALE_FIELDS dicts; None = absent)."""
+    from clients.models import PointsLedgerEntry
+
+    before, after = _earned(old), _earned(new)
+    campaign_id = (new or old or {}).get("campaign_id")
+
+    def entry(kind, employee_id, period, points, amount):
+        return PointsLedgerEntry(
+            employee_id=employee_id, sale_id=sale_id, campaign_id=campaign_id, kind=kind,
+            period=period, points=points, amount=amount, note=note[:120],
+        )
+
+    if before and after and before[:2] == after[:2]:
+        points, amount = after[2] - before[2], after[3] - before[3]
+        if not points and not amount:
+            return []
+        kind = PointsLedgerEntry.KIND_ADJUSTMENT
+        if (old or {}).get("campaign_id") != (new or {}).get("campaign_id") and new.get("campaign_id"):
+            kind = PointsLedgerEntry.KIND_CAMPAIGN
+        return [entry(kind, after[0], after[1], points, amount)]
+
+    rows = []
+    if before:
+        rows.append(entry(PointsLedgerEntry.KIND_REVERSAL, before[0], before[1], -before[2], -before[3]))
+    if after:
+        rows.append(entry(_award_kind(new, book), *after))
+    return rows
+
+
+def rescored(changed, old_points, *, note="recompute"):
+    """Adjustments for sales a batch recompute re-scored (employee / date unchanged).
+
+    `old_points` maps sale id -> points before the recompute; `changed`
+    sales must have status loaded.
+    """
+    from clients.models import PointsLedgerEntry
+
+    rows = []
+    for sale in changed:
+        if sale.status == REJECTED:
+            continue
+        delta = (sale.points or ZERO) - (old_points.get(sale.pk) or ZERO)
+        if delta:
+            rows.append(PointsLedgerEntry(
+                employee_id=sale.employee_id, sale_id=sale.pk, campaign_id=sale.campaign_id,
+                kind=PointsLedgerEntry.KIND_ADJUSTMENT, period=_period(sale.date),
+                points=delta, amount=ZERO, note=note,
+            ))
+    return rows
+
+
+# ---------------- snapshots ----------------
+
+def take_snapshot(lag=SNAPSHOT_LAG):
+    """Fold ledger rows created since the snapshots, up to `lag` ago, into them.
+
+    Returns {"rows": n, "cutoff": datetime}.
+    """
+    from clients.models import PointsLedgerEntry, PointsLedgerSnapshot
+
+    cutoff = timezone.now() - lag
+    with transaction.atomic():
+        since = PointsLedgerSnapshot.objects.aggregate(m=Max("folded_through"))["m"]
+        fresh = PointsLedgerEntry.objects.filter(created_at__lte=cutoff)
+        if since is not None:
+            fresh = fresh.filter(created_at__gt=since)
+        fresh = {
+            (r["employee_id"], r["period"]): r
+            for r in fresh.values("employee_id", "period").annotate(points=Sum("points"), amount=Sum("amount")).order_by()
+        }
+        if not fresh:
+            return {"rows": 0, "cutoff": cutoff}
+
+        existing = {
+            (s.employee_id, s.period): s
+            for s in PointsLedgerSnapshot.objects.select_for_update().filter(
+                employee_id__in={k[0] for k in fresh}, period__in={k[1] for k in fresh},
+            )
+        }
+        now = timezone.now()
+        updated, created = [], []
+        for key, r in fresh.items():
+            snap = existing.get(key)
+            if snap is None:
+                created.append(PointsLedgerSnapshot(
+                    employee_id=key[0], period=key[1], points=r["points"], amount=r["amount"], folded_through=cutoff,
+                ))
+            else:
+                snap.points += r["points"]
+                snap.amount += r["amount"]
+                snap.folded_through = cutoff
+                snap.updated_at = now
+                updated.append(snap)
+        PointsLedgerSnapshot.objects.bulk_update(updated, ["points", "amount", "folded_through", "updated_at"])
+        PointsLedgerSnapshot.objects.bulk_create(created)
+    return {"rows": len(fresh), "cutoff": cutoff}
+
+
+def _fold(snapshots, tail):
+    """{(employee_id, period): [points, amount]} from snapshot rows plus later entries."""
+    totals = defaultdict(lambda: [ZERO, ZERO])
+    cutoffs = {}
+    for snap in snapshots:
+        totals[(snap["employee_id"], snap["period"])] = [snap["points"], snap["amount"]]
+        cutoffs[(snap["employee_id"], snap["period"])] = snap["folded_through"]
+    for e in tail:
+        key = (e["employee_id"], e["period"])
+        cutoff = cutoffs.get(key)
+        if cutoff is None or e["created_at"] > cutoff:
+            totals[key][0] += e["points"]
+            totals[key][1] += e["amount"]
+    return totals
+
+
+def _read(employee_ids=None, periods=None):
+    from clients.models import PointsLedgerEntry, PointsLedgerSnapshot
+
+    snaps = PointsLedgerSnapshot.objects.all()
+    tail = PointsLedgerEntry.objects.all()
+    if employee_ids is not None:
+        snaps = snaps.filter(employee_id__in=employee_ids)
+        tail = tail.filter(employee_id__in=employee_ids)
+    if periods is not None:
+        snaps = snaps.filter(period__in=periods)
+        tail = tail.filter(period__in=periods)
+    snaps = list(snaps.values("employee_id", "period", "points", "amount", "folded_through"))
+    oldest = min((s["folded_through"] for s in snaps if s["folded_through"]), default=None)
+    if oldest is not None:
+        tail = tail.filter(created_at__gt=oldest)
+    tail = tail.values("employee_id", "period", "points", "amount", "created_at")
+    return _fold(snaps, tail)
+
+
+def monthly_history(employee_id, periods=None):
+    """{period: (points, amount)} for one employee, from snapshots plus the ledger tail."""
+    return {period: tuple(v) for (_, period), v in _read([employee_id], periods).items()}
+
+
+def month_totals(period, employee_ids=None):
+    """{employee_id: (points, amount)} for one month."""
+    return {emp: tuple(v) for (emp, _), v in _read(employee_ids, [_period(period)]).items()}
+
+
+# ---------------- drift check ----------------
+
+def verify(*, repair=False):
+    """Compare ledger totals with `Sale` per employee-month. Returns the mismatches.
+
+    With `repair`, posts one adjustment per mismatch so the ledger matches again.
+    """
+    from clients.models import PointsLedgerEntry, Sale
+
+    expected = {
+        (r["employee_id"], r["period"]): (r["points"] or ZERO, r["amount"] or ZERO)
+        for r in Sale.objects.exclude(status=REJECTED)
+        .annotate(period=TruncMonth("date"))
+        .values("employee_id", "period")
+        .annotate(points=Sum("points"), amount=Sum("amount"))
+        .order_by()
+    }
+    actual = _read()
+    mismatches = []
+    for key in set(expected) | set(actual):
+        want = expected.get(key, (ZERO, ZERO))
+        have = tuple(actual.get(key, (ZERO, ZERO)))
+        if want != have:
+            mismatches.append({
+                "employee_id": key[0], "period": key[1],
+                "points": want[0] - have[0], "amount": want[1] - have[1],
+            })
+    if repair and mismatches:
+        PointsLedgerEntry.objects.bulk_create([
+            PointsLedgerEntry(
+                employee_id=m["employee_id"], period=m["period"], kind=PointsLedgerEntry.KIND_ADJUSTMENT,
+                points=m["points"], amount=m["amount"], note="verify repair",
+            )
+            for m in mismatches
+        ])
+    return sorted(mismatches, key=lambda m: (m["employee_id"], m["period"]))
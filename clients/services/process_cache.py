@@ -0,0 +1,114 @@
+"""Versioned process-wide copies of rarely changing data.
+
+The incentive rule book, the margin slab index and the singleton config
+rows are each built once per process and reused. A `ProcessCopy` keeps one
+of them together with the version stamp it was built under:
+
+* `get()` returns the copy while its stamp is still current, and rebuilds it
+  under a lock otherwise;
+* `drop_local()` forgets this process's copy at once; `bump_version()`
+  moves the shared stamp so every other worker rebuilds on its next
+  lookup. Writers call both, the bump on commit (see `clients.signals`).
+
+Stamps are `ProcessCacheVersion` rows, not cache keys: the default cache is
+the per-process LocMemCache, and a rule edit one worker never hears about
+would have the others score sales with the old rule book. All stamps are
+read in one query, once per request (the ``request_started`` receiver below
+forgets them); outside a request they are re-read after
+`STAMP_MAX_AGE_SECONDS`. A missing row is created from the clock
+(`data_versions.seed()`), so it never repeats a stamp a copy was built
+under.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from django.core.signals import request_finished, request_started
+from django.db.models import F
+
+from .data_versions import LOCAL_MAX_AGE_SECONDS, seed
+
+STAMP_MAX_AGE_SECONDS = LOCAL_MAX_AGE_SECONDS
+
+_stamps = threading.local()  # versions: {key: version}, read_at, in_request
+
+
+def current_stamps():
+    """{key: version} of every stamp, as of this request (or the last `STAMP_MAX_AGE_SECONDS`)."""
+    from clients.models import ProcessCacheVersion
+
+    versions = getattr(_stamps, "versions", None)
+    if versions is not None and (
+        getattr(_stamps, "in_request", False) or time.monotonic() - _stamps.read_at < STAMP_MAX_AGE_SECONDS
+    ):
+        return versions
+    versions = _stamps.versions = dict(ProcessCacheVersion.objects.values_list("key", "version"))
+    _stamps.read_at = time.monotonic()
+    return versions
+
+
+def forget_stamps():
+    """Make this thread's next lookup re-read the stamps."""
+    _stamps.versions = None
+
+
+class ProcessCopy:
+    """This process's copy of `build()`, stamped with the version under `version_key`."""
+
+    def __init__(self, version_key, build):
+        self.version_key = version_key
+        self.build = build
+        self._lock = threading.Lock()
+        self._entry = None  # (value, version)
+
+    def get(self):
+        """Return the copy, rebuilding it if stale."""
+        version = current_stamps().get(self.version_key)
+        entry = self._entry
+        if entry is not None and entry[1] == version:
+            return entry[0]
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry[1] != version:
+                # Record the version read *before* building so an edit that
+                # lands mid-build still forces the next caller to rebuild.
+                entry = self._entry = (self.build(), version)
+            return entry[0]
+
+    def peek(self):
+        """The copy this process holds right now, or None; never builds."""
+        entry = self._entry
+        return entry[0] if entry is not None else None
+
+    def drop_local(self):
+        """Forget this process's copy; the next lookup rebuilds it."""
+        self._entry = None
+
+    def bump_version(self):
+        """Tell every process that its copy is stale."""
+        from clients.models import ProcessCacheVersion
+
+        if not ProcessCacheVersion.objects.filter(key=self.version_key).update(version=F("version") + 1):
+            ProcessCacheVersion.objects.get_or_create(key=self.version_key, defaults={"version": seed()})
+        forget_stamps()
+
+    def invalidate(self):
+        self.drop_local()
+        self.bump_version()
+
+
+# ---------------- request scope ----------------
+
+def _begin_request(**kwargs):
+    _stamps.versions = None
+    _stamps.in_request = True
+
+
+def _end_request(**kwargs):
+    _stamps.versions = None
+    _stamps.in_request = False
+
+
+request_started.connect(_begin_request, dispatch_uid="process_cache_begin_request")
+request_finished.connect(_end_request, dispatch_uid="process_cache_end_request")
@@ -0,0 +1,294 @@
+"""Per-view query and latency profiler.
+
+Nothing told us which pages issue hundreds of queries. A `Probe` wraps the
+default connection (``connection.execute_wrapper``) for the length of a
+request or a call and records:
+
+* the query count and total SQL time;
+* query fingerprints — the SQL with literals and ``IN (...)`` lists
+  collapsed — so the same statement run once per row (an N+1) shows up as
+  one fingerprint with a high repeat count;
+* Python time (wall time minus SQL time) and the response size.
+
+`ViewProfilerMiddleware` (clients/middleware.py) probes every request under
+its resolved URL name. Samples are folded into per-process, per-hour windows — counters plus
+latency and query-count histograms — and merged into `ViewProfile` rows at
+most every `FLUSH_SECONDS`, so the cost per request is a few counter
+updates. `report(hours)` reads the rolling window back; the staff-only
+``admin/profiler/`` page and the ``profile_report`` command show it.
+
+Off unless ``VIEW_PROFILER_ENABLED`` is set; ``VIEW_PROFILER_SAMPLE_RATE``
+probes only a share of requests.
+"""
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+# Upper bounds of the histogram buckets; one more bucket holds everything above.
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500)
+FLUSH_SECONDS = 30
+TOP_DUPLICATES = 10
+RETENTION_DAYS = 14
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:[^()]*)\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """`sql` with literals, numbers and IN lists collapsed, for spotting repeats."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def enabled():
+    return getattr(settings, "VIEW_PROFILER_ENABLED", False)
+
+
+def sampled():
+    rate = getattr(settings, "VIEW_PROFILER_SAMPLE_RATE", 1.0)
+    return rate >= 1 or random.random() < rate
+
+
+class Probe:
+    """Counts and times the queries run on the default connection while open."""
+
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.total_seconds = 0.0
+        self.fingerprints = Counter()
+        self._wrapper = None
+        self._started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.total_seconds = time.perf_counter() - self._started
+        self._wrapper.__exit__(*exc)
+        return False
+
+    @property
+    def sql_ms(self):
+        return self.sql_seconds * 1000
+
+    @property
+    def total_ms(self):
+        return self.total_seconds * 1000
+
+    @property
+    def python_ms(self):
+        return max(self.total_ms - self.sql_ms, 0.0)
+
+    def duplicates(self):
+        """{fingerprint: times run} for statements run more than once, most repeated first."""
+        return dict(sorted(((fp, n) for fp, n in self.fingerprints.items() if n > 1), key=lambda kv: -kv[1]))
+
+
+def _bucket(value, bounds):
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds)
+
+
+class _Window:
+    """Per-process accumulator for one (view, hour)."""
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.sql_ms = 0.0
+        self.python_ms = 0.0
+        self.max_ms = 0.0
+        self.response_bytes = 0
+        self.n_plus_one = 0
+        self.latency_hist = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.query_hist = [0] * (len(QUERY_BUCKETS) + 1)
+        self.duplicates = Counter()
+
+    def add(self, probe, response_bytes):
+        self.requests += 1
+        self.queries += probe.queries
+        self.max_queries = max(self.max_queries, probe.queries)
+        self.sql_ms += probe.sql_ms
+        self.python_ms += probe.python_ms
+        self.max_ms = max(self.max_ms, probe.total_ms)
+        self.response_bytes += response_bytes
+        self.latency_hist[_bucket(probe.total_ms, LATENCY_BUCKETS_MS)] += 1
+        self.query_hist[_bucket(probe.queries, QUERY_BUCKETS)] += 1
+        duplicates = probe.duplicates()
+        if duplicates:
+            self.n_plus_one += 1
+            self.duplicates.update(duplicates)
+
+
+_lock = threading.Lock()
+_windows = {}  # (view name, hour) -> _Window
+_last_flush = time.monotonic()
+
+
+def record(probe, response_bytes=0):
+    """Fold a finished probe into this process's window for the current hour."""
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    with _lock:
+        window = _windows.get((probe.name, hour))
+        if window is None:
+            window = _windows[(probe.name, hour)] = _Window()
+        window.add(probe, response_bytes)
+
+
+def flush_due():
+    return _windows and time.monotonic() - _last_flush >= FLUSH_SECONDS
+
+
+def flush():
+    """Merge this process's windows into `ViewProfile` rows; returns how many were written."""
+    global _last_flush
+    from clients.models import ViewProfile
+
+    with _lock:
+        windows = dict(_windows)
+        _windows.clear()
+        _last_flush = time.monotonic()
+
+    for (name, hour), w in windows.items():
+        with transaction.atomic():
+            row, _ = ViewProfile.objects.select_for_update().get_or_create(view_name=name[:200], hour=hour)
+            row.requests += w.requests
+            row.queries += w.queries
+            row.max_queries = max(row.max_queries, w.max_queries)
+            row.sql_ms += w.sql_ms
+            row.python_ms += w.python_ms
+            row.max_ms = max(row.max_ms, w.max_ms)
+            row.response_bytes += w.response_bytes
+            row.n_plus_one_requests += w.n_plus_one
+            row.latency_histogram = _add_lists(row.latency_histogram, w.latency_hist)
+            row.query_histogram = _add_lists(row.query_histogram, w.query_hist)
+            duplicates = Counter(row.top_duplicates or {})
+            duplicates.update(w.duplicates)
+            row.top_duplicates = dict(duplicates.most_common(TOP_DUPLICATES))
+            row.save()
+    return len(windows)
+
+
+def _add_lists(stored, extra):
+    stored = list(stored or [])
+    stored += [0] * (len(extra) - len(stored))
+    return [a + b for a, b in zip(stored, extra)]
+
+
+def expired(days=RETENTION_DAYS):
+    """`ViewProfile` rows older than `days`."""
+    from clients.models import ViewProfile
+
+    return ViewProfile.objects.filter(hour__lt=timezone.now() - timedelta(days=days))
+
+
+def prune(days=RETENTION_DAYS):
+    """Delete the rows `expired(days)` selects. Returns how many went."""
+    return expired(days).delete()[0]
+
+
+def response_size(response):
+    if getattr(response, "streaming", True):
+        return 0
+    return len(getattr(response, "content", b""))
+
+
+# ---------------- reporting ----------------
+
+def _percentile(hist, bounds, pct):
+    """Upper bound of the bucket holding the `pct` percentile (None when open-ended)."""
+    total = sum(hist)
+    if not total:
+        return 0
+    needed, seen = total * pct / 100, 0
+    for i, count in enumerate(hist):
+        seen += count
+        if seen >= needed:
+            return bounds[i] if i < len(bounds) else None
+    return None
+
+
+def report(hours=24, order="total_ms", limit=None):
+    """Per-view stats over the last `hours`, worst first by `order`.
+
+    `order` is one of "total_ms" (time spent in the view overall),
+    "avg_ms", "avg_queries", "max_queries" or "n_plus_one".
+    """
+    from clients.models import ViewProfile
+
+    since = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=max(hours - 1, 0))
+    views = {}
+    for row in ViewProfile.objects.filter(hour__gte=since):
+        v = views.setdefault(row.view_name, {
+            "view": row.view_name, "requests": 0, "queries": 0, "max_queries": 0, "sql_ms": 0.0,
+            "python_ms": 0.0, "max_ms": 0.0, "bytes": 0, "n_plus_one": 0,
+            "latency_hist": [], "query_hist": [], "duplicates": Counter(),
+        })
+        v["requests"] += row.requests
+        v["queries"] += row.queries
+        v["max_queries"] = max(v["max_queries"], row.max_queries)
+        v["sql_ms"] += row.sql_ms
+        v["python_ms"] += row.python_ms
+        v["max_ms"] = max(v["max_ms"], row.max_ms)
+        v["bytes"] += row.response_bytes
+        v["n_plus_one"] += row.n_plus_one_requests
+        v["latency_hist"] = _add_lists(v["latency_hist"], row.latency_histogram or [])
+        v["query_hist"] = _add_lists(v["query_hist"], row.query_histogram or [])
+        v["duplicates"].update(row.top_duplicates or {})
+
+    rows = []
+    for v in views.values():
+        n = v["requests"] or 1
+        rows.append({
+            "view": v["view"],
+            "requests": v["requests"],
+            "avg_queries": v["queries"] / n,
+            "max_queries": v["max_queries"],
+            "p95_queries": _percentile(v["query_hist"], QUERY_BUCKETS, 95),
+            "avg_sql_ms": v["sql_ms"] / n,
+            "avg_python_ms": v["python_ms"] / n,
+            "avg_ms": (v["sql_ms"] + v["python_ms"]) / n,
+            "total_ms": v["sql_ms"] + v["python_ms"],
+            "p50_ms": _percentile(v["latency_hist"], LATENCY_BUCKETS_MS, 50),
+            "p95_ms": _percentile(v["latency_hist"], LATENCY_BUCKETS_MS, 95),
+            "max_ms": v["max_ms"],
+            "avg_kb": v["bytes"] / n / 1024,
+            "n_plus_one": v["n_plus_one"],
+            "n_plus_one_pct": round(100 * v["n_plus_one"] / n),
+            "latency_hist": v["latency_hist"],
+            "query_hist": v["query_hist"],
+            "top_duplicates": v["duplicates"].most_common(3),
+        })
+    rows.sort(key=lambda r: -r[order])
+    return rows[:limit] if limit else rows
@@ -0,0 +1,281 @@
+"""Targeted retroactive points recompute after incentive edits.
+
+Editing a rule, slab or campaign used to leave `Sale.points` stale until the
+global `recalc_points` rewrote every sale. The signals now describe each edit
+as *scopes* — a product (ref id + label) and an optional date range — and
+queue one `PointsRecomputeJob` per transaction on commit. The runner:
+
+* widens every scope to whole slab partitions: calendar months, then any
+  campaign window of the same product overlapping them, until stable (a
+  campaign sale also counts toward its month's total, so the two chain);
+* walks each affected employee's sales in those slices in date order with
+  `incentive_engine.score_employee_sales`, writing back only changed rows;
+* swaps the slices' `EmployeeProductPeriodTotal` rows for the walk's totals;
+* records employees, partitions, sales scanned / updated and the net points
+  delta on the job.
+
+Jobs run from the ``run_recompute_jobs`` cron command
+(``POINTS_RECOMPUTE_MODE = "cron"``, the default), inline (``"sync"``) or,
+opt-in, in a background thread of the web worker after commit
+(``"thread"``). A queued job that has not started absorbs later
+edits. Claiming a job is a lease: one still RUNNING
+``POINTS_RECOMPUTE_LEASE_MINUTES`` after it started (its thread or process
+died) is claimed again by the next runner — a recompute can safely run twice.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from calendar import monthrange
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import commit_buffers, period_totals, points_ledger, sale_effects, sale_rollup
+from .incentive_engine import _SALE_FIELDS, _apply, score_employee_sales
+from .incentive_rules import IncentiveRuleBook
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+
+
+# ---------------- scopes ----------------
+
+def scope(ref_id, name, start=None, end=None):
+    """One product slice an edit can affect; no dates means its whole history."""
+    return {
+        "ref": ref_id or None,
+        "name": name or "",
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+    }
+
+
+def _month_bounds(start, end):
+    return start.replace(day=1), end.replace(day=monthrange(end.year, end.month)[1])
+
+
+def _windows(book, ref_id, name):
+    windows = []
+    for index in (book.campaigns_by_ref.get(ref_id) if ref_id else None, book.campaigns_by_name.get(name)):
+        if index:
+            windows.extend(index.windows)
+    return windows
+
+
+def _widen(book, ref_id, name, start, end):
+    """Grow [start, end] until it holds whole months and whole campaign windows."""
+    windows = _windows(book, ref_id, name)
+    while True:
+        lo, hi = _month_bounds(start, end)
+        for w in windows:
+            if w.start_date <= hi and w.end_date >= lo:
+                lo, hi = min(lo, w.start_date), max(hi, w.end_date)
+        if (lo, hi) == (start, end):
+            return start, end
+        start, end = lo, hi
+
+
+def plan(scopes, book):
+    """Merge scopes into disjoint slices: [(ref_id, name, start, end)], dates None = all history."""
+    by_product = {}
+    for sc in scopes:
+        ref_id = sc.get("ref")
+        name = sc.get("name") or (book.products.get(ref_id) or {}).get("name") or ""
+        ranges = by_product.setdefault((ref_id, name), [])
+        if not sc.get("start") or not sc.get("end") or ranges is None:
+            by_product[(ref_id, name)] = None
+            continue
+        ranges.append(_widen(book, ref_id, name, date.fromisoformat(sc["start"]), date.fromisoformat(sc["end"])))
+
+    slices = []
+    for (ref_id, name), ranges in sorted(by_product.items(), key=lambda item: (item[0][0] or 0, item[0][1])):
+        if ranges is None:
+            slices.append((ref_id, name, None, None))
+            continue
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        slices.extend((ref_id, name, start, end) for start, end in merged)
+    return slices
+
+
+# ---------------- recompute ----------------
+
+def _slice_sales(ref_id, name, start, end):
+    from clients.models import Sale
+
+    match = Q(product_ref__isnull=True, product=name)
+    if ref_id:
+        match |= Q(product_ref_id=ref_id)
+    qs = Sale.objects.filter(match)
+    if start:
+        qs = qs.filter(date__range=(start, end))
+    return qs.only(*_SALE_FIELDS).order_by("employee_id", "date", "created_at", "id")
+
+
+def recompute(scopes, *, dry_run=False):
+    """Re-score the partitions `scopes` reach. Returns the stats dict stored on the job."""
+    from clients.models import Sale
+
+    book = IncentiveRuleBook.build()
+    stats = {"employees": 0, "partitions": 0, "sales_scanned": 0, "sales_updated": 0, "points_delta": ZERO}
+    employees = set()
+    for ref_id, name, start, end in plan(scopes, book):
+        product_keys = {period_totals.product_key(None, name)}
+        if ref_id:
+            product_keys.add(period_totals.product_key(ref_id, name))
+        campaign_ids = set()
+        if start:
+            campaign_ids = {w.campaign_id for w in _windows(book, ref_id, name) if w.start_date <= end and w.end_date >= start}
+
+        for employee_id, sales in groupby(_slice_sales(ref_id, name, start, end).iterator(chunk_size=2000),
+                                          key=lambda s: s.employee_id):
+            sales = list(sales)
+            before = {s.pk: s.points or ZERO for s in sales}
+            totals = {}
+            changed = _apply(score_employee_sales(sales, book, totals))
+            employees.add(employee_id)
+            stats["partitions"] += len(totals)
+            stats["sales_scanned"] += len(sales)
+            stats["sales_updated"] += len(changed)
+            stats["points_delta"] += sum((s.points - before[s.pk] for s in changed), ZERO)
+            if dry_run:
+                continue
+            with sale_effects.deferred():
+                if changed:
+                    Sale.objects.bulk_update(changed, ["points", "incentive_amount", "campaign"], batch_size=500)
+                    sale_effects.ledger_entries(points_ledger.rescored(changed, before, note="rule change"))
+                    sale_effects.rollup_deltas(sale_rollup.rescored(changed, before))
+                period_totals.replace_slice(
+                    employee_id, product_keys, totals,
+                    months=(period_totals.month_key(start), period_totals.month_key(end)) if start else None,
+                    campaign_ids=campaign_ids | {key[2] for key in totals if key[2]},
+                )
+    stats["employees"] = len(employees)
+    return stats
+
+
+# ---------------- jobs ----------------
+
+def enqueue(scopes, reason=""):
+    """Queue (or extend the waiting) recompute job, then start the runner per POINTS_RECOMPUTE_MODE."""
+    from clients.models import PointsRecomputeJob
+
+    if not scopes:
+        return None
+    with transaction.atomic():
+        job = (
+            PointsRecomputeJob.objects.select_for_update()
+            .filter(status=PointsRecomputeJob.STATUS_QUEUED)
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            job = PointsRecomputeJob.objects.create(scopes=scopes, reason=reason[:255])
+        else:
+            job.scopes = job.scopes + [sc for sc in scopes if sc not in job.scopes]
+            if reason and reason not in job.reason:
+                job.reason = f"{job.reason}; {reason}" if job.reason else reason
+                job.reason = job.reason[:255]
+            job.save(update_fields=["scopes", "reason"])
+    _kick()
+    return job
+
+
+def _claim_next():
+    """Take the oldest queued job, or a running one whose lease has expired."""
+    from clients.models import PointsRecomputeJob
+
+    lease = timedelta(minutes=int(getattr(settings, "POINTS_RECOMPUTE_LEASE_MINUTES", 30)))
+    with transaction.atomic():
+        job = (
+            PointsRecomputeJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=PointsRecomputeJob.STATUS_QUEUED)
+                | Q(status=PointsRecomputeJob.STATUS_RUNNING, started_at__lt=timezone.now() - lease)
+            )
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is not None:
+            if job.status == PointsRecomputeJob.STATUS_RUNNING:
+                logger.warning("Reclaiming points recompute job %s (running since %s)", job.pk, job.started_at)
+            job.status = PointsRecomputeJob.STATUS_RUNNING
+            job.started_at = timezone.now()
+            job.save(update_fields=["status", "started_at"])
+    return job
+
+
+def run_pending():
+    """Run queued jobs oldest first until none are left. Returns the jobs run."""
+    from clients.models import PointsRecomputeJob
+
+    done = []
+    while True:
+        job = _claim_next()
+        if job is None:
+            return done
+        try:
+            stats = recompute(job.scopes)
+        except Exception as exc:
+            logger.exception("Points recompute job %s failed", job.pk)
+            job.status = PointsRecomputeJob.STATUS_FAILED
+            job.error = str(exc)
+        else:
+            job.status = PointsRecomputeJob.STATUS_DONE
+            for key, value in stats.items():
+                setattr(job, key, value)
+        job.finished_at = timezone.now()
+        job.save()
+        done.append(job)
+
+
+def _run_in_thread():
+    try:
+        run_pending()
+    finally:
+        connections.close_all()
+
+
+def _kick():
+    mode = getattr(settings, "POINTS_RECOMPUTE_MODE", "cron")
+    if mode == "sync":
+        run_pending()
+    elif mode == "thread":
+        threading.Thread(target=_run_in_thread, name="points-recompute", daemon=True).start()
+
+
+# ---------------- per-transaction collection (called from clients.signals) ----------------
+
+_local = threading.local()
+
+
+class _Pending:
+    def __init__(self):
+        self.scopes = []
+        self.reasons = []
+
+    def flush(self):
+        enqueue(self.scopes, ", ".join(dict.fromkeys(self.reasons)))
+
+
+def note_change(scopes, reason):
+    """Collect an edit's scopes; one job is queued when the transaction commits."""
+    if not scopes:
+        return
+    if not transaction.get_connection().in_atomic_block:
+        enqueue(scopes, reason)
+        return
+    pending = commit_buffers.segment(_local, _Pending)
+    pending.scopes.extend(sc for sc in scopes if sc not in pending.scopes)
+    pending.reasons.append(reason)
@@ -0,0 +1,196 @@
+"""Coalesced Sale side effects.
+
+Every Sale save / delete used to update the client portfolio, notify each
+admin and write an AuditLog row synchronously, one statement per row. The
+Sale signals now hand those effects to this module, which buffers them per
+transaction and runs them once in `transaction.on_commit`:
+
+* portfolio deltas are merged per client — one `update()` per client no matter
+  how many of its sales changed;
+* points-ledger entries are written with one `bulk_create`;
+* daily rollup deltas are merged per rollup row and written with one
+  `bulk_update` (see services/sale_rollup.py);
+* admin notifications go through `services.notifications` (cached recipient
+  list, one `bulk_create`, digest for large batches) and audit rows are
+  written with `bulk_create`.
+
+Effects are buffered per savepoint level (see services/commit_buffers.py),
+so those queued inside a savepoint that rolls back are dropped with it.
+Outside a transaction (autocommit) effects run immediately, as before.
+
+Batch jobs (the incentive engine, the recompute planner, approvals) post
+their prepared ledger rows and rollup deltas here too, and control the
+flush explicitly::
+
+    with sale_effects.deferred():     # one transaction; effects are merged
+        ...                           # and written once, just before commit
+    with sale_effects.suppressed():   # drop them (e.g. a rebuild follows)
+        ...
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.db import transaction
+
+from . import client_portfolio, commit_buffers, points_ledger, sale_rollup
+
+_local = threading.local()
+
+
+class _Buffer:
+    def __init__(self):
+        self.portfolio = defaultdict(lambda: defaultdict(lambda: Decimal("0")))
+        self.new_sales = []
+        self.audit_rows = []
+        self.ledger_rows = []
+        self.rollup = sale_rollup._new_deltas()
+
+    def __bool__(self):
+        return bool(self.portfolio or self.new_sales or self.audit_rows or self.ledger_rows or self.rollup)
+
+    def merge(self, other):
+        for client_id, by_column in other.portfolio.items():
+            for column, delta in by_column.items():
+                self.portfolio[client_id][column] += delta
+        _merge_rollup(self.rollup, other.rollup)
+        self.new_sales.extend(other.new_sales)
+        self.audit_rows.extend(other.audit_rows)
+        self.ledger_rows.extend(other.ledger_rows)
+
+    def flush(self):
+        from clients.models import AuditLog, PointsLedgerEntry
+
+        if not self:
+            return
+        # Runs on commit (its own transaction) or inside deferred(), whose
+        # transaction it should share, so no savepoint.
+        with transaction.atomic(savepoint=False):
+            client_portfolio.apply_deltas(self.portfolio)
+            sale_rollup.apply_deltas(self.rollup)
+            if self.new_sales:
+                _notify_admins(self.new_sales)
+            if self.audit_rows:
+                AuditLog.objects.bulk_create(self.audit_rows)
+            if self.ledger_rows:
+                PointsLedgerEntry.objects.bulk_create(self.ledger_rows)
+
+
+def _merge_rollup(into, deltas):
+    for key, delta in deltas.items():
+        entry = into[key]
+        for i, value in enumerate(delta):
+            entry[i] += value
+
+
+def _mode():
+    return getattr(_local, "mode", None)
+
+
+def _enqueue(add):
+    mode = _mode()
+    if mode == "suppressed":
+        return
+    if mode == "deferred":
+        add(commit_buffers.segment(_local.deferred_segments, _Buffer))
+        return
+    if not transaction.get_connection().in_atomic_block:
+        buf = _Buffer()
+        add(buf)
+        buf.flush()
+        return
+    add(commit_buffers.segment(_local, _Buffer))
+
+
+# ---------------- producers (called from clients.signals) ----------------
+
+def portfolio_changed(old, new):
+    """A sale moved from `old` to `new` portfolio row (see client_portfolio.sale_row)."""
+    _enqueue(lambda buf: client_portfolio.sale_deltas(old, new, buf.portfolio))
+
+
+def rollup_changed(old, new):
+    """A sale moved from `old` to `new` rollup row (see sale_rollup.sale_row)."""
+    _enqueue(lambda buf: sale_rollup.sale_deltas(old, new, buf.rollup))
+
+
+def sale_created(sale):
+    _enqueue(lambda buf: buf.new_sales.append(sale))
+
+
+def audit(**fields):
+    from clients.models import AuditLog
+
+    row = AuditLog(**fields)
+    _enqueue(lambda buf: buf.audit_rows.append(row))
+
+
+def points_changed(sale_id, old, new):
+    """A sale's earned points moved from `old` to `new` (see points_ledger.sale_row)."""
+    ledger_entries(points_ledger.entries_for_change(sale_id, old, new))
+
+
+def ledger_entries(rows):
+    """Prepared PointsLedgerEntry rows, e.g. from `points_ledger.rescored()`."""
+    if rows:
+        _enqueue(lambda buf: buf.ledger_rows.extend(rows))
+
+
+def rollup_deltas(deltas):
+    """Prepared rollup deltas, e.g. from `sale_rollup.status_moves()` / `rescored()`."""
+    if deltas:
+        _enqueue(lambda buf: _merge_rollup(buf.rollup, deltas))
+
+
+# ---------------- consumers ----------------
+
+def _notify_admins(sales):
+    from clients.models import Sale
+
+    from . import notifications
+
+    # Skip sales that did not survive the transaction (deleted, rolled back).
+    alive = set(Sale.objects.filter(pk__in=[s.pk for s in sales]).values_list("pk", flat=True))
+    notifications.notify_new_sales([s for s in sales if s.pk in alive])
+
+
+# ---------------- batch-job controls ----------------
+
+@contextmanager
+def deferred():
+    """Run the block as one transaction and write its side effects once, just
+    before it commits. Effects queued inside a savepoint that rolls back are
+    dropped with it; if the block raises, the whole transaction rolls back,
+    effects included."""
+    if _mode() is not None:  # nested: the outer block owns the flush
+        with transaction.atomic():
+            yield
+        return
+    _local.mode = "deferred"
+    _local.deferred_segments = segments = SimpleNamespace()
+    try:
+        with transaction.atomic():
+            yield
+            _local.mode = None
+            merged = _Buffer()
+            for buf in commit_buffers.take(segments):
+                merged.merge(buf)
+            merged.flush()
+    finally:
+        _local.mode = None
+        _local.deferred_segments = None
+
+
+@contextmanager
+def suppressed():
+    """Skip Sale side effects entirely inside the block."""
+    previous = _mode()
+    _local.mode = "suppressed"
+    try:
+        yield
+    finally:
+        _local.mode = previous
@@ -0,0 +1,256 @@
+"""Per-day sales rollup (`SaleDailyRollup`).
+
+Dashboards and reports used to re-scan raw `Sale` rows for every month or
+year figure. `SaleDailyRollup` holds one row per (date, employee, product,
+policy type, status) with the summed amount, points and cover amount plus
+the sale count, so those queries read at most a few thousand rows.
+
+The table is maintained like the client portfolio columns:
+
+* the Sale signals hand the old and new row to `sale_deltas()`; the deltas
+  are coalesced per transaction by services/sale_effects.py and
+  `apply_deltas()` locks the touched rollup rows and writes them with one
+  `bulk_update` on commit;
+* approvals and batch recomputes, which bypass `Sale.save()`, hand their
+  deltas (`status_moves()`, `rescored()`) to `sale_effects.deferred()`,
+  which applies them before the transaction commits;
+* `rebuild()` (``manage.py rebuild_sale_rollups``) regenerates it from one
+  grouped query and `verify()` lists the days that drifted.
+
+Both paths bump the ``sales:<YYYY-MM>`` data version of every month they
+touch (see services/data_versions.py) and drop the frozen report snapshots
+of the closed ones (services/closed_periods.py).
+
+`totals()` is the read side: the same ``values(...).annotate(...)`` shape
+views would run against `Sale`, but over the rollup.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth, TruncYear
+from django.utils import timezone
+
+from . import closed_periods, data_versions
+from .period_totals import product_key
+
+ZERO = Decimal("0")
+
+# Sale fields that place a sale in the rollup and what it adds there.
+SALE_FIELDS = (
+    "date", "employee_id", "product_ref_id", "product", "policy_type", "status",
+    "amount", "points", "cover_amount",
+)
+# Summed columns, in the order the delta lists hold them.
+MEASURES = ("amount", "points", "cover_amount", "sale_count")
+
+_KEY_FIELDS = ("date", "employee_id", "product_key", "product", "policy_type", "status")
+
+
+def sale_row(sale):
+    row = {field: getattr(sale, field) for field in SALE_FIELDS}
+    row["date"] = sale._sale_day()
+    return row
+
+
+def _key(row):
+    return (
+        row["date"], row["employee_id"], product_key(row["product_ref_id"], row["product"]),
+        row["product"] or "", row["policy_type"] or "", row["status"],
+    )
+
+
+def _new_deltas():
+    return defaultdict(lambda: [ZERO, ZERO, ZERO, 0])
+
+
+def sale_deltas(old, new, deltas=None):
+    """Accumulate the move of one sale from `old` to `new` (SALE_FIELDS dicts; None = absent)."""
+    if deltas is None:
+        deltas = _new_deltas()
+    for row, sign in ((old, -1), (new, 1)):
+        if not row or not row.get("employee_id"):
+            continue
+        entry = deltas[(_key(row), row["product_ref_id"])]
+        entry[0] += sign * (row["amount"] or ZERO)
+        entry[1] += sign * (row["points"] or ZERO)
+        entry[2] += sign * (row["cover_amount"] or ZERO)
+        entry[3] += sign
+    return deltas
+
+
+def status_moves(rows, new_status, deltas=None):
+    """Deltas for approvals moving `rows` (SALE_FIELDS dicts) to `new_status`."""
+    for row in rows:
+        deltas = sale_deltas(row, {**row, "status": new_status}, deltas)
+    return deltas if deltas is not None else _new_deltas()
+
+
+def rescored(changed, old_points, deltas=None):
+    """Points deltas for sales a batch recompute re-scored; `old_points` maps sale id -> points."""
+    if deltas is None:
+        deltas = _new_deltas()
+    for sale in changed:
+        diff = (sale.points or ZERO) - (old_points.get(sale.pk) or ZERO)
+        if not diff:
+            continue
+        row = {
+            "date": sale.date, "employee_id": sale.employee_id, "product_ref_id": sale.product_ref_id,
+            "product": sale.product, "policy_type": sale.policy_type, "status": sale.status,
+        }
+        deltas[(_key(row), sale.product_ref_id)][1] += diff
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Add `deltas` to their rollup rows: create the missing ones, lock, then one bulk_update."""
+    from clients.models import SaleDailyRollup
+
+    moved = {key: d for key, d in deltas.items() if any(d)}
+    if not moved:
+        return
+    SaleDailyRollup.objects.bulk_create(
+        [SaleDailyRollup(product_ref_id=ref_id, **dict(zip(_KEY_FIELDS, key))) for key, ref_id in moved],
+        ignore_conflicts=True,
+    )
+    by_key = {key: d for (key, _ref_id), d in moved.items()}
+    rows = [
+        row
+        for row in SaleDailyRollup.objects.select_for_update().filter(
+            date__in={k[0] for k in by_key},
+            employee_id__in={k[1] for k in by_key},
+            product_key__in={k[2] for k in by_key},
+        ).order_by("pk")
+        if tuple(getattr(row, f) for f in _KEY_FIELDS) in by_key
+    ]
+    now = timezone.now()
+    emptied = []
+    for row in rows:
+        amount, points, cover, count = by_key[tuple(getattr(row, f) for f in _KEY_FIELDS)]
+        row.amount += amount
+        row.points += points
+        row.cover_amount += cover
+        row.sale_count += count
+        row.updated_at = now
+        if row.sale_count <= 0:
+            emptied.append(row.pk)
+    SaleDailyRollup.objects.bulk_update(rows, [*MEASURES, "updated_at"], batch_size=500)
+    if emptied:
+        SaleDailyRollup.objects.filter(pk__in=emptied).delete()
+    data_versions.bump(*{data_versions.sales_month(key[0]) for key in by_key})
+    closed_periods.invalidate(*{key[0] for key in by_key})
+
+
+# ---------------- read side ----------------
+
+def _range(qs, start, end):
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    if end is not None:
+        qs = qs.filter(date__lte=end)
+    return qs
+
+
+def totals(*fields, start=None, end=None, period=None, **filters):
+    """Grouped sums from the rollup, shaped like the equivalent `Sale` query.
+
+    ``totals("employee_id", "product", start=a, end=b, status="approved")``
+    returns the rows of ``Sale.objects.filter(date__range=(a, b), status=...)
+    .values("employee_id", "product").annotate(amount=Sum("amount"), ...)``
+    as a list of dicts, with ``points``, ``cover_amount`` and ``count``
+    alongside. `period` ("month" / "year") adds a truncated ``period``
+    column to group on.
+    Filters are applied to the rollup's own columns (date, employee_id,
+    product, product_ref_id, policy_type, status).
+    """
+    from clients.models import SaleDailyRollup
+
+    qs = _range(SaleDailyRollup.objects.filter(**filters), start, end)
+    if period is not None:
+        qs = qs.annotate(period={"month": TruncMonth, "year": TruncYear}[period]("date"))
+        fields = ("period", *fields)
+    rows = (
+        qs.values(*fields)
+        .annotate(_amount=Sum("amount"), _points=Sum("points"), _cover=Sum("cover_amount"), _count=Sum("sale_count"))
+        .order_by(*fields)
+    )
+    return [
+        {
+            **{f: r[f] for f in fields},
+            "amount": r["_amount"] or ZERO, "points": r["_points"] or ZERO,
+            "cover_amount": r["_cover"] or ZERO, "count": r["_count"] or 0,
+        }
+        for r in rows
+    ]
+
+
+# ---------------- rebuild / verify ----------------
+
+def _expected(start=None, end=None):
+    from clients.models import Sale
+
+    rows = (
+        _range(Sale.objects.all(), start, end)
+        .values("date", "employee_id", "product_ref_id", "product", "policy_type", "status")
+        .annotate(
+            amount_sum=Sum("amount"), points_sum=Sum("points"), cover_sum=Sum("cover_amount"),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+    deltas = _new_deltas()
+    for r in rows:
+        entry = deltas[(_key(r), r["product_ref_id"])]
+        entry[0] += r["amount_sum"] or ZERO
+        entry[1] += r["points_sum"] or ZERO
+        entry[2] += r["cover_sum"] or ZERO
+        entry[3] += r["count"]
+    return deltas
+
+
+def rebuild(start=None, end=None):
+    """Regenerate the rollup (or the days in [start, end]) from `Sale`. Returns {"rows": n}."""
+    from clients.models import SaleDailyRollup
+
+    expected = _expected(start, end)
+    with transaction.atomic():
+        existing = _range(SaleDailyRollup.objects.all(), start, end)
+        months = set(existing.dates("date", "month")) | {key[0] for key, _ref in expected}
+        existing.delete()
+        SaleDailyRollup.objects.bulk_create(
+            [
+                SaleDailyRollup(
+                    product_ref_id=ref_id, amount=amount, points=points, cover_amount=cover, sale_count=count,
+                    **dict(zip(_KEY_FIELDS, key)),
+                )
+                for (key, ref_id), (amount, points, cover, count) in expected.items()
+            ],
+            batch_size=1000,
+        )
+        data_versions.bump(*{data_versions.sales_month(day) for day in months})
+        closed_periods.invalidate(*months)
+    return {"rows": len(expected)}
+
+
+def verify(start=None, end=None):
+    """Days whose rollup rows disagree with `Sale`: [{"date", "employee_id", "product", "status", ...}]."""
+    from clients.models import SaleDailyRollup
+
+    expected = {key: tuple(v) for (key, _ref), v in _expected(start, end).items()}
+    actual = {
+        tuple(r[f] for f in _KEY_FIELDS): (r["amount"], r["points"], r["cover_amount"], r["sale_count"])
+        for r in _range(SaleDailyRollup.objects.all(), start, end).values(*_KEY_FIELDS, *MEASURES)
+    }
+    empty = (ZERO, ZERO, ZERO, 0)
+    mismatches = []
+    for key in set(expected) | set(actual):
+        want, have = expected.get(key, empty), actual.get(key, empty)
+        if want != have:
+            mismatches.append({
+                **dict(zip(_KEY_FIELDS, key)),
+                **{f"{m}_diff": w - h for m, w, h in zip(MEASURES, want, have)},
+            })
+    return sorted(mismatches, key=lambda m: (m["date"], m["employee_id"], m["product_key"], m["status"]))
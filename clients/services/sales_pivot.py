@@ -0,0 +1,106 @@
+"""Single-pass sales aggregation for the dashboards.
+
+The admin dashboard used to run a separate grouped query for every panel:
+points and amount per product, today and month per product, per-employee
+maps, the admin's own figures. `SalesPivot.for_month()` replaces them with
+one conditional-aggregation query over a sargable ``date`` range of the
+daily sales rollup (services/sale_rollup.py), grouped by (employee, product,
+status), with month and today sums side by side. Every
+panel is then pivoted from that result in memory, so the query count no
+longer grows with the number of employees or products. The grouped result
+is kept in the versioned fragment cache (services/data_versions.py).
+"""
+from __future__ import annotations
+
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+
+from . import data_versions
+
+ZERO = Decimal("0")
+
+TODAY = "today"
+MONTH = "month"
+BUCKETS = (TODAY, MONTH)
+
+_FIELDS = {"amount": 0, "points": 1, "count": 2}
+
+
+def month_bounds(day):
+    return date(day.year, day.month, 1), date(day.year, day.month, monthrange(day.year, day.month)[1])
+
+
+class SalesPivot:
+    """(employee_id, product, bucket, status) -> [amount, points, count] for one month."""
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    @classmethod
+    def for_month(cls, today):
+        """The pivot for `today`'s month, cached until that month's sales version moves."""
+        return cls(data_versions.fragment(
+            f"sales-pivot:{today.isoformat()}", [data_versions.sales_month(today)], lambda: cls._cells(today),
+        ))
+
+    @staticmethod
+    def _cells(today):
+        from clients.models import SaleDailyRollup
+
+        start, end = month_bounds(today)
+        is_today = Q(date=today)
+        rows = (
+            SaleDailyRollup.objects.filter(date__gte=start, date__lte=end)
+            .values("employee_id", "product", "status")
+            .annotate(
+                month_amount=Sum("amount"),
+                month_points=Sum("points"),
+                month_count=Sum("sale_count"),
+                today_amount=Sum("amount", filter=is_today),
+                today_points=Sum("points", filter=is_today),
+                today_count=Sum("sale_count", filter=is_today),
+            )
+            .order_by()
+        )
+        cells = {}
+        for r in rows:
+            for bucket in BUCKETS:
+                count = r[f"{bucket}_count"]
+                if count:
+                    cells[(r["employee_id"], r["product"], bucket, r["status"])] = [
+                        r[f"{bucket}_amount"] or ZERO, r[f"{bucket}_points"] or ZERO, count,
+                    ]
+        return cells
+
+    def _matching(self, bucket, status, employee_id):
+        for (emp_id, product, cell_bucket, cell_status), values in self.cells.items():
+            if cell_bucket != bucket or (status is not None and cell_status != status):
+                continue
+            if employee_id is not None and emp_id != employee_id:
+                continue
+            yield emp_id, product, values
+
+    def total(self, field, *, bucket=MONTH, status=None, employee_id=None):
+        idx = _FIELDS[field]
+        return sum((values[idx] for _, _, values in self._matching(bucket, status, employee_id)), ZERO)
+
+    def by_product(self, field, *, bucket=MONTH, status=None, employee_id=None):
+        idx = _FIELDS[field]
+        out = defaultdict(lambda: ZERO)
+        for _, product, values in self._matching(bucket, status, employee_id):
+            out[product] += values[idx]
+        return dict(out)
+
+    def by_employee_product(self, field, *, bucket=MONTH, status=None):
+        idx = _FIELDS[field]
+        out = defaultdict(lambda: ZERO)
+        for emp_id, product, values in self._matching(bucket, status, None):
+            out[(emp_id, product)] += values[idx]
+        return dict(out)
+
+    def products(self):
+        return {product for (_, product, _, _) in self.cells if product}
@@ -0,0 +1,122 @@
+"""Request- and process-level cache for the singleton config models.
+
+`ManagerAccessConfig.current()`, `FirmSettings.get_settings()` and
+`MFProjectionSettings.current()` each ran a ``get_or_create`` per call — the
+`manager_access` context processor on every template render, views again,
+and `mf_engine.reconcile` once per snapshot. They now go through `get()`:
+
+* the first lookup in a process loads the row (creating it if missing) and
+  keeps it in a `process_cache.ProcessCopy` under the model's version
+  stamp, a `ProcessCacheVersion` row every worker reads once per request;
+* within a request (opened and closed by the ``request_started`` /
+  ``request_finished`` receivers below) the first lookup also memoizes a
+  private copy, so repeat lookups cost nothing and a view that edits its
+  copy (e.g. a bound ModelForm) never touches the shared one;
+* the post_save / post_delete receivers in `clients.signals` call
+  `invalidate()`: this process forgets the row at once and the shared
+  version is bumped on commit, so other workers reload from their next
+  request on. A `ManagerAccessConfig` permission change therefore reaches
+  every worker with the next request it serves.
+
+Until the transaction that wrote a row ends, this thread reads it straight
+from the database and nobody caches it, so a rolled-back edit is never
+served from the process copy.
+"""
+from __future__ import annotations
+
+import copy
+import threading
+
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+
+from .process_cache import ProcessCopy
+
+VERSION_PREFIX = "singleton:version:"
+
+_lock = threading.Lock()
+_copies = {}  # model label -> ProcessCopy
+_request = threading.local()
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+def _copy(model):
+    label = _label(model)
+    found = _copies.get(label)
+    if found is None:
+        with _lock:
+            found = _copies.setdefault(
+                label, ProcessCopy(VERSION_PREFIX + label, lambda: model.objects.get_or_create(pk=1)[0]),
+            )
+    return found
+
+
+def _written_in_open_transaction(model, label):
+    """True while this thread's uncommitted write to `label` may still roll back."""
+    written = getattr(_request, "written", None) or {}
+    block = written.get(label)
+    if block is None:
+        return False
+    if any(b is block for b in transaction.get_connection().atomic_blocks):
+        return True
+    # Committed or rolled back: the database is authoritative again.
+    del written[label]
+    _copy(model).drop_local()
+    return False
+
+
+def get(model):
+    """The singleton row of `model` (pk=1), created on first use."""
+    label = _label(model)
+    memo = getattr(_request, "memo", None)
+    if memo is not None and label in memo:
+        return memo[label]
+    if _written_in_open_transaction(model, label):
+        # Never share a row that may still be rolled back.
+        instance, _ = model.objects.get_or_create(pk=1)
+    else:
+        instance = copy.copy(_copy(model).get())
+    if memo is not None:
+        memo[label] = instance
+    return instance
+
+
+def invalidate(model):
+    """`model`'s row changed: drop this process's copies, bump the shared version on commit."""
+    label = _label(model)
+    _copy(model).drop_local()
+    memo = getattr(_request, "memo", None)
+    if memo is not None:
+        memo.pop(label, None)
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        if getattr(_request, "written", None) is None:
+            _request.written = {}
+        _request.written[label] = connection.atomic_blocks[0]
+
+    transaction.on_commit(_copy(model).bump_version)
+
+
+def clear():
+    """Forget every cached row in this process (tests)."""
+    for process_copy in _copies.values():
+        process_copy.drop_local()
+    _request.memo = None
+    _request.written = None
+
+
+# ---------------- request scope ----------------
+
+def _begin_request(**kwargs):
+    _request.memo = {}
+
+
+def _end_request(**kwargs):
+    _request.memo = None
+
+
+request_started.connect(_begin_request, dispatch_uid="singletons_begin_request")
+request_finished.connect(_end_request, dispatch_uid="singletons_end_request")
@@ -0,0 +1,178 @@
+"""Dense sales time series for the performance reports.
+
+The past-performance pages and `employee_performance` each looped over
+their periods with one aggregate per period; the latter ran a ``Count`` per
+day, so a one-year range cost 365 queries. `series()` answers all of them
+with one ``Trunc*``-grouped query over the daily sales rollup
+(services/sale_rollup.py):
+
+* `grain` is "day", "week" (ISO weeks, starting Monday), "month" or "fy"
+  (Indian financial year, April to March; folded from months in Python
+  since the database has no FY truncation);
+* every bucket between `start` and `end` is present, zero-filled, so charts
+  get one value per label;
+* points, amount and count all come back from the same query, optionally
+  split by employee or product (`by`) and filtered by employee, product and
+  sale status;
+* the result is kept in the versioned fragment cache under the
+  ``sales:<YYYY-MM>`` versions of the months it covers.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from . import data_versions
+
+ZERO = Decimal("0")
+GRAINS = ("day", "week", "month", "fy")
+METRICS = ("points", "amount", "count")
+DIMENSIONS = {"employee": "employee_id", "product": "product_ref_id"}
+# Statuses whose points count as earned (what the points ledger holds).
+EARNED = ("pending", "approved")
+
+
+def bucket_of(day, grain):
+    """Start date of the `grain` bucket holding `day`."""
+    if grain == "day":
+        return day
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    if grain == "fy":
+        return date(day.year if day.month >= 4 else day.year - 1, 4, 1)
+    raise ValueError(f"Unknown time-series grain: {grain}")
+
+
+def _next(bucket, grain):
+    if grain == "day":
+        return bucket + timedelta(days=1)
+    if grain == "week":
+        return bucket + timedelta(days=7)
+    if grain == "month":
+        return (bucket + timedelta(days=32)).replace(day=1)
+    return date(bucket.year + 1, 4, 1)
+
+
+def buckets(start, end, grain):
+    """Every bucket start from the one holding `start` to the one holding `end`."""
+    out, bucket, last = [], bucket_of(start, grain), bucket_of(end, grain)
+    while bucket <= last:
+        out.append(bucket)
+        bucket = _next(bucket, grain)
+    return out
+
+
+def label(bucket, grain):
+    if grain == "day":
+        return bucket.strftime("%Y-%m-%d")
+    if grain == "week":
+        return f"Week of {bucket:%d %b %Y}"
+    if grain == "month":
+        return bucket.strftime("%B %Y")
+    return f"FY {bucket.year}-{str(bucket.year + 1)[-2:]}"
+
+
+class TimeSeries:
+    """Zero-filled points / amount / count per bucket, per dimension key.
+
+    Without a dimension the only key is None.
+    """
+
+    def __init__(self, grain, buckets, data):
+        self.grain = grain
+        self.buckets = buckets
+        self.data = data  # key -> {bucket: [points, amount, count]}
+
+    @property
+    def labels(self):
+        return [label(b, self.grain) for b in self.buckets]
+
+    def keys(self):
+        return list(self.data)
+
+    def values(self, metric="points", key=None):
+        column = METRICS.index(metric)
+        cells = self.data.get(key, {})
+        empty = 0 if metric == "count" else ZERO
+        return [cells[b][column] if b in cells else empty for b in self.buckets]
+
+    def total(self, metric="points", key=None):
+        return sum(self.values(metric, key), 0 if metric == "count" else ZERO)
+
+    def rows(self, key=None):
+        """[{bucket, label, points, amount, count}] for one key."""
+        cells = self.data.get(key, {})
+        return [
+            {"bucket": b, "label": label(b, self.grain),
+             **dict(zip(METRICS, cells.get(b, (ZERO, ZERO, 0))))}
+            for b in self.buckets
+        ]
+
+
+def _months(start, end):
+    day, months = start.replace(day=1), []
+    while day <= end:
+        months.append(day)
+        day = (day + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _build(grain, start, end, employee_ids, product_ref_ids, status, by):
+    from clients.models import SaleDailyRollup
+
+    qs = SaleDailyRollup.objects.filter(date__gte=start, date__lte=end)
+    if employee_ids is not None:
+        qs = qs.filter(employee_id__in=employee_ids)
+    if product_ref_ids is not None:
+        qs = qs.filter(product_ref_id__in=product_ref_ids)
+    if status is not None:
+        qs = qs.filter(status__in=[status] if isinstance(status, str) else status)
+
+    truncate = {"day": F("date"), "week": TruncWeek("date"), "month": TruncMonth("date"), "fy": TruncMonth("date")}[grain]
+    fields = ["bucket"] + ([DIMENSIONS[by]] if by else [])
+    rows = (
+        qs.annotate(bucket=truncate)
+        .values(*fields)
+        .annotate(points=Sum("points"), amount=Sum("amount"), count=Sum("sale_count"))
+        .order_by()
+    )
+
+    data = {}
+    for r in rows:
+        key = r[DIMENSIONS[by]] if by else None
+        bucket = bucket_of(r["bucket"], grain)
+        cell = data.setdefault(key, {}).setdefault(bucket, [ZERO, ZERO, 0])
+        cell[0] += r["points"] or ZERO
+        cell[1] += r["amount"] or ZERO
+        cell[2] += r["count"] or 0
+    if not by:
+        data.setdefault(None, {})
+    return TimeSeries(grain, buckets(start, end, grain), data)
+
+
+def series(grain, start, end, employee_ids=None, product_ref_ids=None, status=None, by=None):
+    """`TimeSeries` of sales dated in [start, end].
+
+    `status` is one status, a list of them (e.g. `EARNED`) or None for all;
+    `by` is None, "employee" or "product".
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown time-series grain: {grain}")
+    if by is not None and by not in DIMENSIONS:
+        raise ValueError(f"Unknown time-series dimension: {by}")
+    employee_ids = sorted(employee_ids) if employee_ids is not None else None
+    product_ref_ids = sorted(product_ref_ids) if product_ref_ids is not None else None
+    status = status if status is None or isinstance(status, str) else sorted(status)
+
+    params = repr((employee_ids, product_ref_ids, status, by)).encode()
+    name = f"timeseries:{grain}:{start}:{end}:{hashlib.sha1(params).hexdigest()[:16]}"
+    deps = [data_versions.sales_month(m) for m in _months(start, end)]
+    return data_versions.fragment(
+        name, deps, lambda: _build(grain, start, end, employee_ids, product_ref_ids, status, by),
+    )
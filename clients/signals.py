@@ -1,77 +1,34 @@
 from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Sum, Q
-from .models import Sale, Client, Notification, Employee, Product, AuditLog
-from django.contrib.auth import get_user_model
-from django.urls import reverse
+from .models import Sale, Client, Employee, Product, AuditLog
+from .services import client_portfolio, points_ledger, sale_effects, sale_rollup
+from .services.approvals import status_audit_fields
+
+# Sale side effects below are queued through services.sale_effects, which
+# coalesces them per transaction and runs them once on commit.
 
 @receiver([post_save, post_delete], sender=Sale)
 def update_client_status(sender, instance, **kwargs):
-    client = instance.client
-    sales = Sale.objects.filter(client=client)
-
-    code_to_name = {p.code: p.name for p in Product.objects.all().only("code", "name")}
-
-    def _sum_amount(product_code, fallback_name, field_name):
-        product_name = code_to_name.get(product_code, fallback_name)
-        amount = sales.filter(Q(product_ref__code=product_code) | Q(product=product_name)).aggregate(total=Sum(field_name))["total"]
-        return amount or 0
-
-    client.sip_amount = _sum_amount("SIP", "SIP", "amount")
-    client.life_cover = _sum_amount("LIFE_INS", "Life Insurance", "cover_amount")
-    client.health_cover = _sum_amount("HEALTH_INS", "Health Insurance", "cover_amount")
-    client.motor_insured_value = _sum_amount("MOTOR_INS", "Motor Insurance", "amount")
-    client.pms_amount = _sum_amount("PMS", "PMS", "amount")
-
-    client.sip_status = client.sip_amount > 0
-    client.life_status = client.life_cover > 0
-    client.health_status = client.health_cover > 0
-    client.motor_status = client.motor_insured_value > 0
-    client.pms_status = client.pms_amount > 0
-
-    client.save()
+    # Apply only the old-vs-new difference to the affected portfolio columns;
+    # `_portfolio_old` is captured in pre_save (see _capture_previous_sale).
+    if kwargs.get("signal") is post_delete:
+        sale_effects.portfolio_changed(client_portfolio.sale_row(instance), None)
+        return
+    old = getattr(instance, "_portfolio_old", None)
+    new = client_portfolio.sale_row(instance)
+    if old == new:
+        return  # status / notes edit: nothing the portfolio counts has moved
+    sale_effects.portfolio_changed(old, new)
 
 
 @receiver(post_save, sender=Sale)
 def notify_admins_on_sale(sender, instance, created, **kwargs):
-    if not created:
-        return
-
-    User = get_user_model()
-    try:
-        dashboard_url = reverse("clients:admin_dashboard")
-    except Exception:
-        dashboard_url = ""
-
-    employee_name = getattr(instance.employee, "user", None)
-    if employee_name and hasattr(employee_name, "username"):
-        employee_name = employee_name.username
-    else:
-        employee_name = str(instance.employee)
-
-    client_name = getattr(instance.client, "name", str(instance.client))
-    amount_display = f"₹{instance.amount}"
-
-    body = (
-        f"{employee_name} logged a {instance.product} sale of {amount_display} "
-        f"for client {client_name}."
-    )
-
-    admin_users = set(User.objects.filter(is_superuser=True))
-    admin_users.update(
-        User.objects.filter(employee__role="admin")
-    )
+    if created:
+        sale_effects.sale_created(instance)
 
-    for admin_user in admin_users:
-        Notification.objects.create(
-            recipient=admin_user,
-            title="New sale recorded",
-            body=body,
-            link=dashboard_url,
-            related_sale=instance,
-        )
+from calendar import monthrange
+from datetime import date
 
-from django.db.models import Sum
 from django.utils.timezone import now
 from django.core.cache import cache
 import logging
@@ -87,13 +44,14 @@ def close_month_targets(year: int, month: int, *, dry_run=False):
     """
     monthly_targets = Target.objects.filter(target_type="monthly")
     employees = Employee.objects.all()
+    start = date(year, month, 1)
+    month_sales = sale_rollup.totals("employee_id", "product", start=start, end=start.replace(day=monthrange(year, month)[1]))
+    sales_by_employee = {}
+    for row in month_sales:
+        sales_by_employee.setdefault(row["employee_id"], {})[row["product"]] = row["amount"]
 
     for emp in employees:
-        month_sales = (
-            Sale.objects.filter(employee=emp, date__year=year, date__month=month)
-            .values("product").annotate(total=Sum("amount"))
-        )
-        month_sales_dict = {s["product"]: s["total"] for s in month_sales}
+        month_sales_dict = sales_by_employee.get(emp.pk, {})
 
         for target in monthly_targets:
             achieved = month_sales_dict.get(target.product, 0) or 0
@@ -118,68 +76,81 @@ def close_month_targets(year: int, month: int, *, dry_run=False):
 
 # ────────────────────────────────────────────────────────────────────────────
 # Audit log: track Sale status transitions (approve/reject/etc).
-# Capture the previous status in pre_save, then write the audit row in post_save.
+# Capture the previous row in pre_save (status for the audit log, portfolio
+# inputs for update_client_status), then write the audit row in post_save.
+# The previous values come from the instance's loaded-state snapshot (the
+# UPDATE only lands while the row still holds them, see Sale.save()); only
+# instances without one (built by hand with a pk, or loaded with .only())
+# fall back to reading the row.
 # ────────────────────────────────────────────────────────────────────────────
 
+
 @receiver(pre_save, sender=Sale)
-def _audit_capture_old_sale_status(sender, instance, **kwargs):
+def _capture_previous_sale(sender, instance, **kwargs):
+    instance._audit_old_status = None
+    instance._portfolio_old = None
+    instance._ledger_old = None
+    instance._rollup_old = None
     if not instance.pk:
-        instance._audit_old_status = None
         return
-    try:
-        prev = Sale.objects.only("status").get(pk=instance.pk)
-        instance._audit_old_status = prev.status
-    except Sale.DoesNotExist:
-        instance._audit_old_status = None
-
+    fields = Sale.delta_fields()
+    loaded = instance.loaded_values() or {}
+    if all(field in loaded for field in fields):
+        prev = {field: loaded[field] for field in fields}
+    else:
+        prev = Sale.objects.filter(pk=instance.pk).values(*fields).first()
+    if prev is not None:
+        instance._audit_old_status = prev["status"]
+        instance._portfolio_old = {field: prev[field] for field in client_portfolio.SALE_FIELDS}
+        instance._ledger_old = {field: prev[field] for field in points_ledger.SALE_FIELDS}
+        instance._rollup_old = {field: prev[field] for field in sale_rollup.SALE_FIELDS}
 
-_AUDIT_ACTION_BY_NEW_STATUS = {
-    "approved": AuditLog.ACTION_SALE_APPROVED,
-    "rejected": AuditLog.ACTION_SALE_REJECTED,
-    "pending":  AuditLog.ACTION_SALE_PENDING,
-}
 
+@receiver([post_save, post_delete], sender=Sale)
+def _post_points_ledger(sender, instance, **kwargs):
+    # Append the earned-points difference; see services/points_ledger.py.
+    if kwargs.get("signal") is post_delete:
+        sale_effects.points_changed(instance.pk, points_ledger.sale_row(instance), None)
+        return
+    sale_effects.points_changed(instance.pk, getattr(instance, "_ledger_old", None), points_ledger.sale_row(instance))
 
-@receiver(post_save, sender=Sale)
-def _audit_log_sale_status_change(sender, instance, created, **kwargs):
-    old_status = getattr(instance, "_audit_old_status", None)
-    new_status = instance.status
-    if created or old_status == new_status:
-        return  # only log actual transitions
 
-    action = _AUDIT_ACTION_BY_NEW_STATUS.get(new_status)
-    if not action:
+@receiver([post_save, post_delete], sender=Sale)
+def _update_sale_rollup(sender, instance, **kwargs):
+    # Move the sale between SaleDailyRollup rows; see services/sale_rollup.py.
+    if kwargs.get("signal") is post_delete:
+        sale_effects.rollup_changed(sale_rollup.sale_row(instance), None)
+        return
+    old = getattr(instance, "_rollup_old", None)
+    new = sale_rollup.sale_row(instance)
+    if old == new:
         return
+    sale_effects.rollup_changed(old, new)
 
-    actor = getattr(instance, "_audit_actor", None)
-    summary = (
-        f"Sale #{instance.pk} for {instance.client.name if instance.client_id else '?'}: "
-        f"{old_status} → {new_status}"
-    )
-    details = {
-        "from": old_status,
-        "to": new_status,
-        "amount": str(instance.amount),
-        "product": instance.product or "",
-        "employee_id": instance.employee_id,
-    }
-    if new_status == "rejected" and instance.rejection_reason:
-        details["rejection_reason"] = instance.rejection_reason
 
-    AuditLog.objects.create(
-        action=action,
-        actor=actor,
-        target_model="Sale",
-        target_id=instance.pk,
-        summary=summary,
-        details=details,
+@receiver(post_save, sender=Sale)
+def _audit_log_sale_status_change(sender, instance, created, **kwargs):
+    if created:
+        return  # only log actual transitions
+    fields = status_audit_fields(
+        sale_id=instance.pk,
+        client_name=instance.client.name if instance.client_id else None,
+        old_status=getattr(instance, "_audit_old_status", None),
+        new_status=instance.status,
+        amount=instance.amount,
+        product=instance.product,
+        employee_id=instance.employee_id,
+        rejection_reason=instance.rejection_reason,
+        actor=getattr(instance, "_audit_actor", None),
     )
+    if fields:
+        sale_effects.audit(**fields)
 
 
 @receiver(post_delete, sender=Sale)
 def _audit_log_sale_delete(sender, instance, **kwargs):
     actor = getattr(instance, "_audit_actor", None)
-    AuditLog.objects.create(
+    sale_effects.audit(
         action=AuditLog.ACTION_SALE_DELETED,
         actor=actor,
         target_model="Sale",
@@ -213,3 +184,268 @@ def _audit_log_client_delete(sender, instance, **kwargs):
             archive_client_folder(instance.drive_folder_id, instance.name, instance.pk)
         except Exception:
             pass  # Drive lifecycle should never block a CRM deletion
+
+
+# ---------------------------------------------------------------------------
+# Incentive rule book invalidation
+# ---------------------------------------------------------------------------
+from django.db import transaction
+
+from .models import Campaign, CampaignProduct, CampaignSlab, IncentiveRule, IncentiveSlab
+from .services import incentive_rules
+
+_RULEBOOK_SENDERS = (IncentiveRule, IncentiveSlab, Campaign, CampaignProduct, CampaignSlab, Product)
+
+
+def _invalidate_rulebook(sender, **kwargs):
+    # Drop our copy now so the rest of this transaction sees the edit; other
+    # processes only learn about it once the change is committed.
+    incentive_rules.drop_local()
+    transaction.on_commit(incentive_rules.bump_version)
+
+
+for _model in _RULEBOOK_SENDERS:
+    post_save.connect(_invalidate_rulebook, sender=_model, dispatch_uid=f"rulebook_save_{_model.__name__}")
+    post_delete.connect(_invalidate_rulebook, sender=_model, dispatch_uid=f"rulebook_delete_{_model.__name__}")
+
+
+# ---------------------------------------------------------------------------
+# Compiled margin slab index (services.margin_slabs)
+# ---------------------------------------------------------------------------
+from .models import ProductMarginSlab
+from .services import margin_slabs
+
+
+def _invalidate_margin_slabs(sender, **kwargs):
+    margin_slabs.drop_local()
+    transaction.on_commit(margin_slabs.bump_version)
+
+
+for _model in (ProductMarginSlab, Product):
+    post_save.connect(_invalidate_margin_slabs, sender=_model, dispatch_uid=f"margin_slabs_save_{_model.__name__}")
+    post_delete.connect(_invalidate_margin_slabs, sender=_model, dispatch_uid=f"margin_slabs_delete_{_model.__name__}")
+
+
+# ---------------------------------------------------------------------------
+# Running slab-window totals (EmployeeProductPeriodTotal)
+# ---------------------------------------------------------------------------
+from .services import period_totals
+
+
+@receiver(post_delete, sender=Sale)
+def _period_totals_discard_sale(sender, instance, **kwargs):
+    period_totals.discard(instance)
+
+
+@receiver([post_save, post_delete], sender=Campaign)
+@receiver([post_save, post_delete], sender=CampaignProduct)
+def _period_totals_rebuild_campaign(sender, instance, **kwargs):
+    # Window dates / products decide which sales count toward the campaign
+    # rows; rebuild once the edit (and the rule book bump) is committed.
+    campaign_id = instance.pk if sender is Campaign else instance.campaign_id
+    transaction.on_commit(lambda: period_totals.rebuild_campaign(campaign_id))
+
+
+# ---------------------------------------------------------------------------
+# Cached admin recipient list (services.notifications)
+# ---------------------------------------------------------------------------
+from django.contrib.auth import get_user_model
+
+from .services import notifications
+
+
+def _invalidate_admin_recipients(sender, instance, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return  # logins don't change who is an admin
+    transaction.on_commit(notifications.invalidate_admins)
+
+
+for _model in (get_user_model(), Employee):
+    post_save.connect(_invalidate_admin_recipients, sender=_model, dispatch_uid=f"admins_save_{_model.__name__}")
+    post_delete.connect(_invalidate_admin_recipients, sender=_model, dispatch_uid=f"admins_delete_{_model.__name__}")
+
+
+# ---------------------------------------------------------------------------
+# Retroactive points recompute after incentive edits (services.recompute_planner)
+# ---------------------------------------------------------------------------
+from django.db.models import F
+
+from .services import recompute_planner
+
+_scope = recompute_planner.scope
+
+
+def _hull(*days):
+    days = [d for d in days if d]
+    return (min(days), max(days)) if days else (None, None)
+
+
+def _campaign_product_scopes(rows, old_window=None):
+    scopes = []
+    for row in rows:
+        start, end = _hull(row.get("start_date"), row.get("end_date"), *(old_window or ()))
+        scopes.append(_scope(row["product_ref_id"], row.get("product_ref__name"), start, end))
+    return scopes
+
+
+@receiver(pre_save, sender=IncentiveRule)
+@receiver(pre_save, sender=Campaign)
+@receiver(pre_save, sender=CampaignProduct)
+def _capture_previous_incentive_scope(sender, instance, **kwargs):
+    instance._recompute_old = None
+    if not instance.pk:
+        return
+    fields = {
+        IncentiveRule: ("product_ref_id", "product"),
+        Campaign: ("start_date", "end_date"),
+        CampaignProduct: ("product_ref_id", "product_ref__name", "campaign_id"),
+    }[sender]
+    instance._recompute_old = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver([post_save, post_delete], sender=IncentiveRule)
+def _recompute_after_rule_change(sender, instance, **kwargs):
+    scopes = [_scope(instance.product_ref_id, instance.product)]
+    old = getattr(instance, "_recompute_old", None)
+    if old and (old["product_ref_id"], old["product"]) != (instance.product_ref_id, instance.product):
+        scopes.append(_scope(old["product_ref_id"], old["product"]))
+    recompute_planner.note_change(scopes, f"rule {instance.product}")
+
+
+@receiver([post_save, post_delete], sender=IncentiveSlab)
+def _recompute_after_slab_change(sender, instance, **kwargs):
+    rule = IncentiveRule.objects.filter(pk=instance.rule_id).values("product_ref_id", "product").first()
+    if rule:
+        recompute_planner.note_change([_scope(rule["product_ref_id"], rule["product"])], f"slabs of {rule['product']}")
+
+
+@receiver(post_save, sender=Campaign)
+def _recompute_after_campaign_change(sender, instance, **kwargs):
+    old = getattr(instance, "_recompute_old", None) or {}
+    rows = instance.products.values(
+        "product_ref_id", "product_ref__name", start_date=F("campaign__start_date"), end_date=F("campaign__end_date"),
+    )
+    scopes = _campaign_product_scopes(rows, (old.get("start_date"), old.get("end_date")))
+    recompute_planner.note_change(scopes, f"campaign {instance.name}")
+
+
+@receiver([post_save, post_delete], sender=CampaignProduct)
+def _recompute_after_campaign_product_change(sender, instance, **kwargs):
+    window = Campaign.objects.filter(pk=instance.campaign_id).values("start_date", "end_date").first() or {}
+    rows = [{"product_ref_id": instance.product_ref_id, **window}]
+    old = getattr(instance, "_recompute_old", None)
+    if old and old["product_ref_id"] != instance.product_ref_id:
+        rows.append({"product_ref_id": old["product_ref_id"], "product_ref__name": old["product_ref__name"], **window})
+    recompute_planner.note_change(_campaign_product_scopes(rows), f"campaign #{instance.campaign_id} products")
+
+
+@receiver([post_save, post_delete], sender=CampaignSlab)
+def _recompute_after_campaign_slab_change(sender, instance, **kwargs):
+    rows = list(
+        CampaignProduct.objects.filter(pk=instance.campaign_product_id)
+        .values("product_ref_id", "product_ref__name", "campaign_id",
+                start_date=F("campaign__start_date"), end_date=F("campaign__end_date"))
+    )
+    if rows:
+        recompute_planner.note_change(_campaign_product_scopes(rows), f"campaign #{rows[0]['campaign_id']} slabs")
+
+
+# ---------------------------------------------------------------------------
+# Data versions for the dashboard fragment cache (services.data_versions).
+# Sales months are bumped by services.sale_rollup on every Sale write path.
+# ---------------------------------------------------------------------------
+from django.db.models.signals import m2m_changed
+from .models import Lead, LeadFollowUp, LeadSheet, LeadSheetFollowUp, LeadSheetRecord
+from .services import data_versions
+
+_DATA_VERSION_SENDERS = {
+    Target: data_versions.TARGETS,
+    Product: data_versions.PRODUCTS,
+    Employee: data_versions.EMPLOYEES,
+    get_user_model(): data_versions.EMPLOYEES,
+    Campaign: data_versions.CAMPAIGNS,
+    CampaignProduct: data_versions.CAMPAIGNS,
+    CampaignSlab: data_versions.CAMPAIGNS,
+    Lead: data_versions.LEADS,
+    LeadFollowUp: data_versions.LEADS,
+    LeadSheet: data_versions.LEADS,
+    LeadSheetRecord: data_versions.LEADS,
+    LeadSheetFollowUp: data_versions.LEADS,
+}
+
+
+def _bump_data_version(sender, instance, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return  # logins change nothing a dashboard shows
+    data_versions.bump(_DATA_VERSION_SENDERS[sender])
+
+
+for _model in _DATA_VERSION_SENDERS:
+    post_save.connect(_bump_data_version, sender=_model, dispatch_uid=f"data_version_save_{_model.__name__}")
+    post_delete.connect(_bump_data_version, sender=_model, dispatch_uid=f"data_version_delete_{_model.__name__}")
+
+
+def _bump_sheet_sharing(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        data_versions.bump(data_versions.LEADS)
+
+
+m2m_changed.connect(_bump_sheet_sharing, sender=LeadSheet.shared_with.through, dispatch_uid="data_version_sheet_sharing")
+
+
+# ---------------------------------------------------------------------------
+# Singleton config models (services.singletons)
+# ---------------------------------------------------------------------------
+from .models import FirmSettings, ManagerAccessConfig, MFProjectionSettings
+from .services import singletons
+
+
+def _invalidate_singleton(sender, **kwargs):
+    singletons.invalidate(sender)
+
+
+for _model in (FirmSettings, ManagerAccessConfig, MFProjectionSettings):
+    post_save.connect(_invalidate_singleton, sender=_model, dispatch_uid=f"singleton_save_{_model.__name__}")
+    post_delete.connect(_invalidate_singleton, sender=_model, dispatch_uid=f"singleton_delete_{_model.__name__}")
+
+
+# ---------------------------------------------------------------------------
+# Monthly expense ledger (services.expense_ledger); deletes cascade. Both
+# drop the frozen snapshots of the closed months they touch.
+# ---------------------------------------------------------------------------
+from .models import Expense
+from .services import closed_periods, expense_ledger
+
+
+@receiver(post_save, sender=Expense, dispatch_uid="expense_ledger_sync")
+def _sync_expense_ledger(sender, instance, **kwargs):
+    closed_periods.invalidate(*expense_ledger.sync(instance))
+
+
+@receiver(post_delete, sender=Expense, dispatch_uid="expense_closed_periods")
+def _expense_deleted(sender, instance, **kwargs):
+    closed_periods.invalidate(*expense_ledger.months_of(instance))
+
+
+# ---------------------------------------------------------------------------
+# Frozen closed-month reports (services.closed_periods): a renewal moving
+# premium into or out of a closed month drops that month's snapshots.
+# Sales invalidate through services.sale_rollup, expenses through the
+# ledger receivers above.
+# ---------------------------------------------------------------------------
+from .models import Renewal
+
+
+@receiver(pre_save, sender=Renewal, dispatch_uid="closed_periods_renewal_previous")
+def _capture_renewal_month(sender, instance, **kwargs):
+    instance._collected_on_old = (
+        Renewal.objects.filter(pk=instance.pk).values_list("premium_collected_on", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver([post_save, post_delete], sender=Renewal, dispatch_uid="closed_periods_renewal")
+def _invalidate_renewal_months(sender, instance, **kwargs):
+    closed_periods.invalidate(instance.premium_collected_on, getattr(instance, "_collected_on_old", None))
@@ -0,0 +1,65 @@
+"""Shared fixtures for tests that write sales.
+
+    class MyTests(SalesTestCase):
+        def test_points(self):
+            sale = self.sale(self.sip, 5000, date(2026, 1, 5))
+
+`SalesTestCase` creates the usual cast once per class — an admin (superuser
+with an admin Employee row), an employee, a client and the seeded SIP / life
+insurance products — and clears the process-wide caches before every test,
+since they outlive each test's rolled-back transaction. `sale()` creates a
+sale and runs its on-commit work (rollups, ledger, notifications) unless
+told not to.
+"""
+from contextlib import nullcontext
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from clients.models import Client, Employee, Product, Sale
+from clients.services import incentive_rules, margin_slabs, notifications, process_cache, profiler, singletons
+
+
+def reset_process_caches():
+    """Drop everything a previous test may have left in the default cache or in module globals."""
+    cache.clear()
+    process_cache.forget_stamps()
+    incentive_rules.invalidate()
+    margin_slabs.invalidate()
+    notifications.invalidate_admins()
+    singletons.clear()
+    profiler._windows.clear()
+
+
+class SalesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="sales_admin", password="pass")
+        Employee.objects.create(user=cls.admin, role="admin")
+        cls.employee = Employee.objects.create(
+            user=User.objects.create_user(username="sales_emp", password="pass"), role="employee",
+        )
+        cls.customer = Client.objects.create(name="Sales Client")
+        cls.sip = Product.objects.get(code="SIP")
+        cls.life = Product.objects.get(code="LIFE_INS")
+
+    def setUp(self):
+        super().setUp()
+        reset_process_caches()
+        self.addCleanup(singletons.clear)
+
+    def sale(self, product=None, amount=5000, day=date(2026, 1, 5), *, name=None, employee=None, client=None,
+             commit=True, **fields):
+        """Create one sale (SIP unless `product` or a free-text `name` is given).
+
+        `commit=False` leaves its on-commit callbacks queued for the caller.
+        """
+        if product is None and name is None:
+            product = self.sip
+        with self.captureOnCommitCallbacks(execute=True) if commit else nullcontext():
+            return Sale.objects.create(
+                client=client or self.customer, employee=employee or self.employee,
+                product=name or product.name, product_ref=product, amount=amount, date=day, **fields,
+            )
@@ -0,0 +1,30 @@
+"""Query budgets for views, for use in tests.
+
+    class MyTests(QueryBudgetMixin, TestCase):
+        def test_budget(self):
+            self.assertQueryBudget(reverse("clients:all_clients"), max_queries=20, max_repeats=2)
+
+`max_queries` caps the total; `max_repeats` caps how often any one
+statement (by profiler fingerprint) may run, which is how an N+1 shows up.
+The failure message lists the most repeated statements.
+"""
+from clients.services import profiler
+
+
+class QueryBudgetMixin:
+    def assertQueryBudget(self, url, max_queries, max_repeats=None, client=None, status=200):
+        with profiler.Probe(url) as probe:
+            response = (client or self.client).get(url)
+        self.assertEqual(response.status_code, status)
+
+        repeats = probe.duplicates()
+        over_total = probe.queries > max_queries
+        over_repeats = max_repeats is not None and any(n > max_repeats for n in repeats.values())
+        if over_total or over_repeats:
+            worst = "\n".join(f"  x{n} {sql[:200]}" for sql, n in list(repeats.items())[:5])
+            self.fail(
+                f"{url} ran {probe.queries} queries (budget {max_queries}"
+                f"{'' if max_repeats is None else f', at most {max_repeats} repeats each'})"
+                f"{':' if worst else '.'}\n{worst}"
+            )
+        return response, probe
@@ -0,0 +1,79 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.urls import reverse
+
+from clients.models import AuditLog, IncentiveRule, PointsLedgerEntry, Sale
+from clients.services import approvals
+from clients.test.base import SalesTestCase
+
+
+class ApprovalWorkbenchTests(SalesTestCase):
+    """Bulk approve/reject is one UPDATE plus bulk audit rows, with no re-scoring."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.rule = IncentiveRule.objects.create(
+            product=cls.sip.name, product_ref=cls.sip, unit_amount=1000, points_per_unit=2,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def test_bulk_approve_updates_status_only(self):
+        sales = [self.sale(day=date(2026, 1, d)) for d in (3, 4, 5)]
+        # A rule change after the fact must not leak into approvals.
+        self.rule.points_per_unit = 9
+        self.rule.save()
+
+        page = self.client.get(reverse("clients:approve_sales"))
+        self.assertContains(page, f'name="sale_ids" value="{sales[0].pk}"', count=2)  # table + card
+        self.assertEqual([row["pending"] for row in page.context["employee_counts"]], [3])
+
+        resp = self.client.post(reverse("clients:approve_sales"), {
+            "action": "approve", "sale_ids": [sales[0].pk, sales[1].pk],
+        })
+        self.assertEqual(resp.status_code, 302)
+
+        statuses = dict(Sale.objects.values_list("id", "status"))
+        self.assertEqual(statuses[sales[0].pk], Sale.STATUS_APPROVED)
+        self.assertEqual(statuses[sales[1].pk], Sale.STATUS_APPROVED)
+        self.assertEqual(statuses[sales[2].pk], Sale.STATUS_PENDING)
+        self.assertEqual(set(Sale.objects.values_list("points", flat=True)), {Decimal("10.000")})
+        logged = AuditLog.objects.filter(action=AuditLog.ACTION_SALE_APPROVED)
+        self.assertEqual(set(logged.values_list("target_id", flat=True)), {sales[0].pk, sales[1].pk})
+        self.assertTrue(all(entry.actor_id == self.admin.pk for entry in logged))
+
+    def test_decide_query_count_is_flat(self):
+        sales = [self.sale(day=date(2026, 1, d)) for d in range(1, 21)]
+        # savepoint, lock+read, update, audit insert, ledger insert,
+        # rollup create/lock/update + drop of the emptied pending rows,
+        # January's closed-period generation bump (create + update) and
+        # snapshot drop, release
+        with self.assertNumQueries(13):
+            changed = approvals.decide([s.pk for s in sales], Sale.STATUS_REJECTED, actor=self.admin, reason="dup")
+        self.assertEqual(changed, 20)
+        reversed_points = PointsLedgerEntry.objects.filter(kind=PointsLedgerEntry.KIND_REVERSAL).aggregate(t=Sum("points"))["t"]
+        self.assertEqual(reversed_points, Decimal("-200"))
+        # Already decided sales are skipped on a second pass.
+        self.assertEqual(approvals.decide([s.pk for s in sales], Sale.STATUS_APPROVED, actor=self.admin), 0)
+
+    def test_keyset_pages_cover_queue_once(self):
+        for d in (1, 2, 2, 3, 4):
+            self.sale(day=date(2026, 2, d))
+        qs = Sale.objects.filter(status=Sale.STATUS_PENDING)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor, counts = approvals.pending_queue(qs, cursor, page_size=2)
+            seen.extend(s.pk for s in page)
+            if not cursor:
+                break
+
+        self.assertEqual(seen, list(qs.order_by("-date", "-id").values_list("id", flat=True)))
+        self.assertEqual(counts, [{
+            "employee_id": self.employee.pk, "username": self.employee.user.username, "full_name": "", "pending": 5,
+        }])
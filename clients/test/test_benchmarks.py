@@ -0,0 +1,40 @@
+import json
+import os
+import tempfile
+
+from django.test import TestCase
+
+from clients.models import LeadSheetRecord, Sale, SaleDailyRollup
+from clients.services import bench_data, benchmarks, singletons
+from clients.test.base import reset_process_caches
+
+
+class BenchmarkSuiteTests(TestCase):
+    """The generator is reproducible and the suite writes comparable JSON."""
+
+    def setUp(self):
+        reset_process_caches()
+        self.addCleanup(singletons.clear)
+
+    def test_generate_and_run(self):
+        volumes = bench_data.Volumes(scale=0.01)
+        data = bench_data.generate(volumes, seed=7)
+        self.assertEqual(Sale.objects.count(), volumes.sales)
+        self.assertEqual(LeadSheetRecord.objects.count(), volumes.sheets * volumes.records_per_sheet)
+        self.assertTrue(SaleDailyRollup.objects.exists())  # derived tables rebuilt
+
+        results = benchmarks.run(data, repeat=1, only=["admin_dashboard", "lead_sheet_detail", "mf_engine.build_dashboard"])
+        self.assertEqual(set(results), {"admin_dashboard", "lead_sheet_detail", "mf_engine.build_dashboard"})
+        self.assertGreater(results["admin_dashboard"]["queries"], 0)
+        self.assertGreater(results["lead_sheet_detail"]["bytes"], 0)
+
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        benchmarks.write(path, results, volumes, seed=7, repeat=1)
+        with open(path, encoding="utf-8") as fh:
+            saved = json.load(fh)
+        self.assertEqual(saved["meta"]["volumes"]["sales"], volumes.sales)
+        rows = benchmarks.compare(saved, results)
+        self.assertEqual({r[0] for r in rows}, set(results))
+        self.assertTrue(all(r[3] == 0 for r in rows))
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from clients.models import Campaign, CampaignProduct, CampaignSlab, Employee, Sale
+from clients.services import campaign_challenges
+from clients.test.base import SalesTestCase
+
+
+class CampaignChallengeTests(SalesTestCase):
+    """Challenge cards and the leaderboard come from one grouped query."""
+
+    today = date(2026, 5, 10)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alice = Employee.objects.create(user=User.objects.create_user(username="alice", password="pass"), role="employee")
+        cls.bob = Employee.objects.create(user=User.objects.create_user(username="bob", password="pass"), role="employee")
+
+    def _sale(self, employee, product, amount, day, status=Sale.STATUS_APPROVED):
+        sale = self.sale(product, amount, day, employee=employee)
+        if status != Sale.STATUS_PENDING:
+            with self.captureOnCommitCallbacks(execute=True):
+                sale.status = status
+                sale.save()
+        return sale
+
+    def _unit_campaign(self, name, product, start, end):
+        camp = Campaign.objects.create(name=name, start_date=start, end_date=end)
+        CampaignProduct.objects.create(campaign=camp, product_ref=product, unit_amount=1000, points_per_unit=5)
+        return camp
+
+    def test_cards_match_window_and_status(self):
+        camp = Campaign.objects.create(name="May target", start_date=date(2026, 5, 1), end_date=date(2026, 5, 31))
+        cp = CampaignProduct.objects.create(
+            campaign=camp, product_ref=self.life, benefit_type=CampaignProduct.BENEFIT_TARGET,
+        )
+        CampaignSlab.objects.create(campaign_product=cp, threshold=10000, payout=300)
+        CampaignSlab.objects.create(campaign_product=cp, threshold=50000, payout=2000)
+        self._sale(self.alice, self.life, 12000, date(2026, 5, 2))
+        self._sale(self.alice, self.life, 9000, date(2026, 5, 3), status=Sale.STATUS_PENDING)
+        self._sale(self.alice, self.life, 40000, date(2026, 4, 30))  # before the window
+
+        [card] = campaign_challenges.challenges_for(self.alice, self.today)
+        self.assertEqual(card["cumulative"], Decimal("12000"))
+        self.assertEqual((card["current_payout"], card["next_threshold"]), (Decimal("300"), Decimal("50000")))
+        self.assertEqual(card["amount_to_next"], Decimal("38000"))
+        self.assertEqual(card["days_left"], 21)
+        self.assertFalse(card["top_reached"])
+
+    def test_query_count_is_constant_in_live_campaigns(self):
+        self._unit_campaign("SIP push", self.sip, date(2026, 5, 1), date(2026, 5, 20))
+        with self.assertNumQueries(5) as one:
+            campaign_challenges.challenges_for(self.alice, self.today)
+        self._unit_campaign("Life push", self.life, date(2026, 4, 20), date(2026, 5, 15))
+        self._unit_campaign("Late SIP", self.sip, date(2026, 5, 21), date(2026, 5, 31))  # not live yet
+        with self.assertNumQueries(len(one.captured_queries)):
+            cards = campaign_challenges.challenges_for(self.alice, self.today)
+        self.assertEqual([c["campaign"] for c in cards], ["Life push", "SIP push"])
+
+    def test_leaderboard_ranks_employees(self):
+        self._unit_campaign("SIP push", self.sip, date(2026, 5, 1), date(2026, 5, 20))
+        self._sale(self.alice, self.sip, 2000, date(2026, 5, 4))
+        self._sale(self.bob, self.sip, 5000, date(2026, 5, 5))
+        self._sale(self.bob, self.sip, 9000, date(2026, 5, 25))  # after the window
+
+        [board] = campaign_challenges.leaderboard(self.today)
+        self.assertEqual([(r["rank"], r["employee"]) for r in board["rows"]], [(1, "bob"), (2, "alice")])
+        self.assertEqual(board["rows"][0]["cumulative"], Decimal("5000"))
+
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse("clients:campaign_leaderboard")).status_code, 200)
+
+    def test_leaderboard_page_hides_colleagues_amounts_from_employees(self):
+        today = timezone.localdate()
+        self._unit_campaign("Live push", self.sip, today - timedelta(days=1), today + timedelta(days=1))
+        self._sale(self.alice, self.sip, 2000, today)
+        self._sale(self.bob, self.sip, 5000, today)
+
+        self.client.force_login(self.alice.user)
+        [board] = self.client.get(reverse("clients:campaign_leaderboard")).context["boards"]
+        amounts = {r["employee"]: (r["cumulative"], r["earned_points"]) for r in board["rows"]}
+        self.assertEqual(amounts, {"alice": (Decimal("2000"), Decimal("10")), "bob": (None, Decimal("25"))})
+
+        self.client.force_login(self.admin)
+        [board] = self.client.get(reverse("clients:campaign_leaderboard")).context["boards"]
+        self.assertEqual([r["cumulative"] for r in board["rows"]], [Decimal("5000"), Decimal("2000")])
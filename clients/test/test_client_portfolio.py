@@ -0,0 +1,53 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+from clients.models import Client
+from clients.test.base import SalesTestCase
+
+
+class ClientPortfolioDeltaTests(SalesTestCase):
+    """Sale writes move only their own contribution between portfolio columns."""
+
+    def _write(self, sale, delete=False):
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.delete() if delete else sale.save()
+
+    def test_create_edit_move_delete(self):
+        first = Client.objects.create(name="Portfolio One")
+        second = Client.objects.create(name="Portfolio Two")
+
+        sip = self.sale(self.sip, 5000, client=first)
+        self.sale(self.life, 20000, client=first, cover_amount=1000000)
+        first.refresh_from_db()
+        self.assertEqual((first.sip_amount, first.sip_status), (Decimal("5000"), True))
+        self.assertEqual((first.life_cover, first.life_status), (Decimal("1000000"), True))
+        self.assertIsNone(first.edited_at)  # portfolio upkeep is not a user edit
+
+        sip.amount = 7000
+        self._write(sip)
+        first.refresh_from_db()
+        self.assertEqual(first.sip_amount, Decimal("7000"))
+
+        sip.client = second
+        self._write(sip)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.sip_amount, first.sip_status), (Decimal("0"), False))
+        self.assertEqual((second.sip_amount, second.sip_status), (Decimal("7000"), True))
+
+        self._write(sip, delete=True)
+        second.refresh_from_db()
+        self.assertEqual((second.sip_amount, second.sip_status), (Decimal("0"), False))
+
+    def test_rebuild_repairs_drift(self):
+        customer = Client.objects.create(name="Portfolio Drift")
+        self.sale(self.sip, 5000, client=customer)
+        self.sale(self.sip, 2500, client=customer)
+        Client.objects.filter(pk=customer.pk).update(sip_amount=1, sip_status=False)
+
+        call_command("rebuild_client_portfolios", stdout=StringIO())
+
+        customer.refresh_from_db()
+        self.assertEqual((customer.sip_amount, customer.sip_status), (Decimal("7500"), True))
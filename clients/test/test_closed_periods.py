@@ -0,0 +1,81 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clients.models import ClosedPeriodSnapshot, Expense, ExpenseCategory, Renewal, Sale
+from clients.services import closed_periods
+from clients.test.base import SalesTestCase
+
+MAY = date(2026, 5, 1)
+
+
+class ClosedPeriodSnapshotTests(SalesTestCase):
+    """Closed months are served from frozen payloads until a back-dated write lands in them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.rent, _ = ExpenseCategory.objects.get_or_create(name="Rent")
+
+    def _sale(self, amount, day):
+        self.sale(self.sip, amount, day, status=Sale.STATUS_APPROVED)
+
+    def _may(self):
+        return closed_periods.business_months([(2026, 5)])[(2026, 5)]
+
+    def test_frozen_payloads_round_trip_and_are_served_from_one_row(self):
+        self._sale(40000, date(2026, 5, 3))
+        Expense.objects.create(category=self.rent, amount=Decimal("15000"), spent_on=date(2026, 5, 1))
+
+        built = self._may()
+        totals = closed_periods.monthly_business_totals(MAY)
+        performance = closed_periods.month_performance(MAY)
+        self.assertEqual(ClosedPeriodSnapshot.objects.filter(month=MAY).count(), 3)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(self._may(), built)
+            self.assertEqual(closed_periods.monthly_business_totals(MAY), totals)
+            self.assertEqual(closed_periods.month_performance(MAY), performance)
+        self.assertEqual(built["totals"]["revenue"], Decimal("40000"))
+        self.assertEqual(built["expense_total"], Decimal("15000.00"))
+        self.assertEqual(totals[1][(self.employee.pk, self.sip.name)], Decimal("40000.00"))
+
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("clients:admin_past_month_performance", args=[2026, 5]))
+        self.assertEqual(resp.context["products"], performance["products"])
+        self.assertFalse([q for q in ctx.captured_queries if "clients_saledailyrollup" in q["sql"]])
+
+    def test_back_dated_writes_drop_the_month(self):
+        self._may()
+        self._sale(40000, date(2026, 5, 20))
+        self.assertFalse(ClosedPeriodSnapshot.objects.filter(month=MAY).exists())
+        self.assertEqual(self._may()["totals"]["revenue"], Decimal("40000"))
+
+        renewal = Renewal.objects.create(client=self.customer, product_ref=self.life, product_type="life_insurance",
+                                         renewal_date=date(2026, 5, 1), frequency="yearly", premium_amount=20000,
+                                         premium_collected_on=date(2026, 5, 2))
+        self.assertEqual(self._may()["renewal_totals"]["revenue"], Decimal("20000"))
+        renewal.premium_collected_on = date(2026, 6, 2)
+        renewal.save()
+        self.assertEqual(self._may()["renewal_totals"]["revenue"], Decimal("0"))
+
+        expense = Expense.objects.create(category=self.rent, amount=Decimal("1000"), spent_on=date(2026, 4, 1),
+                                         expense_type=Expense.TYPE_RECURRING, end_on=date(2026, 5, 31))
+        self.assertEqual(self._may()["expense_total"], Decimal("1000.00"))
+        expense.delete()
+        self.assertEqual(self._may()["expense_total"], Decimal("0"))
+
+    def test_write_during_a_build_keeps_its_payload_out(self):
+        def build(months):
+            stale = closed_periods._business(months)
+            self._sale(40000, date(2026, 5, 20))  # lands after the build read the month
+            return stale
+
+        report = ClosedPeriodSnapshot.REPORT_BUSINESS_ANALYTICS
+        self.assertEqual(closed_periods._served(report, [MAY], build)[MAY]["totals"]["revenue"], 0)
+        self.assertFalse(ClosedPeriodSnapshot.objects.filter(month=MAY).exists())
+        self.assertEqual(self._may()["totals"]["revenue"], Decimal("40000"))
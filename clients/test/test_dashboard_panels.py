@@ -0,0 +1,68 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clients.models import Campaign, CampaignProduct
+from clients.services import data_versions
+from clients.test.base import SalesTestCase
+
+
+class DashboardPanelTests(SalesTestCase):
+    """Heavy dashboard panels load from cacheable JSON endpoints, not with the page."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.employee.user)
+
+    def _panel(self, name, **headers):
+        return self.client.get(reverse("clients:dashboard_panel", args=[name]), **headers)
+
+    def test_shell_leaves_panels_to_their_endpoints(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("clients:employee_dashboard"))
+        self.assertEqual(resp.status_code, 200)
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        for table in ("clients_campaign", "clients_leadsheet", "clients_leadfollowup"):
+            self.assertNotIn(table, sql)
+        self.assertContains(resp, reverse("clients:dashboard_panel", args=["campaigns"]))
+
+    def test_etag_revalidates_until_campaign_sales_move(self):
+        today = timezone.now().date()
+        camp = Campaign.objects.create(name="Live push", start_date=today - timedelta(days=1), end_date=today + timedelta(days=5))
+        CampaignProduct.objects.create(campaign=camp, product_ref=self.sip, unit_amount=1000, points_per_unit=5)
+
+        resp = self._panel("campaigns")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("Live push", resp.json()["html"])
+        self.assertIn("private", resp["Cache-Control"])
+        etag = resp["ETag"]
+        self.assertEqual(self._panel("campaigns", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.sale(self.sip, 2000, today)
+        resp = self._panel("campaigns", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_per_process_cache_etag_expires(self):
+        etag = self._panel("campaigns")["ETag"]
+        self.assertEqual(self._panel("campaigns", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Another worker's writes never reach this process's counters; the epoch rolls over instead.
+        later = time.time() + data_versions.LOCAL_MAX_AGE_SECONDS
+        with mock.patch("clients.services.data_versions.time.time", return_value=later):
+            self.assertEqual(self._panel("campaigns", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_panel_permissions(self):
+        self.assertEqual(self._panel("admin-company").status_code, 403)
+        self.assertEqual(self._panel("company").status_code, 403)
+        self.assertEqual(self._panel("no-such-panel").status_code, 404)
+        self.assertEqual(self._panel("lead-records").status_code, 200)
+
+        self.client.force_login(self.admin)
+        resp = self._panel("admin-followups")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("followupCalendarWidget", resp.json()["html"])
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clients.models import Client, Employee, Product, Sale, Target
+from clients.test.base import reset_process_caches
+
+PANEL = "clients:dashboard_panel"
+
+
+class AdminDashboardQueryTests(TestCase):
+    """The dashboards and their company panels pivot one grouped sales query; query counts are flat."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username="dash_admin", password="pass")
+        cls.admin_emp = Employee.objects.create(user=cls.admin, role="admin")
+        cls.customer = Client.objects.create(name="Dashboard Client")
+        cls.products = list(Product.objects.filter(code__in=["SIP", "LUMSUM", "LIFE_INS", "MOTOR_INS"]))
+
+    def setUp(self):
+        reset_process_caches()  # fragment versions outlive the rolled-back test data
+        self.client.force_login(self.admin)
+
+    def _add_team(self, size):
+        today = timezone.now().date()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(size):
+                user = User.objects.create_user(username=f"dash_emp_{size}_{i}_{User.objects.count()}", password="pass")
+                emp = Employee.objects.create(user=user, role="employee")
+                for product in self.products:
+                    for day, status in ((today, Sale.STATUS_APPROVED), (today.replace(day=1), Sale.STATUS_PENDING)):
+                        Sale.objects.create(
+                            client=self.customer, employee=emp, product=product.name, product_ref=product,
+                            amount=1000, date=day, status=status,
+                        )
+
+    def _render(self, view="clients:admin_dashboard", *args):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse(view, args=args))
+        self.assertEqual(resp.status_code, 200)
+        return resp, len(ctx.captured_queries)
+
+    def test_query_count_is_flat(self):
+        self._add_team(1)
+        self._render()  # warm per-process caches (firm settings, rule book, ...)
+        self._add_team(1)  # both measured renders follow a sales change: fragment misses
+        _, small = self._render()
+        self._add_team(5)
+        resp, large = self._render()
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 12)
+        self.assertEqual(resp.context["total_sales"], Decimal("28000"))  # 7 employees × 4 products, approved only
+
+        self._add_team(1)
+        _, small = self._render(PANEL, "admin-company")
+        self._add_team(5)
+        resp, large = self._render(PANEL, "admin-company")
+        self.assertEqual(small, large)
+        ctx = resp.context
+        sip = next(row for row in ctx["overall_daily_progress"] if row["product"] == "SIP")
+        self.assertEqual(sip["achieved"], Decimal("13000"))
+        self.assertEqual(len(ctx["monthly_employee_product"]), 14)  # 13 + the admin
+
+    def test_month_bucket_uses_sale_date(self):
+        last_month = timezone.now().date().replace(day=1) - timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Sale.objects.create(
+                client=self.customer, employee=self.admin_emp, product=self.products[0].name,
+                product_ref=self.products[0], amount=500, date=last_month, status=Sale.STATUS_APPROVED,
+            )
+        resp, _ = self._render()
+        self.assertEqual(resp.context["total_sales"], Decimal("0"))
+
+    def test_employee_dashboard_company_sections_are_flat(self):
+        self._add_team(1)
+        resp, _ = self._render("clients:employee_dashboard")
+        self.assertTrue(resp.context["show_company_sections"])
+        self._render(PANEL, "company")
+        self._add_team(1)
+        _, small = self._render(PANEL, "company")
+        self._add_team(5)
+        resp, large = self._render(PANEL, "company")
+        self.assertEqual(small, large)
+
+        ctx = resp.context
+        monthly = next(row for row in ctx["overall_monthly_progress"] if row["product"] == "SIP")
+        self.assertEqual(monthly["achieved"], Decimal("7000"))
+        row = next(r for r in ctx["monthly_employee_product"] if r["employee"].startswith("dash_emp_5_0_"))
+        achieved = {p["product"]: p["achieved"] for p in row["products"]}
+        self.assertEqual(achieved["SIP"], Decimal("1000"))  # the pending sale on the 1st is not counted
+        self.assertEqual(achieved["PMS"], 0)
+
+    def test_repeat_view_reads_fragments_until_data_changes(self):
+        self._add_team(2)
+        self._render(PANEL, "admin-company")
+        _, warm = self._render(PANEL, "admin-company")
+        self._add_team(1)
+        _, cold = self._render(PANEL, "admin-company")
+        self.assertLess(warm, cold)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Target.objects.create(product="SIP", target_type="monthly", target_value=5000)
+        resp, _ = self._render(PANEL, "admin-company")
+        sip = next(row for row in resp.context["overall_monthly_progress"] if row["product"] == "SIP")
+        self.assertEqual(sip["target"], Decimal("15000"))  # 3 employees × 5000, not the cached value
@@ -0,0 +1,67 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from clients.models import Expense, ExpenseCategory
+from clients.services import expense_ledger
+from clients.test.base import reset_process_caches
+
+
+def _scan(months):
+    """What business analytics computed before the ledger."""
+    totals = {}
+    for y, m in months:
+        for e in Expense.objects.select_related("category"):
+            if e.applies_to_month(y, m):
+                totals[e.category.name] = totals.get(e.category.name, Decimal("0")) + e.amount
+    return [{"category": k, "amount": v} for k, v in sorted(totals.items())]
+
+
+class ExpenseLedgerTests(TestCase):
+    """Period expense totals from the ledger match the per-expense month checks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rent, _ = ExpenseCategory.objects.get_or_create(name="Rent")
+        cls.power, _ = ExpenseCategory.objects.get_or_create(name="Electricity")
+
+    def setUp(self):
+        reset_process_caches()
+
+    def _expense(self, category, amount, spent_on, recurring=False, end_on=None):
+        return Expense.objects.create(
+            category=category, amount=Decimal(amount), spent_on=spent_on, end_on=end_on,
+            expense_type=Expense.TYPE_RECURRING if recurring else Expense.TYPE_ONE_TIME,
+        )
+
+    @mock.patch("clients.services.expense_ledger.timezone.localdate", return_value=date(2026, 6, 15))
+    def test_breakdown_matches_scan_and_follows_edits(self, _today):
+        fy = [(2026, m) for m in range(4, 13)] + [(2027, m) for m in range(1, 4)]
+        ongoing = self._expense(self.rent, "20000", date(2026, 5, 10), recurring=True)
+        self._expense(self.rent, "5000", date(2026, 3, 1), recurring=True, end_on=date(2026, 7, 31))
+        self._expense(self.power, "1200", date(2026, 4, 20))
+        self._expense(self.power, "900", date(2026, 11, 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rows, total = expense_ledger.breakdown(fy)  # extends the ongoing rent to March 2027
+        self.assertEqual(rows, _scan(fy))
+        self.assertEqual(total, Decimal("20000") * 11 + Decimal("5000") * 4 + Decimal("2100"))
+        with self.assertNumQueries(1):
+            self.assertEqual(expense_ledger.breakdown(fy)[0], rows)
+
+        ongoing.end_on = date(2026, 9, 1)
+        ongoing.save()
+        self.assertEqual(expense_ledger.breakdown(fy)[0], _scan(fy))
+        ongoing.delete()
+        self.assertEqual(expense_ledger.breakdown(fy)[0], _scan(fy))
+
+    def test_rebuild_matches_incremental_ledger(self):
+        self._expense(self.rent, "20000", date(2025, 1, 10), recurring=True)
+        self._expense(self.power, "1200", date(2025, 4, 20))
+        months = [(2025, m) for m in range(1, 13)]
+        before = expense_ledger.breakdown(months)
+        expense_ledger.rebuild()
+        self.assertEqual(expense_ledger.breakdown(months), before)
+        self.assertEqual(before[0], _scan(months))
@@ -0,0 +1,77 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+from clients.models import Campaign, CampaignProduct, IncentiveRule, IncentiveSlab, Sale
+from clients.services.incentive_engine import recompute_points
+from clients.test.base import SalesTestCase
+
+
+class IncentiveEngineTests(SalesTestCase):
+    """The batch engine must land on the same points as saving each sale in date order."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        life_rule = IncentiveRule.objects.create(
+            product=cls.life.name, product_ref=cls.life, unit_amount=1000, points_per_unit=1,
+        )
+        IncentiveSlab.objects.create(rule=life_rule, threshold=100000, payout=500)
+        IncentiveSlab.objects.create(rule=life_rule, threshold=200000, payout=1200)
+        IncentiveRule.objects.create(
+            product=cls.sip.name, product_ref=cls.sip, unit_amount=1000, points_per_unit=2,
+        )
+
+    def _points(self):
+        return dict(Sale.objects.values_list("id", "points"))
+
+    def test_batch_matches_sequential_saves(self):
+        self.sale(self.life, 60000, date(2026, 1, 5))
+        self.sale(self.life, 60000, date(2026, 1, 6))
+        self.sale(self.life, 90000, date(2026, 1, 7))
+        self.sale(self.life, 150000, date(2026, 2, 1))  # new month, fresh slab window
+        self.sale(self.sip, 5000, date(2026, 1, 5))
+        expected = self._points()
+        self.assertEqual(sorted(expected.values()), sorted(
+            Decimal(v) for v in ("0.000", "500.000", "700.000", "500.000", "10.000")
+        ))
+
+        Sale.objects.update(points=0, incentive_amount=0)
+        stats = recompute_points()
+
+        self.assertEqual(self._points(), expected)
+        self.assertEqual(stats["sales"], 5)
+        self.assertEqual(stats["updated"], 4)  # the zero-point sale was already right
+
+    def test_campaign_window_replaces_regular_rule(self):
+        campaign = Campaign.objects.create(
+            name="Life push", start_date=date(2026, 3, 1), end_date=date(2026, 3, 15),
+        )
+        CampaignProduct.objects.create(
+            campaign=campaign, product_ref=self.life, benefit_type=CampaignProduct.BENEFIT_UNIT,
+            unit_amount=1000, points_per_unit=3,
+        )
+        inside = self.sale(self.life, 10000, date(2026, 3, 10))
+        outside = self.sale(self.life, 120000, date(2026, 3, 20))
+        Sale.objects.update(points=0, incentive_amount=0, campaign=None)
+
+        recompute_points([self.employee.id])
+
+        inside.refresh_from_db()
+        outside.refresh_from_db()
+        self.assertEqual(inside.points, Decimal("30.000"))
+        self.assertEqual(inside.campaign_id, campaign.id)
+        # Same product-month, so the campaign sale's amount and points count toward the slab.
+        self.assertEqual(outside.points, Decimal("470.000"))
+        self.assertIsNone(outside.campaign_id)
+
+    def test_dry_run_command_writes_nothing(self):
+        sale = self.sale(self.sip, 5000, date(2026, 1, 5))
+        Sale.objects.update(points=0, incentive_amount=0)
+
+        call_command("recalc_points", "--dry-run", "--employee", self.employee.user.username, stdout=StringIO())
+
+        sale.refresh_from_db()
+        self.assertEqual(sale.points, Decimal("0.000"))
@@ -0,0 +1,77 @@
+from datetime import date
+from decimal import Decimal
+
+from clients.models import Campaign, CampaignProduct, CampaignSlab, IncentiveRule, IncentiveSlab, Sale
+from clients.services import incentive_rules
+from clients.test.base import SalesTestCase
+
+
+class IncentiveRuleBookTests(SalesTestCase):
+    """compute_points reads rules from the compiled book and only queries running totals."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.sip_rule = IncentiveRule.objects.create(
+            product=cls.sip.name, product_ref=cls.sip, unit_amount=1000, points_per_unit=2,
+        )
+        life_rule = IncentiveRule.objects.create(
+            product=cls.life.name, product_ref=cls.life, unit_amount=1000, points_per_unit=1,
+        )
+        IncentiveSlab.objects.create(rule=life_rule, threshold=100000, payout=500)
+        IncentiveSlab.objects.create(rule=life_rule, threshold=200000, payout=1200)
+
+    def _sale(self, product, amount, day=date(2026, 1, 5)):
+        """An unsaved sale, to score with compute_points()."""
+        return Sale(
+            client=self.customer, employee=self.employee, product=product.name,
+            product_ref=product, amount=amount, date=day,
+        )
+
+    def test_warm_book_needs_no_rule_queries(self):
+        incentive_rules.get_rulebook()
+
+        unit_sale = self._sale(self.sip, 5000)
+        with self.assertNumQueries(0):
+            unit_sale.compute_points()
+        self.assertEqual(unit_sale.points, Decimal("10"))
+
+        slab_sale = self._sale(self.life, 150000)
+        with self.assertNumQueries(1):  # the product-month running total
+            slab_sale.compute_points()
+        self.assertEqual(slab_sale.points, Decimal("500"))
+
+    def test_rule_edit_invalidates_book(self):
+        before = self._sale(self.sip, 5000)
+        before.save()
+        self.assertEqual(before.points, Decimal("10"))
+
+        self.sip_rule.points_per_unit = 3
+        self.sip_rule.save()
+
+        after = self._sale(self.sip, 5000)
+        after.save()
+        self.assertEqual(after.points, Decimal("15"))
+
+    def test_campaign_windows_resolve_by_date(self):
+        march = Campaign.objects.create(name="March", start_date=date(2026, 3, 1), end_date=date(2026, 3, 15))
+        april = Campaign.objects.create(name="April", start_date=date(2026, 4, 1), end_date=date(2026, 4, 30))
+        CampaignProduct.objects.create(
+            campaign=march, product_ref=self.sip, benefit_type=CampaignProduct.BENEFIT_UNIT,
+            unit_amount=1000, points_per_unit=5,
+        )
+        target = CampaignProduct.objects.create(
+            campaign=april, product_ref=self.sip, benefit_type=CampaignProduct.BENEFIT_TARGET,
+        )
+        CampaignSlab.objects.create(campaign_product=target, threshold=10000, payout=300)
+
+        in_march = self._sale(self.sip, 2000, date(2026, 3, 10))
+        between = self._sale(self.sip, 2000, date(2026, 3, 20))
+        in_april = self._sale(self.sip, 12000, date(2026, 4, 2))
+        for sale in (in_march, between, in_april):
+            sale.compute_points()
+
+        self.assertEqual((in_march.points, in_march.campaign_id), (Decimal("10"), march.id))
+        self.assertEqual((between.points, between.campaign_id), (Decimal("4"), None))
+        self.assertEqual((in_april.points, in_april.campaign_id), (Decimal("300"), april.id))
+
@@ -0,0 +1,77 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from clients.models import Campaign, CampaignProduct, Employee, Sale
+from clients.services import approvals, leaderboard
+from clients.test.base import SalesTestCase
+
+
+class LeaderboardTests(SalesTestCase):
+    """Standings rank approved sales per period and follow approvals."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.team = [
+            Employee.objects.create(user=User.objects.create_user(username=name, password="pass"), role="employee")
+            for name in ("asha", "bala", "chetan", "divya")
+        ]
+
+    def _sale(self, employee, amount, day, product=None, status=Sale.STATUS_APPROVED):
+        sale = self.sale(product, amount, day, employee=employee)
+        if status == Sale.STATUS_APPROVED:
+            with self.captureOnCommitCallbacks(execute=True):
+                approvals.decide([sale.pk], Sale.STATUS_APPROVED, actor=self.admin)
+        return sale
+
+    def test_ranks_ties_and_percentiles(self):
+        asha, bala, chetan, divya = self.team
+        day = date(2026, 6, 10)
+        self._sale(asha, 1000, day)
+        self._sale(bala, 3000, day)
+        self._sale(chetan, 1000, day)
+        self._sale(divya, 9000, day, status=Sale.STATUS_PENDING)  # not ranked until approved
+
+        board = leaderboard.standings(leaderboard.month(day), "amount")
+        self.assertEqual([(r["rank"], r["name"]) for r in board.top()], [(1, "bala"), (2, "asha"), (2, "chetan")])
+        self.assertEqual(board.rank_of(chetan.pk), 2)
+        self.assertIsNone(board.rank_of(divya.pk))
+        self.assertEqual(board.percentile(bala.pk), 100)
+        with self.assertNumQueries(0):
+            leaderboard.standings(leaderboard.month(day), "amount").rank_of(asha.pk)
+
+        pending = Sale.objects.get(employee=divya)
+        with self.captureOnCommitCallbacks(execute=True):
+            approvals.decide([pending.pk], Sale.STATUS_APPROVED, actor=self.admin)
+        board = leaderboard.standings(leaderboard.month(day), "amount")
+        self.assertEqual(board.top(1)[0]["name"], "divya")
+        self.assertEqual(len(board), 4)
+
+    def test_periods_bound_dates_and_products(self):
+        asha, bala = self.team[:2]
+        self._sale(asha, 1000, date(2026, 3, 31))  # FY 2025-26
+        self._sale(bala, 2000, date(2026, 4, 1), product=self.life)  # FY 2026-27
+        self._sale(asha, 500, date(2026, 4, 2))
+
+        fy = leaderboard.standings(leaderboard.fy(date(2026, 10, 1)), "amount")
+        self.assertEqual([(r["name"], r["amount"]) for r in fy.top()], [("bala", 2000), ("asha", 500)])
+
+        camp = Campaign.objects.create(name="SIP April", start_date=date(2026, 4, 1), end_date=date(2026, 4, 30))
+        CampaignProduct.objects.create(campaign=camp, product_ref=self.sip, unit_amount=1000, points_per_unit=5)
+        camp = Campaign.objects.prefetch_related("products").get(pk=camp.pk)
+        board = leaderboard.standings(leaderboard.campaign(camp), "amount")
+        self.assertEqual([r["name"] for r in board.top()], ["asha"])
+
+    def test_tv_page_renders(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("clients:leaderboard_tv"), {"metric": "amount"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([b["title"] for b in resp.context["boards"]][:3], ["Today", "This Month", "Financial Year"])
+        self.assertEqual(resp.context["metric"], "amount")
+
+        self.client.force_login(self.employee.user)
+        resp = self.client.get(reverse("clients:leaderboard_tv"), {"metric": "amount"})
+        self.assertEqual((resp.context["metric"], resp.context["other_metric"]), ("points", None))
+        self.assertNotContains(resp, "₹")
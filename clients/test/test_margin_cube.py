@@ -0,0 +1,80 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clients.models import Product, ProductMarginSlab, Renewal, Sale
+from clients.services import margin_cube, margin_slabs
+from clients.test.base import SalesTestCase
+
+
+class MarginCubeTests(SalesTestCase):
+    """One FY of margins from a handful of grouped queries, slabs resolved in memory."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.health = Product.objects.get(code="HEALTH_INS")
+        ProductMarginSlab.objects.create(product=cls.health, policy_type="fresh", min_amount=0, max_amount=100000, margin_percent=Decimal("10"))
+        ProductMarginSlab.objects.create(product=cls.health, policy_type="fresh", min_amount=100000, margin_percent=Decimal("20"))
+        Product.objects.filter(pk=cls.sip.pk).update(margin_percent=Decimal("1.50"))
+        Product.objects.filter(pk=cls.life.pk).update(renewal_margin_percent=Decimal("5.00"))
+
+    def _sale(self, amount, day, product=None, policy_type="", name=None):
+        self.sale(product, amount, day, name=name, policy_type=policy_type, status=Sale.STATUS_APPROVED)
+
+    def test_breakdowns_match_per_month_rules(self):
+        self._sale(60000, date(2026, 5, 3), self.health, "fresh")
+        self._sale(60000, date(2026, 5, 9), self.health, "fresh")  # cumulative 120000 → 20% slab
+        self._sale(30000, date(2026, 5, 9), self.health, "port")
+        self._sale(10000, date(2026, 5, 9), self.sip)
+        self._sale(5000, date(2026, 5, 9), name="Legacy product")
+        self._sale(40000, date(2026, 6, 1), self.health, "fresh")
+        Renewal.objects.create(client=self.customer, product_ref=self.life, product_type="life_insurance",
+                               renewal_date=date(2026, 5, 1), frequency="yearly", premium_amount=20000,
+                               premium_collected_on=date(2026, 5, 2))
+        Renewal.objects.create(client=self.customer, product_type="other", product_name="Misc",
+                               renewal_date=date(2026, 5, 1), frequency="yearly", premium_amount=1000,
+                               premium_collected_on=date(2026, 5, 2))
+
+        with self.assertNumQueries(4):
+            cube = margin_cube.build([(2026, 5), (2026, 6)])
+            rows, totals = cube.sales(2026, 5)
+            june, _ = cube.sales(2026, 6)
+            renewals, renewal_totals = cube.renewals(2026, 5)
+
+        by_key = {(r["product"], r["policy"]): r for r in rows}
+        self.assertEqual(by_key[(self.health.name, "Fresh")]["margin_percent"], Decimal("20"))
+        self.assertEqual(by_key[(self.health.name, "Fresh")]["margin_amount"], Decimal("24000.00"))
+        self.assertEqual(by_key[(self.health.name, "Port")]["margin_percent"], self.health.margin_percent)
+        self.assertEqual(by_key[(self.sip.name, "")]["margin_amount"], Decimal("150.00"))
+        self.assertEqual(by_key[("Other / Unmapped", "")]["margin_amount"], Decimal("0.00"))
+        self.assertEqual(totals["revenue"], Decimal("165000"))
+        self.assertEqual([r["margin_percent"] for r in june], [Decimal("10")])
+
+        self.assertEqual([r["product"] for r in renewals], [self.life.name, "Other / Unmapped (Renewal)"])
+        self.assertEqual(renewal_totals["margin_amount"], Decimal("1000.00"))
+
+    def test_annual_view_query_count_is_flat(self):
+        self.client.force_login(self.admin)
+        url = reverse("clients:business_analytics")
+
+        def render():
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(url, {"view": "annual", "fy": 2026})
+            self.assertEqual(resp.status_code, 200)
+            return resp, len(ctx.captured_queries)
+
+        render()  # warm per-process caches
+        margin_slabs.get_index()  # an empty year resolves no margins
+        _, empty = render()
+        for month in (4, 7, 10, 1):
+            day = date(2027 if month < 4 else 2026, month, 5)
+            self._sale(50000, day, self.health, "fresh")
+            self._sale(50000, day, self.sip)
+        render()  # re-freeze the closed months the sales landed in
+        resp, busy = render()
+        self.assertEqual(empty + 1, busy)  # + the per-request stamp read once margins are resolved
+        self.assertEqual(resp.context["fy_totals"]["revenue"], Decimal("400000"))
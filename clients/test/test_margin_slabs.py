@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from clients.models import Product, ProductMarginSlab
+from clients.test.base import reset_process_caches
+
+
+def _linear_margin(product, amount, policy_type=""):
+    """The per-call scan `Product.margin_for` used to run."""
+    pt = (policy_type or "").strip() if product.is_health else ""
+    for slab in product.margin_slabs.filter(policy_type=pt):
+        if amount < slab.min_amount or (slab.max_amount is not None and amount > slab.max_amount):
+            continue
+        return slab.margin_percent
+    return product.margin_percent
+
+
+class MarginSlabIndexTests(TestCase):
+    """Compiled slab lookups answer like the linear scan, without queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.health = Product.objects.get(code="HEALTH_INS")
+        # Gap below 10000, overlap between 50000 and 80000, gap above 200000.
+        for lo, hi, pct in [(10000, 80000, "8"), (50000, 120000, "12"), (120000, 200000, "15")]:
+            ProductMarginSlab.objects.create(product=cls.health, policy_type="fresh", min_amount=lo,
+                                             max_amount=hi, margin_percent=Decimal(pct))
+        ProductMarginSlab.objects.create(product=cls.health, policy_type="port", min_amount=0, margin_percent=Decimal("4"))
+
+    def setUp(self):
+        reset_process_caches()
+
+    def test_matches_linear_scan_with_zero_queries(self):
+        amounts = [Decimal(a) for a in (0, 9999, 10000, 50000, "80000", "80000.01", 119999, 120000, 200000, "200000.5", 10**7)]
+        for pt in ("fresh", "port", ""):
+            expected = [_linear_margin(self.health, a, pt) for a in amounts]
+            self.health.margin_for(0, pt)  # warm the process index
+            with self.assertNumQueries(0):
+                self.assertEqual([self.health.margin_for(a, pt) for a in amounts], expected)
+                self.assertEqual(self.health.margin_for_many(amounts, pt), expected)
+
+    def test_slab_edits_rebuild_the_index(self):
+        self.assertEqual(self.health.margin_for(300000, "fresh"), self.health.margin_percent)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductMarginSlab.objects.create(product=self.health, policy_type="fresh", min_amount=200000,
+                                             margin_percent=Decimal("18"))
+        self.assertEqual(self.health.margin_for(300000, "fresh"), Decimal("18"))
@@ -0,0 +1,44 @@
+from django.test import override_settings
+
+from clients.models import Notification
+from clients.services import notifications, sale_effects
+from clients.test.base import SalesTestCase
+
+
+class NotificationDispatchTests(SalesTestCase):
+    """Admin recipients are cached, and sale alerts fold into digests."""
+
+    def _sales(self, count):
+        with sale_effects.suppressed():
+            return [self.sale(amount=1000 + i, commit=False) for i in range(count)]
+
+    def test_recipients_cached_until_role_change(self):
+        self.assertEqual(notifications.admin_recipient_ids(), [self.admin.pk])
+        with self.assertNumQueries(0):
+            notifications.admin_recipient_ids()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.role = "admin"
+            self.employee.save()
+        self.assertEqual(notifications.admin_recipient_ids(), sorted([self.admin.pk, self.employee.user_id]))
+
+    @override_settings(SALE_NOTIFICATION_DIGEST_BATCH=3)
+    def test_large_batch_becomes_one_digest(self):
+        sales = self._sales(5)
+        with self.assertNumQueries(2):  # admin ids, one insert
+            notifications.notify_new_sales(sales)
+        note = Notification.objects.get(recipient=self.admin)
+        self.assertEqual((note.group_key, note.event_count), (notifications.SALE_DIGEST_KEY, 5))
+        self.assertTrue(note.body.startswith("5 new sales recorded."))
+
+    @override_settings(SALE_NOTIFICATION_DIGEST_MINUTES=30)
+    def test_window_folds_into_unread_digest(self):
+        sales = self._sales(3)
+        notifications.notify_new_sales(sales[:1])
+        notifications.notify_new_sales(sales[1:])
+        note = Notification.objects.get(recipient=self.admin)
+        self.assertEqual(note.event_count, 3)
+
+        Notification.objects.update(is_read=True)
+        notifications.notify_new_sales(sales[:1])
+        self.assertEqual(Notification.objects.filter(recipient=self.admin).count(), 2)
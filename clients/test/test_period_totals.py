@@ -0,0 +1,58 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+from clients.models import EmployeeProductPeriodTotal, IncentiveRule, IncentiveSlab
+from clients.test.base import SalesTestCase
+
+
+class PeriodTotalsTests(SalesTestCase):
+    """Running slab-window totals follow every sale write and match a full rebuild."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        rule = IncentiveRule.objects.create(
+            product=cls.life.name, product_ref=cls.life, unit_amount=1000, points_per_unit=1,
+        )
+        IncentiveSlab.objects.create(rule=rule, threshold=100000, payout=500)
+        IncentiveSlab.objects.create(rule=rule, threshold=200000, payout=1200)
+
+    def _totals(self):
+        return {
+            row.period_key: (row.total_amount, row.total_points)
+            for row in EmployeeProductPeriodTotal.objects.filter(employee=self.employee)
+        }
+
+    def test_create_edit_delete_keep_totals_current(self):
+        first = self.sale(self.life, 60000, date(2026, 1, 5))
+        second = self.sale(self.life, 60000, date(2026, 1, 6))
+        self.assertEqual(second.points, Decimal("500"))
+        self.assertEqual(self._totals(), {"2026-01": (Decimal("120000"), Decimal("500"))})
+
+        # Moving a sale to the next month takes it out of January's window.
+        first.date = date(2026, 2, 1)
+        first.save()
+        self.assertEqual(self._totals()["2026-01"], (Decimal("60000"), Decimal("500")))
+        self.assertEqual(self._totals()["2026-02"], (Decimal("60000"), Decimal("0")))
+
+        # Re-scoring an edited sale only counts the *other* sales in its window.
+        second.amount = 210000
+        second.save()
+        self.assertEqual(second.points, Decimal("1200"))
+
+        second.delete()
+        self.assertEqual(self._totals()["2026-01"], (Decimal("0"), Decimal("0")))
+
+    def test_rebuild_matches_incremental_rows(self):
+        self.sale(self.life, 60000, date(2026, 1, 5))
+        self.sale(self.life, 90000, date(2026, 1, 6))
+        self.sale(self.life, 30000, date(2026, 2, 2))
+        incremental = self._totals()
+
+        EmployeeProductPeriodTotal.objects.all().delete()
+        call_command("rebuild_period_totals", stdout=StringIO())
+
+        self.assertEqual(self._totals(), incremental)
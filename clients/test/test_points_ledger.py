@@ -0,0 +1,83 @@
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from clients.models import IncentiveRule, PointsLedgerEntry, PointsLedgerSnapshot, Sale
+from clients.services import points_ledger
+from clients.test.base import SalesTestCase
+
+
+class PointsLedgerTests(SalesTestCase):
+    """Every change to earned points is appended; snapshots + tail give the balance."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        IncentiveRule.objects.create(product=cls.sip.name, product_ref=cls.sip, unit_amount=1000, points_per_unit=2)
+
+    def _write(self, fn):
+        with self.captureOnCommitCallbacks(execute=True):
+            return fn()
+
+    def test_lifecycle_is_append_only(self):
+        jan, feb = date(2026, 1, 1), date(2026, 2, 1)
+        sale = self.sale(self.sip, 5000, date(2026, 1, 10))
+        sale.amount = 8000
+        self._write(sale.save)
+        sale.date = date(2026, 2, 3)
+        self._write(sale.save)
+        sale.status = Sale.STATUS_REJECTED
+        self._write(sale.save)
+
+        kinds = list(PointsLedgerEntry.objects.values_list("kind", "period", "points"))
+        self.assertEqual(kinds, [
+            ("award", jan, Decimal("10.000")),
+            ("adjustment", jan, Decimal("6.000")),
+            ("reversal", jan, Decimal("-16.000")),
+            ("award", feb, Decimal("16.000")),
+            ("reversal", feb, Decimal("-16.000")),
+        ])
+        history = points_ledger.monthly_history(self.employee.pk)
+        self.assertEqual(history[jan][0], Decimal("0"))
+        self.assertEqual(history[feb][0], Decimal("0"))
+        self.assertEqual(points_ledger.verify(), [])
+
+    def test_snapshot_plus_tail(self):
+        for day in (5, 6):
+            self.sale(self.sip, 1000, date(2026, 3, day))
+        self.assertEqual(points_ledger.take_snapshot()["rows"], 0)  # too young: may not all be committed
+        PointsLedgerEntry.objects.update(created_at=timezone.now() - 2 * points_ledger.SNAPSHOT_LAG)
+        self.assertEqual(points_ledger.take_snapshot()["rows"], 1)
+        self.sale(self.sip, 1000, date(2026, 3, 7))
+        # Inside the lag window: left for the next run and read from the tail meanwhile.
+        PointsLedgerEntry.objects.filter(pk=PointsLedgerEntry.objects.latest("id").pk).update(
+            created_at=timezone.now() - timedelta(minutes=1),
+        )
+        self.assertEqual(points_ledger.take_snapshot()["rows"], 0)
+
+        snap = PointsLedgerSnapshot.objects.get(employee=self.employee)
+        self.assertEqual(snap.points, Decimal("4.000"))
+        with self.assertNumQueries(2):  # snapshot rows, ledger tail
+            totals = points_ledger.month_totals(date(2026, 3, 15))
+        self.assertEqual(totals[self.employee.pk], (Decimal("6.000"), Decimal("3000.00")))
+
+        # Drift from a raw update is detected and repaired with an appended adjustment.
+        Sale.objects.filter(date=date(2026, 3, 7)).update(points=5)
+        self.assertEqual(len(points_ledger.verify(repair=True)), 1)
+        self.assertEqual(points_ledger.verify(), [])
+
+    def test_past_performance_chart_reads_the_ledger(self):
+        today = timezone.localdate()
+        self.sale(self.sip, 5000, today)
+        self.sale(self.sip, 3000, today, status=Sale.STATUS_REJECTED)
+        self.client.force_login(self.employee.user)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("clients:employee_past_performance"))
+        self.assertEqual(json.loads(resp.context["points_json"])[-1], 10)
+        self.assertEqual(resp.context["total_points_12"], 10)
+        self.assertFalse([q for q in ctx.captured_queries if "clients_saledailyrollup" in q["sql"]])
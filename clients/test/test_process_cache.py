@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.db.models import F
+from django.test import TestCase
+
+from clients.models import ProcessCacheVersion
+from clients.services import process_cache
+from clients.services.process_cache import ProcessCopy
+
+
+class ProcessCopyTests(TestCase):
+    """A process copy is rebuilt once its stamp row moves, whichever worker moved it."""
+
+    def setUp(self):
+        process_cache.forget_stamps()
+        self.addCleanup(process_cache._end_request)
+        self.builds = 0
+        self.copy = ProcessCopy("test:version", self._build)
+
+    def _build(self):
+        self.builds += 1
+        return self.builds
+
+    def _bumped_elsewhere(self):
+        ProcessCacheVersion.objects.filter(key="test:version").update(version=F("version") + 1)
+
+    def test_bump_forces_a_rebuild(self):
+        self.assertEqual((self.copy.get(), self.copy.get()), (1, 1))
+        self.copy.bump_version()
+        self.assertEqual(self.copy.get(), 2)
+        self.assertGreater(ProcessCacheVersion.objects.get(key="test:version").version, 1)
+
+    def test_stamps_are_read_once_per_request(self):
+        self.copy.bump_version()
+        process_cache._begin_request()
+        self.assertEqual(self.copy.get(), 1)
+        self._bumped_elsewhere()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.copy.get(), 1)
+
+        process_cache._begin_request()  # the next request sees the other worker's bump
+        self.assertEqual(self.copy.get(), 2)
+
+    def test_outside_a_request_stamps_age_out(self):
+        self.copy.bump_version()
+        self.assertEqual(self.copy.get(), 1)
+        self._bumped_elsewhere()
+        self.assertEqual(self.copy.get(), 1)
+        later = process_cache.time.monotonic() + process_cache.STAMP_MAX_AGE_SECONDS
+        with mock.patch("clients.services.process_cache.time.monotonic", return_value=later):
+            self.assertEqual(self.copy.get(), 2)
@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from clients.models import Client, Employee, LeadSheet, LeadSheetColumn, LeadSheetRecord, Product, Sale
+from clients.services import profiler
+from clients.test.base import reset_process_caches
+from clients.test.budgets import QueryBudgetMixin
+
+
+class ProfilerTests(TestCase):
+    """Probes count queries and spot repeats; the middleware feeds the report."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser(username="prof_staff", password="pass")
+        Employee.objects.create(user=cls.staff, role="admin")
+        cls.customers = [Client.objects.create(name=f"Prof Client {i}") for i in range(4)]
+
+    def setUp(self):
+        reset_process_caches()
+        self.client.force_login(self.staff)
+
+    def test_probe_fingerprints_repeated_statements(self):
+        with profiler.Probe("loop") as probe:
+            for c in self.customers:
+                Client.objects.filter(pk=c.pk).first()
+            Client.objects.count()
+        self.assertEqual(probe.queries, 5)
+        self.assertEqual(list(probe.duplicates().values()), [4])
+        self.assertGreaterEqual(probe.total_ms, probe.sql_ms)
+
+    @override_settings(VIEW_PROFILER_ENABLED=True)
+    def test_middleware_samples_reach_report_and_command(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get(reverse("clients:all_clients")).status_code, 200)
+        profiler.flush()
+
+        row = next(r for r in profiler.report() if r["view"] == "clients:all_clients")
+        self.assertEqual(row["requests"], 2)
+        self.assertGreater(row["avg_queries"], 0)
+        self.assertEqual(sum(row["latency_hist"]), 2)
+
+        out = StringIO()
+        call_command("profile_report", "--order", "avg_queries", stdout=out)
+        self.assertIn("clients:all_clients", out.getvalue())
+
+        resp = self.client.get(reverse("clients:profiler_report"))
+        self.assertContains(resp, "clients:all_clients")
+
+    def test_report_page_is_staff_only(self):
+        user = User.objects.create_user(username="prof_emp", password="pass")
+        Employee.objects.create(user=user, role="employee")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse("clients:profiler_report")).status_code, 403)
+
+
+class ViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets for the heaviest pages; a new N+1 fails here."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="budget_admin", password="pass")
+        cls.admin_emp = Employee.objects.create(user=cls.admin, role="admin")
+        sip = Product.objects.get(code="SIP")
+        today = timezone.now().date()
+        cls.sheet = LeadSheet.objects.create(name="Budget sheet", owner=cls.admin_emp)
+        LeadSheetColumn.objects.create(sheet=cls.sheet, name="Name", field_key="name")
+        for i in range(12):
+            emp = Employee.objects.create(user=User.objects.create_user(username=f"budget_emp_{i}"), role="employee")
+            customer = Client.objects.create(name=f"Budget Client {i}")
+            Sale.objects.create(client=customer, employee=emp, product=sip.name, product_ref=sip, amount=1000, date=today)
+            LeadSheetRecord.objects.create(sheet=cls.sheet, values={"name": f"Lead {i}"}, assigned_to=emp)
+        cls.sheet.shared_with.add(*Employee.objects.filter(role="employee")[:6])
+
+    def setUp(self):
+        reset_process_caches()
+        self.client.force_login(self.admin)
+
+    def test_admin_dashboard(self):
+        self.assertQueryBudget(reverse("clients:admin_dashboard"), max_queries=15, max_repeats=1)
+
+    def test_all_clients(self):
+        self.assertQueryBudget(reverse("clients:all_clients"), max_queries=18, max_repeats=2)
+
+    def test_lead_sheet_detail(self):
+        self.assertQueryBudget(reverse("clients:lead_sheet_detail", args=[self.sheet.pk]), max_queries=18, max_repeats=1)
@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import override_settings
+from django.utils import timezone
+
+from clients.models import (
+    Campaign,
+    CampaignProduct,
+    EmployeeProductPeriodTotal,
+    IncentiveRule,
+    PointsRecomputeJob,
+    Sale,
+)
+from clients.services import incentive_rules, recompute_planner
+from clients.test.base import SalesTestCase
+
+
+@override_settings(POINTS_RECOMPUTE_MODE="sync")
+class RecomputePlannerTests(SalesTestCase):
+    """Incentive edits re-score only the partitions they can reach."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Flush the recompute queued by creating the rules, so it doesn't absorb later edits.
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.sip_rule = IncentiveRule.objects.create(
+                product=cls.sip.name, product_ref=cls.sip, unit_amount=1000, points_per_unit=2,
+            )
+            IncentiveRule.objects.create(product=cls.life.name, product_ref=cls.life, unit_amount=1000, points_per_unit=1)
+
+    def test_rule_edit_rescores_its_product_only(self):
+        sip_sales = [self.sale(self.sip, 5000, date(2026, m, 3)) for m in (1, 2)]
+        life_sale = self.sale(self.life, 5000, date(2026, 1, 3))
+        Sale.objects.filter(pk=life_sale.pk).update(points=Decimal("99"))  # stale, but out of scope
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sip_rule.points_per_unit = 3
+            self.sip_rule.save()
+
+        self.assertEqual({s.points for s in Sale.objects.filter(pk__in=[s.pk for s in sip_sales])}, {Decimal("15.000")})
+        self.assertEqual(Sale.objects.get(pk=life_sale.pk).points, Decimal("99.000"))
+        total = EmployeeProductPeriodTotal.objects.get(employee=self.employee, product_key=f"r{self.sip.pk}", period_key="2026-01")
+        self.assertEqual(total.total_points, Decimal("15.000"))
+
+        job = PointsRecomputeJob.objects.first()
+        self.assertEqual(job.status, PointsRecomputeJob.STATUS_DONE)
+        self.assertEqual((job.sales_scanned, job.sales_updated, job.points_delta), (2, 2, Decimal("10.000")))
+
+    def test_campaign_scope_widens_to_months_and_windows(self):
+        campaign = Campaign.objects.create(name="Jan push", start_date=date(2026, 1, 20), end_date=date(2026, 2, 10))
+        CampaignProduct.objects.create(campaign=campaign, product_ref=self.sip, unit_amount=1000, points_per_unit=5)
+        book = incentive_rules.IncentiveRuleBook.build()
+
+        slices = recompute_planner.plan(
+            [recompute_planner.scope(self.sip.pk, self.sip.name, date(2026, 1, 25), date(2026, 1, 26)),
+             recompute_planner.scope(self.sip.pk, self.sip.name, date(2026, 5, 2), date(2026, 5, 2))],
+            book,
+        )
+        self.assertEqual(slices, [
+            (self.sip.pk, self.sip.name, date(2026, 1, 1), date(2026, 2, 28)),
+            (self.sip.pk, self.sip.name, date(2026, 5, 1), date(2026, 5, 31)),
+        ])
+
+    def test_runner_reclaims_jobs_whose_lease_expired(self):
+        sale = self.sale(self.sip, 5000, date(2026, 1, 3))
+        Sale.objects.filter(pk=sale.pk).update(points=Decimal("99"))
+        scopes = [recompute_planner.scope(self.sip.pk, self.sip.name)]
+        dead = PointsRecomputeJob.objects.create(
+            scopes=scopes, status=PointsRecomputeJob.STATUS_RUNNING, started_at=timezone.now() - timedelta(hours=2),
+        )
+        live = PointsRecomputeJob.objects.create(
+            scopes=scopes, status=PointsRecomputeJob.STATUS_RUNNING, started_at=timezone.now(),
+        )
+
+        self.assertEqual([job.pk for job in recompute_planner.run_pending()], [dead.pk])
+        dead.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual(dead.status, PointsRecomputeJob.STATUS_DONE)
+        self.assertEqual(live.status, PointsRecomputeJob.STATUS_RUNNING)
+        self.assertEqual(Sale.objects.get(pk=sale.pk).points, Decimal("10.000"))
+
+    @override_settings(POINTS_RECOMPUTE_MODE="cron")
+    def test_cron_mode_leaves_the_job_to_the_runner(self):
+        sale = self.sale(self.sip, 5000, date(2026, 1, 3))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sip_rule.points_per_unit = 3
+            self.sip_rule.save()
+
+        job = PointsRecomputeJob.objects.latest("id")
+        self.assertEqual(job.status, PointsRecomputeJob.STATUS_QUEUED)
+        self.assertEqual(Sale.objects.get(pk=sale.pk).points, Decimal("10.000"))
+        recompute_planner.run_pending()
+        self.assertEqual(Sale.objects.get(pk=sale.pk).points, Decimal("15.000"))
@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from clients.models import AuditLog, Notification, Sale
+from clients.services import sale_effects
+from clients.test.base import SalesTestCase
+
+
+class SaleEffectsTests(SalesTestCase):
+    """Sale side effects are coalesced per transaction and written once on commit."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        User.objects.create_superuser(username="effects_admin", password="pass")
+
+    def _sale(self, amount):
+        return self.sale(amount=amount, commit=False)
+
+    def test_effects_run_once_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                first = self._sale(1000)
+                second = self._sale(2000)
+                second.status = Sale.STATUS_APPROVED
+                second.save()
+            # Nothing has been written yet.
+            self.assertEqual(Notification.objects.count(), 0)
+            self.assertEqual(AuditLog.objects.count(), 0)
+
+        self.assertEqual(len(callbacks), 1)
+        # one client update, rollup create/lock/update, closed-month
+        # generation bump (create + update) and snapshot drop, live-sale check,
+        # admins, three bulk inserts
+        with self.assertNumQueries(12):
+            callbacks[0]()
+
+        self.customer.refresh_from_db()
+        self.assertEqual((self.customer.sip_amount, self.customer.sip_status), (Decimal("3000"), True))
+        self.assertEqual(
+            set(Notification.objects.values_list("related_sale_id", flat=True)), {first.pk, second.pk},
+        )
+        self.assertEqual(Notification.objects.count(), 4)  # 2 sales × 2 admins
+        self.assertEqual(AuditLog.objects.filter(target_id=second.pk).count(), 1)
+
+    def test_rolled_back_savepoint_drops_its_effects(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self._sale(1000)
+                with self.assertRaises(RuntimeError):
+                    with transaction.atomic():
+                        self._sale(2000)
+                        raise RuntimeError
+                self._sale(500)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.sip_amount, Decimal("1500"))
+
+    def test_rolled_back_transaction_buffer_is_not_reused(self):
+        block = transaction.atomic()
+        with self.assertRaises(RuntimeError):
+            with block:
+                self._sale(1000)
+                raise RuntimeError
+        with self.captureOnCommitCallbacks(execute=True):
+            with block:
+                self._sale(500)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.sip_amount, Decimal("500"))
+
+    def test_suppressed_skips_effects(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with sale_effects.suppressed():
+                self._sale(1000)
+
+        self.customer.refresh_from_db()
+        self.assertFalse(self.customer.sip_status)
+        self.assertEqual(Notification.objects.count(), 0)
+
+    def test_deferred_drops_rolled_back_savepoints(self):
+        with sale_effects.deferred():
+            self._sale(1000)
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    self._sale(2000)
+                    raise RuntimeError
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.sip_amount, Decimal("1000"))
+
+    def test_deferred_error_rolls_back_the_whole_block(self):
+        with self.assertRaises(RuntimeError):
+            with sale_effects.deferred():
+                self._sale(1000)
+                raise RuntimeError
+
+        self.assertFalse(Sale.objects.exists())
+        self.customer.refresh_from_db()
+        self.assertFalse(self.customer.sip_status)
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+    def test_deferred_flushes_on_exit(self):
+        with sale_effects.deferred():
+            self._sale(1000)
+            self._sale(500)
+            self.assertEqual(Notification.objects.count(), 0)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.sip_amount, Decimal("1500"))
+        self.assertEqual(Notification.objects.count(), 4)
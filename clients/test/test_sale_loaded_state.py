@@ -0,0 +1,81 @@
+from datetime import date
+from decimal import Decimal
+
+from clients.models import AuditLog, IncentiveRule, Sale, SaleDailyRollup
+from clients.test.base import SalesTestCase
+
+
+class SaleLoadedStateTests(SalesTestCase):
+    """Loaded sales know what changed; their UPDATE only lands while the row still matches."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        IncentiveRule.objects.create(product=cls.sip.name, product_ref=cls.sip, unit_amount=1000, points_per_unit=2)
+
+    def _stored_sale(self):
+        sale = self.sale(self.sip, 5000, date(2026, 3, 2))
+        return Sale.objects.select_related("client").get(pk=sale.pk)
+
+    def test_changed_fields_tracks_edits(self):
+        sale = self._stored_sale()
+        self.assertEqual(sale.changed_fields(), set())
+        sale.status = Sale.STATUS_APPROVED
+        sale.rejection_reason = "checked"
+        self.assertEqual(sale.changed_fields(), {"status", "rejection_reason"})
+        self.assertEqual(set(Sale(amount=1).changed_fields()), {f.attname for f in Sale._meta.concrete_fields})
+
+    def test_status_save_is_a_single_narrow_update(self):
+        sale = self._stored_sale()
+        sale.status = Sale.STATUS_APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):  # UPDATE status, updated_at WHERE <delta columns> = snapshot
+                sale.save()
+        self.assertEqual(sale.changed_fields(), set())
+        self.assertTrue(AuditLog.objects.filter(action=AuditLog.ACTION_SALE_APPROVED, target_id=sale.pk).exists())
+
+    def test_notes_save_is_a_single_update(self):
+        sale = self._stored_sale()
+        sale.rejection_reason = "checked"
+        with self.assertNumQueries(1):  # no delta column written: an unconditional UPDATE
+            sale.save()
+
+    def test_stale_instance_moves_the_stored_values(self):
+        sale = self._stored_sale()
+        stale = Sale.objects.get(pk=sale.pk)
+        sale.amount = 8000
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.save()
+
+        stale.status = Sale.STATUS_APPROVED  # loaded before the amount edit
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.save()
+        self.assertEqual(stale.amount, Decimal("8000"))
+        rollup = SaleDailyRollup.objects.filter(employee=self.employee).values_list("status", "amount")
+        self.assertEqual(list(rollup), [(Sale.STATUS_APPROVED, Decimal("8000.00"))])
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.sip_amount, Decimal("8000"))
+
+    def test_stale_rescore_keeps_the_stored_status(self):
+        sale = self._stored_sale()
+        stale = Sale.objects.get(pk=sale.pk)
+        sale.status = Sale.STATUS_APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.save()
+
+        stale.amount = 8000  # re-scored against running totals claimed from the stored row
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.save()
+        self.assertEqual((stale.status, stale.points), (Sale.STATUS_APPROVED, Decimal("16.000")))
+        rollup = SaleDailyRollup.objects.filter(employee=self.employee).values_list("status", "amount", "points")
+        self.assertEqual(list(rollup), [(Sale.STATUS_APPROVED, Decimal("8000.00"), Decimal("16.000"))])
+
+    def test_amount_edit_rescored_from_snapshot(self):
+        sale = self._stored_sale()
+        sale.amount = 8000
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.save()
+        sale.refresh_from_db()
+        self.assertEqual(sale.points, Decimal("16.000"))
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.sip_amount, Decimal("8000"))
@@ -0,0 +1,62 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+from clients.models import Sale, SaleDailyRollup
+from clients.services import approvals, sale_rollup
+from clients.test.base import SalesTestCase
+
+
+class SaleDailyRollupTests(SalesTestCase):
+    """SaleDailyRollup follows every Sale write path and reads back like Sale."""
+
+    def _row(self, day, product, status):
+        return SaleDailyRollup.objects.get(date=day, employee=self.employee, product=product.name, status=status)
+
+    def test_saves_and_deletes_move_rollup_rows(self):
+        day = date(2026, 3, 2)
+        first = self.sale(self.sip, 1000, day)
+        self.sale(self.sip, 500, day)
+        self.sale(self.life, 20000, day, cover_amount=500000, policy_type="")
+        row = self._row(day, self.sip, Sale.STATUS_PENDING)
+        self.assertEqual((row.amount, row.sale_count), (Decimal("1500"), 2))
+        self.assertEqual(self._row(day, self.life, Sale.STATUS_PENDING).cover_amount, Decimal("500000"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.amount = 1200
+            first.date = date(2026, 3, 3)
+            first.save()
+        self.assertEqual(self._row(day, self.sip, Sale.STATUS_PENDING).sale_count, 1)
+        self.assertEqual(self._row(date(2026, 3, 3), self.sip, Sale.STATUS_PENDING).amount, Decimal("1200"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertFalse(SaleDailyRollup.objects.filter(date=date(2026, 3, 3)).exists())
+        self.assertEqual(sale_rollup.verify(), [])
+
+    def test_bulk_approval_moves_status_rows(self):
+        day = date(2026, 3, 5)
+        sales = [self.sale(self.sip, 100, day) for _ in range(3)]
+        approvals.decide([s.pk for s in sales], Sale.STATUS_APPROVED, actor=self.admin)
+        self.assertFalse(SaleDailyRollup.objects.filter(status=Sale.STATUS_PENDING).exists())
+        self.assertEqual(self._row(day, self.sip, Sale.STATUS_APPROVED).sale_count, 3)
+        self.assertEqual(sale_rollup.verify(), [])
+
+    def test_totals_match_sale_aggregate(self):
+        for day in (date(2026, 1, 10), date(2026, 1, 20), date(2026, 2, 1)):
+            self.sale(self.sip, 1000, day)
+        monthly = sale_rollup.totals("product", period="month", start=date(2026, 1, 1), end=date(2026, 2, 28))
+        self.assertEqual(
+            [(r["period"], r["product"], r["amount"], r["count"]) for r in monthly],
+            [(date(2026, 1, 1), "SIP", Decimal("2000"), 2), (date(2026, 2, 1), "SIP", Decimal("1000"), 1)],
+        )
+
+    def test_rebuild_repairs_drift(self):
+        sale = self.sale(self.sip, 1000, date(2026, 4, 1))
+        Sale.objects.filter(pk=sale.pk).update(amount=4000)  # raw SQL edit, no signals
+        self.assertEqual(len(sale_rollup.verify()), 1)
+        call_command("rebuild_sale_rollups", "--from", "2026-04-01", "--to", "2026-04-30", stdout=StringIO())
+        self.assertEqual(sale_rollup.verify(), [])
+        self.assertEqual(self._row(date(2026, 4, 1), self.sip, Sale.STATUS_PENDING).amount, Decimal("4000"))
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from clients.models import FirmSettings, ManagerAccessConfig, ProcessCacheVersion
+from clients.services import process_cache, singletons
+
+
+class SingletonCacheTests(TestCase):
+    """Config singletons load once per process and once per request."""
+
+    def setUp(self):
+        cache.clear()
+        ManagerAccessConfig.objects.get_or_create(pk=1)
+        FirmSettings.objects.get_or_create(pk=1)
+        # Start from committed-looking rows so the process cache is in play.
+        singletons.clear()
+        self.addCleanup(singletons.clear)
+        self.addCleanup(process_cache._end_request)
+
+    def test_repeat_lookups_are_free(self):
+        ManagerAccessConfig.current()
+        with self.assertNumQueries(0):
+            ManagerAccessConfig.current()
+            ManagerAccessConfig.current()
+
+        singletons._begin_request()
+        try:
+            mine = FirmSettings.get_settings()
+            with self.assertNumQueries(0):
+                self.assertIs(FirmSettings.get_settings(), mine)
+            mine.firm_name = "Scratch"  # a view editing its copy leaves the shared one alone
+        finally:
+            singletons._end_request()
+        self.assertNotEqual(FirmSettings.get_settings().firm_name, "Scratch")
+
+    def test_save_is_seen_and_not_shared_before_commit(self):
+        cfg = ManagerAccessConfig.current()
+        cfg.allow_employee_performance = False
+        cfg.save()
+
+        self.assertFalse(ManagerAccessConfig.current().allow_employee_performance)
+        # The write is still uncommitted, so no process-wide copy is kept.
+        self.assertIsNone(singletons._copy(ManagerAccessConfig).peek())
+        with self.assertNumQueries(1):
+            ManagerAccessConfig.current()
+
+    def test_another_workers_edit_is_seen_on_the_next_request(self):
+        process_cache._begin_request()
+        self.assertTrue(ManagerAccessConfig.current().allow_employee_performance)
+
+        # Another worker revokes the permission: it writes the row and bumps the
+        # shared stamp, and this process's copy is never told directly.
+        ManagerAccessConfig.objects.filter(pk=1).update(allow_employee_performance=False)
+        key = singletons.VERSION_PREFIX + ManagerAccessConfig._meta.label_lower
+        ProcessCacheVersion.objects.update_or_create(key=key, defaults={"version": 1})
+        self.assertTrue(ManagerAccessConfig.current().allow_employee_performance)  # same request
+
+        process_cache._begin_request()
+        self.assertFalse(ManagerAccessConfig.current().allow_employee_performance)
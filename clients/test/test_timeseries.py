@@ -0,0 +1,73 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clients.models import Employee, Sale
+from clients.services import timeseries
+from clients.test.base import SalesTestCase
+
+
+class TimeSeriesTests(SalesTestCase):
+    """Series are dense, bucketed by grain and read with one grouped query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.asha = Employee.objects.create(user=User.objects.create_user(username="ts_asha"), role="employee")
+        cls.bala = Employee.objects.create(user=User.objects.create_user(username="ts_bala"), role="employee")
+
+    def test_buckets_are_dense_per_grain(self):
+        self.sale(self.sip, 1000, date(2026, 3, 30), employee=self.asha)
+        self.sale(self.sip, 2000, date(2026, 4, 2), employee=self.asha)
+        self.sale(self.life, 500, date(2026, 4, 2), employee=self.bala, status=Sale.STATUS_REJECTED)
+
+        months = timeseries.series("month", date(2026, 2, 1), date(2026, 5, 31))
+        self.assertEqual(months.labels, ["February 2026", "March 2026", "April 2026", "May 2026"])
+        self.assertEqual(months.values("amount"), [0, 1000, 2500, 0])
+        self.assertEqual(months.values("count"), [0, 1, 2, 0])
+
+        weeks = timeseries.series("week", date(2026, 3, 30), date(2026, 4, 12))
+        self.assertEqual(weeks.buckets, [date(2026, 3, 30), date(2026, 4, 6)])
+        self.assertEqual(weeks.values("amount"), [3500, 0])
+
+        fy = timeseries.series("fy", date(2026, 1, 1), date(2026, 12, 31), status=timeseries.EARNED)
+        self.assertEqual(fy.labels, ["FY 2025-26", "FY 2026-27"])
+        self.assertEqual(fy.values("amount"), [1000, 2000])
+
+        by_emp = timeseries.series("day", date(2026, 4, 1), date(2026, 4, 3), by="employee")
+        self.assertEqual(by_emp.values("amount", self.bala.pk), [0, 500, 0])
+        by_product = timeseries.series("month", date(2026, 4, 1), date(2026, 4, 30), by="product", product_ref_ids=[self.sip.pk])
+        self.assertEqual(by_product.keys(), [self.sip.pk])
+
+    def test_cache_follows_new_sales(self):
+        self.sale(self.sip, 1000, date(2026, 4, 2), employee=self.asha)
+        first = timeseries.series("month", date(2026, 4, 1), date(2026, 4, 30))
+        with self.assertNumQueries(0):
+            timeseries.series("month", date(2026, 4, 1), date(2026, 4, 30))
+        self.sale(self.sip, 1000, date(2026, 4, 20), employee=self.asha)
+        self.assertEqual(first.total("amount") + 1000, timeseries.series("month", date(2026, 4, 1), date(2026, 4, 30)).total("amount"))
+
+    def test_employee_performance_is_one_query_per_range(self):
+        self.sale(self.sip, 1000, date(2026, 1, 5), employee=self.asha)
+        self.sale(self.sip, 3000, date(2026, 6, 9), employee=self.asha, status=Sale.STATUS_APPROVED)
+        self.client.force_login(self.admin)
+        url = reverse("clients:employee_performance")
+
+        def render(start, end):
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(url, {"employee_id": self.asha.pk, "start": start, "end": end})
+            self.assertEqual(resp.status_code, 200)
+            return resp, len(ctx.captured_queries)
+
+        render("2026-06-01", "2026-06-30")  # warm per-process caches
+        _, month = render("2026-06-01", "2026-06-30")
+        resp, year = render("2026-01-01", "2026-12-31")
+        self.assertEqual(month, year)
+        self.assertEqual(len(resp.context["days"]), 365)
+        self.assertEqual(sum(resp.context["sales_series"]), 2)
+        self.assertEqual(resp.context["total_amount"], 4000)
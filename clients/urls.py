@@ -16,7 +16,9 @@ urlpatterns = [
     path("admin/firm-settings/", views.firm_settings_page, name="firm_settings"),
     path("admin/products/", views.product_management_page, name="product_management"),
     path("admin/audit-log/", views.audit_log, name="audit_log"),
+    path("admin/profiler/", views.profiler_report, name="profiler_report"),
     path("dashboard/employee/", views.employee_dashboard, name="employee_dashboard"),
+    path("dashboard/panel/<slug:name>/", views.dashboard_panel, name="dashboard_panel"),
 
     # Team management
     path("team/", views.team_list, name="team_list"),
@@ -30,6 +32,7 @@ urlpatterns = [
   # ----- Admin past performance -----
     path("admin/past-performance/", views.admin_past_performance, name="admin_past_performance"),
     path("admin/past-performance/<int:year>/<int:month>/", views.admin_past_month_performance, name="admin_past_month_performance"),
+    path("leaderboard/tv/", views.leaderboard_tv, name="leaderboard_tv"),
 
     # Notifications
     path("notifications/json/", views.notifications_json, name="notifications_json"),
@@ -126,6 +129,7 @@ urlpatterns = [
 
     # Target & Special Campaigns
     path("campaigns/manage/", views.manage_campaigns, name="manage_campaigns"),
+    path("campaigns/leaderboard/", views.campaign_leaderboard, name="campaign_leaderboard"),
     path("campaigns/add/", views.add_campaign, name="add_campaign"),
     path("campaigns/<int:campaign_id>/update/", views.update_campaign, name="update_campaign"),
     path("campaigns/<int:campaign_id>/delete/", views.delete_campaign, name="delete_campaign"),
@@ -9,6 +9,7 @@ from .helpers import *  # noqa: F401,F403
 from .auth import *  # noqa: F401,F403
 from .leads import *  # noqa: F401,F403
 from .dashboards import *  # noqa: F401,F403
+from .dashboard_panels import *  # noqa: F401,F403
 from .clients_views import *  # noqa: F401,F403
 from .sales import *  # noqa: F401,F403
 from .campaigns import *  # noqa: F401,F403
@@ -19,4 +20,5 @@ from .notifications import *  # noqa: F401,F403
 from .team import *  # noqa: F401,F403
 from .renewal_views import *  # noqa: F401,F403
 from .audit import *  # noqa: F401,F403
+from .profiler import *  # noqa: F401,F403
 from .lead_records import *  # noqa: F401,F403
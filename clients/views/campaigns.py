@@ -13,6 +13,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
 from django.views.decorators.http import require_POST
 
 from ..models import (
@@ -22,6 +23,8 @@ from ..models import (
     Product,
     campaign_product_overlaps,
 )
+from ..services import campaign_challenges
+from .helpers import can_view_team_figures
 
 
 def _is_admin(request):
@@ -68,6 +71,32 @@ def manage_campaigns(request):
     )
 
 
+
+# Row keys that reveal an employee's ₹ sales (directly or as slab progress).
+_AMOUNT_KEYS = ("cumulative", "progress", "amount_to_next")
+
+
+@login_required
+def campaign_leaderboard(request):
+    """Firm-wide standings for every live campaign product (any signed-in user).
+
+    Employees who may not see team figures get ranks and points only; their
+    own row keeps its amounts.
+    """
+    today = timezone.localdate()
+    boards = campaign_challenges.leaderboard(today)
+    if not can_view_team_figures(request.user):
+        own_id = getattr(getattr(request.user, "employee", None), "pk", None)
+        for board in boards:
+            for row in board["rows"]:
+                if row["employee_id"] != own_id:
+                    row.update(dict.fromkeys(_AMOUNT_KEYS))
+    return render(
+        request,
+        "campaigns/leaderboard.html",
+        {"boards": boards, "today": today},
+    )
+
 # ----------------------------- Campaign CRUD -----------------------------
 @login_required
 @require_POST
@@ -0,0 +1,262 @@
+"""Lazily loaded dashboard panels.
+
+admin_dashboard and employee_dashboard render the header KPIs only; every
+heavy panel (follow-up calendar, company progress tables, lead records,
+campaign challenges) is a placeholder the page fills from
+``dashboard/panel/<name>/`` once it scrolls into view
+(templates/dashboards/_lazy_panels_script.html). A panel nobody scrolls to is
+never computed.
+
+Each panel declares the data versions it reads (services/data_versions.py).
+The endpoint answers ``{"panel": ..., "html": ...}`` with an ETag derived
+from those versions, the viewer and the day, plus a short private
+Cache-Control, so a revisit with nothing changed is a 304 without building
+the panel at all. With a per-process cache the versions only see this
+worker's writes, so the ETag also carries `data_versions.local_epoch()` and
+goes stale after at most ``LOCAL_MAX_AGE_SECONDS``.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.db.models import Min, Q
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+
+from ..models import (
+    Campaign,
+    Employee,
+    LeadFollowUp,
+    LeadSheet,
+    LeadSheetFollowUp,
+    LeadSheetRecord,
+    Target,
+)
+from ..services import campaign_challenges, data_versions
+from ..services.sales_pivot import SalesPivot, month_bounds
+from .dashboards import _company_progress, _employee_company_sections, _employee_products
+from .helpers import get_manager_access
+
+# name -> (panel function, template, Cache-Control max-age)
+_PANELS = {}
+
+PRODUCT_LABELS = {
+    "Lumsum": "Lumpsum",
+}
+
+
+def _panel(name, template, max_age=60):
+    def register(func):
+        _PANELS[name] = (func, template, max_age)
+        return func
+    return register
+
+
+def _admin_viewer(request):
+    emp = getattr(request.user, "employee", None)
+    return request.user.is_superuser or (emp and emp.role in ("admin", "manager"))
+
+
+def _minute(now_ts):
+    # Overdue flags move with the clock, not with the data.
+    return now_ts.strftime("%Y%m%d%H%M")
+
+
+def _week(today):
+    week_start = today - timedelta(days=today.weekday())
+    return [week_start + timedelta(days=i) for i in range(7)]
+
+
+def _sales_months(start, end):
+    months, day = [], start.replace(day=1)
+    while day <= end:
+        months.append(data_versions.sales_month(day))
+        day = (day + timedelta(days=32)).replace(day=1)
+    return months
+
+
+# A panel function returns None when the viewer may not see the panel, else
+# (data-version deps, extra ETag scope, build) where build() is the template
+# context. Only what the ETag needs may be read before build().
+
+@_panel("admin-followups", "dashboards/_followup_calendar.html")
+def _admin_followups(request, now_ts):
+    if not _admin_viewer(request):
+        return None
+    today = now_ts.date()
+
+    def build():
+        return {
+            "is_admin_dashboard": True,
+            "week_dates": _week(today),
+            "today_date": today,
+            "all_employees": list(Employee.objects.filter(active=True).select_related("user").order_by("user__username")),
+            "overdue_count": LeadFollowUp.objects.filter(status="pending", scheduled_time__lt=now_ts).count(),
+        }
+    return [data_versions.LEADS, data_versions.EMPLOYEES], _minute(now_ts), build
+
+
+@_panel("admin-company", "dashboards/_admin_company_progress.html")
+def _admin_company(request, now_ts):
+    if not _admin_viewer(request):
+        return None
+    today = now_ts.date()
+    deps = [data_versions.sales_month(today), data_versions.TARGETS, data_versions.EMPLOYEES, data_versions.PRODUCTS]
+
+    def build():
+        # Only changes with this month's sales, the targets, the team or the
+        # product list; served from the fragment cache until one of them moves.
+        return data_versions.fragment(
+            f"admin-company-progress:{today.isoformat()}",
+            deps,
+            lambda: _company_progress(
+                SalesPivot.for_month(today),
+                list(Employee.objects.filter(active=True).select_related("user").order_by("user__username")),
+            ),
+        )
+    return deps, today.isoformat(), build
+
+
+@_panel("followups", "dashboards/_followup_calendar.html")
+def _employee_followups(request, now_ts):
+    emp = getattr(request.user, "employee", None)
+    if emp is None:
+        return None
+    today = now_ts.date()
+
+    def build():
+        return {
+            "is_admin_dashboard": False,
+            "week_dates": _week(today),
+            "today_date": today,
+            "overdue_count": LeadFollowUp.objects.filter(
+                status="pending", assigned_to=emp, scheduled_time__lt=now_ts,
+            ).count(),
+        }
+    return [data_versions.LEADS], f"{emp.pk}:{_minute(now_ts)}", build
+
+
+@_panel("company", "dashboards/_employee_company_sections.html")
+def _employee_company(request, now_ts):
+    emp = getattr(request.user, "employee", None)
+    role = getattr(emp, "role", "")
+    manager_access = get_manager_access() if role == "manager" else None
+    if not (role == "admin" or (manager_access and manager_access.allow_employee_performance)):
+        return None
+    today = now_ts.date()
+    products = _employee_products(emp)
+    products_digest = hashlib.sha1("\x1f".join(products).encode()).hexdigest()[:12]
+    deps = [data_versions.sales_month(today), data_versions.TARGETS, data_versions.EMPLOYEES, data_versions.PRODUCTS]
+
+    def build():
+        targets = {"daily": {}, "monthly": {}}
+        for t in Target.objects.filter(target_type__in=("daily", "monthly")).values("product", "target_type", "target_value"):
+            targets[t["target_type"]][t["product"]] = t["target_value"]
+        # Pivoted from one grouped (employee, product, status) query for the month.
+        (
+            overall_daily_progress, overall_monthly_progress, monthly_employee_product,
+            overall_product_point_breakup, overall_product_sales_breakup,
+        ) = data_versions.fragment(
+            f"employee-company-sections:{today.isoformat()}:{products_digest}",
+            deps,
+            lambda: _employee_company_sections(today, products, targets["daily"], targets["monthly"], PRODUCT_LABELS),
+        )
+        month_start, month_end = month_bounds(today)
+        return {
+            "overall_daily_progress": overall_daily_progress,
+            "overall_monthly_progress": overall_monthly_progress,
+            "monthly_employee_product": monthly_employee_product,
+            "overall_product_point_breakup": overall_product_point_breakup,
+            "overall_product_sales_breakup": overall_product_sales_breakup,
+            "month_start": month_start,
+            "month_end": month_end,
+        }
+    return deps, f"{today.isoformat()}:{products_digest}", build
+
+
+@_panel("campaigns", "dashboards/_campaign_challenges.html")
+def _campaigns(request, now_ts):
+    emp = getattr(request.user, "employee", None)
+    if emp is None:
+        return None
+    today = now_ts.date()
+    first_start = Campaign.objects.filter(
+        is_active=True, start_date__lte=today, end_date__gte=today,
+    ).aggregate(first=Min("start_date"))["first"]
+    deps = [data_versions.CAMPAIGNS, data_versions.PRODUCTS]
+    if first_start is not None:
+        deps += _sales_months(first_start, today)
+
+    def build():
+        return {"campaign_challenges": campaign_challenges.challenges_for(emp, today)}
+    return deps, f"{emp.pk}:{today.isoformat()}", build
+
+
+@_panel("lead-records", "dashboards/_lead_records.html")
+def _lead_records(request, now_ts):
+    emp = getattr(request.user, "employee", None)
+    if emp is None:
+        return None
+
+    def build():
+        # Sheets where this employee is in shared_with (or is owner) AND not archived.
+        my_lead_sheets_qs = (
+            LeadSheet.objects.filter(archived=False)
+            .filter(Q(owner=emp) | Q(shared_with=emp))
+            .distinct()
+            .order_by("-updated_at")[:5]
+        )
+        my_lead_sheets = []
+        for s in my_lead_sheets_qs:
+            my_count = LeadSheetRecord.objects.filter(sheet=s, assigned_to=emp).count()
+            total_count = LeadSheetRecord.objects.filter(sheet=s).count()
+            my_lead_sheets.append({"sheet": s, "my_count": my_count, "total_count": total_count})
+
+        # Pending lead-record follow-ups for this employee, in either:
+        #  (a) records assigned to them, OR
+        #  (b) follow-ups they personally created
+        pending_lead_followups = list(
+            LeadSheetFollowUp.objects.filter(completed=False)
+            .filter(Q(record__assigned_to=emp) | Q(created_by=request.user))
+            .select_related("record__sheet")
+            .order_by("scheduled_at")[:8]
+        )
+        return {
+            "my_lead_sheets": my_lead_sheets,
+            "pending_lead_followups": pending_lead_followups,
+            "overdue_lead_followups": [f for f in pending_lead_followups if f.scheduled_at < now_ts],
+            "now_ts": now_ts,
+        }
+    return [data_versions.LEADS], f"{emp.pk}:{_minute(now_ts)}", build
+
+
+def _etag(name, request, deps, scope):
+    versions = data_versions.current(*deps)
+    raw = "|".join([
+        name, str(request.user.pk), scope, data_versions.local_epoch(),
+        *(f"{dep}={versions[dep]}" for dep in sorted(versions)),
+    ])
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest()[:24])
+
+
+@login_required
+def dashboard_panel(request, name):
+    """One lazily loaded dashboard panel as JSON: {"panel": name, "html": rendered panel}."""
+    if name not in _PANELS:
+        return JsonResponse({"error": "Unknown panel"}, status=404)
+    func, template, max_age = _PANELS[name]
+    spec = func(request, timezone.now())
+    if spec is None:
+        return JsonResponse({"error": "Permission denied"}, status=403)
+    deps, scope, build = spec
+
+    etag = _etag(name, request, deps, scope)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        html = render_to_string(template, build(), request=request)
+        response = JsonResponse({"panel": name, "html": html})
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, max_age=max_age)
+    return response
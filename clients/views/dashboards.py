@@ -12,9 +12,8 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse, HttpResponseForbidden
 from django.utils import timezone
 from django.utils.timezone import now
-from django.db.models import Sum, Q, Count
+from django.db.models import Sum, Q
 from django.db.models.functions import TruncDay, TruncMonth, TruncYear
-from django.core.exceptions import FieldError
 from django.db import transaction
 
 from ..models import (
@@ -28,21 +27,16 @@ from ..models import (
     CalendarEvent,
     NetBusinessEntry,
     NetSipEntry,
-    Notification,
-    LeadFollowUp,
-    LeadSheet,
-    LeadSheetRecord,
-    LeadSheetFollowUp,
     ManagerAccessConfig,
     FirmSettings,
-    Campaign,
-    CampaignProduct,
 )
 from ..forms import (
     EmployeeCreateForm,
     EmployeeDeactivateForm,
     FirmSettingsForm,
 )
+from ..services import leaderboard, timeseries
+from ..services.sales_pivot import TODAY, SalesPivot, month_bounds
 from .helpers import get_manager_access
 
 
@@ -98,14 +92,99 @@ def _is_admin_user(user):
     return bool(emp and emp.role == "admin")
 
 
+def _company_targets(pivot):
+    """(products, daily target map, monthly target map) for the admin dashboard."""
+    targets = list(Target.objects.filter(target_type__in=("daily", "monthly")).values("product", "target_type", "target_value"))
+    daily_target_map = {t["product"]: t["target_value"] for t in targets if t["target_type"] == "daily"}
+    monthly_target_map = {t["product"]: t["target_value"] for t in targets if t["target_type"] == "monthly"}
+    products = _ordered_product_names(sorted(pivot.products() | {t["product"] for t in targets if t["product"]}))
+    return products, daily_target_map, monthly_target_map
+
+
+def _company_progress(pivot, employees):
+    """Company-wide daily / monthly progress tables for admin_dashboard.
+
+    Everything here comes from the month's sales pivot, the targets, the
+    active team and the product list, so the admin-company panel caches the
+    result against those data versions (see dashboard_panels.py).
+    """
+    approved = Sale.STATUS_APPROVED
+    products, daily_target_map, monthly_target_map = _company_targets(pivot)
+    active_employee_count = sum(1 for e in employees if e.role == "employee")
+
+    today_by_product = pivot.by_product("amount", bucket=TODAY, status=approved)
+    month_by_product = pivot.by_product("amount", status=approved)
+    today_by_emp_product = pivot.by_employee_product("amount", bucket=TODAY, status=approved)
+    month_by_emp_product = pivot.by_employee_product("amount", status=approved)
+
+    overall_daily_progress = []
+    for product in products:
+        target_value = daily_target_map.get(product, Decimal("0")) * (active_employee_count or 0)
+        achieved = today_by_product.get(product, Decimal("0"))
+        progress = (achieved / target_value * 100) if target_value else 0
+        overall_daily_progress.append({"product": product, "achieved": achieved, "target": target_value, "progress": progress})
+
+    overall_monthly_progress = []
+    for product in products:
+        achieved = month_by_product.get(product, Decimal("0"))
+        target_base = monthly_target_map.get(product, Decimal("0"))
+        target_value = (target_base or 0) * (active_employee_count or 0)
+        progress = (achieved / target_value * 100) if target_value else 0
+        overall_monthly_progress.append({"product": product, "achieved": achieved, "target": target_value, "progress": progress})
+
+    daily_employee_product = []
+    for emp_obj in employees:
+        emp_entry = {
+            "employee": emp_obj.user.username if hasattr(emp_obj, "user") else emp_obj.name,
+            "products": []
+        }
+        for product in products:
+            achieved = today_by_emp_product.get((emp_obj.id, product), Decimal("0"))
+            target = daily_target_map.get(product, 0)
+            progress = (achieved / target * 100) if target else 0
+            emp_entry["products"].append({
+                "product": product,
+                "achieved": achieved,
+                "target": target,
+                "progress": progress,
+            })
+        daily_employee_product.append(emp_entry)
+
+    monthly_employee_product = []
+    for emp_obj in employees:
+        emp_entry = {
+            "employee": emp_obj.user.username if hasattr(emp_obj, "user") else emp_obj.name,
+            "products": []
+        }
+        for product in products:
+            achieved = month_by_emp_product.get((emp_obj.id, product), Decimal("0"))
+            target = monthly_target_map.get(product, 0)
+            progress = (achieved / target * 100) if target else 0
+            emp_entry["products"].append({
+                "product": product,
+                "achieved": achieved,
+                "target": target,
+                "progress": progress,
+            })
+        monthly_employee_product.append(emp_entry)
+
+    return {
+        "products": products,
+        "daily_target_map": daily_target_map,
+        "monthly_target_map": monthly_target_map,
+        "overall_daily_progress": overall_daily_progress,
+        "overall_monthly_progress": overall_monthly_progress,
+        "daily_employee_product": daily_employee_product,
+        "monthly_employee_product": monthly_employee_product,
+    }
+
+
 @login_required
 def admin_dashboard(request):
     emp = getattr(request.user, "employee", None)
     if not (request.user.is_superuser or (emp and emp.role in ("admin", "manager"))):
         return redirect("clients:employee_dashboard")
     today = timezone.now().date()
-    month = today.month
-    year = today.year
 
     admin_emp = getattr(request.user, "employee", None)
 
@@ -123,49 +202,24 @@ def admin_dashboard(request):
             for product in products
         ]
 
-    now_ts = timezone.now()
-    today_date = now_ts.date()
-    week_start = today_date - timedelta(days=today_date.weekday())
-    week_dates = [week_start + timedelta(days=i) for i in range(7)]
+    # One grouped query over this month's sales; every card below pivots it.
+    # The follow-up calendar and the company progress tables are lazy panels
+    # (views/dashboard_panels.py), fetched once they scroll into view.
+    pivot = SalesPivot.for_month(today)
+    approved = Sale.STATUS_APPROVED
+    month_start, month_end = month_bounds(today)
+    products, daily_target_map, monthly_target_map = _company_targets(pivot)
 
-    followup_qs = (
-        LeadFollowUp.objects.filter(status="pending")
-        .filter(
-            Q(scheduled_time__lt=now_ts) |
-            Q(scheduled_time__date__gte=week_start, scheduled_time__date__lte=week_start + timedelta(days=6))
-        )
-        .select_related("lead", "assigned_to__user")
-        .order_by("scheduled_time")
-    )
-    followups_by_date = {}
-    overdue_followups = []
-    for f in followup_qs:
-        f.is_overdue = f.scheduled_time < now_ts
-        if f.is_overdue:
-            overdue_followups.append(f)
-        fdate = f.scheduled_time.date()
-        followups_by_date.setdefault(fdate, []).append(f)
-    upcoming_followups = list(followup_qs)
-    all_employees = Employee.objects.filter(active=True).select_related("user").order_by("user__username")
-
-    all_sales_qs = Sale.objects.all()
-    monthly_sales_qs = Sale.objects.filter(status=Sale.STATUS_APPROVED, created_at__year=year, created_at__month=month)
-    approved_sales_all = Sale.objects.filter(status=Sale.STATUS_APPROVED)
-    products = _ordered_product_names(
-        list(all_sales_qs.exclude(product="").values_list("product", flat=True).distinct())
-        + list(Target.objects.exclude(product="").values_list("product", flat=True).distinct())
-    )
+    top_performers = leaderboard.standings(leaderboard.month(today)).top(5)
 
     total_clients = Client.objects.count()
-    total_sales = monthly_sales_qs.aggregate(total=Sum("amount"))["total"] or Decimal("0")
-    total_points = monthly_sales_qs.aggregate(total=Sum("points"))["total"] or Decimal("0")
+    total_sales = pivot.total("amount", status=approved)
+    total_points = pivot.total("points", status=approved)
     total_salary_all = Employee.objects.aggregate(total=Sum("salary"))["total"] or Decimal("0")
     admin_points_scale = max(total_points, total_salary_all, Decimal("1"))
     admin_salary_ratio = (total_salary_all / admin_points_scale) * Decimal("100") if admin_points_scale else Decimal("0")
     admin_points_ratio = (total_points / admin_points_scale) * Decimal("100") if admin_points_scale else Decimal("0")
     admin_extra_points = max(total_points - total_salary_all, Decimal("0"))
-    month_start = date(year, month, 1)
-    month_end = date(year, month, monthrange(year, month)[1])
 
     admin_self_sales = Decimal("0")
     admin_self_points = Decimal("0")
@@ -173,22 +227,16 @@ def admin_dashboard(request):
     admin_self_points_map = {p: Decimal("0") for p in products}
     admin_self_sales_map = {p: Decimal("0") for p in products}
     if admin_emp:
-        self_sales_qs = Sale.objects.filter(employee=admin_emp, status=Sale.STATUS_APPROVED, date__year=year, date__month=month)
-        admin_self_sales = self_sales_qs.aggregate(total=Sum("amount"))['total'] or Decimal("0")
-        admin_self_points = self_sales_qs.aggregate(total=Sum("points"))['total'] or Decimal("0")
-        admin_self_pending_points = Sale.objects.filter(employee=admin_emp, status=Sale.STATUS_PENDING, date__year=year, date__month=month).aggregate(total=Sum("points"))['total'] or Decimal("0")
-
-        for entry in self_sales_qs.values("product").annotate(total=Sum("points")):
-            admin_self_points_map[entry["product"]] = entry["total"] or Decimal("0")
-        for entry in self_sales_qs.values("product").annotate(total=Sum("amount")):
-            admin_self_sales_map[entry["product"]] = entry["total"] or Decimal("0")
+        admin_self_sales = pivot.total("amount", status=approved, employee_id=admin_emp.id)
+        admin_self_points = pivot.total("points", status=approved, employee_id=admin_emp.id)
+        admin_self_pending_points = pivot.total("points", status=Sale.STATUS_PENDING, employee_id=admin_emp.id)
+        admin_self_points_map.update(pivot.by_product("points", status=approved, employee_id=admin_emp.id))
+        admin_self_sales_map.update(pivot.by_product("amount", status=approved, employee_id=admin_emp.id))
 
     overall_points_map = {p: Decimal("0") for p in products}
     overall_sales_map = {p: Decimal("0") for p in products}
-    for entry in monthly_sales_qs.values("product").annotate(total=Sum("points")):
-        overall_points_map[entry["product"]] = entry["total"] or Decimal("0")
-    for entry in monthly_sales_qs.values("product").annotate(total=Sum("amount")):
-        overall_sales_map[entry["product"]] = entry["total"] or Decimal("0")
+    overall_points_map.update(pivot.by_product("points", status=approved))
+    overall_sales_map.update(pivot.by_product("amount", status=approved))
 
     admin_self_points_breakup = _build_breakup(admin_self_points_map)
     admin_overall_points_breakup = _build_breakup(overall_points_map)
@@ -201,19 +249,11 @@ def admin_dashboard(request):
     motor_sales = overall_sales_map.get("Motor Insurance", Decimal("0"))
     pms_sales = overall_sales_map.get("PMS", Decimal("0"))
 
-    daily_targets = Target.objects.filter(target_type="daily")
-    monthly_targets = Target.objects.filter(target_type="monthly")
-    daily_target_map = {t.product: t.target_value for t in daily_targets}
-    monthly_target_map = {t.product: t.target_value for t in monthly_targets}
-    active_employee_count = Employee.objects.filter(role="employee", active=True).count()
-
     admin_daily_targets_display = []
     admin_monthly_targets_display = []
     if admin_emp:
-        admin_today_sales = monthly_sales_qs.filter(employee=admin_emp, date=today).values("product").annotate(total=Sum("amount"))
-        admin_today_map = {s["product"]: s["total"] for s in admin_today_sales}
-        admin_month_sales = monthly_sales_qs.filter(employee=admin_emp).values("product").annotate(total=Sum("amount"))
-        admin_month_map = {s["product"]: s["total"] for s in admin_month_sales}
+        admin_today_map = pivot.by_product("amount", bucket=TODAY, status=approved, employee_id=admin_emp.id)
+        admin_month_map = pivot.by_product("amount", status=approved, employee_id=admin_emp.id)
 
         for product in products:
             target_val = daily_target_map.get(product, Decimal("0"))
@@ -237,84 +277,10 @@ def admin_dashboard(request):
                 "progress": progress,
             })
 
-    # ── Pre-aggregate once instead of per-product / per-employee loops.
-    # This collapses 4 N×M N+1 loops (≥120 queries) into 4 group-by queries.
-    today_by_product = {
-        r["product"]: r["total"] or Decimal("0")
-        for r in approved_sales_all.filter(date=today).values("product").annotate(total=Sum("amount"))
-    }
-    month_by_product = {
-        r["product"]: r["total"] or Decimal("0")
-        for r in monthly_sales_qs.values("product").annotate(total=Sum("amount"))
-    }
-    today_by_emp_product = {
-        (r["employee_id"], r["product"]): r["total"] or Decimal("0")
-        for r in approved_sales_all.filter(date=today)
-                                    .values("employee_id", "product")
-                                    .annotate(total=Sum("amount"))
-    }
-    month_by_emp_product = {
-        (r["employee_id"], r["product"]): r["total"] or Decimal("0")
-        for r in monthly_sales_qs
-                                    .values("employee_id", "product")
-                                    .annotate(total=Sum("amount"))
-    }
-
-    overall_daily_progress = []
-    for product in products:
-        target_value = daily_target_map.get(product, Decimal("0")) * (active_employee_count or 0)
-        achieved = today_by_product.get(product, Decimal("0"))
-        progress = (achieved / target_value * 100) if target_value else 0
-        overall_daily_progress.append({"product": product, "achieved": achieved, "target": target_value, "progress": progress})
-
-    overall_monthly_progress = []
-    for product in products:
-        achieved = month_by_product.get(product, Decimal("0"))
-        target_base = monthly_target_map.get(product, Decimal("0"))
-        target_value = (target_base or 0) * (active_employee_count or 0)
-        progress = (achieved / target_value * 100) if target_value else 0
-        overall_monthly_progress.append({"product": product, "achieved": achieved, "target": target_value, "progress": progress})
-
-    employees = Employee.objects.select_related("user").filter(active=True)
-
-    daily_employee_product = []
-    for emp_obj in employees:
-        emp_entry = {
-            "employee": emp_obj.user.username if hasattr(emp_obj, "user") else emp_obj.name,
-            "products": []
-        }
-        for product in products:
-            achieved = today_by_emp_product.get((emp_obj.id, product), Decimal("0"))
-            target = daily_target_map.get(product, 0)
-            progress = (achieved / target * 100) if target else 0
-            emp_entry["products"].append({
-                "product": product,
-                "achieved": achieved,
-                "target": target,
-                "progress": progress,
-            })
-        daily_employee_product.append(emp_entry)
-
-    monthly_employee_product = []
-    for emp_obj in employees:
-        emp_entry = {
-            "employee": emp_obj.user.username if hasattr(emp_obj, "user") else emp_obj.name,
-            "products": []
-        }
-        for product in products:
-            achieved = month_by_emp_product.get((emp_obj.id, product), Decimal("0"))
-            target = monthly_target_map.get(product, 0)
-            progress = (achieved / target * 100) if target else 0
-            emp_entry["products"].append({
-                "product": product,
-                "achieved": achieved,
-                "target": target,
-                "progress": progress,
-            })
-        monthly_employee_product.append(emp_entry)
-
+    month_start_ts = timezone.make_aware(datetime.combine(month_start, datetime.min.time()))
+    next_month_ts = timezone.make_aware(datetime.combine(month_end + timedelta(days=1), datetime.min.time()))
     monthly_summary = {
-        "total_clients": Client.objects.filter(created_at__year=year, created_at__month=month).count(),
+        "total_clients": Client.objects.filter(created_at__gte=month_start_ts, created_at__lt=next_month_ts).count(),
         "total_sales": total_sales,
         "total_points": total_points,
         "sip": sip_sales,
@@ -325,12 +291,6 @@ def admin_dashboard(request):
         "pms": pms_sales,
     }
 
-    notifications = []
-    unread_notifications = 0
-    if request.user.is_authenticated:
-        notifications = Notification.objects.filter(recipient=request.user).order_by("-created_at")[:10]
-        unread_notifications = Notification.objects.filter(recipient=request.user, is_read=False).count()
-
     context = {
         "total_clients": total_clients,
         "total_sales": total_sales,
@@ -354,20 +314,9 @@ def admin_dashboard(request):
         "health_sales": health_sales,
         "motor_sales": motor_sales,
         "pms_sales": pms_sales,
-        "overall_daily_progress": overall_daily_progress,
-        "overall_monthly_progress": overall_monthly_progress,
-        "daily_employee_product": daily_employee_product,
-        "monthly_employee_product": monthly_employee_product,
+        "top_performers": top_performers,
         "monthly_summary": monthly_summary,
-        "notifications": notifications,
-        "unread_notifications": unread_notifications,
-        "upcoming_followups": upcoming_followups,
-        "followups_by_date": followups_by_date,
-        "overdue_followups": overdue_followups,
-        "week_dates": week_dates,
-        "today_date": today_date,
         "is_admin_dashboard": True,
-        "all_employees": all_employees,
         "month_start": month_start,
         "month_end": month_end,
     }
@@ -484,6 +433,88 @@ def employee_management(request):
     return render(request, "employees/manage.html", context)
 
 
+def _employee_products(emp):
+    """Products on employee_dashboard: the ones this employee sold plus every targeted one."""
+    return _ordered_product_names(
+        list(
+            Sale.objects.filter(employee=emp)
+            .exclude(product="")
+            .values_list("product", flat=True)
+            .distinct()
+        )
+        + list(Target.objects.exclude(product="").values_list("product", flat=True).distinct())
+    )
+
+
+def _employee_company_sections(today, products, daily_target_map, monthly_target_map, product_labels):
+    """Company-wide progress tables and product breakups for employee_dashboard."""
+    overall_daily_progress, overall_monthly_progress, monthly_employee_product = [], [], []
+    pivot = SalesPivot.for_month(today)
+    approved = Sale.STATUS_APPROVED
+    daily_by_product = pivot.by_product("amount", bucket=TODAY, status=approved)
+    monthly_by_product = pivot.by_product("amount", status=approved)
+    monthly_by_emp_product = pivot.by_employee_product("amount", status=approved)
+    employees_all = list(Employee.objects.select_related("user").filter(active=True))
+    active_employee_count = sum(1 for e in employees_all if e.role == "employee")
+
+    for product in products:
+        target_value = daily_target_map.get(product, Decimal("0")) * (active_employee_count or 0)
+        achieved = daily_by_product.get(product) or 0
+        progress = (achieved / target_value * 100) if target_value else 0
+        overall_daily_progress.append({"product": product, "achieved": achieved, "target": target_value, "progress": progress})
+
+    for product in products:
+        achieved = monthly_by_product.get(product) or 0
+        target_base = monthly_target_map.get(product, Decimal("0"))
+        target_value = (target_base or 0) * (active_employee_count or 0)
+        progress = (achieved / target_value * 100) if target_value else 0
+        overall_monthly_progress.append({"product": product, "achieved": achieved, "target": target_value, "progress": progress})
+
+    for e in employees_all:
+        emp_entry_monthly = {
+            "employee": e.user.username if hasattr(e, "user") else getattr(e, "name", ""),
+            "products": [],
+        }
+        for product in products:
+            achieved = monthly_by_emp_product.get((e.id, product)) or 0
+            target = monthly_target_map.get(product, 0)
+            progress = (achieved / target * 100) if target else 0
+            emp_entry_monthly["products"].append({
+                "product": product,
+                "achieved": achieved,
+                "target": target,
+                "progress": progress,
+            })
+        monthly_employee_product.append(emp_entry_monthly)
+
+    overall_points_map = {p: Decimal("0") for p in products}
+    overall_points_map.update(pivot.by_product("points", status=approved))
+    overall_sales_map = {p: Decimal("0") for p in products}
+    overall_sales_map.update(monthly_by_product)
+
+    overall_product_point_breakup = [
+        {
+            "product": product,
+            "label": product_labels.get(product, product),
+            "points": overall_points_map.get(product, Decimal("0")),
+        }
+        for product in products
+    ]
+
+    overall_product_sales_breakup = [
+        {
+            "product": product,
+            "label": product_labels.get(product, product),
+            "amount": overall_sales_map.get(product, Decimal("0")),
+        }
+        for product in products
+    ]
+    return (
+        overall_daily_progress, overall_monthly_progress, monthly_employee_product,
+        overall_product_point_breakup, overall_product_sales_breakup,
+    )
+
+
 @login_required
 def employee_dashboard(request):
     emp = request.user.employee
@@ -496,39 +527,7 @@ def employee_dashboard(request):
     month_start = date(today.year, today.month, 1)
     month_end = date(today.year, today.month, monthrange(today.year, today.month)[1])
 
-    now_ts = timezone.now()
-    today_date = now_ts.date()
-    week_start = today_date - timedelta(days=today_date.weekday())
-    week_dates = [week_start + timedelta(days=i) for i in range(7)]
-
-    followup_qs = (
-        LeadFollowUp.objects.filter(status="pending", assigned_to=emp)
-        .filter(
-            Q(scheduled_time__lt=now_ts) |
-            Q(scheduled_time__date__gte=week_start, scheduled_time__date__lte=week_start + timedelta(days=6))
-        )
-        .select_related("lead")
-        .order_by("scheduled_time")
-    )
-    followups_by_date = {}
-    overdue_followups = []
-    for f in followup_qs:
-        f.is_overdue = f.scheduled_time < now_ts
-        if f.is_overdue:
-            overdue_followups.append(f)
-        fdate = f.scheduled_time.date()
-        followups_by_date.setdefault(fdate, []).append(f)
-    upcoming_followups = list(followup_qs)
-
-    products = _ordered_product_names(
-        list(
-            Sale.objects.filter(employee=emp)
-            .exclude(product="")
-            .values_list("product", flat=True)
-            .distinct()
-        )
-        + list(Target.objects.exclude(product="").values_list("product", flat=True).distinct())
-    )
+    products = _employee_products(emp)
 
     monthly_sales_approved = Sale.objects.filter(
         employee=emp,
@@ -633,189 +632,11 @@ def employee_dashboard(request):
         status="pending",
     ).order_by("scheduled_time")
 
-    # Company-wide aggregates for managers/admins
-    overall_daily_progress = []
-    overall_monthly_progress = []
-    daily_employee_product = []
-    monthly_employee_product = []
-    overall_product_point_breakup = []
-    overall_product_sales_breakup = []
-
-    if allow_company_sections:
-        approved_sales_all = Sale.objects.filter(status=Sale.STATUS_APPROVED)
-        monthly_sales_qs = approved_sales_all.filter(date__year=today.year, date__month=today.month)
-        active_employee_count = Employee.objects.filter(role="employee", active=True).count()
-
-        for product in products:
-            target_value = daily_target_map.get(product, Decimal("0")) * (active_employee_count or 0)
-            achieved = approved_sales_all.filter(product=product, date=today).aggregate(total=Sum("amount"))['total'] or 0
-            progress = (achieved / target_value * 100) if target_value else 0
-            overall_daily_progress.append({"product": product, "achieved": achieved, "target": target_value, "progress": progress})
-
-        for product in products:
-            achieved = monthly_sales_qs.filter(product=product).aggregate(total=Sum("amount"))['total'] or 0
-            target_base = monthly_target_map.get(product, Decimal("0"))
-            target_value = (target_base or 0) * (active_employee_count or 0)
-            progress = (achieved / target_value * 100) if target_value else 0
-            overall_monthly_progress.append({"product": product, "achieved": achieved, "target": target_value, "progress": progress})
-
-        employees_all = Employee.objects.select_related("user").filter(active=True)
-        for e in employees_all:
-            emp_entry_daily = {
-                "employee": e.user.username if hasattr(e, "user") else getattr(e, "name", ""),
-                "products": [],
-            }
-            for product in products:
-                achieved = approved_sales_all.filter(employee=e, product=product, date=today).aggregate(total=Sum("amount"))['total'] or 0
-                target = daily_target_map.get(product, 0)
-                progress = (achieved / target * 100) if target else 0
-                emp_entry_daily["products"].append({
-                    "product": product,
-                    "achieved": achieved,
-                    "target": target,
-                    "progress": progress,
-                })
-            daily_employee_product.append(emp_entry_daily)
-
-        for e in employees_all:
-            emp_entry_monthly = {
-                "employee": e.user.username if hasattr(e, "user") else getattr(e, "name", ""),
-                "products": [],
-            }
-            for product in products:
-                achieved = approved_sales_all.filter(
-                    employee=e,
-                    product=product,
-                    date__year=today.year,
-                    date__month=today.month,
-                ).aggregate(total=Sum("amount"))['total'] or 0
-                target = monthly_target_map.get(product, 0)
-                progress = (achieved / target * 100) if target else 0
-                emp_entry_monthly["products"].append({
-                    "product": product,
-                    "achieved": achieved,
-                    "target": target,
-                    "progress": progress,
-                })
-            monthly_employee_product.append(emp_entry_monthly)
-
-        overall_points_map = {p: Decimal("0") for p in products}
-        overall_sales_map = {p: Decimal("0") for p in products}
-        for entry in monthly_sales_qs.values("product").annotate(total=Sum("points")):
-            overall_points_map[entry["product"]] = entry["total"] or Decimal("0")
-        for entry in monthly_sales_qs.values("product").annotate(total=Sum("amount")):
-            overall_sales_map[entry["product"]] = entry["total"] or Decimal("0")
-
-        overall_product_point_breakup = [
-            {
-                "product": product,
-                "label": product_labels.get(product, product),
-                "points": overall_points_map.get(product, Decimal("0")),
-            }
-            for product in products
-        ]
-
-        overall_product_sales_breakup = [
-            {
-                "product": product,
-                "label": product_labels.get(product, product),
-                "amount": overall_sales_map.get(product, Decimal("0")),
-            }
-            for product in products
-        ]
-
-    # ── My Lead Records widget ──
-    # Sheets where this employee is in shared_with (or is owner) AND not archived.
-    my_lead_sheets_qs = (
-        LeadSheet.objects.filter(archived=False)
-        .filter(Q(owner=emp) | Q(shared_with=emp))
-        .distinct()
-        .order_by("-updated_at")[:5]
-    )
-    my_lead_sheets = []
-    for s in my_lead_sheets_qs:
-        my_count = LeadSheetRecord.objects.filter(sheet=s, assigned_to=emp).count()
-        total_count = LeadSheetRecord.objects.filter(sheet=s).count()
-        my_lead_sheets.append({"sheet": s, "my_count": my_count, "total_count": total_count})
-
-    # Pending lead-record follow-ups for this employee, in either:
-    #  (a) records assigned to them, OR
-    #  (b) follow-ups they personally created
-    pending_lead_followups = list(
-        LeadSheetFollowUp.objects.filter(completed=False)
-        .filter(Q(record__assigned_to=emp) | Q(created_by=request.user))
-        .select_related("record__sheet")
-        .order_by("scheduled_at")[:8]
-    )
-    overdue_lead_followups = [f for f in pending_lead_followups if f.scheduled_at < now_ts]
-
-    # ── Gamified Campaign Challenges ──
-    # For every campaign currently live, show this employee's progress on each
-    # campaign product: boosted-rate earnings (unit) or slab-target progress.
-    campaign_challenges = []
-    active_campaigns = (
-        Campaign.objects.filter(is_active=True, start_date__lte=today, end_date__gte=today)
-        .prefetch_related("products__slabs", "products__product_ref")
-        .order_by("end_date")
-    )
-    for camp in active_campaigns:
-        days_left = (camp.end_date - today).days
-        for cp in camp.products.all():
-            win_sales = Sale.objects.filter(
-                employee=emp,
-                product_ref=cp.product_ref,
-                date__range=[camp.start_date, camp.end_date],
-            )
-            approved_win = win_sales.filter(status=Sale.STATUS_APPROVED)
-            cumulative = approved_win.aggregate(t=Sum("amount"))["t"] or Decimal("0")
-            earned = approved_win.aggregate(t=Sum("points"))["t"] or Decimal("0")
-            pending_pts = win_sales.filter(status=Sale.STATUS_PENDING).aggregate(t=Sum("points"))["t"] or Decimal("0")
-
-            challenge = {
-                "campaign": camp.name,
-                "end_date": camp.end_date,
-                "days_left": days_left,
-                "product": cp.product_ref.name,
-                "benefit_type": cp.benefit_type,
-                "earned_points": earned,
-                "pending_points": pending_pts,
-                "cumulative": cumulative,
-            }
-
-            if cp.benefit_type == CampaignProduct.BENEFIT_UNIT:
-                challenge["unit_amount"] = cp.unit_amount or Decimal("0")
-                challenge["points_per_unit"] = cp.points_per_unit or Decimal("0")
-            else:
-                slabs = sorted(cp.slabs.all(), key=lambda s: s.threshold)
-                current_payout = Decimal("0")
-                next_threshold = None
-                next_payout = None
-                for s in slabs:
-                    if cumulative >= s.threshold:
-                        current_payout = s.payout
-                    else:
-                        next_threshold = s.threshold
-                        next_payout = s.payout
-                        break
-                if next_threshold is not None and next_threshold > 0:
-                    progress = min(cumulative / next_threshold * Decimal("100"), Decimal("100"))
-                    amount_to_next = next_threshold - cumulative
-                    top_reached = False
-                else:
-                    progress = Decimal("100")
-                    amount_to_next = Decimal("0")
-                    top_reached = True
-                challenge.update({
-                    "current_payout": current_payout,
-                    "next_threshold": next_threshold,
-                    "next_payout": next_payout,
-                    "progress": progress,
-                    "amount_to_next": amount_to_next,
-                    "top_reached": top_reached,
-                    "max_payout": slabs[-1].payout if slabs else Decimal("0"),
-                })
-            campaign_challenges.append(challenge)
+    # Firm-wide standing this month, read from the cached leaderboard.
+    month_board = leaderboard.standings(leaderboard.month(today))
 
+    # Follow-ups, company sections, lead records and campaign challenges are
+    # lazy panels (views/dashboard_panels.py), fetched once they scroll into view.
     context = {
         "total_sales": total_sales,
         "total_points": total_points,
@@ -835,30 +656,17 @@ def employee_dashboard(request):
         "daily_targets": daily_targets_display,
         "monthly_targets": monthly_targets_display,
         "history": history,
-        "upcoming_followups": upcoming_followups,
-        "followups_by_date": followups_by_date,
-        "overdue_followups": overdue_followups,
-        "week_dates": week_dates,
-        "today_date": today_date,
-        "is_admin_dashboard": False,
         "pending_points": pending_points,
+        "my_rank": month_board.rank_of(emp.pk),
+        "my_percentile": month_board.percentile(emp.pk),
+        "ranked_count": len(month_board),
         "product_point_breakup": product_point_breakup,
         "product_sales_breakup": product_sales_breakup,
-        "overall_product_point_breakup": overall_product_point_breakup,
-        "overall_product_sales_breakup": overall_product_sales_breakup,
         "show_company_sections": allow_company_sections,
-        "overall_daily_progress": overall_daily_progress,
-        "overall_monthly_progress": overall_monthly_progress,
-        "monthly_employee_product": monthly_employee_product,
         "is_manager": is_manager,
         "is_admin": is_admin,
         "month_start": month_start,
         "month_end": month_end,
-        "my_lead_sheets": my_lead_sheets,
-        "pending_lead_followups": pending_lead_followups,
-        "overdue_lead_followups": overdue_lead_followups,
-        "now_ts": now_ts,
-        "campaign_challenges": campaign_challenges,
     }
     return render(request, "dashboards/employee_dashboard.html", context)
 
@@ -1116,15 +924,11 @@ def employee_performance(request):
         end = date.today()
 
     sales_qs = Sale.objects.filter(employee=employee, date__range=(start, end))
-    total_sales = sales_qs.count()
-    try:
-        total_amount = sales_qs.aggregate(total=Sum('amount'))['total'] or 0
-    except FieldError:
-        try:
-            total_amount = sales_qs.aggregate(total=Sum('total_amount'))['total'] or 0
-        except FieldError:
-            total_amount = 0
-    points = sales_qs.aggregate(total=Sum('points'))['total'] or 0
+    # One day-grouped query for the chart and the headline totals.
+    daily = timeseries.series("day", start, end, employee_ids=[employee.pk]) if start <= end else None
+    total_sales = daily.total("count") if daily else 0
+    total_amount = daily.total("amount") if daily else 0
+    points = daily.total("points") if daily else 0
 
     # Calling component removed — call/connect metrics no longer tracked.
     calls_made = 0
@@ -1132,17 +936,11 @@ def employee_performance(request):
     connect_rate = 0
     conversion_rate = 0
 
-    days = []
-    sales_series = []
-    calls_series = []
-    current = start
-    while current <= end:
-        days.append(current.strftime('%Y-%m-%d'))
-        sales_series.append(sales_qs.filter(date=current).aggregate(cnt=Count('id'))['cnt'] or 0)
-        calls_series.append(0)
-        current += timedelta(days=1)
-
-    recent_sales = sales_qs.order_by('-date')[:10]
+    days = daily.labels if daily else []
+    sales_series = daily.values("count") if daily else []
+    calls_series = [0] * len(days)
+
+    recent_sales = sales_qs.select_related('client').order_by('-date')[:10]
 
     if request.GET.get('export') == 'csv':
         import csv as _csv
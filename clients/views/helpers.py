@@ -26,6 +26,18 @@ def get_manager_access():
     return ManagerAccessConfig.current()
 
 
+def can_view_team_figures(user):
+    """Admins, and managers allowed employee performance, may see other employees' ₹ figures."""
+    emp = getattr(user, "employee", None)
+    role = getattr(emp, "role", "")
+    if user.is_superuser or role == "admin":
+        return True
+    if role == "manager":
+        access = get_manager_access()
+        return bool(access and access.allow_employee_performance)
+    return False
+
+
 def _lead_queryset_for_request(request):
     qs = Lead.objects.select_related("assigned_to__user").prefetch_related(
         "progress_entries",
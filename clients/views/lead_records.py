@@ -356,7 +356,8 @@ def _apply_filters_sort(qs, request, columns):
 
 @login_required
 def lead_sheet_detail(request, sheet_id):
-    sheet = get_object_or_404(LeadSheet, id=sheet_id)
+    # shared_with is read per employee by the access modal; load it once.
+    sheet = get_object_or_404(LeadSheet.objects.prefetch_related("shared_with__user"), id=sheet_id)
     if not sheet.can_view(request.user):
         return HttpResponseForbidden("You don't have access to this sheet.")
 
@@ -0,0 +1,41 @@
+"""Staff-only report of the per-view query / latency profiler."""
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseForbidden
+from django.shortcuts import render
+
+from ..services import profiler
+
+_ORDERS = {
+    "total_ms": "Total time",
+    "avg_ms": "Avg time",
+    "avg_queries": "Avg queries",
+    "max_queries": "Max queries",
+    "n_plus_one": "Repeated queries",
+}
+_HOURS = (1, 6, 24, 72, 168)
+
+
+@login_required
+def profiler_report(request):
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Staff only.")
+
+    order = request.GET.get("order")
+    if order not in _ORDERS:
+        order = "total_ms"
+    try:
+        hours = int(request.GET.get("hours", 24))
+    except (TypeError, ValueError):
+        hours = 24
+    if hours not in _HOURS:
+        hours = 24
+
+    profiler.flush()  # include this process's unflushed samples
+    return render(request, "profiler_report.html", {
+        "rows": profiler.report(hours=hours, order=order, limit=100),
+        "enabled": profiler.enabled(),
+        "order": order,
+        "order_options": _ORDERS.items(),
+        "hours": hours,
+        "hour_options": _HOURS,
+    })
@@ -9,22 +9,24 @@ from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
-from django.db.models import Sum, Q
+from django.db.models import Sum
 from django.utils.timezone import now
 
 from ..models import (
-    Sale, Employee, MonthlyTargetHistory, Product, Expense, ExpenseCategory,
-    Renewal, MFSnapshot, MFProjectionSettings,
+    SaleDailyRollup, Employee, MonthlyTargetHistory, Expense, ExpenseCategory,
+    MFSnapshot, MFProjectionSettings,
 )
+from ..services import campaign_challenges, closed_periods, leaderboard, points_ledger, timeseries
+from ..services.sales_pivot import month_bounds
 from ..services.mf_engine import (
     build_dashboard, reconcile, historical_analytics,
 )
-from .helpers import get_manager_access, _last_n_months
+from .helpers import can_view_team_figures, get_manager_access, _last_n_months
 
 
 @login_required
 def employee_past_performance(request):
-    """Line chart of monthly points (last 12 months) for the logged-in employee."""
+    """Line chart of monthly earned points (last 12 months) for the logged-in employee."""
     emp = request.user.employee
     today = now().date()
     months = _last_n_months(today, n=12)
@@ -33,16 +35,14 @@ def employee_past_performance(request):
     points_data = []
     months_data = []
 
+    # Earned (not rejected) points per month from the ledger snapshots (+ recent entries).
+    history = points_ledger.monthly_history(emp.pk, periods=[date(y, m, 1) for y, m in months])
     for y, m in months:
-        label = f"{month_name[m]} {y}"
-        pts = (
-            Sale.objects.filter(employee=emp, date__year=y, date__month=m)
-            .aggregate(total=Sum("points"))["total"]
-            or 0
-        )
+        label = timeseries.label(date(y, m, 1), "month")
+        pts = int(history.get(date(y, m, 1), (0, 0))[0])
         labels.append(label)
-        points_data.append(int(pts))
-        months_data.append({"year": y, "month": m, "label": label, "points": int(pts)})
+        points_data.append(pts)
+        months_data.append({"year": y, "month": m, "label": label, "points": pts})
 
     total_points_12 = sum(points_data)
     avg_points = round(total_points_12 / len(points_data), 1) if points_data else 0
@@ -79,7 +79,7 @@ def past_month_performance(request, year, month):
     emp = request.user.employee
 
     product_sales = (
-        Sale.objects.filter(employee=emp, date__year=year, date__month=month)
+        SaleDailyRollup.objects.filter(employee=emp, date__range=month_bounds(date(int(year), int(month), 1)))
         .values("product")
         .annotate(total_amount=Sum("amount"), total_points=Sum("points"))
         .order_by("-total_amount")
@@ -168,14 +168,18 @@ def admin_past_performance(request, n_months=12):
     # Chart: always show points history across the full last n_months window
     # so users see a true "past performance" trend instead of being limited
     # to whatever months exist in the selected year.
+    # Both loops read one month-grouped time series, cached until a sale in
+    # the window moves.
+    window_start, window_end = date(*months[0], 1), month_bounds(date(*months[-1], 1))[1]
+    history = timeseries.series(
+        "month", window_start, window_end, employee_ids=[selected_employee.pk] if selected_employee else None,
+    )
+    by_month = {(r["bucket"].year, r["bucket"].month): r for r in history.rows()}
     labels = []
     totals_data = []
     for y, m in months:
         label = f"{month_name[m]} {y}"
-        sale_filter = {"date__year": y, "date__month": m}
-        if selected_employee:
-            sale_filter["employee"] = selected_employee
-        total_points = Sale.objects.filter(**sale_filter).aggregate(total=Sum("points"))["total"] or 0
+        total_points = by_month.get((y, m), {}).get("points") or 0
         labels.append(label)
         totals_data.append(int(total_points))
 
@@ -183,12 +187,9 @@ def admin_past_performance(request, n_months=12):
     months_data = []
     for y, m in months_for_year:
         label = f"{month_name[m]} {y}"
-        sale_filter = {"date__year": y, "date__month": m}
-        if selected_employee:
-            sale_filter["employee"] = selected_employee
-
-        total_points = Sale.objects.filter(**sale_filter).aggregate(total=Sum("points"))["total"] or 0
-        total_amount = Sale.objects.filter(**sale_filter).aggregate(total=Sum("amount"))["total"] or 0
+        month_totals = by_month.get((y, m), {})
+        total_points = month_totals.get("points") or 0
+        total_amount = month_totals.get("amount") or 0
 
         months_data.append({
             "year": y,
@@ -203,33 +204,11 @@ def admin_past_performance(request, n_months=12):
         md["percent_of_max"] = round((md["points"] / max_points_snapshot) * 100, 1) if max_points_snapshot else 0
 
     latest_year, latest_month = months_for_year[-1] if months_for_year else months[-1]
-    top_performers_qs = Sale.objects.filter(date__year=latest_year, date__month=latest_month)
+    board = leaderboard.standings(leaderboard.month(date(latest_year, latest_month, 1)))
     if selected_employee:
-        top_performers_qs = top_performers_qs.filter(employee=selected_employee)
-
-    top_performers_qs = (
-        top_performers_qs.values(
-            "employee__id",
-            "employee__user__username",
-            "employee__user__first_name",
-            "employee__user__last_name",
-        )
-        .annotate(total_points=Sum("points"), total_amount=Sum("amount"))
-        .order_by("-total_points")
-    )
-
-    top_performers = []
-    for r in top_performers_qs:
-        first = (r.get("employee__user__first_name") or "").strip()
-        last = (r.get("employee__user__last_name") or "").strip()
-        full_name = (first + " " + last).strip() if (first or last) else (r.get("employee__user__username") or "Unknown")
-        top_performers.append({
-            "employee_id": r.get("employee__id"),
-            "username": r.get("employee__user__username") or "",
-            "full_name": full_name,
-            "total_points": int(r.get("total_points") or 0),
-            "total_amount": float(r.get("total_amount") or 0),
-        })
+        top_performers = closed_periods.performer_rows([board.entry(selected_employee.pk)])
+    else:
+        top_performers = closed_periods.performer_rows(board.top(len(board)))
 
     context = {
         "labels_json": labels,
@@ -249,6 +228,36 @@ def admin_past_performance(request, n_months=12):
     return render(request, "dashboards/admin_past_performance.html", context)
 
 
+@login_required
+def leaderboard_tv(request):
+    """Full-screen, auto-refreshing firm leaderboard for an office display.
+
+    Ranking by ₹ sales is only offered to users who may see team figures;
+    everyone else gets the points board.
+    """
+    show_amounts = can_view_team_figures(request.user)
+    metric = request.GET.get("metric")
+    if metric not in leaderboard.METRICS or (metric == "amount" and not show_amounts):
+        metric = "points"
+    today = now().date()
+    periods = [
+        ("Today", leaderboard.day(today)),
+        ("This Month", leaderboard.month(today)),
+        ("Financial Year", leaderboard.fy(today)),
+    ]
+    periods += [("Campaign", leaderboard.campaign(c)) for c in campaign_challenges.live_campaigns(today)]
+    boards = [
+        {"title": title, "label": period.label, "rows": leaderboard.standings(period, metric).top(10)}
+        for title, period in periods
+    ]
+    return render(request, "dashboards/leaderboard_tv.html", {
+        "boards": boards,
+        "metric": metric,
+        "other_metric": ("amount" if metric == "points" else "points") if show_amounts else None,
+        "generated_at": now(),
+    })
+
+
 @login_required
 def admin_past_month_performance(request, year, month):
     emp = getattr(request.user, "employee", None)
@@ -258,122 +267,16 @@ def admin_past_month_performance(request, year, month):
     if not (is_admin_user or (is_manager and mgr_access and mgr_access.allow_employee_performance)):
         return HttpResponseForbidden("Access denied.")
 
-    product_sales = (
-        Sale.objects.filter(date__year=year, date__month=month)
-        .values("product")
-        .annotate(total_amount=Sum("amount"), total_points=Sum("points"))
-        .order_by("-total_amount")
-    )
-
-    target_history = MonthlyTargetHistory.objects.filter(year=year, month=month)
-    target_map = {}
-    if target_history.exists():
-        summed_targets = target_history.values("product").annotate(
-            target_value_sum=Sum("target_value"), achieved_value_sum=Sum("achieved_value")
-        )
-        for t in summed_targets:
-            target_map[t["product"]] = {
-                "target_value": float(t["target_value_sum"] or 0),
-                "achieved_value": float(t["achieved_value_sum"] or 0),
-            }
-
-    products = []
-    for row in product_sales:
-        prod = row["product"]
-        target_val = target_map.get(prod, {}).get("target_value")
-        achieved_val = target_map.get(prod, {}).get("achieved_value")
-        progress = 0
-        if target_val:
-            try:
-                progress = (float(achieved_val or 0) / float(target_val)) * 100
-            except Exception:
-                progress = 0
-        products.append({
-            "product": prod,
-            "total_amount": float(row["total_amount"] or 0),
-            "total_points": int(row["total_points"] or 0),
-            "target_value": target_val,
-            "achieved_value": achieved_val,
-            "progress": progress,
-        })
-
-    top_performers_qs = (
-        Sale.objects.filter(date__year=year, date__month=month)
-        .values(
-            "employee__id",
-            "employee__user__username",
-            "employee__user__first_name",
-            "employee__user__last_name",
-        )
-        .annotate(total_points=Sum("points"), total_amount=Sum("amount"))
-        .order_by("-total_points")
-    )
-
-    top_performers = []
-    for r in top_performers_qs:
-        first = (r.get("employee__user__first_name") or "").strip()
-        last = (r.get("employee__user__last_name") or "").strip()
-        full_name = (first + " " + last).strip() if (first or last) else (r.get("employee__user__username") or "Unknown")
-        top_performers.append({
-            "employee_id": r.get("employee__id"),
-            "username": r.get("employee__user__username") or "",
-            "full_name": full_name,
-            "total_points": int(r.get("total_points") or 0),
-            "total_amount": float(r.get("total_amount") or 0),
-        })
-
-    # Per-product employee breakdown: for each product in this month, list which
-    # employees sold it with their amount/points contribution.
-    per_product_employee_qs = (
-        Sale.objects.filter(date__year=year, date__month=month)
-        .values(
-            "product",
-            "employee__id",
-            "employee__user__username",
-            "employee__user__first_name",
-            "employee__user__last_name",
-        )
-        .annotate(total_amount=Sum("amount"), total_points=Sum("points"))
-        .order_by("product", "-total_points")
-    )
-
-    product_employee_map = {}
-    for r in per_product_employee_qs:
-        prod = r["product"]
-        first = (r.get("employee__user__first_name") or "").strip()
-        last = (r.get("employee__user__last_name") or "").strip()
-        full_name = (first + " " + last).strip() if (first or last) else (r.get("employee__user__username") or "Unknown")
-        product_employee_map.setdefault(prod, []).append({
-            "employee_id": r.get("employee__id"),
-            "username": r.get("employee__user__username") or "",
-            "full_name": full_name,
-            "total_points": int(r.get("total_points") or 0),
-            "total_amount": float(r.get("total_amount") or 0),
-        })
-
-    product_employee_stats = []
-    for p in products:
-        employees_for_prod = product_employee_map.get(p["product"], [])
-        prod_total_points = p["total_points"] or 0
-        for emp_row in employees_for_prod:
-            emp_row["points_share"] = (
-                round((emp_row["total_points"] / prod_total_points) * 100, 1)
-                if prod_total_points else 0
-            )
-        product_employee_stats.append({
-            "product": p["product"],
-            "total_amount": p["total_amount"],
-            "total_points": p["total_points"],
-            "employees": employees_for_prod,
-        })
+    # Served from the frozen snapshot once the month is closed.
+    report = closed_periods.month_performance(date(int(year), int(month), 1))
 
     context = {
         "year": int(year),
         "month": int(month),
         "month_label": f"{month_name[int(month)]} {year}",
-        "products": products,
-        "top_performers": top_performers,
-        "product_employee_stats": product_employee_stats,
+        "products": report["products"],
+        "top_performers": report["top_performers"],
+        "product_employee_stats": report["product_employee_stats"],
     }
     return render(request, "dashboards/admin_past_month_performance.html", context)
 
@@ -388,42 +291,10 @@ def monthly_business_report(request):
     sel_month = int(request.GET.get("month", today.month))
     sel_year = int(request.GET.get("year", today.year))
 
-    approved = Sale.objects.filter(status="approved", date__year=sel_year, date__month=sel_month)
-
-    # Show all active products, and include disabled products only if they have sales in the selected month.
-    products = list(
-        Product.objects.filter(is_active=True)
-        .order_by("display_order", "name")
-        .values_list("name", flat=True)
-    )
-
-    used_products = set(
-        approved.exclude(product="")
-        .values_list("product", flat=True)
-        .distinct()
-    )
-    used_ref_products = set(
-        approved.filter(product_ref__isnull=False)
-        .values_list("product_ref__name", flat=True)
-        .distinct()
-    )
-
-    for product_name in sorted(used_products | used_ref_products):
-        if product_name and product_name not in products:
-            products.append(product_name)
+    month_start = date(sel_year, sel_month, 1)
+    products, amount_by_emp_product, points_by_emp = closed_periods.monthly_business_totals(month_start)
     employees = Employee.objects.filter(active=True).select_related("user").order_by("user__first_name")
 
-    # Pre-aggregate amounts grouped by (employee, product) and points by employee.
-    # Replaces an N×M loop of per-cell `.aggregate(Sum)` calls with two queries.
-    amount_by_emp_product = {
-        (r["employee_id"], r["product"]): r["total"] or Decimal("0")
-        for r in approved.values("employee_id", "product").annotate(total=Sum("amount"))
-    }
-    points_by_emp = {
-        r["employee_id"]: r["total"] or Decimal("0")
-        for r in approved.values("employee_id").annotate(total=Sum("points"))
-    }
-
     rows = []
     grand = {p: Decimal("0") for p in products}
     grand["points"] = Decimal("0")
@@ -465,149 +336,6 @@ def _fy_months(fy_start_year):
     return months
 
 
-def _month_margin_breakdown(year, month):
-    """Per-product (and Fresh/Port for health) margin for one month.
-
-    Slabs match against the product's cumulative monthly revenue, so the
-    revenue is aggregated per product/bucket first, then the margin % resolved.
-    Returns (rows, totals) where each row has product, policy label, revenue,
-    margin_percent and margin_amount.
-    """
-    approved = Sale.objects.filter(status="approved", date__year=year, date__month=month)
-    products = list(Product.objects.all().order_by("display_order", "name"))
-
-    rows = []
-    total_rev = Decimal("0")
-    total_margin = Decimal("0")
-    matched_pks = []
-
-    for p in products:
-        base = approved.filter(
-            Q(product_ref=p) | (Q(product_ref__isnull=True) & Q(product=p.name))
-        )
-        matched_pks.append(p.pk)
-
-        if p.is_health:
-            buckets = [("fresh", "Fresh"), ("port", "Port")]
-            seen_codes = []
-            for code, label in buckets:
-                seen_codes.append(code)
-                rev = base.filter(policy_type=code).aggregate(t=Sum("amount"))["t"] or Decimal("0")
-                if rev <= 0:
-                    continue
-                pct = p.margin_for(rev, code)
-                amt = (rev * pct / Decimal("100")).quantize(Decimal("0.01"))
-                rows.append({"product": p.name, "policy": label, "revenue": rev,
-                             "margin_percent": pct, "margin_amount": amt})
-                total_rev += rev
-                total_margin += amt
-            rev_unset = base.exclude(policy_type__in=seen_codes).aggregate(t=Sum("amount"))["t"] or Decimal("0")
-            if rev_unset > 0:
-                pct = p.margin_for(rev_unset, "")
-                amt = (rev_unset * pct / Decimal("100")).quantize(Decimal("0.01"))
-                rows.append({"product": p.name, "policy": "Unspecified", "revenue": rev_unset,
-                             "margin_percent": pct, "margin_amount": amt})
-                total_rev += rev_unset
-                total_margin += amt
-        else:
-            rev = base.aggregate(t=Sum("amount"))["t"] or Decimal("0")
-            if rev <= 0:
-                continue
-            pct = p.margin_for(rev, "")
-            amt = (rev * pct / Decimal("100")).quantize(Decimal("0.01"))
-            rows.append({"product": p.name, "policy": "", "revenue": rev,
-                         "margin_percent": pct, "margin_amount": amt})
-            total_rev += rev
-            total_margin += amt
-
-    # Approved sales not mapped to any known product → 0% margin, kept so totals reconcile.
-    product_names = [p.name for p in products]
-    leftover = approved.filter(product_ref__isnull=True).exclude(product__in=product_names)
-    leftover_rev = leftover.aggregate(t=Sum("amount"))["t"] or Decimal("0")
-    if leftover_rev > 0:
-        rows.append({"product": "Other / Unmapped", "policy": "", "revenue": leftover_rev,
-                     "margin_percent": Decimal("0.00"), "margin_amount": Decimal("0.00")})
-        total_rev += leftover_rev
-
-    blended = (total_margin / total_rev * Decimal("100")).quantize(Decimal("0.01")) if total_rev else Decimal("0.00")
-    totals = {"revenue": total_rev, "margin_amount": total_margin, "blended_percent": blended}
-    return rows, totals
-
-
-def _month_renewal_breakdown(year, month):
-    """Per-product renewal margin for one month, by premium collected.
-
-    Renewal premium is attributed to the month it was collected, grouped by
-    the linked Product and valued at that product's flat renewal margin %.
-    Renewals not linked to a Product are kept as a 0%-margin row so the
-    revenue totals reconcile.
-    """
-    qs = Renewal.objects.filter(
-        premium_collected_on__year=year, premium_collected_on__month=month
-    )
-
-    rows = []
-    total_rev = Decimal("0")
-    total_margin = Decimal("0")
-
-    per_product = (
-        qs.filter(product_ref__isnull=False)
-        .values("product_ref")
-        .annotate(total=Sum("premium_amount"))
-    )
-    products = {p.pk: p for p in Product.objects.filter(
-        pk__in=[r["product_ref"] for r in per_product]
-    )}
-    for r in per_product:
-        rev = r["total"] or Decimal("0")
-        if rev <= 0:
-            continue
-        p = products.get(r["product_ref"])
-        pct = p.renewal_margin_percent if p else Decimal("0.00")
-        amt = (rev * pct / Decimal("100")).quantize(Decimal("0.01"))
-        rows.append({"product": p.name if p else "—", "revenue": rev,
-                     "margin_percent": pct, "margin_amount": amt})
-        total_rev += rev
-        total_margin += amt
-
-    unmapped_rev = (
-        qs.filter(product_ref__isnull=True).aggregate(t=Sum("premium_amount"))["t"]
-        or Decimal("0")
-    )
-    if unmapped_rev > 0:
-        rows.append({"product": "Other / Unmapped (Renewal)", "revenue": unmapped_rev,
-                     "margin_percent": Decimal("0.00"), "margin_amount": Decimal("0.00")})
-        total_rev += unmapped_rev
-
-    blended = (total_margin / total_rev * Decimal("100")).quantize(Decimal("0.01")) if total_rev else Decimal("0.00")
-    rows.sort(key=lambda x: x["margin_amount"], reverse=True)
-    totals = {"revenue": total_rev, "margin_amount": total_margin, "blended_percent": blended}
-    return rows, totals
-
-
-def _monthly_salary_total():
-    """Current total monthly salary across active employees."""
-    return Employee.objects.filter(active=True).aggregate(t=Sum("salary"))["t"] or Decimal("0")
-
-
-def _period_expense_breakdown(months):
-    """months: list of (year, month). Returns (category_rows, total).
-
-    One-time expenses count in the month they were incurred; recurring
-    expenses count their per-month amount for each active month.
-    """
-    expenses = list(Expense.objects.select_related("category").all())
-    cat_totals = {}
-    total = Decimal("0")
-    for (y, m) in months:
-        for e in expenses:
-            if e.applies_to_month(y, m):
-                cat_totals[e.category.name] = cat_totals.get(e.category.name, Decimal("0")) + e.amount
-                total += e.amount
-    rows = [{"category": k, "amount": v} for k, v in sorted(cat_totals.items())]
-    return rows, total
-
-
 def _parse_expense_post(request):
     """Validate add-expense form fields. Returns (kwargs, error)."""
     try:
@@ -747,9 +475,12 @@ def business_analytics(request):
         fy_renew_rev = Decimal("0")
         fy_renew_margin = Decimal("0")
 
-        for (y, m) in _fy_months(fy_start):
-            rows, totals = _month_margin_breakdown(y, m)
-            r_rows, r_totals = _month_renewal_breakdown(y, m)
+        period_months = _fy_months(fy_start)
+        payloads = closed_periods.business_months(period_months)
+        for (y, m) in period_months:
+            p = payloads[(y, m)]
+            rows, totals = p["rows"], p["totals"]
+            r_rows, r_totals = p["renewal_rows"], p["renewal_totals"]
             month_summary.append({
                 "year": y, "month": m, "label": f"{month_name[m][:3]} {y}",
                 "revenue": totals["revenue"], "margin_amount": totals["margin_amount"],
@@ -791,7 +522,6 @@ def business_analytics(request):
 
         fy_blended = (fy_margin / fy_rev * Decimal("100")).quantize(Decimal("0.01")) if fy_rev else Decimal("0.00")
         renew_blended = (fy_renew_margin / fy_renew_rev * Decimal("100")).quantize(Decimal("0.01")) if fy_renew_rev else Decimal("0.00")
-        period_months = _fy_months(fy_start)
         period_revenue = fy_rev + fy_renew_rev
         gross_margin = fy_margin + fy_renew_margin
         context.update({
@@ -810,10 +540,11 @@ def business_analytics(request):
         except (TypeError, ValueError):
             sel_month, sel_year = today.month, today.year
 
-        rows, totals = _month_margin_breakdown(sel_year, sel_month)
-        rows.sort(key=lambda x: x["margin_amount"], reverse=True)
-        renewal_rows, renewal_totals = _month_renewal_breakdown(sel_year, sel_month)
         period_months = [(sel_year, sel_month)]
+        payloads = closed_periods.business_months(period_months)
+        p = payloads[(sel_year, sel_month)]
+        rows, totals = sorted(p["rows"], key=lambda x: x["margin_amount"], reverse=True), p["totals"]
+        renewal_rows, renewal_totals = p["renewal_rows"], p["renewal_totals"]
         period_revenue = totals["revenue"] + renewal_totals["revenue"]
         gross_margin = totals["margin_amount"] + renewal_totals["margin_amount"]
         context.update({
@@ -827,9 +558,15 @@ def business_analytics(request):
         })
 
     # ---- Expenses + Net Margin (shared by both views) ----
-    expense_rows, expense_total = _period_expense_breakdown(period_months)
-    monthly_salary = _monthly_salary_total()
-    salary_total = monthly_salary * len(period_months)
+    # Closed months carry the expenses and salary bill they were frozen with.
+    expense_by_category = {}
+    for p in payloads.values():
+        for r in p["expense_rows"]:
+            expense_by_category[r["category"]] = expense_by_category.get(r["category"], Decimal("0")) + r["amount"]
+    expense_rows = [{"category": k, "amount": v} for k, v in sorted(expense_by_category.items())]
+    expense_total = sum((p["expense_total"] for p in payloads.values()), Decimal("0"))
+    monthly_salary = payloads[period_months[-1]]["monthly_salary"]
+    salary_total = sum((p["monthly_salary"] for p in payloads.values()), Decimal("0"))
     salary_applied = salary_total if include_salaries else Decimal("0")
     net_margin = gross_margin - expense_total - salary_applied
     net_margin_percent = (
@@ -4,11 +4,13 @@ from decimal import Decimal
 import json
 from io import BytesIO
 import re
+from urllib.parse import urlencode
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden, JsonResponse, HttpResponse
+from django.urls import reverse
 from django.utils import timezone
 from django.db.models import Q, Sum
 from django.core.paginator import Paginator
@@ -16,6 +18,8 @@ from django.views.decorators.http import require_POST
 
 from ..models import Client, Sale, Employee, IncentiveRule, IncentiveSlab, Product
 from ..forms import AdminSaleForm, EditSaleForm, SaleForm
+from ..services import approvals
+from ..services.incentive_engine import recompute_points
 from .helpers import get_manager_access
 
 
@@ -87,8 +91,6 @@ def add_sale(request):
                         },
                     )
 
-            sale.compute_points()
-
             if sale.product:
                 sale.product_ref = Product.objects.filter(name=sale.product).first()
 
@@ -212,7 +214,6 @@ def admin_add_sale(request):
             if not sale.employee_id:
                 form.add_error("employee", "Please select an employee for this sale.")
             else:
-                sale.compute_points()
                 if sale.product:
                     sale.product_ref = Product.objects.filter(name=sale.product).first()
                 sale.status = Sale.STATUS_APPROVED
@@ -238,36 +239,35 @@ def approve_sales(request):
     if not (is_admin or (manager_access and manager_access.allow_approve_sales)):
         return HttpResponseForbidden("You do not have permission to approve sales.")
 
+    scope = Sale.objects.all()
+    if manager_access and not manager_access.allow_view_all_sales:
+        scope = scope.filter(employee=user_emp)
+
     if request.method == "POST":
         action = request.POST.get("action")
-        sale_id = request.POST.get("sale_id")
+        # Multi-select posts sale_ids; the per-row buttons post a single sale_id.
+        sale_ids = request.POST.getlist("sale_ids") or [request.POST.get("sale_id")]
         reason = (request.POST.get("reason") or "").strip()
-        sale = get_object_or_404(Sale, id=sale_id)
-        if action == "approve":
-            sale.status = Sale.STATUS_APPROVED
-            sale.approved_by = request.user
-            sale.approved_at = timezone.now()
-            sale.rejection_reason = ""
-            sale._audit_actor = request.user   # picked up by AuditLog signal
-            sale.save()
-            messages.success(request, f"Approved sale #{sale.id}.")
-        elif action == "reject":
-            sale.status = Sale.STATUS_REJECTED
-            sale.approved_by = request.user
-            sale.approved_at = timezone.now()
-            sale.rejection_reason = reason
-            sale._audit_actor = request.user   # picked up by AuditLog signal
-            sale.save()
-            messages.info(request, f"Rejected sale #{sale.id}.")
+        new_status = {"approve": Sale.STATUS_APPROVED, "reject": Sale.STATUS_REJECTED}.get(action)
+        if new_status:
+            changed = approvals.decide(
+                [i for i in sale_ids if i], new_status, actor=request.user, reason=reason, scope=scope,
+            )
+            verb = "Approved" if new_status == Sale.STATUS_APPROVED else "Rejected"
+            if changed:
+                messages.success(request, f"{verb} {changed} sale{'s' if changed != 1 else ''}.")
+            else:
+                messages.info(request, "No pending sales were selected.")
+        next_url = request.POST.get("next") or ""
+        if next_url.startswith("?"):
+            return redirect(reverse("clients:approve_sales") + next_url)
         return redirect("clients:approve_sales")
 
     employee_filter = request.GET.get("employee", "").strip()
     start_date = request.GET.get("start_date")
     end_date = request.GET.get("end_date")
 
-    sales_qs = Sale.objects.filter(status=Sale.STATUS_PENDING).select_related("client", "employee__user")
-    if manager_access and not manager_access.allow_view_all_sales:
-        sales_qs = sales_qs.filter(employee=user_emp)
+    sales_qs = scope.filter(status=Sale.STATUS_PENDING).select_related("client", "employee__user")
     if employee_filter:
         sales_qs = sales_qs.filter(
             Q(employee__user__username__icontains=employee_filter)
@@ -277,12 +277,21 @@ def approve_sales(request):
     if start_date and end_date:
         sales_qs = sales_qs.filter(date__range=[start_date, end_date])
 
-    sales_qs = sales_qs.order_by("-date", "-created_at")
+    cursor = request.GET.get("after") or None
+    sales, next_cursor, employee_counts = approvals.pending_queue(sales_qs, cursor)
+
+    filters = {k: v for k, v in (("employee", employee_filter), ("start_date", start_date), ("end_date", end_date)) if v}
+    qstring = urlencode(filters)
     context = {
-        "sales": sales_qs,
+        "sales": sales,
         "employee_filter": employee_filter,
         "start_date": start_date,
         "end_date": end_date,
+        "employee_counts": employee_counts,
+        "total_pending": sum(row["pending"] for row in employee_counts),
+        "qstring": qstring,
+        "next_cursor": next_cursor,
+        "is_first_page": not cursor,
     }
     return render(request, "sales/approve_sales.html", context)
 
@@ -516,13 +525,13 @@ def recalc_points(request):
         messages.error(request, "You are not mapped to an employee.")
         return redirect("clients:login")
 
-    count = 0
-    for s in sales:
-        s.compute_points()
-        s.save()
-        count += 1
+    employee_ids = sales.order_by().values_list("employee_id", flat=True).distinct()
+    stats = recompute_points(list(employee_ids))
 
-    messages.success(request, f"Recalculated points for {count} sales.")
+    messages.success(
+        request,
+        f"Recalculated points for {stats['sales']} sales ({stats['updated']} changed).",
+    )
     if request.user.employee.role == "admin":
         return redirect("clients:all_sales")
     else:
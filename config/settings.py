@@ -76,6 +76,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'clients.middleware.ViewProfilerMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.gzip.GZipMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -134,13 +135,38 @@ CACHES = {
     }
 }
 
+# New-sale notifications: one digest per admin when a single commit brings in
+# more than DIGEST_BATCH sales; with DIGEST_MINUTES > 0, alerts also fold into
+# the admin's unread digest from that window.
+SALE_NOTIFICATION_DIGEST_BATCH = 20
+SALE_NOTIFICATION_DIGEST_MINUTES = int(os.environ.get("SALE_NOTIFICATION_DIGEST_MINUTES", "0"))
+
+# Retroactive points recompute after incentive rule / campaign edits:
+# "cron" (default: queued jobs are run by the run_recompute_jobs cron entry
+# below, within a minute), "sync" (inline, for small installs) or "thread"
+# (opt-in: a background thread in the web worker after commit, for servers
+# without the cron entry).
+POINTS_RECOMPUTE_MODE = os.environ.get("POINTS_RECOMPUTE_MODE", "cron")
+# A job still RUNNING this long after it started is assumed dead (its
+# thread or process went away) and is picked up again by the next runner.
+POINTS_RECOMPUTE_LEASE_MINUTES = int(os.environ.get("POINTS_RECOMPUTE_LEASE_MINUTES", "30"))
+
+# Per-view query / latency profiler (clients/services/profiler.py). Off by
+# default; VIEW_PROFILER_SAMPLE_RATE (0-1) probes only a share of requests.
+VIEW_PROFILER_ENABLED = os.environ.get("VIEW_PROFILER", "False").lower() in ("true", "1", "yes")
+VIEW_PROFILER_SAMPLE_RATE = float(os.environ.get("VIEW_PROFILER_SAMPLE_RATE", "1.0"))
+
 CRONJOBS = [
     # Run close_month at 12:05 AM on 1st of every month
     ('5 0 1 * *', 'django.core.management.call_command', ['close_month']),
+    # Fold the points ledger into monthly snapshots nightly at 12:30 AM
+    ('30 0 * * *', 'django.core.management.call_command', ['snapshot_points_ledger']),
     # Clean old notifications, message logs, expired sessions every Sunday at 3 AM
     ('0 3 * * 0', 'django.core.management.call_command', ['cleanup_data']),
     # Tag lead-sheet records untouched for 90+ days as 'cold', nightly at 1 AM
     ('0 1 * * *', 'django.core.management.call_command', ['autoclose_stale_leads']),
+    # Pick up any queued points-recompute jobs every minute
+    ('* * * * *', 'django.core.management.call_command', ['run_recompute_jobs']),
 ]
 
 